@@ -1,10 +1,13 @@
+import asyncio
 import json
 import os
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 import requests
 
+from .response_cache import get_ai_response_cache, response_cache_key
+
 def _env(name: str, default: Optional[str] = None) -> Optional[str]:
     raw = os.getenv(name)
     if raw is None:
@@ -25,6 +28,8 @@ class AIClientResult:
     tokens_in: int
     tokens_out: int
     latency_ms: int
+    # Served from the response cache (or a concurrent identical call): no tokens were spent.
+    cached: bool = False
 
 
 def _extract_json(text: str) -> Dict[str, Any]:
@@ -47,6 +52,14 @@ def _extract_json(text: str) -> Dict[str, Any]:
         return json.loads(cleaned[start : end + 1])
 
 
+def is_json_object(text: str) -> bool:
+    """``cache_valid`` check for prompts that must answer with a JSON object."""
+    try:
+        return isinstance(_extract_json(text), dict)
+    except Exception:
+        return False
+
+
 def _is_transient_error(exc: Exception) -> bool:
     msg = str(exc).lower()
     return any(k in msg for k in ["timeout", "temporar", "unavailable", "resource exhausted", "429", "503"])
@@ -141,12 +154,12 @@ def _extract_openai_text(payload: Dict[str, Any]) -> str:
 
 
 
-def _call_openai_chat_completion(
+def _openai_chat_request(
     prompt: str,
     model_name: str,
-    max_retries: int = 2,
     generation_config: Optional[Dict[str, Any]] = None,
-) -> AIClientResult:
+) -> tuple[str, Dict[str, str], Dict[str, Any]]:
+    """Endpoint, headers and JSON payload for one OpenAI-compatible chat completion."""
     api_key = _env("OPENAI_API_KEY")
     if not api_key:
         raise AIClientError("OPENAI_API_KEY is not configured")
@@ -175,6 +188,16 @@ def _call_openai_chat_completion(
     if is_openrouter:
         headers["HTTP-Referer"] = _env("OPENROUTER_HTTP_REFERER") or "https://jobshaman.cz"
         headers["X-Title"] = _env("OPENROUTER_APP_TITLE") or "JobShaman"
+    return endpoint, headers, payload
+
+
+def _call_openai_chat_completion(
+    prompt: str,
+    model_name: str,
+    max_retries: int = 2,
+    generation_config: Optional[Dict[str, Any]] = None,
+) -> AIClientResult:
+    endpoint, headers, payload = _openai_chat_request(prompt, model_name, generation_config)
 
     attempt = 0
     while True:
@@ -202,6 +225,12 @@ def _call_openai_chat_completion(
             time.sleep(backoff)
 
 
+def _azure_sampling(generation_config: Optional[Dict[str, Any]]) -> tuple[Any, Any]:
+    # Chat Completions has no top_k; like the OpenAI route, only temperature and top_p go out.
+    config = generation_config or {}
+    return config.get("temperature", 0), config.get("top_p", 1)
+
+
 def _call_azure_chat_completion(
     prompt: str,
     model_name: str,
@@ -210,7 +239,7 @@ def _call_azure_chat_completion(
 ) -> AIClientResult:
     from app.services.azure_ai_client import AzureAIClientError, call_ai_text
 
-    temperature = (generation_config or {}).get("temperature", 0)
+    temperature, top_p = _azure_sampling(generation_config)
     attempt = 0
     while True:
         attempt += 1
@@ -219,6 +248,7 @@ def _call_azure_chat_completion(
                 prompt,
                 model_name=model_name,
                 temperature=temperature,
+                top_p=top_p,
                 timeout=90,
             )
             return AIClientResult(
@@ -258,16 +288,8 @@ def call_model_with_retry(
     )
 
 
-def call_primary_with_fallback(
-    prompt: str,
-    primary_model: str,
-    fallback_model: Optional[str],
-    max_retries: int = 2,
-    generation_config: Optional[Dict[str, Any]] = None,
-    provider_override: Optional[str] = None,
-) -> tuple[AIClientResult, bool]:
+def _model_chain(primary_model: str, fallback_model: Optional[str], provider: str) -> list[str]:
     default_rescue = "gpt-4.1-mini,gpt-4.1-nano"
-    provider = (provider_override or resolve_ai_provider()).strip().lower()
     if provider == "azure":
         default_rescue = "gpt-5-mini"
 
@@ -284,9 +306,18 @@ def call_primary_with_fallback(
     for name in chain:
         if name not in ordered_unique:
             ordered_unique.append(name)
+    return ordered_unique
+
 
+def _call_model_chain(
+    prompt: str,
+    models: list[str],
+    max_retries: int,
+    generation_config: Optional[Dict[str, Any]],
+    provider: str,
+) -> tuple[AIClientResult, bool]:
     last_error: Optional[Exception] = None
-    for index, model_name in enumerate(ordered_unique):
+    for index, model_name in enumerate(models):
         try:
             return call_model_with_retry(
                 prompt,
@@ -304,12 +335,199 @@ def call_primary_with_fallback(
     raise AIClientError("No usable AI model configured")
 
 
+def _cacheable(text: str, cache_valid: Optional[Callable[[str], bool]]) -> bool:
+    if cache_valid is None:
+        return True
+    try:
+        return bool(cache_valid(text))
+    except Exception:
+        return False
+
+
+def call_primary_with_fallback(
+    prompt: str,
+    primary_model: str,
+    fallback_model: Optional[str],
+    max_retries: int = 2,
+    generation_config: Optional[Dict[str, Any]] = None,
+    provider_override: Optional[str] = None,
+    *,
+    cache: bool = False,
+    prompt_version: Optional[str] = None,
+    cache_ttl_seconds: Optional[int] = None,
+    cache_valid: Optional[Callable[[str], bool]] = None,
+) -> tuple[AIClientResult, bool]:
+    """
+    Runs the primary -> fallback -> rescue model chain. With ``cache=True`` identical
+    calls (same provider, model chain, prompt version, normalized prompt and generation
+    params) are answered from the AI response cache; opt in only for deterministic
+    prompts. ``cache_valid(text)`` keeps output the caller would reject (unparseable,
+    failing its schema) out of the cache, so a retry asks the model again.
+    """
+    provider = (provider_override or resolve_ai_provider()).strip().lower()
+    ordered_unique = _model_chain(primary_model, fallback_model, provider)
+
+    response_cache = get_ai_response_cache() if cache else None
+    if response_cache is None:
+        return _call_model_chain(prompt, ordered_unique, max_retries, generation_config, provider)
+
+    def compute() -> Dict[str, Any]:
+        result, fallback_used = _call_model_chain(prompt, ordered_unique, max_retries, generation_config, provider)
+        return {
+            "text": result.text,
+            "model_name": result.model_name,
+            "tokens_in": result.tokens_in,
+            "tokens_out": result.tokens_out,
+            "latency_ms": result.latency_ms,
+            "fallback_used": fallback_used,
+        }
+
+    key = response_cache_key(
+        provider=provider,
+        models=ordered_unique,
+        prompt=prompt,
+        prompt_version=prompt_version,
+        generation_config=generation_config,
+    )
+    payload, cached = response_cache.get_or_compute(
+        key,
+        compute,
+        ttl_seconds=cache_ttl_seconds,
+        accept=lambda value: _cacheable(value["text"], cache_valid),
+    )
+    result = AIClientResult(
+        text=payload["text"],
+        model_name=payload["model_name"],
+        tokens_in=0 if cached else int(payload["tokens_in"]),
+        tokens_out=0 if cached else int(payload["tokens_out"]),
+        latency_ms=0 if cached else int(payload["latency_ms"]),
+        cached=cached,
+    )
+    return result, bool(payload["fallback_used"])
+
+
+def build_chat_request(
+    prompt: str,
+    model_name: str,
+    generation_config: Optional[Dict[str, Any]] = None,
+    provider: Optional[str] = None,
+    response_format: Optional[Dict[str, Any]] = None,
+):
+    """One provider chat request for the async transport."""
+    from .transport import ChatRequest
+
+    provider = (provider or resolve_ai_provider()).strip().lower()
+    if provider == "azure":
+        from app.services.azure_ai_client import build_chat_request as build_azure_chat_request
+
+        temperature, top_p = _azure_sampling(generation_config)
+        url, headers, payload, model = build_azure_chat_request(
+            prompt,
+            model_name=model_name,
+            temperature=temperature,
+            top_p=top_p,
+            response_format=response_format,
+        )
+        return ChatRequest(provider, model, url, headers, payload)
+    endpoint, headers, payload = _openai_chat_request(prompt, model_name, generation_config)
+    if response_format:
+        payload["response_format"] = response_format
+    return ChatRequest(provider, model_name, endpoint, headers, payload)
+
+
+async def acall_primary_with_fallback(
+    prompt: str,
+    primary_model: str,
+    fallback_model: Optional[str],
+    generation_config: Optional[Dict[str, Any]] = None,
+    provider_override: Optional[str] = None,
+    *,
+    deadline_seconds: Optional[float] = None,
+    cache: bool = False,
+    prompt_version: Optional[str] = None,
+    cache_ttl_seconds: Optional[int] = None,
+    cache_valid: Optional[Callable[[str], bool]] = None,
+) -> tuple[AIClientResult, bool]:
+    """
+    Async counterpart of ``call_primary_with_fallback`` on the pooled transport. The
+    fallback chain is hedged (see ``transport.AITransport.complete``) and the whole call is
+    bounded by ``deadline_seconds``.
+    """
+    from .transport import get_ai_transport
+
+    provider = (provider_override or resolve_ai_provider()).strip().lower()
+    models = _model_chain(primary_model, fallback_model, provider)
+    response_cache = get_ai_response_cache() if cache else None
+    key = None
+    if response_cache is not None:
+        key = response_cache_key(
+            provider=provider,
+            models=models,
+            prompt=prompt,
+            prompt_version=prompt_version,
+            generation_config=generation_config,
+        )
+        # SQLite can wait on its busy timeout; keep it off the event loop.
+        payload = await asyncio.to_thread(response_cache.get, key)
+        if payload is not None and _cacheable(payload["text"], cache_valid):
+            return AIClientResult(
+                text=payload["text"],
+                model_name=payload["model_name"],
+                tokens_in=0,
+                tokens_out=0,
+                latency_ms=0,
+                cached=True,
+            ), bool(payload["fallback_used"])
+
+    requests_chain = [build_chat_request(prompt, model, generation_config, provider) for model in models]
+    result, index = await get_ai_transport().complete(requests_chain, deadline_seconds=deadline_seconds)
+    if response_cache is not None and key is not None and _cacheable(result.text, cache_valid):
+        await asyncio.to_thread(
+            response_cache.set,
+            key,
+            {
+                "text": result.text,
+                "model_name": result.model_name,
+                "tokens_in": result.tokens_in,
+                "tokens_out": result.tokens_out,
+                "latency_ms": result.latency_ms,
+                "fallback_used": index > 0,
+            },
+            ttl_seconds=cache_ttl_seconds,
+        )
+    return result, index > 0
+
+
+def stream_primary_with_fallback(
+    prompt: str,
+    primary_model: str,
+    fallback_model: Optional[str],
+    generation_config: Optional[Dict[str, Any]] = None,
+    provider_override: Optional[str] = None,
+    *,
+    deadline_seconds: Optional[float] = None,
+):
+    """
+    Token stream over the model chain: ``async for delta in stream`` yields text as it
+    arrives; ``stream.result`` / ``stream.first_token_ms`` are set once it finishes.
+    Streams are never cached.
+    """
+    from .transport import get_ai_transport
+
+    provider = (provider_override or resolve_ai_provider()).strip().lower()
+    models = _model_chain(primary_model, fallback_model, provider)
+    requests_chain = [build_chat_request(prompt, model, generation_config, provider) for model in models]
+    return get_ai_transport().stream(requests_chain, deadline_seconds=deadline_seconds)
+
+
 __all__ = [
     "AIClientError",
     "AIClientResult",
     "_extract_json",
+    "acall_primary_with_fallback",
     "call_primary_with_fallback",
     "get_default_fallback_model",
     "get_default_primary_model",
     "resolve_ai_provider",
+    "stream_primary_with_fallback",
 ]
@@ -0,0 +1,380 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Word pieces of a BPE tokenizer, approximated: runs of letters, runs of digits, single symbols.
+_TOKEN_RE = re.compile(r"[^\W\d_]+|\d+|\S")
+
+# CV sections in the order they matter to the model when a prompt has to be cut.
+SECTION_PRIORITY = {
+    "summary": 9,
+    "experience": 8,
+    "skills": 8,
+    "contact": 7,
+    "education": 6,
+    "languages": 6,
+    "certifications": 5,
+    "projects": 4,
+    "other": 3,
+    "interests": 2,
+    "references": 1,
+}
+
+_SECTION_HEADINGS = {
+    "summary": ("profil", "profile", "summary", "o mně", "about me", "shrnutí", "objective", "kariérní cíl", "o mnie"),
+    "experience": (
+        "pracovní zkušenosti", "pracovné skúsenosti", "work experience", "professional experience",
+        "experience", "zkušenosti", "employment history", "praxe", "doświadczenie zawodowe", "berufserfahrung",
+    ),
+    "skills": ("dovednosti", "skills", "znalosti", "kompetence", "zručnosti", "umiejętności", "kenntnisse"),
+    "education": ("vzdělání", "vzdelanie", "education", "wykształcenie", "ausbildung"),
+    "languages": ("jazykové znalosti", "jazyky", "languages", "języki", "sprachen"),
+    "certifications": ("certifikáty", "certifikace", "certifications", "kurzy a školení", "kurzy", "courses", "školení"),
+    "projects": ("projekty", "projects"),
+    "interests": ("zájmy", "koníčky", "hobbies", "interests", "zainteresowania", "hobby"),
+    "references": ("reference", "references", "referencje"),
+}
+
+_HEADING_TO_SECTION = {
+    heading: section for section, headings in _SECTION_HEADINGS.items() for heading in headings
+}
+
+# Headings are only trusted when written as headings (Title case or UPPER case), longest first.
+_HEADING_RE = re.compile(
+    r"(?<!\w)("
+    + "|".join(
+        re.escape(variant)
+        for heading in sorted(_HEADING_TO_SECTION, key=len, reverse=True)
+        for variant in {heading[:1].upper() + heading[1:], heading.upper()}
+    )
+    + r")(?!\w)\s*:?"
+)
+
+# Lines, bullet points (the bullet stays with its item), date ranges starting an entry and sentences.
+_SEGMENT_SPLIT_RE = re.compile(
+    r"\s*\n\s*"
+    r"|\s+(?=[•▪●■◦|]\s)"
+    r"|\s+(?=(?:19|20)\d{2}\s*[–-]\s*(?:(?:19|20)\d{2}|dosud|současnost|dnes|present|now|today)\b)"
+    r"|(?<=[.!?])\s+(?=[A-ZÁČĎÉĚÍŇÓŘŠŤÚŮÝŽŁŚŻŹ0-9])"
+)
+
+# Text that costs tokens and never helps the model: consent clauses, page markers, titles.
+_BOILERPLATE_RES = (
+    re.compile(r"(?i)(?:souhlasím|souhlasim|súhlasím) se? (?:zpracováním|spracovaním)[^.]*(?:\.|$)"),
+    re.compile(r"(?i)i (?:hereby )?(?:agree|consent) to the processing of (?:my )?personal data[^.]*(?:\.|$)"),
+    re.compile(r"(?i)wyrażam zgodę na przetwarzanie[^.]*(?:\.|$)"),
+    re.compile(r"(?i)\b(?:page|strana|stránka|strona|seite)\s+\d+\s*(?:of|z|ze|/|von)\s*\d+\b"),
+    re.compile(r"(?i)\bcurriculum vitae\b"),
+    re.compile(r"(?i)\breferences? (?:are )?available (?:up)?on request\.?"),
+    re.compile(r"(?i)\breference (?:poskytnu )?na vyžádání\.?"),
+)
+
+# Entry headers ("2019 – 2023 Senior developer, Acme") are the skeleton of a CV section.
+_ENTRY_RE = re.compile(r"^(?:\d{1,2}[./]\s*)?(?:19|20)\d{2}\b")
+
+_ELLIPSIS = "…"
+
+
+def _word_cost(piece: str) -> int:
+    if piece.isascii():
+        return 1 + max(0, len(piece) - 4) // 5
+    # Diacritics split into more pieces in most vocabularies.
+    return 1 + (len(piece) - 1) // 3
+
+
+def count_tokens(text: str) -> int:
+    """
+    Local approximation of a chat model tokenizer, biased slightly high so that a
+    prompt under budget here is under budget at the provider too.
+    """
+    if not text:
+        return 0
+    return sum(_word_cost(piece) for piece in _TOKEN_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` at a word boundary so that the result (with an ellipsis) fits ``max_tokens``."""
+    text = str(text or "")
+    if count_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 1:
+        return ""
+    used = 0
+    end = 0
+    for match in _TOKEN_RE.finditer(text):
+        cost = _word_cost(match.group())
+        if used + cost > max_tokens - 1:
+            break
+        used += cost
+        end = match.end()
+    return (text[:end].rstrip() + " " + _ELLIPSIS).lstrip()
+
+
+def allocate_budget(costs: Sequence[int], total: int) -> List[int]:
+    """Split ``total`` fairly: small parts keep all they need, the rest share what is left evenly."""
+    shares = [0] * len(costs)
+    pending = sorted(range(len(costs)), key=lambda index: costs[index])
+    remaining = max(0, int(total))
+    while pending:
+        fair = remaining // len(pending)
+        index = pending[0]
+        if costs[index] <= fair:
+            shares[index] = costs[index]
+        else:
+            # Everyone left needs more than the fair share: split evenly and stop.
+            for index in pending:
+                shares[index] = fair
+            break
+        remaining -= costs[index]
+        pending.pop(0)
+    return shares
+
+
+def strip_boilerplate(text: str) -> str:
+    for pattern in _BOILERPLATE_RES:
+        text = pattern.sub(" ", text)
+    return text
+
+
+def _split_sections(text: str) -> List[Tuple[str, str, bool]]:
+    """(section, chunk, is_heading) triples; text before the first heading is the contact header."""
+    parts: List[Tuple[str, str, bool]] = []
+    section = "contact"
+    position = 0
+    for match in _HEADING_RE.finditer(text):
+        if match.start() > position:
+            parts.append((section, text[position:match.start()], False))
+        section = _HEADING_TO_SECTION[match.group(1).lower()]
+        parts.append((section, match.group(0), True))
+        position = match.end()
+    parts.append((section, text[position:], False))
+    return parts
+
+
+def _split_long(segment: str, max_tokens: int) -> List[str]:
+    words = segment.split()
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+    for word in words:
+        cost = count_tokens(word)
+        if current and used + cost > max_tokens:
+            chunks.append(" ".join(current))
+            current, used = [], 0
+        current.append(word)
+        used += cost
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _dedupe_key(segment: str) -> str:
+    return " ".join(segment.casefold().split()).strip(" .,;:-–")
+
+
+def compact_text(
+    text: str,
+    max_tokens: int,
+    *,
+    section_priority: Optional[Dict[str, int]] = None,
+) -> str:
+    """
+    Deterministic extractive compaction of CV-like text to ``max_tokens``.
+
+    Boilerplate and repeated segments (page headers, duplicated bullet points) are
+    removed first. If the text is still too long, whole segments are kept by section
+    priority and by position within their section (earlier entries are usually the
+    recent, relevant ones) and emitted in their original order.
+    """
+    text = str(text or "")
+    if max_tokens <= 0 or not text.strip():
+        return ""
+    priorities = section_priority or SECTION_PRIORITY
+    multiline = "\n" in text.strip()
+
+    segments: List[Tuple[str, str, bool]] = []
+    seen = set()
+    for section, chunk, is_heading in _split_sections(strip_boilerplate(text)):
+        for segment in _SEGMENT_SPLIT_RE.split(chunk):
+            segment = " ".join(segment.split())
+            key = _dedupe_key(segment)
+            if not key or (key in seen and not is_heading):
+                continue
+            seen.add(key)
+            segments.append((section, segment, is_heading))
+
+    costs = [count_tokens(segment) for _, segment, _ in segments]
+    joiner = "\n" if multiline else " "
+    if sum(costs) <= max_tokens:
+        return joiner.join(segment for _, segment, _ in segments)
+
+    # Fine-grained units so one run-on paragraph cannot take the whole budget.
+    unit_limit = max(16, max_tokens // 8)
+    units: List[Tuple[str, str, int]] = []
+    headings: Dict[int, bool] = {}
+    for (section, segment, is_heading), cost in zip(segments, costs):
+        pieces = _split_long(segment, unit_limit) if cost > unit_limit else [segment]
+        for piece in pieces:
+            headings[len(units)] = is_heading
+            units.append((section, piece, count_tokens(piece)))
+
+    section_positions: Dict[str, int] = {}
+    ranked = []
+    for index, (section, piece, _cost) in enumerate(units):
+        position = section_positions.get(section, 0)
+        section_positions[section] = position + 1
+        score = priorities.get(section, priorities.get("other", 3))
+        if _ENTRY_RE.match(piece):
+            score += 1
+        else:
+            score /= 1.0 + 0.1 * position
+        ranked.append((-score, index))
+    ranked.sort()
+
+    kept: Dict[int, str] = {}
+    remaining = max_tokens
+    for _score, index in ranked:
+        _section, piece, cost = units[index]
+        if cost <= remaining:
+            kept[index] = piece
+            remaining -= cost
+        elif remaining >= 12:
+            kept[index] = truncate_to_tokens(piece, remaining)
+            remaining -= count_tokens(kept[index])
+        if remaining <= 0:
+            break
+    # A heading is only worth its tokens if something of its section survived.
+    order = sorted(kept)
+    output = []
+    for position, index in enumerate(order):
+        if headings[index]:
+            following = order[position + 1] if position + 1 < len(order) else None
+            if following is None or any(headings[between] for between in range(index + 1, following + 1)):
+                continue
+        output.append(kept[index])
+    return joiner.join(output)
+
+
+def _shrink(value: Any, string_limit: int, list_limit: int) -> Any:
+    if isinstance(value, str):
+        return value if len(value) <= string_limit else value[:string_limit].rstrip() + _ELLIPSIS
+    if isinstance(value, dict):
+        return {key: _shrink(item, string_limit, list_limit) for key, item in value.items() if item not in (None, "", [], {})}
+    if isinstance(value, (list, tuple)):
+        return [_shrink(item, string_limit, list_limit) for item in list(value)[:list_limit]]
+    return value
+
+
+_JSON_SHRINK_STEPS = ((2000, 24), (600, 12), (300, 8), (160, 5), (80, 3), (40, 2), (20, 1))
+
+
+def compact_json(value: Any, max_tokens: int) -> str:
+    """
+    Compact JSON for a prompt, shrinking long strings and lists step by step (and finally
+    dropping trailing keys) until it fits ``max_tokens``. Always valid JSON.
+    """
+
+    def dumps(item: Any) -> str:
+        return json.dumps(item, ensure_ascii=False, separators=(",", ":"), default=str)
+
+    text = dumps(value)
+    if count_tokens(text) <= max_tokens:
+        return text
+    shrunk = value
+    for string_limit, list_limit in _JSON_SHRINK_STEPS:
+        shrunk = _shrink(value, string_limit, list_limit)
+        text = dumps(shrunk)
+        if count_tokens(text) <= max_tokens:
+            return text
+    if isinstance(shrunk, dict):
+        items = list(shrunk.items())
+        while items:
+            items.pop()
+            text = dumps(dict(items))
+            if count_tokens(text) <= max_tokens:
+                return text
+    if isinstance(shrunk, list):
+        items = list(shrunk)
+        while items:
+            items.pop()
+            text = dumps(items)
+            if count_tokens(text) <= max_tokens:
+                return text
+    return "{}" if isinstance(value, dict) else "[]"
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    return str(message.get("message") or message.get("content") or message.get("text") or "")
+
+
+def compact_messages(messages: Sequence[Dict[str, Any]], max_tokens: int, *, max_message_tokens: int = 300) -> List[Dict[str, Any]]:
+    """
+    The newest messages that fit ``max_tokens``, each cut to ``max_message_tokens``, oldest
+    first. A leading memory summary (role ``summary``) is kept ahead of older turns.
+    """
+    messages = [item for item in messages or [] if isinstance(item, dict)]
+    pinned: List[Dict[str, Any]] = []
+    if messages and messages[0].get("role") == "summary":
+        pinned, messages = messages[:1], messages[1:]
+
+    def shorten(message: Dict[str, Any], limit: int) -> Tuple[Dict[str, Any], int]:
+        text = truncate_to_tokens(_message_text(message), limit)
+        key = "message" if "message" in message or "content" not in message else "content"
+        return {"role": message.get("role"), key: text}, count_tokens(text) + 2  # role marker and separators
+
+    remaining = max_tokens
+    head: List[Dict[str, Any]] = []
+    for message in pinned:
+        short, cost = shorten(message, min(max_message_tokens, max(0, remaining - 2)))
+        if cost <= remaining and _message_text(short):
+            head.append(short)
+            remaining -= cost
+    kept: List[Dict[str, Any]] = []
+    for message in reversed(messages):
+        short, cost = shorten(message, max_message_tokens)
+        if cost > remaining:
+            break
+        kept.append(short)
+        remaining -= cost
+    kept.reverse()
+    return head + kept
+
+
+def _first_sentence(text: str, max_tokens: int) -> str:
+    text = " ".join(str(text or "").split())
+    sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    return truncate_to_tokens(sentence, max_tokens)
+
+
+def fold_memory(
+    history: Sequence[Dict[str, Any]],
+    checkpoint: Optional[Dict[str, Any]],
+    *,
+    keep_last: int,
+    summary_tokens: int,
+    line_tokens: int = 40,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Memory summarization checkpoint for long agent conversations.
+
+    Messages beyond the newest ``keep_last`` are folded into an extractive summary
+    (one line per message: role and first sentence) appended to the previous
+    checkpoint; the summary keeps its newest lines within ``summary_tokens``.
+    Returns ``(recent_messages, checkpoint)``.
+    """
+    history = [item for item in history or [] if isinstance(item, dict)]
+    checkpoint = dict(checkpoint or {})
+    lines = [line for line in str(checkpoint.get("summary") or "").split("\n") if line.strip()]
+    folded = int(checkpoint.get("folded") or 0)
+    if len(history) > keep_last:
+        older, history = history[: len(history) - keep_last], history[len(history) - keep_last:]
+        for message in older:
+            sentence = _first_sentence(_message_text(message), line_tokens)
+            if sentence:
+                lines.append(f"{message.get('role') or 'user'}: {sentence}")
+        folded += len(older)
+    while lines and count_tokens("\n".join(lines)) > summary_tokens:
+        lines.pop(0)
+    if lines:
+        checkpoint.update({"summary": "\n".join(lines), "folded": folded})
+    return list(history), checkpoint
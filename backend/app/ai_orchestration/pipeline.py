@@ -14,13 +14,14 @@ from .client import (
     get_default_primary_model,
 )
 from ..core.runtime_config import get_active_model_config, get_release_flag
+from .context_budget import allocate_budget, compact_json, compact_text, count_tokens
 from .models import (
     AIGuidedProfileAIResult,
     AIGuidedProfileResponseV2,
     AIGenerationMeta,
     TokenUsage,
 )
-from .prompt_registry import get_prompt
+from .prompt_registry import get_prompt, get_prompt_budget
 from .telemetry import canonical_hash, estimate_text_cost_usd, log_ai_generation
 
 DEFAULT_PRIMARY_MODEL = get_default_primary_model()
@@ -57,14 +58,25 @@ def _normalize_payload(raw: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _budget_steps(steps: List[Dict[str, str]], max_tokens: int) -> List[Dict[str, str]]:
+    """Short steps stay whole; long ones share what is left and are compacted extractively."""
+    shares = allocate_budget([count_tokens(s["text"]) for s in steps], max_tokens)
+    return [
+        {"id": s["id"], "text": s["text"] if count_tokens(s["text"]) <= share else compact_text(s["text"], share)}
+        for s, share in zip(steps, shares)
+    ]
+
+
 def _build_generation_prompt(
     system_prompt: str,
     language: str,
     existing_profile: Optional[Dict[str, Any]],
     steps: List[Dict[str, str]],
+    budget: Optional[Dict[str, int]] = None,
 ) -> str:
-    steps_text = "\n\n".join([f"[{s['id']}] {s['text']}" for s in steps])
-    existing_json = json.dumps(existing_profile or {}, ensure_ascii=False)
+    budget = budget or get_prompt_budget("profile_generate")
+    steps_text = "\n\n".join([f"[{s['id']}] {s['text']}" for s in _budget_steps(steps, budget["steps"])])
+    existing_json = compact_json(existing_profile or {}, budget["existing_profile"])
 
     schema_hint = {
         "profile_updates": {
@@ -145,11 +157,12 @@ def generate_profile_with_orchestration(
         raise ValueError("No valid steps provided")
 
     prompt_version, system_prompt = get_prompt("profile_generate", requested_prompt_version)
-    prompt = _build_generation_prompt(system_prompt, language, existing_profile, safe_steps)
+    model_cfg = get_active_model_config("ai_orchestration", "profile_generate")
+    budget = get_prompt_budget("profile_generate", model_cfg.get("token_budget"))
+    prompt = _build_generation_prompt(system_prompt, language, existing_profile, safe_steps, budget)
     input_hash = canonical_hash({"language": language, "steps": safe_steps, "existing_profile": existing_profile or {}})
     prompt_hash = canonical_hash({"prompt_version": prompt_version, "system_prompt": system_prompt, "prompt": prompt})
 
-    model_cfg = get_active_model_config("ai_orchestration", "profile_generate")
     primary_model = model_cfg.get("primary_model") or DEFAULT_PRIMARY_MODEL
     fallback_model = model_cfg.get("fallback_model") or DEFAULT_FALLBACK_MODEL
 
@@ -179,6 +192,7 @@ def generate_profile_with_orchestration(
             primary_model,
             fallback_model,
             generation_config=generation_config,
+            prompt_version=prompt_version,
         )
         model_final = result.model_name
         tokens_in += result.tokens_in
@@ -197,6 +211,7 @@ def generate_profile_with_orchestration(
                 primary_model,
                 fallback_model,
                 generation_config=generation_config,
+                prompt_version=prompt_version,
             )
             fallback_used = fallback_used or repaired_fallback
             model_final = repaired.model_name
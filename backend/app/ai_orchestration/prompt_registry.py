@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 
 from ..core.database import supabase
 
@@ -9,9 +9,18 @@ DEFAULT_PROMPTS = {
             "You are a senior career strategist. Analyze the user career story and "
             "return strict JSON only, matching the required response schema."
         ),
+        "token_budget": {"steps": 3000, "existing_profile": 1200},
     }
 }
 
+# Input token budgets (per prompt part) for features whose prompts live next to their code.
+PROMPT_TOKEN_BUDGETS: Dict[str, Dict[str, int]] = {
+    "cv_parse": {"cv_text": 4000},
+    "jcfpm_report": {"payload": 2500},
+    "mentor_chat": {"profile": 1500, "job_recommendations": 700, "history": 900},
+    "recruiter_chat": {"roles": 700, "candidates": 700, "history": 900, "memory_summary": 300},
+}
+
 
 def get_prompt(feature: str, requested_version: Optional[str] = None) -> tuple[str, str]:
     default = DEFAULT_PROMPTS.get(feature)
@@ -35,3 +44,19 @@ def get_prompt(feature: str, requested_version: Optional[str] = None) -> tuple[s
         print(f"⚠️ [AI Prompt Registry] failed to load prompt from DB: {exc}")
 
     return default["version"], default["system_prompt"]
+
+
+def get_prompt_budget(feature: str, overrides: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """
+    Token budgets for the variable parts of a prompt. Registry metadata first, then the
+    code defaults; ``overrides`` (e.g. from the runtime model config) win per part.
+    """
+    default = DEFAULT_PROMPTS.get(feature, {})
+    budget = dict(default.get("token_budget") or PROMPT_TOKEN_BUDGETS.get(feature) or {})
+    for part, value in (overrides if isinstance(overrides, dict) else {}).items():
+        try:
+            if part in budget and int(value) > 0:
+                budget[part] = int(value)
+        except (TypeError, ValueError):
+            continue
+    return budget
@@ -0,0 +1,252 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Bump when the key payload or the stored value layout changes.
+CACHE_KEY_VERSION = "v1"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Line endings and trailing whitespace never change the answer; keep everything else."""
+    text = str(prompt or "").replace("\r\n", "\n").replace("\r", "\n").strip()
+    return "\n".join(line.rstrip() for line in text.split("\n"))
+
+
+def response_cache_key(
+    *,
+    provider: str,
+    models: Iterable[str],
+    prompt: str,
+    prompt_version: Optional[str] = None,
+    generation_config: Optional[Dict[str, Any]] = None,
+) -> str:
+    payload = {
+        "v": CACHE_KEY_VERSION,
+        "provider": provider,
+        "models": list(models),
+        "prompt_version": prompt_version or "",
+        "generation_config": generation_config or {},
+        "prompt": normalize_prompt(prompt),
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+class AIResponseCache:
+    """
+    Persistent AI response cache (one SQLite file per host, shared by all workers).
+
+    Entries expire after their TTL and the least recently used ones are evicted once the
+    stored payloads exceed ``max_bytes``. ``get_or_compute`` additionally collapses
+    concurrent identical calls in this process onto one upstream request. Storage errors
+    are reported and treated as misses: the cache never fails an AI call.
+    """
+
+    _PRUNE_EVERY = 50
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int = 86400,
+        max_bytes: int = 256 * 1024 * 1024,
+        clock: Callable[[], float] = time.time,
+        busy_timeout_ms: int = 2000,
+    ):
+        self.path = path
+        self.ttl_seconds = int(ttl_seconds)
+        self.max_bytes = int(max_bytes)
+        self._clock = clock
+        self._busy_timeout_ms = int(busy_timeout_ms)
+        self._local = threading.local()
+        self._inflight: Dict[str, _Flight] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "shared": 0, "stores": 0, "evictions": 0, "errors": 0}
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ai_response_cache_last_access ON ai_response_cache (last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self._busy_timeout_ms / 1000.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self._busy_timeout_ms}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            conn = self._connect()
+            now = self._clock()
+            row = conn.execute("SELECT value, expires_at FROM ai_response_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                self._count("misses")
+                return None
+            conn.execute("UPDATE ai_response_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._count("hits")
+            return json.loads(row[0])
+        except Exception as exc:
+            self._count("errors")
+            print(f"⚠️ [AI Response Cache] read failed: {exc}")
+            return None
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        try:
+            encoded = json.dumps(value, ensure_ascii=False)
+            now = self._clock()
+            ttl = self.ttl_seconds if ttl_seconds is None else int(ttl_seconds)
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO ai_response_cache (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "expires_at = excluded.expires_at, last_access = excluded.last_access",
+                (key, encoded, len(encoded.encode("utf-8")), now + ttl, now),
+            )
+            self._count("stores")
+            self._writes += 1
+            if self._writes % self._PRUNE_EVERY == 0 or len(encoded) * self._PRUNE_EVERY > self.max_bytes:
+                self.prune()
+        except Exception as exc:
+            self._count("errors")
+            print(f"⚠️ [AI Response Cache] write failed: {exc}")
+
+    def prune(self) -> None:
+        """Drop expired entries, then least recently used ones until the payloads fit ``max_bytes``."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            evicted = conn.execute("DELETE FROM ai_response_cache WHERE expires_at <= ?", (self._clock(),)).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ai_response_cache").fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                victims = []
+                for key, size in conn.execute("SELECT key, size FROM ai_response_cache ORDER BY last_access"):
+                    victims.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                conn.executemany("DELETE FROM ai_response_cache WHERE key = ?", victims)
+                evicted += len(victims)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if evicted:
+            self._count("evictions", evicted)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Dict[str, Any]],
+        ttl_seconds: Optional[int] = None,
+        accept: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> tuple[Dict[str, Any], bool]:
+        """
+        Returns ``(value, from_cache)``. On a miss exactly one caller per key computes;
+        concurrent callers wait for it and share its value (or its exception). Values
+        ``accept`` turns down are neither stored nor served from the store.
+        """
+        value = self.get(key)
+        if value is not None and (accept is None or accept(value)):
+            return value, True
+
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            self._count("shared")
+            return flight.value, True
+
+        try:
+            value = compute()
+            flight.value = value
+            if accept is None or accept(value):
+                self.set(key, value, ttl_seconds=ttl_seconds)
+            return value, False
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM ai_response_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        try:
+            entries, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ai_response_cache").fetchone()
+            stats.update({"entries": entries, "bytes": size})
+        except Exception:
+            pass
+        return stats
+
+
+_cache_lock = threading.Lock()
+_cache_instance: Optional[AIResponseCache] = None
+_cache_configured = False
+
+
+def get_ai_response_cache() -> Optional[AIResponseCache]:
+    """The process-wide cache from config, or None when disabled or unusable."""
+    global _cache_instance, _cache_configured
+    if _cache_configured:
+        return _cache_instance
+    with _cache_lock:
+        if not _cache_configured:
+            from ..core import config
+
+            if config.AI_RESPONSE_CACHE_ENABLED:
+                try:
+                    _cache_instance = AIResponseCache(
+                        config.AI_RESPONSE_CACHE_PATH,
+                        ttl_seconds=config.AI_RESPONSE_CACHE_TTL_SECONDS,
+                        max_bytes=config.AI_RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+                    )
+                except Exception as exc:
+                    print(f"⚠️ [AI Response Cache] disabled, cannot open {config.AI_RESPONSE_CACHE_PATH}: {exc}")
+            _cache_configured = True
+    return _cache_instance
+
+
+def set_ai_response_cache(cache: Optional[AIResponseCache]) -> None:
+    """Replace the process-wide cache (``None`` disables caching)."""
+    global _cache_instance, _cache_configured
+    with _cache_lock:
+        _cache_instance = cache
+        _cache_configured = True
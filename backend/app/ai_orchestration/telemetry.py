@@ -9,6 +9,7 @@ except Exception:
     sentry_sdk = None
 
 from ..core.database import supabase
+from ..core.event_writer import register_after_write, write_event
 
 
 def _safe_hash(value: str) -> str:
@@ -62,7 +63,7 @@ def _track_generation_diff(payload: Dict[str, Any]) -> None:
             "change_ratio": ratio,
             "created_at": datetime.now(timezone.utc).isoformat(),
         }
-        supabase.table("ai_generation_diffs").insert(diff_row).execute()
+        write_event("ai_generation_diffs", diff_row)
     except Exception as exc:
         print(f"⚠️ [AI Telemetry] failed to persist ai_generation_diffs: {exc}")
 
@@ -118,15 +119,21 @@ def log_ai_generation(event: Dict[str, Any]) -> None:
     if not supabase:
         return
 
-    try:
-        inserted = supabase.table("ai_generation_logs").insert(payload).execute()
-        row = (inserted.data or [None])[0]
-        if row and row.get("id"):
-            payload["id"] = row["id"]
-        if payload.get("output_valid"):
-            _track_generation_diff(payload)
-    except Exception as exc:
-        print(f"⚠️ [AI Telemetry] failed to persist ai_generation_logs: {exc}")
+    # Persisted by the background event writer; diffs are tracked once the row has an id.
+    write_event("ai_generation_logs", payload)
+
+
+def _after_generation_logs_written(rows: List[Dict[str, Any]], inserted: List[Dict[str, Any]]) -> None:
+    for index, payload in enumerate(rows):
+        if not payload.get("output_valid"):
+            continue
+        stored = inserted[index] if index < len(inserted) else None
+        if stored and stored.get("id"):
+            payload = {**payload, "id": stored["id"]}
+        _track_generation_diff(payload)
+
+
+register_after_write("ai_generation_logs", _after_generation_logs_written)
 
 
 def estimate_text_cost_usd(model_name: str, tokens_in: int, tokens_out: int) -> float:
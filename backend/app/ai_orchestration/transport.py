@@ -0,0 +1,425 @@
+"""
+Async AI transport.
+
+One pooled ``httpx.AsyncClient`` per provider origin (HTTP/2 when ``h2`` is installed,
+keep-alive otherwise), per-call deadlines, token streaming and hedged fallback: the next
+model in a chain starts once the current one is slower than a high percentile of its
+recent latencies, instead of after a hard timeout. The first successful answer wins and
+the others are cancelled.
+"""
+
+import asyncio
+import importlib.util
+import json
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..core import config
+from .client import AIClientError, AIClientResult, _extract_openai_text, _usage_counts_openai
+
+# httpx negotiates HTTP/2 only with the optional h2 package (httpx[http2]).
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+_HTTP2_FALLBACK_REPORTED = False
+
+
+@dataclass(frozen=True)
+class ChatRequest:
+    provider: str
+    model_name: str
+    url: str
+    headers: Dict[str, str]
+    payload: Dict[str, Any]
+
+    @property
+    def origin(self) -> str:
+        parts = urlsplit(self.url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+
+class LatencyTracker:
+    """Recent successful latencies per (provider, model, kind)."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = int(window)
+        self.min_samples = int(min_samples)
+        self._samples: Dict[tuple[str, str, str], deque] = {}
+        self._lock = Lock()
+
+    def observe(self, key: tuple[str, str, str], seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(float(seconds))
+
+    def percentile(self, key: tuple[str, str, str], q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key) or ())
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class AITransport:
+    def __init__(
+        self,
+        *,
+        http2: bool = True,
+        max_connections: int = 32,
+        max_keepalive: int = 16,
+        keepalive_expiry: float = 60.0,
+        default_deadline: float = 60.0,
+        hedge_percentile: float = 0.9,
+        hedge_min_delay: float = 1.5,
+        hedge_max_delay: float = 20.0,
+        hedge_default_delay: float = 8.0,
+        latencies: Optional[LatencyTracker] = None,
+    ):
+        global _HTTP2_FALLBACK_REPORTED
+        self.http2 = bool(http2) and _HTTP2_AVAILABLE
+        if http2 and not _HTTP2_AVAILABLE and not _HTTP2_FALLBACK_REPORTED:
+            _HTTP2_FALLBACK_REPORTED = True
+            print("⚠️ [AI Transport] h2 is not installed, falling back to HTTP/1.1 keep-alive")
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.default_deadline = float(default_deadline)
+        self.hedge_percentile = float(hedge_percentile)
+        self.hedge_min_delay = float(hedge_min_delay)
+        self.hedge_max_delay = float(hedge_max_delay)
+        self.hedge_default_delay = float(hedge_default_delay)
+        self.latencies = latencies or LatencyTracker()
+        # httpx connections belong to the event loop that opened them.
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple[str, str], httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+    def _client(self, request: ChatRequest) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        clients = self._clients.get(loop)
+        if clients is None:
+            clients = self._clients[loop] = {}
+        key = (request.provider, request.origin)
+        client = clients.get(key)
+        if client is None or client.is_closed:
+            client = clients[key] = httpx.AsyncClient(http2=self.http2, limits=self.limits)
+        return client
+
+    async def aclose(self) -> None:
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+    def hedge_delay(self, request: ChatRequest, kind: str) -> float:
+        observed = self.latencies.percentile((request.provider, request.model_name, kind), self.hedge_percentile)
+        delay = self.hedge_default_delay if observed is None else observed
+        return max(self.hedge_min_delay, min(self.hedge_max_delay, delay))
+
+    def _deadline(self, deadline_seconds: Optional[float]) -> float:
+        return asyncio.get_running_loop().time() + float(deadline_seconds or self.default_deadline)
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            raise AIClientError("AI deadline exceeded")
+        return remaining
+
+    async def post_json(self, request: ChatRequest, *, deadline_seconds: Optional[float] = None) -> httpx.Response:
+        """Single POST on the provider pool, bounded by the deadline (no hedging)."""
+        deadline = self._deadline(deadline_seconds)
+        try:
+            return await self._client(request).post(
+                request.url,
+                headers=request.headers,
+                json=request.payload,
+                timeout=self._remaining(deadline),
+            )
+        except httpx.TimeoutException as exc:
+            raise AIClientError(f"AI deadline exceeded: {exc}") from exc
+        except httpx.HTTPError as exc:
+            raise AIClientError(f"AI request failed: {exc}") from exc
+
+    async def _complete_one(self, request: ChatRequest, deadline: float) -> AIClientResult:
+        started = time.perf_counter()
+        response = await self.post_json(request, deadline_seconds=self._remaining(deadline))
+        payload = request.payload
+        if response.status_code == 400 and payload.get("response_format") and "response_format" in response.text:
+            payload = {key: value for key, value in payload.items() if key != "response_format"}
+            response = await self.post_json(
+                ChatRequest(request.provider, request.model_name, request.url, request.headers, payload),
+                deadline_seconds=self._remaining(deadline),
+            )
+        if response.status_code >= 400:
+            raise AIClientError(f"{request.provider} HTTP {response.status_code}: {response.text[:500]}")
+        try:
+            data = response.json()
+        except ValueError as exc:
+            raise AIClientError(f"{request.provider} returned invalid JSON (status {response.status_code})") from exc
+        text = _extract_openai_text(data)
+        tokens_in, tokens_out = _usage_counts_openai(data)
+        elapsed = time.perf_counter() - started
+        self.latencies.observe((request.provider, request.model_name, "complete"), elapsed)
+        return AIClientResult(
+            text=text,
+            model_name=request.model_name,
+            tokens_in=tokens_in,
+            tokens_out=tokens_out,
+            latency_ms=int(elapsed * 1000),
+        )
+
+    async def complete(
+        self,
+        requests: Sequence[ChatRequest],
+        *,
+        deadline_seconds: Optional[float] = None,
+    ) -> tuple[AIClientResult, int]:
+        """
+        Runs ``requests`` (primary first) as a hedged chain and returns the first success
+        with its index. A failed attempt starts the next one immediately.
+        """
+        if not requests:
+            raise AIClientError("No usable AI model configured")
+        loop = asyncio.get_running_loop()
+        deadline = self._deadline(deadline_seconds)
+        pending: Dict[asyncio.Task, int] = {}
+        next_index = 0
+        hedge_at = 0.0
+        last_error: Optional[BaseException] = None
+
+        def launch() -> None:
+            nonlocal next_index, hedge_at
+            request = requests[next_index]
+            pending[asyncio.create_task(self._complete_one(request, deadline))] = next_index
+            hedge_at = loop.time() + self.hedge_delay(request, "complete")
+            next_index += 1
+
+        launch()
+        try:
+            while pending:
+                timeout = self._remaining(deadline)
+                if next_index < len(requests):
+                    timeout = min(timeout, max(0.0, hedge_at - loop.time()))
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result(), index
+                    last_error = task.exception()
+                if next_index < len(requests) and (not pending or loop.time() >= hedge_at):
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error or AIClientError("AI call failed")
+
+    def stream(self, requests: Sequence[ChatRequest], *, deadline_seconds: Optional[float] = None) -> "AIStream":
+        return AIStream(self, list(requests), deadline_seconds)
+
+    async def _stream_one(self, request: ChatRequest, deadline: float, queue: asyncio.Queue) -> None:
+        started = time.perf_counter()
+        payload = {**request.payload, "stream": True, "stream_options": {"include_usage": True}}
+        first = True
+        try:
+            async with self._client(request).stream(
+                "POST",
+                request.url,
+                headers=request.headers,
+                json=payload,
+                timeout=self._remaining(deadline),
+            ) as response:
+                if response.status_code >= 400:
+                    body = (await response.aread()).decode("utf-8", "replace")
+                    raise AIClientError(f"{request.provider} HTTP {response.status_code}: {body[:500]}")
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    if chunk.get("usage"):
+                        await queue.put(("usage", _usage_counts_openai(chunk)))
+                    for choice in chunk.get("choices") or []:
+                        delta = ((choice or {}).get("delta") or {}).get("content")
+                        if isinstance(delta, str) and delta:
+                            if first:
+                                first = False
+                                self.latencies.observe((request.provider, request.model_name, "first_token"), time.perf_counter() - started)
+                            await queue.put(("delta", delta))
+            await queue.put(("end", None))
+        except asyncio.CancelledError:
+            raise
+        except httpx.TimeoutException as exc:
+            await queue.put(("error", AIClientError(f"AI deadline exceeded: {exc}")))
+        except Exception as exc:
+            await queue.put(("error", exc if isinstance(exc, AIClientError) else AIClientError(str(exc))))
+
+
+class AIStream:
+    """
+    Async iterator of text deltas from whichever model of the chain produced the first
+    token. Hedging keys off time-to-first-token; once a model has answered, the stream
+    stays on it. After iteration ``result`` holds the full text and usage.
+    """
+
+    def __init__(self, transport: AITransport, requests: List[ChatRequest], deadline_seconds: Optional[float]):
+        self._transport = transport
+        self._requests = requests
+        self._deadline_seconds = deadline_seconds
+        self._chunks: List[str] = []
+        self.model_name: Optional[str] = None
+        self.winner_index: Optional[int] = None
+        self.first_token_ms: Optional[int] = None
+        self.latency_ms: Optional[int] = None
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    @property
+    def result(self) -> AIClientResult:
+        return AIClientResult(
+            text=self.text.strip(),
+            model_name=self.model_name or "",
+            tokens_in=self.tokens_in,
+            tokens_out=self.tokens_out,
+            latency_ms=self.latency_ms or 0,
+        )
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._run()
+
+    async def collect(self) -> AIClientResult:
+        async for _ in self:
+            pass
+        return self.result
+
+    async def _run(self) -> AsyncIterator[str]:
+        transport, requests = self._transport, self._requests
+        if not requests:
+            raise AIClientError("No usable AI model configured")
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = transport._deadline(self._deadline_seconds)
+        # attempt index -> (queue, producer task, pending queue.get task)
+        attempts: Dict[int, tuple[asyncio.Queue, asyncio.Task, asyncio.Task]] = {}
+        usage: Dict[int, tuple[int, int]] = {}
+        next_index = 0
+        hedge_at = 0.0
+        last_error: Optional[BaseException] = None
+        winner: Optional[int] = None
+        winning_producer: Optional[asyncio.Task] = None
+
+        def launch() -> None:
+            nonlocal next_index, hedge_at
+            request = requests[next_index]
+            queue: asyncio.Queue = asyncio.Queue()
+            producer = asyncio.create_task(transport._stream_one(request, deadline, queue))
+            attempts[next_index] = (queue, producer, asyncio.create_task(queue.get()))
+            hedge_at = loop.time() + transport.hedge_delay(request, "first_token")
+            next_index += 1
+
+        launch()
+        try:
+            while winner is None:
+                if not attempts:
+                    raise last_error or AIClientError("AI stream failed")
+                timeout = transport._remaining(deadline)
+                if next_index < len(requests):
+                    timeout = min(timeout, max(0.0, hedge_at - loop.time()))
+                getters = {getter: index for index, (_, _, getter) in attempts.items()}
+                done, _ = await asyncio.wait(getters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for getter in done:
+                    index = getters[getter]
+                    kind, value = getter.result()
+                    queue, producer, _ = attempts[index]
+                    if kind == "delta":
+                        winner = index
+                        self._chunks.append(value)
+                        break
+                    if kind == "usage":
+                        usage[index] = value
+                        attempts[index] = (queue, producer, asyncio.create_task(queue.get()))
+                        continue
+                    last_error = value if kind == "error" else AIClientError("AI stream ended without content")
+                    del attempts[index]
+                if winner is None and next_index < len(requests) and (not attempts or loop.time() >= hedge_at):
+                    launch()
+
+            queue, winning_producer, _ = attempts.pop(winner)
+            for _, producer, getter in attempts.values():
+                getter.cancel()
+                producer.cancel()
+            attempts.clear()
+            self.winner_index = winner
+            self.model_name = requests[winner].model_name
+            self.first_token_ms = int((loop.time() - started) * 1000)
+            if winner in usage:
+                self.tokens_in, self.tokens_out = usage[winner]
+            yield self._chunks[-1]
+
+            while True:
+                try:
+                    kind, value = await asyncio.wait_for(queue.get(), transport._remaining(deadline))
+                except asyncio.TimeoutError:
+                    raise AIClientError("AI deadline exceeded") from None
+                if kind == "delta":
+                    self._chunks.append(value)
+                    yield value
+                elif kind == "usage":
+                    self.tokens_in, self.tokens_out = value
+                elif kind == "error":
+                    raise value
+                else:
+                    break
+            self.latency_ms = int((loop.time() - started) * 1000)
+        finally:
+            for _, producer, getter in attempts.values():
+                getter.cancel()
+                producer.cancel()
+            if winning_producer is not None:
+                winning_producer.cancel()
+
+
+_transport_lock = Lock()
+_transport: Optional[AITransport] = None
+
+
+def get_ai_transport() -> AITransport:
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = AITransport(
+                    http2=config.AI_HTTP2_ENABLED,
+                    max_connections=config.AI_POOL_MAX_CONNECTIONS,
+                    max_keepalive=config.AI_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=config.AI_POOL_KEEPALIVE_EXPIRY_SECONDS,
+                    default_deadline=config.AI_DEFAULT_DEADLINE_SECONDS,
+                    hedge_percentile=config.AI_HEDGE_PERCENTILE,
+                    hedge_min_delay=config.AI_HEDGE_MIN_DELAY_SECONDS,
+                    hedge_max_delay=config.AI_HEDGE_MAX_DELAY_SECONDS,
+                    hedge_default_delay=config.AI_HEDGE_DEFAULT_DELAY_SECONDS,
+                )
+    return _transport
+
+
+def set_ai_transport(transport: Optional[AITransport]) -> None:
+    global _transport
+    with _transport_lock:
+        _transport = transport
+
+
+async def aclose_ai_transport() -> None:
+    if _transport is not None:
+        await _transport.aclose()
@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field
 from app.core.legacy_supabase import get_legacy_supabase_client
 from app.core.security import AccessControlService
 from app.domains.reality.service import RealityDomainService
+from app.matching_engine.change_tracking import mark_interactions_dirty
 
 router = APIRouter()
 
@@ -115,6 +116,7 @@ def _insert_interaction_rows(rows: list[dict[str, Any]]) -> None:
         client.table("job_interactions").insert(rows).execute()
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to write interactions: {exc}") from exc
+    mark_interactions_dirty(rows)
 
 @router.get("/")
 async def get_jobs(
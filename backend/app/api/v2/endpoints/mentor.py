@@ -7,8 +7,15 @@ from app.core.security import AccessControlService
 from app.domains.identity.service import IdentityDomainService
 from app.domains.recommendation.service import RecommendationDomainService
 from app.domains.reality.service import RealityDomainService
-from app.services.cybershaman_service import build_cybershaman_reply
-from app.services.shami_agent_service import build_shami_recruiter_agent_reply, build_shami_role_detail_insight, get_agent_memory, save_agent_memory
+from app.services.cybershaman_service import abuild_cybershaman_reply
+from app.services.shami_agent_service import (
+    abuild_shami_recruiter_agent_reply,
+    abuild_shami_role_detail_insight,
+    agent_memory_context,
+    get_agent_memory,
+    record_agent_turn,
+    save_agent_memory,
+)
 from app.services.azure_ai_client import AzureAIClientError
 from app.services.subscription_access import fetch_latest_subscription_by, is_active_subscription
 
@@ -213,7 +220,7 @@ async def mentor_chat(
                 job_recommendations = _compact_job_recommendations(feed, limit=4)
             except Exception as recommendation_exc:
                 logger.warning("Failed to load mentor job recommendations: %s", recommendation_exc)
-        data = build_cybershaman_reply(
+        data = await abuild_cybershaman_reply(
             message=payload.message,
             profile=profile,
             recent_messages=[item.model_dump() for item in payload.recent_messages],
@@ -263,7 +270,7 @@ async def role_insight(
     )
     profile = await IdentityDomainService.get_candidate_profile(domain_user["id"])
     try:
-        data = build_shami_role_detail_insight(
+        data = await abuild_shami_role_detail_insight(
             role=payload.role,
             blueprint=payload.blueprint,
             profile=profile,
@@ -313,17 +320,17 @@ async def recruiter_chat(
     try:
         # 0. Načti persistentní paměť agenta (historii chatu)
         memory = get_agent_memory(domain_user["id"])
-        persisted_messages = memory.get("chat_history", []) or []
         # Nový payload upřednostňuje inline recent_messages > persistentní, ale lze je sloučit
         incoming_messages = [item.model_dump() for item in payload.recent_messages] if payload.recent_messages else []
-        combined_history = persisted_messages[-4:] + incoming_messages  # krátká historie až 8 zpráv (omezení pro tok)
+        # Do promptu jde jen krátká historie; starší konverzace přichází jako shrnutí z checkpointu paměti
+        prompt_history = agent_memory_context(memory, incoming_messages)
 
-        data = build_shami_recruiter_agent_reply(
+        data = await abuild_shami_recruiter_agent_reply(
             message=payload.message,
             company=company,
             roles=roles,
             candidates=candidates,
-            recent_messages=combined_history,
+            recent_messages=prompt_history,
         )
         # 1. Pokud agent vrátil schválené změny profilu, ulož je do databáze
         profile_update = data.get("profile_update_request")
@@ -335,15 +342,10 @@ async def recruiter_chat(
                 logger.warning("Failed to apply Shami profile_update_request for user %s: %s", domain_user["id"], profile_exc)
 
         # 2. Ulož rozšířenou konverzaci do persistentní storage
-        # Append uživatelova zpráva + odpověď agenta
-        save_agent_memory(
-            domain_user["id"],
-            chat_history=(combined_history + [
-                {"role": "user", "message": payload.message},
-                {"role": "agent", "message": data["reply"]},
-            ])[-20:],  # Omezit délku na max 20 posledních zpráv
-            agent_state=None
-        )
+        # Append uživatelova zpráva + odpověď agenta k celé uložené historii
+        # Zprávy nad limit 20 se neztrácí, ale skládají se do checkpointu v agent_state
+        chat_history, agent_state = record_agent_turn(memory, incoming_messages, payload.message, data["reply"], keep_last=20)
+        save_agent_memory(domain_user["id"], chat_history=chat_history, agent_state=agent_state)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except AzureAIClientError as exc:
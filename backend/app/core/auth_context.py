@@ -0,0 +1,236 @@
+"""
+Resolved auth context for legacy (Supabase profile based) endpoints.
+
+A context is built once per token from one Supabase round trip (profile + company
+associations) and one V2 query (user role + company memberships). It is stored frozen,
+so no caller can change the cached copy; every cache hit hands out plain dicts and lists.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Iterable, Mapping, Optional
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    # Only ever sees what _freeze built, so exact type checks (much cheaper than ABCs) suffice.
+    kind = type(value)
+    if kind is MappingProxyType:
+        return {key: _thaw(item) for key, item in value.items()}
+    if kind is tuple:
+        return [_thaw(item) for item in value]
+    if kind is frozenset:
+        return {_thaw(item) for item in value}
+    return value
+
+
+@dataclass(frozen=True)
+class CompanyAssociation:
+    id: str
+    name: Optional[str]
+    type: str
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"id": self.id, "name": self.name, "type": self.type}
+
+
+@dataclass(frozen=True)
+class AuthContext:
+    user_id: str
+    v2_user_id: Optional[str]
+    profile: Mapping[str, Any]
+    authorized_ids: tuple[str, ...]
+    associations: tuple[CompanyAssociation, ...]
+
+    def as_user(self) -> dict[str, Any]:
+        """Fresh plain ``dict``/``list`` copy in the legacy ``current_user`` shape."""
+        user = _thaw(self.profile)
+        user["authorized_ids"] = list(self.authorized_ids)
+        return user
+
+    def covers_company(self, company_id: str) -> bool:
+        return str(company_id) in self.authorized_ids
+
+
+def build_auth_context(
+    *,
+    user_id: str,
+    email: Optional[str],
+    profile_row: Mapping[str, Any],
+    supabase_companies: Iterable[Mapping[str, Any]],
+    v2_user: Optional[Mapping[str, Any]],
+    v2_companies: Iterable[Mapping[str, Any]],
+) -> AuthContext:
+    """
+    Merge Supabase profile, Supabase company links (``{"id", "name", "type"}`` in
+    owner-then-member order) and V2 memberships the same way the legacy resolver did.
+    """
+    profile = dict(profile_row)
+    authorized_ids: list[str] = [user_id]
+    profile["auth_id"] = user_id
+    profile["email"] = email or ""
+
+    if profile.get("role") == "recruiter":
+        for company in supabase_companies:
+            company_id = company.get("id")
+            if company_id and company_id not in authorized_ids:
+                authorized_ids.append(company_id)
+
+    profile["user_type"] = profile.get("user_type", "candidate")
+
+    associations: list[CompanyAssociation] = [
+        CompanyAssociation(id=str(item.get("id")), name=item.get("name"), type=str(item.get("type") or ""))
+        for item in (profile.get("associations") or [])
+        if isinstance(item, Mapping) and item.get("id")
+    ]
+    if v2_user:
+        if v2_user.get("role") == "recruiter" and profile.get("role") != "recruiter":
+            profile["role"] = "recruiter"
+
+        v2_associations: list[CompanyAssociation] = []
+        for row in v2_companies:
+            cid = str(row["id"])
+            if cid not in authorized_ids:
+                authorized_ids.append(cid)
+            v2_associations.append(CompanyAssociation(id=cid, name=row.get("name"), type=row.get("role")))
+
+        if v2_associations:
+            existing_ids = {association.id for association in associations}
+            for association in v2_associations:
+                if association.id not in existing_ids:
+                    associations.append(association)
+            profile["associations"] = [association.as_dict() for association in associations]
+            profile["user_type"] = "company"
+            if not profile.get("company_id") and associations:
+                profile["company_id"] = associations[0].id
+                profile["company_name"] = associations[0].name
+
+    profile["authorized_ids"] = list(authorized_ids)
+    return AuthContext(
+        user_id=user_id,
+        v2_user_id=str(v2_user["id"]) if v2_user and v2_user.get("id") else None,
+        profile=_freeze(profile),
+        authorized_ids=tuple(authorized_ids),
+        associations=tuple(associations),
+    )
+
+
+ContextLoader = Callable[[str], Awaitable[AuthContext]]
+
+
+class AuthContextResolver:
+    """Bounded LRU of auth contexts keyed by token hash, with per-token single-flight loads."""
+
+    def __init__(
+        self,
+        loader: ContextLoader,
+        *,
+        max_entries: int = 5000,
+        ttl_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._loader = loader
+        self._max_entries = max(1, int(max_entries))
+        self._ttl_seconds = max(0.1, float(ttl_seconds))
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, AuthContext]]" = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        # Bumped on every invalidation; loads started before it must not repopulate the cache.
+        self._generation = 0
+        self.stats = {"hits": 0, "misses": 0, "loads": 0, "shared_loads": 0, "invalidations": 0}
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    async def resolve(self, token: str) -> AuthContext:
+        key = self.token_key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, context = entry
+            if self._clock() < expires_at:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return context
+            self._entries.pop(key, None)
+
+        self.stats["misses"] += 1
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight.get_loop() is asyncio.get_running_loop():
+            self.stats["shared_loads"] += 1
+            return await asyncio.shield(inflight)
+
+        generation = self._generation
+        task = asyncio.ensure_future(self._loader(token))
+        self._inflight[key] = task
+        self.stats["loads"] += 1
+        try:
+            context = await asyncio.shield(task)
+        finally:
+            if self._inflight.get(key) is task:
+                self._inflight.pop(key, None)
+        if generation == self._generation:
+            self._store(key, context)
+        return context
+
+    def _store(self, key: str, context: AuthContext) -> None:
+        self._entries[key] = (self._clock() + self._ttl_seconds, context)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Drop contexts of a user, matched by Supabase id or V2 user id."""
+        target = str(user_id or "")
+        return self._invalidate(lambda ctx: target in (ctx.user_id, ctx.v2_user_id))
+
+    def invalidate_company(self, company_id: str) -> int:
+        target = str(company_id or "")
+        return self._invalidate(lambda ctx: ctx.covers_company(target))
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    def _invalidate(self, predicate: Callable[[AuthContext], bool]) -> int:
+        self._generation += 1
+        self.stats["invalidations"] += 1
+        doomed = [key for key, (_, context) in self._entries.items() if predicate(context)]
+        for key in doomed:
+            self._entries.pop(key, None)
+        return len(doomed)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_resolvers: list[AuthContextResolver] = []
+
+
+def register_auth_context_resolver(resolver: AuthContextResolver) -> AuthContextResolver:
+    _resolvers.append(resolver)
+    return resolver
+
+
+def invalidate_auth_context(*, user_id: Optional[str] = None, company_id: Optional[str] = None) -> None:
+    """Hook for membership/role changes: drop cached auth contexts that may be outdated."""
+    for resolver in _resolvers:
+        if user_id:
+            resolver.invalidate_user(user_id)
+        if company_id:
+            resolver.invalidate_company(company_id)
@@ -158,9 +158,71 @@ JOBS_POSTGRES_NATIVE_RETENTION_DAYS = max(1, int(_env_str("JOBS_POSTGRES_NATIVE_
 JOBS_POSTGRES_SEARCH_TIMING_LOG_ENABLED = _env_bool("JOBS_POSTGRES_SEARCH_TIMING_LOG_ENABLED", True)
 JOBS_POSTGRES_SEARCH_SLOW_MS = max(50, int(_env_str("JOBS_POSTGRES_SEARCH_SLOW_MS", "350") or "350"))
 JOBS_POSTGRES_SEARCH_EXPLAIN_ENABLED = _env_bool("JOBS_POSTGRES_SEARCH_EXPLAIN_ENABLED", False)
+JOBS_POSTGRES_BULK_UPSERT_ENABLED = _env_bool("JOBS_POSTGRES_BULK_UPSERT_ENABLED", True)
+JOBS_POSTGRES_UNCHANGED_TOUCH_MINUTES = max(0, int(_env_str("JOBS_POSTGRES_UNCHANGED_TOUCH_MINUTES", "60") or "60"))
 JOB_INTELLIGENCE_AI_THRESHOLD = max(0.0, min(1.0, float(_env_str("JOB_INTELLIGENCE_AI_THRESHOLD", "0.56") or "0.56")))
 JOB_INTELLIGENCE_BATCH_LIMIT = max(100, int(_env_str("JOB_INTELLIGENCE_BATCH_LIMIT", "4000") or "4000"))
 
+# Runtime config snapshot (release flags, model registry, experiments)
+RUNTIME_CONFIG_TTL_SECONDS = max(5, int(_env_str("RUNTIME_CONFIG_TTL_SECONDS", "30") or "30"))
+RUNTIME_CONFIG_VERSION_POLL_SECONDS = max(1, int(_env_str("RUNTIME_CONFIG_VERSION_POLL_SECONDS", "5") or "5"))
+RUNTIME_CONFIG_MAX_STALE_SECONDS = max(30, int(_env_str("RUNTIME_CONFIG_MAX_STALE_SECONDS", "300") or "300"))
+
+# AI response cache (identical prompts served from a per-host SQLite file). Call sites
+# opt in with cache=True; this switch turns the store off for all of them.
+AI_RESPONSE_CACHE_ENABLED = _env_bool("AI_RESPONSE_CACHE_ENABLED", True)
+AI_RESPONSE_CACHE_PATH = _env_str(
+    "AI_RESPONSE_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "ai_response_cache.sqlite3"),
+)
+AI_RESPONSE_CACHE_TTL_SECONDS = max(60, int(_env_str("AI_RESPONSE_CACHE_TTL_SECONDS", "86400") or "86400"))
+AI_RESPONSE_CACHE_MAX_MB = max(1, int(_env_str("AI_RESPONSE_CACHE_MAX_MB", "256") or "256"))
+
+# Async AI transport (pooled httpx clients, deadlines, hedged fallback)
+AI_HTTP2_ENABLED = _env_bool("AI_HTTP2_ENABLED", True)
+AI_POOL_MAX_CONNECTIONS = max(1, int(_env_str("AI_POOL_MAX_CONNECTIONS", "32") or "32"))
+AI_POOL_MAX_KEEPALIVE = max(1, int(_env_str("AI_POOL_MAX_KEEPALIVE", "16") or "16"))
+AI_POOL_KEEPALIVE_EXPIRY_SECONDS = max(1.0, float(_env_str("AI_POOL_KEEPALIVE_EXPIRY_SECONDS", "60") or "60"))
+AI_DEFAULT_DEADLINE_SECONDS = max(1.0, float(_env_str("AI_DEFAULT_DEADLINE_SECONDS", "60") or "60"))
+AI_HEDGE_PERCENTILE = max(0.5, min(0.999, float(_env_str("AI_HEDGE_PERCENTILE", "0.9") or "0.9")))
+AI_HEDGE_MIN_DELAY_SECONDS = max(0.0, float(_env_str("AI_HEDGE_MIN_DELAY_SECONDS", "1.5") or "1.5"))
+AI_HEDGE_MAX_DELAY_SECONDS = max(0.1, float(_env_str("AI_HEDGE_MAX_DELAY_SECONDS", "20") or "20"))
+AI_HEDGE_DEFAULT_DELAY_SECONDS = max(0.1, float(_env_str("AI_HEDGE_DEFAULT_DELAY_SECONDS", "8") or "8"))
+
+# Background event writer (batched telemetry/analytics inserts, spilled to disk when the DB is down)
+EVENT_WRITER_ENABLED = _env_bool("EVENT_WRITER_ENABLED", True)
+EVENT_WRITER_QUEUE_SIZE = max(100, int(_env_str("EVENT_WRITER_QUEUE_SIZE", "10000") or "10000"))
+EVENT_WRITER_BATCH_SIZE = max(1, int(_env_str("EVENT_WRITER_BATCH_SIZE", "200") or "200"))
+EVENT_WRITER_FLUSH_INTERVAL_SECONDS = max(0.05, float(_env_str("EVENT_WRITER_FLUSH_INTERVAL_SECONDS", "1.0") or "1.0"))
+EVENT_WRITER_SPILL_DIR = _env_str("EVENT_WRITER_SPILL_DIR", "data/event_spill")
+EVENT_WRITER_REPLAY_INTERVAL_SECONDS = max(1.0, float(_env_str("EVENT_WRITER_REPLAY_INTERVAL_SECONDS", "30") or "30"))
+
+# Offline recommendation evaluation (keyset-paginated streaming, 0 = no row cap)
+RECOMMENDATION_EVAL_PAGE_SIZE = max(100, int(_env_str("RECOMMENDATION_EVAL_PAGE_SIZE", "5000") or "5000"))
+RECOMMENDATION_EVAL_MAX_EXPOSURES = max(0, int(_env_str("RECOMMENDATION_EVAL_MAX_EXPOSURES", "0") or "0"))
+
+# Market skill demand (incrementally aggregated, served from an in-memory snapshot)
+MARKET_DEMAND_SNAPSHOT_TTL_SECONDS = max(30, int(_env_str("MARKET_DEMAND_SNAPSHOT_TTL_SECONDS", "3600") or "3600"))
+
+# Matching batch jobs (chunked work queue leased to worker threads; "memory" or "supabase")
+MATCHING_BATCH_QUEUE_BACKEND = (_env_str("MATCHING_BATCH_QUEUE_BACKEND", "supabase") or "supabase").strip().lower()
+MATCHING_BATCH_WORKERS = max(1, int(_env_str("MATCHING_BATCH_WORKERS", "4") or "4"))
+MATCHING_BATCH_CHUNK_SIZE = max(1, int(_env_str("MATCHING_BATCH_CHUNK_SIZE", "100") or "100"))
+MATCHING_BATCH_LEASE_SECONDS = max(10, int(_env_str("MATCHING_BATCH_LEASE_SECONDS", "300") or "300"))
+MATCHING_BATCH_MAX_ATTEMPTS = max(1, int(_env_str("MATCHING_BATCH_MAX_ATTEMPTS", "3") or "3"))
+MATCHING_BATCH_CHECKPOINT_EVERY = max(1, int(_env_str("MATCHING_BATCH_CHECKPOINT_EVERY", "25") or "25"))
+
+# Change-driven recommendation refresh (dirty users and per-segment job arrivals since the last cycle)
+MATCHING_CHANGE_TRACKING_ENABLED = _env_bool("MATCHING_CHANGE_TRACKING_ENABLED", True)
+MATCHING_CHANGE_TRACKING_BACKEND = (_env_str("MATCHING_CHANGE_TRACKING_BACKEND", "supabase") or "supabase").strip().lower()
+MATCHING_FULL_REFRESH_HOURS = max(1, int(_env_str("MATCHING_FULL_REFRESH_HOURS", "24") or "24"))
+MATCHING_SEGMENT_CELL_DEGREES = max(0.05, float(_env_str("MATCHING_SEGMENT_CELL_DEGREES", "0.25") or "0.25"))
+MATCHING_NOTIFY_CONCURRENCY = max(1, int(_env_str("MATCHING_NOTIFY_CONCURRENCY", "8") or "8"))
+
+# Career map pools (precomputed per market, refreshed in the background)
+CAREER_MAP_POOL_SNAPSHOT_PATH = _env_str("CAREER_MAP_POOL_SNAPSHOT_PATH", "data/career_map_pools.json.gz")
+CAREER_MAP_ACTIVE_COUNT_TTL_SECONDS = max(30, int(_env_str("CAREER_MAP_ACTIVE_COUNT_TTL_SECONDS", "600") or "600"))
+
 # External asset storage
 EXTERNAL_ASSET_STORAGE_MODE = _env_str("EXTERNAL_ASSET_STORAGE_MODE", "local").lower()
 EXTERNAL_ASSET_LOCAL_DIR = _env_str("EXTERNAL_ASSET_LOCAL_DIR", "data/external_assets")
@@ -0,0 +1,199 @@
+"""
+In-process snapshot of runtime configuration (release flags, model registry, scoring
+versions, experiments, action prediction models).
+
+The whole configuration is loaded at once and served from memory:
+
+- a single loader call fills the snapshot, so lookups of keys that do not exist are
+  answered from the snapshot as well (negative caching for free),
+- the snapshot is refreshed in the background shortly before it goes stale, with
+  per-process jitter so workers do not all hit the DB in the same second,
+- concurrent callers share one load (single-flight), both for the cold start and for
+  background refreshes,
+- a cheap version probe (the ``runtime_config_version`` row) is polled every few
+  seconds and forces a reload as soon as the version moves.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+SnapshotLoader = Callable[[], Optional[Dict[str, Any]]]
+VersionProbe = Callable[[], Optional[Any]]
+
+
+def _run_in_thread(fn: Callable[[], None]) -> None:
+    threading.Thread(target=fn, name="runtime-config-refresh", daemon=True).start()
+
+
+class ConfigSnapshotService:
+    def __init__(
+        self,
+        loader: SnapshotLoader,
+        version_probe: Optional[VersionProbe] = None,
+        *,
+        ttl_seconds: float = 30.0,
+        refresh_ahead_seconds: float = 5.0,
+        jitter_seconds: float = 3.0,
+        version_poll_seconds: float = 5.0,
+        max_stale_seconds: float = 300.0,
+        failure_retry_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        run_in_background: Callable[[Callable[[], None]], None] = _run_in_thread,
+    ):
+        self._loader = loader
+        self._version_probe = version_probe
+        self._ttl_seconds = max(1.0, float(ttl_seconds))
+        self._refresh_ahead_seconds = max(0.0, min(float(refresh_ahead_seconds), self._ttl_seconds))
+        self._jitter_seconds = max(0.0, float(jitter_seconds))
+        self._version_poll_seconds = max(0.0, float(version_poll_seconds))
+        self._max_stale_seconds = max(self._ttl_seconds, float(max_stale_seconds))
+        self._failure_retry_seconds = max(0.1, float(failure_retry_seconds))
+        self._clock = clock
+        self._run_in_background = run_in_background
+
+        self._entry: Optional[Dict[str, Any]] = None
+        self._load_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._background_active = False
+        self._next_version_check = 0.0
+        self._stats = {
+            "loads": 0,
+            "load_failures": 0,
+            "version_checks": 0,
+            "version_changes": 0,
+            "background_runs": 0,
+            "invalidations": 0,
+        }
+
+    # ----------------------------------------------------------------- public API
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        """Return the current snapshot data (``None`` when config could not be loaded)."""
+        now = self._clock()
+        entry = self._entry
+        if entry is None or now >= entry["stale_until"]:
+            entry = self._load_blocking()
+        elif now >= entry["refresh_at"] or (self._version_probe and now >= self._next_version_check):
+            self._schedule_background()
+        return entry["data"] if entry else None
+
+    def refresh(self) -> Optional[Dict[str, Any]]:
+        """Reload synchronously, e.g. right after this process changed a flag."""
+        with self._load_lock:
+            entry = self._reload()
+        return entry["data"] if entry else None
+
+    def invalidate(self) -> None:
+        """Mark the snapshot as due; the next lookup schedules a background reload."""
+        with self._state_lock:
+            self._stats["invalidations"] += 1
+            if self._entry is not None:
+                self._entry = {**self._entry, "refresh_at": float("-inf")}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._state_lock:
+            out: Dict[str, Any] = dict(self._stats)
+        entry = self._entry
+        out["version"] = entry.get("version") if entry else None
+        out["age_seconds"] = round(self._clock() - entry["loaded_at"], 3) if entry else None
+        return out
+
+    # ------------------------------------------------------------------ internals
+
+    def _load_blocking(self) -> Optional[Dict[str, Any]]:
+        with self._load_lock:
+            entry = self._entry
+            if entry is not None and self._clock() < entry["stale_until"]:
+                # Another caller finished the load while we were waiting.
+                return entry
+            return self._reload()
+
+    def _reload(self) -> Optional[Dict[str, Any]]:
+        """Call the loader and swap the snapshot. Caller must hold ``_load_lock``."""
+        previous = self._entry
+        try:
+            data = self._loader()
+        except Exception as exc:
+            print(f"⚠️ [Runtime Config] snapshot load failed: {exc}")
+            data = None
+
+        now = self._clock()
+        with self._state_lock:
+            self._stats["loads"] += 1
+            if data is None:
+                self._stats["load_failures"] += 1
+                retry_at = now + self._failure_retry_seconds
+                if previous is not None and previous["data"] is not None and now < previous["stale_until"]:
+                    # Keep serving the last good snapshot, just retry a bit later.
+                    self._entry = {**previous, "refresh_at": retry_at}
+                else:
+                    self._entry = {
+                        "data": None,
+                        "version": None,
+                        "loaded_at": now,
+                        "refresh_at": retry_at,
+                        "stale_until": retry_at,
+                    }
+            else:
+                jitter = random.uniform(0.0, self._jitter_seconds) if self._jitter_seconds else 0.0
+                refresh_in = max(0.0, self._ttl_seconds - self._refresh_ahead_seconds - jitter)
+                self._entry = {
+                    "data": data,
+                    "version": data.get("version"),
+                    "loaded_at": now,
+                    "refresh_at": now + refresh_in,
+                    "stale_until": now + self._max_stale_seconds,
+                }
+            self._next_version_check = now + self._version_poll_seconds
+            return self._entry
+
+    def _schedule_background(self) -> None:
+        with self._state_lock:
+            if self._background_active:
+                return
+            self._background_active = True
+            self._next_version_check = self._clock() + self._version_poll_seconds
+        try:
+            self._run_in_background(self._background_cycle)
+        except Exception as exc:
+            print(f"⚠️ [Runtime Config] failed to start background refresh: {exc}")
+            with self._state_lock:
+                self._background_active = False
+
+    def _background_cycle(self) -> None:
+        try:
+            with self._state_lock:
+                self._stats["background_runs"] += 1
+            entry = self._entry
+            due = entry is None or self._clock() >= entry["refresh_at"]
+            if not due and self._version_probe is not None:
+                due = self._version_changed(entry)
+            if due:
+                with self._load_lock:
+                    self._reload()
+        finally:
+            with self._state_lock:
+                self._background_active = False
+
+    def _version_changed(self, entry: Dict[str, Any]) -> bool:
+        try:
+            current = self._version_probe() if self._version_probe else None
+        except Exception as exc:
+            print(f"⚠️ [Runtime Config] version probe failed: {exc}")
+            current = None
+        with self._state_lock:
+            self._stats["version_checks"] += 1
+            if current is None or current == entry.get("version"):
+                return False
+            if entry.get("version") is None:
+                # Loaded without a version (e.g. table fallback): adopt the probed one
+                # instead of reloading on every poll; later moves still trigger a reload.
+                if self._entry is entry:
+                    self._entry = {**entry, "version": current}
+                return False
+            self._stats["version_changes"] += 1
+        return True
@@ -0,0 +1,405 @@
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from postgrest.exceptions import APIError as PostgrestAPIError
+except Exception:
+    PostgrestAPIError = None
+
+# sink(table, rows) -> inserted rows (may be empty). Raise EventRejected for rows the
+# database will never accept, TableUnavailable when the table itself does not exist; any
+# other exception means "unavailable, try again later".
+EventSink = Callable[[str, List[Dict[str, Any]]], Optional[List[Dict[str, Any]]]]
+AfterWrite = Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], None]
+
+_after_write: Dict[str, AfterWrite] = {}
+# Tables found missing; their events are discarded for the life of the process.
+_unavailable_tables: set = set()
+_unavailable_lock = threading.Lock()
+
+
+class EventRejected(Exception):
+    """The sink refused the rows for good (schema/constraint error); they are not retried."""
+
+
+class TableUnavailable(Exception):
+    """The target table does not exist (optional table, migration not applied)."""
+
+
+def table_unavailable(table: str) -> bool:
+    return table in _unavailable_tables
+
+
+def mark_table_unavailable(table: str, exc: Exception) -> None:
+    """Stop writing to ``table``; warns once, the way the direct inserts used to."""
+    with _unavailable_lock:
+        if table in _unavailable_tables:
+            return
+        _unavailable_tables.add(table)
+    print(f"⚠️ [Event Writer] {table} table missing, discarding its events: {exc}")
+
+
+def register_after_write(table: str, callback: AfterWrite) -> None:
+    """Run ``callback(rows, inserted)`` in the writer thread after rows of ``table`` are stored."""
+    _after_write[table] = callback
+
+
+class _FlushMarker:
+    __slots__ = ("done",)
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class EventWriter:
+    """
+    Fire-and-forget writer for append-only event rows (telemetry, analytics).
+
+    ``submit`` only enqueues: a background thread drains the bounded queue and writes one
+    bulk insert per table every ``batch_size`` rows or ``flush_interval`` seconds, keeping
+    submission order within a table. When the queue is full new rows are dropped and
+    counted. Batches the sink cannot take right now are appended to a JSON-lines spill
+    file and replayed once writes succeed again, so a database outage loses nothing that
+    made it into the queue. A table the database reports missing is latched off and its
+    events are discarded, as the direct inserts into optional tables always did.
+    """
+
+    def __init__(
+        self,
+        sink: EventSink,
+        *,
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        spill_dir: Optional[str] = None,
+        replay_interval: float = 30.0,
+        name: str = "events",
+    ):
+        self._sink = sink
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.01, float(flush_interval))
+        self.replay_interval = max(0.0, float(replay_interval))
+        self.name = name
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._spill_dir = spill_dir
+        self._spill_path = os.path.join(spill_dir, f"{name}-{os.getpid()}.jsonl") if spill_dir else None
+        self._spill_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "written": 0,
+            "batches": 0,
+            "dropped": 0,
+            "rejected": 0,
+            "discarded": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "lost": 0,
+        }
+        self._last_drop_report = 0.0
+        self._last_replay = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"event-writer-{name}", daemon=True)
+        self._thread.start()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+    def submit(self, table: str, row: Dict[str, Any]) -> bool:
+        """Enqueue one row without blocking; returns False when it was dropped."""
+        if self._closed:
+            self._count("dropped")
+            return False
+        if table_unavailable(table):
+            self._count("discarded")
+            return False
+        try:
+            self._queue.put_nowait((table, row))
+        except queue.Full:
+            self._count("dropped")
+            now = time.monotonic()
+            if now - self._last_drop_report >= 10.0:
+                self._last_drop_report = now
+                print(f"⚠️ [Event Writer] {self.name} queue full, dropping events (dropped so far: {self.stats()['dropped']})")
+            return False
+        self._count("submitted")
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything submitted before this call has been written or spilled."""
+        if not self._thread.is_alive():
+            return self._queue.empty()
+        marker = _FlushMarker()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop accepting rows, write what is queued and stop the worker."""
+        if self._closed:
+            return
+        self._closed = True
+        self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        pending: List[tuple] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = False
+            if isinstance(item, tuple):
+                pending.append(item)
+                if len(pending) < self.batch_size:
+                    continue
+            if pending:
+                self._write(pending)
+                pending = []
+            if isinstance(item, _FlushMarker):
+                item.done.set()
+            if item is None:
+                return
+            self._maybe_replay()
+            deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, items: List[tuple]) -> None:
+        by_table: Dict[str, List[Dict[str, Any]]] = {}
+        for table, row in items:
+            by_table.setdefault(table, []).append(row)
+        for table, rows in by_table.items():
+            self._insert(table, rows, spill=True)
+
+    def _insert(self, table: str, rows: List[Dict[str, Any]], spill: bool) -> bool:
+        """Insert rows with one call; returns False if they should be retried later."""
+        if table_unavailable(table):
+            self._count("discarded", len(rows))
+            return True
+        try:
+            inserted = self._sink(table, rows) or []
+        except TableUnavailable as exc:
+            mark_table_unavailable(table, exc)
+            self._count("discarded", len(rows))
+            return True
+        except EventRejected as exc:
+            if len(rows) > 1:
+                # One bad row must not sink the whole batch.
+                ok = True
+                for row in rows:
+                    ok = self._insert(table, [row], spill) and ok
+                return ok
+            self._count("rejected")
+            print(f"⚠️ [Event Writer] {table} rejected an event: {exc}")
+            return True
+        except Exception as exc:
+            if spill:
+                self._spill(table, rows, exc)
+            return False
+        self._count("written", len(rows))
+        self._count("batches")
+        callback = _after_write.get(table)
+        if callback:
+            try:
+                callback(rows, inserted)
+            except Exception as exc:
+                print(f"⚠️ [Event Writer] after-write hook for {table} failed: {exc}")
+        return True
+
+    def _spill(self, table: str, rows: List[Dict[str, Any]], exc: Exception) -> None:
+        if not self._spill_path:
+            self._count("lost", len(rows))
+            print(f"⚠️ [Event Writer] failed to write {len(rows)} {table} events: {exc}")
+            return
+        try:
+            encoded = "".join(
+                json.dumps({"table": table, "row": row}, ensure_ascii=False, default=str) + "\n" for row in rows
+            )
+            with self._spill_lock:
+                os.makedirs(self._spill_dir, exist_ok=True)
+                with open(self._spill_path, "a", encoding="utf-8") as handle:
+                    handle.write(encoded)
+            self._count("spilled", len(rows))
+            print(f"⚠️ [Event Writer] {table} unavailable, spilled {len(rows)} events: {exc}")
+        except Exception as spill_exc:
+            self._count("lost", len(rows))
+            print(f"⚠️ [Event Writer] failed to spill {len(rows)} {table} events: {spill_exc}")
+
+    def _claim_spill_files(self) -> List[str]:
+        """Our own spill file, plus files of other processes that have not been touched for a while."""
+        claimed = []
+        stale_before = time.time() - max(60.0, self.replay_interval * 2)
+        for path in sorted(glob.glob(os.path.join(self._spill_dir, f"{self.name}-*.jsonl"))):
+            try:
+                if path != self._spill_path and os.path.getmtime(path) > stale_before:
+                    continue
+                target = f"{path}.replay-{os.getpid()}"
+                os.replace(path, target)
+                claimed.append(target)
+            except OSError:
+                continue
+        return claimed
+
+    def _maybe_replay(self) -> None:
+        if not self._spill_dir or time.monotonic() - self._last_replay < self.replay_interval:
+            return
+        self._last_replay = time.monotonic()
+        self.replay_spilled()
+
+    def replay_spilled(self) -> int:
+        """Re-send spilled events in their original order; stops at the first failure."""
+        if not self._spill_dir:
+            return 0
+        with self._spill_lock:
+            claimed = self._claim_spill_files()
+        replayed = 0
+        for index, path in enumerate(claimed):
+            try:
+                with open(path, encoding="utf-8") as handle:
+                    records = [json.loads(line) for line in handle if line.strip()]
+            except Exception as exc:
+                print(f"⚠️ [Event Writer] unreadable spill file {path}: {exc}")
+                continue
+            position = 0
+            while position < len(records):
+                table = records[position]["table"]
+                end = position
+                while end < len(records) and end - position < self.batch_size and records[end]["table"] == table:
+                    end += 1
+                if not self._insert(table, [record["row"] for record in records[position:end]], spill=False):
+                    break
+                replayed += end - position
+                position = end
+            if position < len(records):
+                # Still unavailable: put the rest (and unread files) back for the next attempt.
+                self._respill(records[position:], claimed[index + 1:])
+                os.remove(path)
+                break
+            os.remove(path)
+        if replayed:
+            self._count("replayed", replayed)
+        return replayed
+
+    def _respill(self, records: List[Dict[str, Any]], untouched: List[str]) -> None:
+        with self._spill_lock:
+            os.makedirs(self._spill_dir, exist_ok=True)
+            with open(self._spill_path, "a", encoding="utf-8") as handle:
+                for record in records:
+                    handle.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                for path in untouched:
+                    with open(path, encoding="utf-8") as source:
+                        handle.write(source.read())
+                    os.remove(path)
+
+
+def _is_missing_table_error(exc: Exception) -> bool:
+    code = str(getattr(exc, "code", "") or "").upper()
+    # PGRST205: not in the schema cache; 42P01: undefined table.
+    return code in {"PGRST205", "42P01"} or "pgrst205" in str(exc).lower()
+
+
+def _is_permanent_error(exc: Exception) -> bool:
+    code = str(getattr(exc, "code", "") or "")
+    if PostgrestAPIError is not None and isinstance(exc, PostgrestAPIError):
+        # PGRST2xx: unknown table/column; SQLSTATE 22/23/42: bad data, constraints, schema.
+        return code.upper().startswith("PGRST2") or code[:2] in {"22", "23", "42"}
+    return False
+
+
+def supabase_sink(table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    from .database import supabase
+
+    if not supabase:
+        raise RuntimeError("Supabase client is not configured")
+    try:
+        response = supabase.table(table).insert(rows).execute()
+    except Exception as exc:
+        if _is_missing_table_error(exc):
+            raise TableUnavailable(str(exc)) from exc
+        if _is_permanent_error(exc):
+            raise EventRejected(str(exc)) from exc
+        raise
+    return list(response.data or [])
+
+
+_writer_lock = threading.Lock()
+_writer_instance: Optional[EventWriter] = None
+_writer_configured = False
+
+
+def get_event_writer() -> Optional[EventWriter]:
+    """The process-wide writer from config, or None when disabled or without a database."""
+    global _writer_instance, _writer_configured
+    if _writer_configured:
+        return _writer_instance
+    with _writer_lock:
+        if not _writer_configured:
+            from . import config
+            from .database import supabase
+
+            if config.EVENT_WRITER_ENABLED and supabase:
+                _writer_instance = EventWriter(
+                    supabase_sink,
+                    max_queue=config.EVENT_WRITER_QUEUE_SIZE,
+                    batch_size=config.EVENT_WRITER_BATCH_SIZE,
+                    flush_interval=config.EVENT_WRITER_FLUSH_INTERVAL_SECONDS,
+                    spill_dir=config.EVENT_WRITER_SPILL_DIR or None,
+                    replay_interval=config.EVENT_WRITER_REPLAY_INTERVAL_SECONDS,
+                )
+                atexit.register(_writer_instance.close)
+            _writer_configured = True
+    return _writer_instance
+
+
+def set_event_writer(writer: Optional[EventWriter]) -> None:
+    """Replace the process-wide writer (``None`` makes ``write_event`` insert synchronously)."""
+    global _writer_instance, _writer_configured
+    with _writer_lock:
+        _writer_instance = writer
+        _writer_configured = True
+
+
+def close_event_writer(timeout: float = 10.0) -> None:
+    writer = _writer_instance
+    if writer is not None:
+        writer.close(timeout)
+
+
+def write_event(table: str, row: Dict[str, Any]) -> None:
+    """
+    Queue an event row for the background writer. Without one (writer disabled) the row is
+    inserted right away, as before; errors are reported, never raised.
+    """
+    writer = get_event_writer()
+    if writer is not None:
+        writer.submit(table, row)
+        return
+    from .database import supabase
+
+    if not supabase or table_unavailable(table):
+        return
+    try:
+        inserted = supabase_sink(table, [row])
+        callback = _after_write.get(table)
+        if callback:
+            callback([row], inserted)
+    except TableUnavailable as exc:
+        mark_table_unavailable(table, exc)
+    except Exception as exc:
+        print(f"⚠️ [Event Writer] failed to write {table} event: {exc}")
@@ -1,6 +1,5 @@
-from datetime import datetime, timedelta, timezone
-from copy import deepcopy
-from hashlib import sha256
+import asyncio
+from datetime import datetime, timezone
 from fastapi import Request, Depends, HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel
@@ -10,13 +9,21 @@ from typing import Dict, Any, Optional
 from app.core.legacy_supabase import get_legacy_supabase_client
 from app.core.security import security, AccessControlService
 from app.core.database import async_session_factory
+from app.core.auth_context import (
+    AuthContext,
+    AuthContextResolver,
+    build_auth_context,
+    register_auth_context_resolver,
+)
 from sqlalchemy import text
 import uuid
 
 supabase = get_legacy_supabase_client()
 
 _AUTH_CONTEXT_CACHE_TTL_SECONDS = 30
-_AUTH_CONTEXT_CACHE: dict[str, tuple[datetime, dict]] = {}
+_AUTH_CONTEXT_CACHE_MAX_ENTRIES = 5000
+_AUTH_CONTEXT_RPC = "get_auth_context"
+_auth_context_rpc_available = True
 
 # Mocks
 class DummyLimiter:
@@ -37,118 +44,115 @@ def require_company_access(user: dict, company_id: str) -> str:
         raise HTTPException(status_code=403, detail="Unauthorized")
     return company_id
 
-async def verify_supabase_token_legacy(token: str) -> dict:
-    if not supabase:
-        raise HTTPException(status_code=500, detail="Authentication service unavailable")
-    cache_key = sha256(token.encode("utf-8")).hexdigest()
-    cached = _AUTH_CONTEXT_CACHE.get(cache_key)
-    now = datetime.now(timezone.utc)
-    if cached and cached[0] > now:
-        return deepcopy(cached[1])
-    if cached:
-        _AUTH_CONTEXT_CACHE.pop(cache_key, None)
+def _is_missing_rpc_error(exc: Exception) -> bool:
+    message = str(exc)
+    return "PGRST202" in message or "Could not find the function" in message
+
+
+def _fetch_supabase_auth_rows(user_id: str) -> tuple[dict | None, list[dict]]:
+    """Profile row plus company links ({id, name, type}, owners first) in one RPC round trip."""
+    global _auth_context_rpc_available
+    if _auth_context_rpc_available:
+        try:
+            resp = supabase.rpc(_AUTH_CONTEXT_RPC, {"p_user_id": str(user_id)}).execute()
+            data = resp.data if isinstance(resp.data, dict) else {}
+            profile = data.get("profile") if isinstance(data.get("profile"), dict) else None
+            companies = [row for row in (data.get("companies") or []) if isinstance(row, dict)]
+            return profile, companies
+        except Exception as exc:
+            if not _is_missing_rpc_error(exc):
+                raise
+            _auth_context_rpc_available = False
+            print(f"⚠️ [AUTH] {_AUTH_CONTEXT_RPC} RPC missing, falling back to per-table queries: {exc}")
+
+    profile_resp = supabase.table("profiles").select("*").eq("id", user_id).execute()
+    if not profile_resp.data:
+        return None, []
+    profile = profile_resp.data[0]
+    companies: list[dict] = []
+    if profile.get("role") == "recruiter":
+        owner_resp = supabase.table("companies").select("id, name").eq("owner_id", user_id).execute()
+        created_by_resp = supabase.table("companies").select("id, name").eq("created_by", user_id).execute()
+        member_resp = supabase.table("company_members").select("company_id, companies(name)").eq("user_id", user_id).execute()
+        for c in (owner_resp.data or []) + (created_by_resp.data or []):
+            companies.append({"id": c["id"], "name": c.get("name"), "type": "owner"})
+        for m in member_resp.data or []:
+            companies.append({"id": m["company_id"], "name": (m.get("companies") or {}).get("name"), "type": "member"})
+    return profile, companies
+
+
+async def _fetch_v2_auth_rows(user_id: str) -> tuple[dict | None, list[dict]]:
+    """V2 role and company memberships (Northflank Postgres) in a single joined query."""
+    async with async_session_factory() as session:
+        result = await session.execute(
+            text("""
+                SELECT u.id AS user_id, u.role AS user_role,
+                       c.id AS company_id, c.name AS company_name, cu.role AS membership_role
+                FROM users u
+                LEFT JOIN company_users cu ON cu.user_id = u.id
+                LEFT JOIN companies c ON c.id = cu.company_id
+                WHERE u.supabase_id = :sid
+            """),
+            {"sid": uuid.UUID(str(user_id))}
+        )
+        rows = result.mappings().all()
+    if not rows:
+        return None, []
+    v2_user = {"id": rows[0]["user_id"], "role": rows[0]["user_role"]}
+    companies = [
+        {"id": row["company_id"], "name": row["company_name"], "role": row["membership_role"]}
+        for row in rows
+        if row["company_id"] is not None
+    ]
+    return v2_user, companies
+
+
+async def _load_auth_context(token: str) -> AuthContext:
     try:
-        user_response = supabase.auth.get_user(token)
+        user_response = await asyncio.to_thread(supabase.auth.get_user, token)
         if not user_response or not user_response.user:
             raise HTTPException(status_code=401, detail="Invalid token")
-        
+
         user_id = user_response.user.id
-        profile_resp = supabase.table("profiles").select("*").eq("id", user_id).execute()
-        
-        if profile_resp.data:
-            profile = profile_resp.data[0]
-            authorized_ids = [user_id]
-            profile["auth_id"] = user_id
-            profile["email"] = getattr(user_response.user, "email", "")
-            
-            if profile.get("role") == "recruiter":
-                owner_resp = supabase.table("companies").select("id, name").eq("owner_id", user_id).execute()
-                owned_companies = owner_resp.data or []
-
-                created_by_resp = supabase.table("companies").select("id, name").eq("created_by", user_id).execute()
-                created_companies = created_by_resp.data or []
-                
-                member_resp = supabase.table("company_members").select("company_id, companies(name)").eq("user_id", user_id).execute()
-                member_companies = member_resp.data or []
-                
-                all_associations = []
-                for c in owned_companies:
-                    if c["id"] not in authorized_ids:
-                        all_associations.append({"id": c["id"], "name": c.get("name"), "type": "owner"})
-                        authorized_ids.append(c["id"])
-
-                for c in created_companies:
-                    if c["id"] not in authorized_ids:
-                        all_associations.append({"id": c["id"], "name": c.get("name"), "type": "owner"})
-                        authorized_ids.append(c["id"])
-                
-                for m in member_companies:
-                    if m["company_id"] not in authorized_ids:
-                        all_associations.append({"id": m["company_id"], "name": m.get("companies", {}).get("name"), "type": "member"})
-                        authorized_ids.append(m["company_id"])
-                
-            profile["user_type"] = profile.get("user_type", "candidate")
-
-            # NEW: V2 Domain Synchronization
-            # We check the V2 database (Northflank Postgres) to see if the user has 
-            # recruiter status or company associations that are not yet in Supabase.
-            try:
-                async with async_session_factory() as session:
-                    v2_user_result = await session.execute(
-                        text("SELECT id, role FROM users WHERE supabase_id = :sid"),
-                        {"sid": uuid.UUID(str(user_id))}
-                    )
-                    v2_user = v2_user_result.mappings().first()
-                    
-                    if v2_user:
-                        v2_role = v2_user["role"]
-                        if v2_role == "recruiter" and profile.get("role") != "recruiter":
-                            profile["role"] = "recruiter"
-                        
-                        v2_companies_result = await session.execute(
-                            text("""
-                                SELECT c.id, c.name, cu.role 
-                                FROM company_users cu
-                                JOIN companies c ON c.id = cu.company_id
-                                WHERE cu.user_id = :uid
-                            """),
-                            {"uid": v2_user["id"]}
-                        )
-                        
-                        v2_associations = []
-                        for row in v2_companies_result.mappings().all():
-                            cid = str(row["id"])
-                            if cid not in authorized_ids:
-                                authorized_ids.append(cid)
-                            
-                            v2_associations.append({
-                                "id": cid,
-                                "name": row["name"],
-                                "type": row["role"]
-                            })
-                        
-                        if v2_associations:
-                            profile.setdefault("associations", [])
-                            existing_ids = {a["id"] for a in profile["associations"]}
-                            for va in v2_associations:
-                                if va["id"] not in existing_ids:
-                                    profile["associations"].append(va)
-                            
-                            profile["user_type"] = "company"
-                            if not profile.get("company_id") and profile["associations"]:
-                                profile["company_id"] = profile["associations"][0]["id"]
-                                profile["company_name"] = profile["associations"][0]["name"]
-            except Exception as e:
-                print(f"⚠️ [AUTH] V2 sync failed: {e}")
-
-            profile["authorized_ids"] = authorized_ids
-            _AUTH_CONTEXT_CACHE[cache_key] = (now + timedelta(seconds=_AUTH_CONTEXT_CACHE_TTL_SECONDS), deepcopy(profile))
-            return profile
-            
-        raise HTTPException(status_code=401, detail="Profile not found")
+        profile_row, companies = await asyncio.to_thread(_fetch_supabase_auth_rows, user_id)
+        if not profile_row:
+            raise HTTPException(status_code=401, detail="Profile not found")
+
+        # V2 Domain Synchronization: the V2 database (Northflank Postgres) may know about
+        # recruiter status or company associations that are not yet in Supabase.
+        try:
+            v2_user, v2_companies = await _fetch_v2_auth_rows(user_id)
+        except Exception as e:
+            print(f"⚠️ [AUTH] V2 sync failed: {e}")
+            v2_user, v2_companies = None, []
+
+        return build_auth_context(
+            user_id=user_id,
+            email=getattr(user_response.user, "email", ""),
+            profile_row=profile_row,
+            supabase_companies=companies,
+            v2_user=v2_user,
+            v2_companies=v2_companies,
+        )
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+
+_auth_context_resolver = register_auth_context_resolver(
+    AuthContextResolver(
+        _load_auth_context,
+        max_entries=_AUTH_CONTEXT_CACHE_MAX_ENTRIES,
+        ttl_seconds=_AUTH_CONTEXT_CACHE_TTL_SECONDS,
+    )
+)
+
+
+async def verify_supabase_token_legacy(token: str) -> dict:
+    if not supabase:
+        raise HTTPException(status_code=500, detail="Authentication service unavailable")
+    context = await _auth_context_resolver.resolve(token)
+    return context.as_user()
+
 async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
     cached_user = getattr(request.state, "current_user", None)
     if isinstance(cached_user, dict):
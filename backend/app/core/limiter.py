@@ -1,4 +1,41 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+"""
+Rate limiting for the backend API.
 
-limiter = Limiter(key_func=get_remote_address)
+The implementation is shared with the search API and lives in
+runtime-services/search-api/app/core/limiter.py. This module loads that file once per
+process and re-exports it, the way backend/scraper bridges the runtime scrapers, so
+both services run one copy of the limiter.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+
+_RUNTIME_LIMITER = Path(__file__).resolve().parents[3] / "runtime-services" / "search-api" / "app" / "core" / "limiter.py"
+_RUNTIME_MODULE_NAME = "jobshaman_runtime_limiter"
+
+
+def _load_runtime_limiter() -> ModuleType:
+    # One instance per process however this module is imported (app.core / backend.app.core),
+    # so the verified-identity table and metrics are not split.
+    module = sys.modules.get(_RUNTIME_MODULE_NAME)
+    if module is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(_RUNTIME_MODULE_NAME, _RUNTIME_LIMITER)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Unable to load the shared limiter from {_RUNTIME_LIMITER}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[_RUNTIME_MODULE_NAME] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(_RUNTIME_MODULE_NAME, None)
+        raise
+    return module
+
+
+_runtime_module = _load_runtime_limiter()
+globals().update({name: getattr(_runtime_module, name) for name in dir(_runtime_module) if not name.startswith("__")})
@@ -1,25 +1,192 @@
 import hashlib
 import time
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional
 
+from . import config
+from .config_snapshot import ConfigSnapshotService
 from .database import supabase
 
-_CACHE_TTL_SECONDS = 30
-_cache: Dict[str, Dict[str, Any]] = {}
+# Tables that make up the runtime config snapshot. They are small (tens of rows) and
+# are always loaded together, so a lookup never needs its own round trip.
+_SNAPSHOT_TABLES = (
+    ("release_flags", "flag_key, is_enabled, rollout_percent, variant, config_json"),
+    (
+        "model_registry",
+        "subsystem, feature, version, model_name, temperature, top_p, top_k, is_primary, is_fallback, is_active, config_json, created_at",
+    ),
+    (
+        "scoring_model_versions",
+        "version, alpha_skill, beta_demand, gamma_seniority, delta_salary, epsilon_geo, is_active, created_at",
+    ),
+    (
+        "model_experiments",
+        "subsystem, feature, experiment_key, control_version, candidate_version, traffic_percent, is_enabled, updated_at",
+    ),
+    (
+        "action_prediction_models",
+        "model_key, version, objective, coefficients_json, feature_schema_json, is_active, created_at",
+    ),
+)
+_SNAPSHOT_RPC = "get_runtime_config_snapshot"
+_VERSION_TABLE = "runtime_config_version"
+_MODEL_ROWS_LIMIT = 10
+_ASSIGNMENT_MEMO_LIMIT = 50000
+
+_VERSION_PROBE_BACKOFF_MIN_SECONDS = 5.0
+_VERSION_PROBE_BACKOFF_MAX_SECONDS = 300.0
+
+_version_probe_disabled = False
+_version_probe_backoff = 0.0
+_version_probe_retry_at = 0.0
+_assignment_lock = Lock()
+_persisted_assignments: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def _rows(payload: Dict[str, Any], key: str) -> List[Dict[str, Any]]:
+    value = payload.get(key)
+    return [row for row in value if isinstance(row, dict)] if isinstance(value, list) else []
+
+
+def _newest_first(rows: List[Dict[str, Any]], field: str) -> List[Dict[str, Any]]:
+    return sorted(rows, key=lambda row: str(row.get(field) or ""), reverse=True)
+
+
+def _build_snapshot(payload: Dict[str, Any]) -> Dict[str, Any]:
+    flags = {
+        str(row.get("flag_key")): {
+            "flag_key": row.get("flag_key"),
+            "is_enabled": row.get("is_enabled"),
+            "rollout_percent": row.get("rollout_percent"),
+            "variant": row.get("variant"),
+            "config_json": row.get("config_json"),
+        }
+        for row in _rows(payload, "release_flags")
+        if row.get("flag_key")
+    }
+
+    model_rows: Dict[tuple, List[Dict[str, Any]]] = {}
+    for row in _newest_first(_rows(payload, "model_registry"), "created_at"):
+        if row.get("is_active") is False:
+            continue
+        bucket = model_rows.setdefault((row.get("subsystem"), row.get("feature")), [])
+        if len(bucket) < _MODEL_ROWS_LIMIT:
+            bucket.append(row)
+
+    scoring_rows = _newest_first(_rows(payload, "scoring_model_versions"), "created_at")
+    scoring_versions: Dict[str, Dict[str, Any]] = {}
+    for row in scoring_rows:
+        scoring_versions.setdefault(str(row.get("version") or ""), row)
+    scoring_active = next((row for row in scoring_rows if row.get("is_active")), None)
+
+    experiments: Dict[str, Dict[str, Any]] = {}
+    for row in _newest_first(_rows(payload, "model_experiments"), "updated_at"):
+        if row.get("subsystem") == "matching" and row.get("is_enabled"):
+            experiments.setdefault(str(row.get("feature") or ""), row)
+
+    action_models: Dict[str, Dict[str, Any]] = {}
+    for row in _newest_first(_rows(payload, "action_prediction_models"), "created_at"):
+        if row.get("is_active"):
+            action_models.setdefault(str(row.get("model_key") or ""), row)
+
+    return {
+        "version": payload.get("version"),
+        "flags": flags,
+        "model_rows": model_rows,
+        "scoring_versions": scoring_versions,
+        "scoring_active": scoring_active,
+        "experiments": experiments,
+        "action_models": action_models,
+        # Derived per-key results, valid for the lifetime of this snapshot.
+        "derived": {},
+    }
 
 
-def _cache_get(key: str):
-    item = _cache.get(key)
-    if not item:
+def _load_runtime_config_snapshot() -> Optional[Dict[str, Any]]:
+    if not supabase:
         return None
-    if time.time() - item["ts"] > _CACHE_TTL_SECONDS:
-        _cache.pop(key, None)
+
+    try:
+        resp = supabase.rpc(_SNAPSHOT_RPC, {}).execute()
+        payload = getattr(resp, "data", None)
+        if isinstance(payload, dict):
+            return _build_snapshot(payload)
+    except Exception as exc:
+        print(f"⚠️ [Runtime Config] snapshot RPC unavailable, falling back to table reads: {exc}")
+
+    # Version first: a change landing during the table reads still moves it past ours.
+    payload: Dict[str, Any] = {"version": _probe_runtime_config_version()}
+    for table, columns in _SNAPSHOT_TABLES:
+        # One unreadable table leaves only its own lookups on defaults, as before the snapshot.
+        try:
+            resp = supabase.table(table).select(columns).execute()
+            payload[table] = resp.data or []
+        except Exception as exc:
+            print(f"⚠️ [Runtime Config] {table} unavailable, using defaults for it: {exc}")
+            payload[table] = []
+    return _build_snapshot(payload)
+
+
+def _is_missing_relation_error(exc: Exception) -> bool:
+    code = str(getattr(exc, "code", "") or "").upper()
+    msg = str(exc).lower()
+    return code in {"PGRST205", "42P01"} or "pgrst205" in msg or ("relation" in msg and "does not exist" in msg)
+
+
+def _probe_runtime_config_version() -> Optional[Any]:
+    global _version_probe_disabled, _version_probe_backoff, _version_probe_retry_at
+    if not supabase or _version_probe_disabled or time.monotonic() < _version_probe_retry_at:
         return None
-    return item["value"]
+    try:
+        resp = supabase.table(_VERSION_TABLE).select("version").eq("id", 1).limit(1).execute()
+    except Exception as exc:
+        if _is_missing_relation_error(exc):
+            # Missing table: fall back to TTL-only refresh instead of logging every poll.
+            _version_probe_disabled = True
+            print(f"⚠️ [Runtime Config] version probe disabled: {exc}")
+            return None
+        # Anything else may be transient: pause the probe (TTL refresh still runs) and retry.
+        _version_probe_backoff = min(
+            _VERSION_PROBE_BACKOFF_MAX_SECONDS,
+            max(_VERSION_PROBE_BACKOFF_MIN_SECONDS, _version_probe_backoff * 2),
+        )
+        _version_probe_retry_at = time.monotonic() + _version_probe_backoff
+        print(f"⚠️ [Runtime Config] version probe failed, retrying in {_version_probe_backoff:.0f}s: {exc}")
+        return None
+    _version_probe_backoff = 0.0
+    rows = resp.data or []
+    return rows[0].get("version") if rows and isinstance(rows[0], dict) else None
+
 
+_snapshot_service = ConfigSnapshotService(
+    _load_runtime_config_snapshot,
+    _probe_runtime_config_version,
+    ttl_seconds=config.RUNTIME_CONFIG_TTL_SECONDS,
+    version_poll_seconds=config.RUNTIME_CONFIG_VERSION_POLL_SECONDS,
+    max_stale_seconds=config.RUNTIME_CONFIG_MAX_STALE_SECONDS,
+)
 
-def _cache_set(key: str, value: Any):
-    _cache[key] = {"ts": time.time(), "value": value}
+
+def get_runtime_config_snapshot_service() -> ConfigSnapshotService:
+    return _snapshot_service
+
+
+def invalidate_runtime_config() -> None:
+    _snapshot_service.invalidate()
+
+
+def _snapshot() -> Optional[Dict[str, Any]]:
+    return _snapshot_service.get()
+
+
+def _derived(snapshot: Optional[Dict[str, Any]], key: str, build):
+    if snapshot is None:
+        return build(None)
+    memo = snapshot["derived"]
+    if key not in memo:
+        memo[key] = build(snapshot)
+    return memo[key]
 
 
 def _stable_rollout_bucket(subject: str) -> int:
@@ -30,32 +197,17 @@ def _stable_rollout_bucket(subject: str) -> int:
 
 
 def get_release_flag(flag_key: str, subject_id: Optional[str] = None, default: bool = True) -> Dict[str, Any]:
-    cache_key = f"flag:{flag_key}"
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        flag = cached
-    else:
-        flag = {
-            "flag_key": flag_key,
-            "is_enabled": default,
-            "rollout_percent": 100,
-            "variant": None,
-            "config_json": {},
-        }
-        if supabase:
-            try:
-                resp = (
-                    supabase.table("release_flags")
-                    .select("flag_key, is_enabled, rollout_percent, variant, config_json")
-                    .eq("flag_key", flag_key)
-                    .maybe_single()
-                    .execute()
-                )
-                if resp and getattr(resp, "data", None):
-                    flag.update(resp.data)
-            except Exception as exc:
-                print(f"⚠️ [Runtime Config] failed loading release flag {flag_key}: {exc}")
-        _cache_set(cache_key, flag)
+    flag = {
+        "flag_key": flag_key,
+        "is_enabled": default,
+        "rollout_percent": 100,
+        "variant": None,
+        "config_json": {},
+    }
+    snapshot = _snapshot()
+    if snapshot is not None:
+        # Flags missing from the snapshot are known-missing: defaults, no extra query.
+        flag.update(snapshot["flags"].get(flag_key) or {})
 
     rollout = int(flag.get("rollout_percent") or 0)
     enabled = bool(flag.get("is_enabled", False))
@@ -68,12 +220,7 @@ def get_release_flag(flag_key: str, subject_id: Optional[str] = None, default: b
     }
 
 
-def get_active_model_config(subsystem: str, feature: str) -> Dict[str, Any]:
-    cache_key = f"model:{subsystem}:{feature}"
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return cached
-
+def _model_config_from_rows(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
     defaults = {
         "version": "v1",
         "primary_model": None,
@@ -83,61 +230,54 @@ def get_active_model_config(subsystem: str, feature: str) -> Dict[str, Any]:
         "top_k": 1,
         "config_json": {},
     }
-
-    if not supabase:
+    if not rows:
         return defaults
 
-    try:
-        resp = (
-            supabase.table("model_registry")
-            .select("version, model_name, temperature, top_p, top_k, is_primary, is_fallback, config_json")
-            .eq("subsystem", subsystem)
-            .eq("feature", feature)
-            .eq("is_active", True)
-            .order("created_at", desc=True)
-            .limit(10)
-            .execute()
-        )
-        rows = resp.data or []
-        if rows:
-            first = rows[0]
-            merged_config: Dict[str, Any] = {}
-            for row in rows:
-                cfg = row.get("config_json") or {}
-                if isinstance(cfg, dict):
-                    merged_config.update(cfg)
-            out = {
-                "version": first.get("version") or defaults["version"],
-                "primary_model": None,
-                "fallback_model": None,
-                "temperature": first.get("temperature") if first.get("temperature") is not None else defaults["temperature"],
-                "top_p": first.get("top_p") if first.get("top_p") is not None else defaults["top_p"],
-                "top_k": first.get("top_k") if first.get("top_k") is not None else defaults["top_k"],
-                "config_json": merged_config,
-            }
-            for row in rows:
-                model_name = row.get("model_name")
-                if row.get("is_primary") and model_name and not out["primary_model"]:
-                    out["primary_model"] = model_name
-                if row.get("is_fallback") and model_name and not out["fallback_model"]:
-                    out["fallback_model"] = model_name
-            if not out["primary_model"] and rows:
-                out["primary_model"] = rows[0].get("model_name")
-            _cache_set(cache_key, out)
-            return out
-    except Exception as exc:
-        print(f"⚠️ [Runtime Config] failed loading model config {subsystem}/{feature}: {exc}")
+    first = rows[0]
+    merged_config: Dict[str, Any] = {}
+    for row in rows:
+        cfg = row.get("config_json") or {}
+        if isinstance(cfg, dict):
+            merged_config.update(cfg)
+    out = {
+        "version": first.get("version") or defaults["version"],
+        "primary_model": None,
+        "fallback_model": None,
+        "temperature": first.get("temperature") if first.get("temperature") is not None else defaults["temperature"],
+        "top_p": first.get("top_p") if first.get("top_p") is not None else defaults["top_p"],
+        "top_k": first.get("top_k") if first.get("top_k") is not None else defaults["top_k"],
+        "config_json": merged_config,
+    }
+    for row in rows:
+        model_name = row.get("model_name")
+        if row.get("is_primary") and model_name and not out["primary_model"]:
+            out["primary_model"] = model_name
+        if row.get("is_fallback") and model_name and not out["fallback_model"]:
+            out["fallback_model"] = model_name
+    if not out["primary_model"]:
+        out["primary_model"] = rows[0].get("model_name")
+    return out
 
-    _cache_set(cache_key, defaults)
-    return defaults
 
+def get_active_model_config(subsystem: str, feature: str) -> Dict[str, Any]:
+    return _derived(
+        _snapshot(),
+        f"model:{subsystem}:{feature}",
+        lambda snap: _model_config_from_rows((snap or {}).get("model_rows", {}).get((subsystem, feature)) or []),
+    )
 
-def get_active_scoring_model() -> Dict[str, Any]:
-    cache_key = "scoring:active"
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return cached
 
+def _scoring_model_from_row(data: Dict[str, Any], fallback_version: str, fallback_weights: Dict[str, float]) -> Dict[str, Any]:
+    return {
+        "version": data.get("version") or fallback_version,
+        "weights": {
+            name: float(data.get(name) or fallback_weights[name])
+            for name in ("alpha_skill", "beta_demand", "gamma_seniority", "delta_salary", "epsilon_geo")
+        },
+    }
+
+
+def get_active_scoring_model() -> Dict[str, Any]:
     defaults = {
         "version": "scoring-v1",
         "weights": {
@@ -149,81 +289,47 @@ def get_active_scoring_model() -> Dict[str, Any]:
         },
     }
 
-    if not supabase:
-        return defaults
-
-    try:
-        row = (
-            supabase.table("scoring_model_versions")
-            .select(
-                "version, alpha_skill, beta_demand, gamma_seniority, delta_salary, epsilon_geo"
-            )
-            .eq("is_active", True)
-            .order("created_at", desc=True)
-            .limit(1)
-            .execute()
-        )
-        data = (row.data or [None])[0]
-        if data:
-            out = {
-                "version": data.get("version") or defaults["version"],
-                "weights": {
-                    "alpha_skill": float(data.get("alpha_skill") or defaults["weights"]["alpha_skill"]),
-                    "beta_demand": float(data.get("beta_demand") or defaults["weights"]["beta_demand"]),
-                    "gamma_seniority": float(data.get("gamma_seniority") or defaults["weights"]["gamma_seniority"]),
-                    "delta_salary": float(data.get("delta_salary") or defaults["weights"]["delta_salary"]),
-                    "epsilon_geo": float(data.get("epsilon_geo") or defaults["weights"]["epsilon_geo"]),
-                },
-            }
-            _cache_set(cache_key, out)
-            return out
-    except Exception as exc:
-        print(f"⚠️ [Runtime Config] failed loading scoring model: {exc}")
+    def build(snap: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        data = (snap or {}).get("scoring_active")
+        if not data:
+            return defaults
+        return _scoring_model_from_row(data, defaults["version"], defaults["weights"])
 
-    _cache_set(cache_key, defaults)
-    return defaults
+    return _derived(_snapshot(), "scoring:active", build)
 
 
 def get_scoring_model_by_version(version: str) -> Optional[Dict[str, Any]]:
     if not version:
         return None
 
-    cache_key = f"scoring:version:{version}"
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return cached
-
-    if not supabase:
-        return None
-
-    try:
-        row = (
-            supabase.table("scoring_model_versions")
-            .select("version, alpha_skill, beta_demand, gamma_seniority, delta_salary, epsilon_geo")
-            .eq("version", version)
-            .limit(1)
-            .execute()
-        )
-        data = (row.data or [None])[0]
+    def build(snap: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        data = (snap or {}).get("scoring_versions", {}).get(version)
         if not data:
-            _cache_set(cache_key, None)
             return None
+        return _scoring_model_from_row(data, version, dict.fromkeys(("alpha_skill", "beta_demand", "gamma_seniority", "delta_salary", "epsilon_geo"), 0.0))
 
-        out = {
-            "version": data.get("version") or version,
-            "weights": {
-                "alpha_skill": float(data.get("alpha_skill") or 0),
-                "beta_demand": float(data.get("beta_demand") or 0),
-                "gamma_seniority": float(data.get("gamma_seniority") or 0),
-                "delta_salary": float(data.get("delta_salary") or 0),
-                "epsilon_geo": float(data.get("epsilon_geo") or 0),
-            },
-        }
-        _cache_set(cache_key, out)
-        return out
+    return _derived(_snapshot(), f"scoring:version:{version}", build)
+
+
+def _persist_experiment_assignment(payload: Dict[str, Any]) -> None:
+    memo_key = (payload["experiment_key"], payload["user_id"])
+    with _assignment_lock:
+        if _persisted_assignments.get(memo_key) == payload["assigned_version"]:
+            _persisted_assignments.move_to_end(memo_key)
+            return
+    try:
+        supabase.table("model_experiment_assignments").upsert(
+            payload,
+            on_conflict="experiment_key,user_id",
+        ).execute()
     except Exception as exc:
-        print(f"⚠️ [Runtime Config] failed loading scoring version {version}: {exc}")
-        return None
+        print(f"⚠️ [Runtime Config] failed to persist model experiment assignment: {exc}")
+        return
+    with _assignment_lock:
+        _persisted_assignments[memo_key] = payload["assigned_version"]
+        _persisted_assignments.move_to_end(memo_key)
+        while len(_persisted_assignments) > _ASSIGNMENT_MEMO_LIMIT:
+            _persisted_assignments.popitem(last=False)
 
 
 def resolve_scoring_model_for_user(user_id: str, feature: str = "recommendations") -> Dict[str, Any]:
@@ -231,24 +337,15 @@ def resolve_scoring_model_for_user(user_id: str, feature: str = "recommendations
     Deterministic user -> scoring_version mapping using model_experiments:
       bucket = hash(f\"{experiment_key}:{user_id}\") % 100
       if bucket < traffic_percent => candidate_version else control_version
-    Assignment is persisted in model_experiment_assignments.
+    Assignment is persisted in model_experiment_assignments (once per user and version).
     """
     active = get_active_scoring_model()
-    if not supabase or not user_id:
+    snapshot = _snapshot()
+    if not supabase or not user_id or snapshot is None:
         return {**active, "assignment_source": "active_default", "bucket": None, "experiment_key": None}
 
     try:
-        exp = (
-            supabase.table("model_experiments")
-            .select("experiment_key, control_version, candidate_version, traffic_percent")
-            .eq("subsystem", "matching")
-            .eq("feature", feature)
-            .eq("is_enabled", True)
-            .order("updated_at", desc=True)
-            .limit(1)
-            .execute()
-        )
-        experiment = (exp.data or [None])[0]
+        experiment = snapshot["experiments"].get(feature)
         if not experiment:
             return {**active, "assignment_source": "active_default", "bucket": None, "experiment_key": None}
 
@@ -262,22 +359,17 @@ def resolve_scoring_model_for_user(user_id: str, feature: str = "recommendations
 
         selected = get_scoring_model_by_version(selected_version) or active
 
-        assignment_payload = {
-            "experiment_key": experiment_key,
-            "user_id": user_id,
-            "subsystem": "matching",
-            "feature": feature,
-            "assigned_version": selected.get("version") or active["version"],
-            "bucket": bucket,
-            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        }
-        try:
-            supabase.table("model_experiment_assignments").upsert(
-                assignment_payload,
-                on_conflict="experiment_key,user_id",
-            ).execute()
-        except Exception as exc:
-            print(f"⚠️ [Runtime Config] failed to persist model experiment assignment: {exc}")
+        _persist_experiment_assignment(
+            {
+                "experiment_key": experiment_key,
+                "user_id": user_id,
+                "subsystem": "matching",
+                "feature": feature,
+                "assigned_version": selected.get("version") or active["version"],
+                "bucket": bucket,
+                "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+        )
 
         return {
             **selected,
@@ -291,11 +383,6 @@ def resolve_scoring_model_for_user(user_id: str, feature: str = "recommendations
 
 
 def get_active_action_prediction_model(model_key: str = "job_apply_probability") -> Dict[str, Any]:
-    cache_key = f"action_model:{model_key}:active"
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return cached
-
     defaults = {
         "model_key": model_key,
         "version": "v1",
@@ -312,32 +399,16 @@ def get_active_action_prediction_model(model_key: str = "job_apply_probability")
         "feature_schema_json": {},
     }
 
-    if not supabase:
-        return defaults
-
-    try:
-        row = (
-            supabase.table("action_prediction_models")
-            .select("model_key, version, objective, coefficients_json, feature_schema_json")
-            .eq("model_key", model_key)
-            .eq("is_active", True)
-            .order("created_at", desc=True)
-            .limit(1)
-            .execute()
-        )
-        data = (row.data or [None])[0]
-        if data:
-            out = {
-                "model_key": data.get("model_key") or model_key,
-                "version": data.get("version") or "v1",
-                "objective": data.get("objective") or "apply_click_probability",
-                "coefficients_json": data.get("coefficients_json") or defaults["coefficients_json"],
-                "feature_schema_json": data.get("feature_schema_json") or {},
-            }
-            _cache_set(cache_key, out)
-            return out
-    except Exception as exc:
-        print(f"⚠️ [Runtime Config] failed loading action prediction model {model_key}: {exc}")
+    def build(snap: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        data = (snap or {}).get("action_models", {}).get(model_key)
+        if not data:
+            return defaults
+        return {
+            "model_key": data.get("model_key") or model_key,
+            "version": data.get("version") or "v1",
+            "objective": data.get("objective") or "apply_click_probability",
+            "coefficients_json": data.get("coefficients_json") or defaults["coefficients_json"],
+            "feature_schema_json": data.get("feature_schema_json") or {},
+        }
 
-    _cache_set(cache_key, defaults)
-    return defaults
+    return _derived(_snapshot(), f"action_model:{model_key}:active", build)
@@ -4,14 +4,18 @@ import base64
 from fastapi import HTTPException, Security, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
-import requests
-from jose import jwt as jose_jwt
-from jose import jwk as jose_jwk
 import json
 import time
 
 from app.core.legacy_supabase import get_legacy_supabase_client
 from app.core.runtime import allow_legacy_auth_fallback, strict_production_mode
+from .limiter import remember_authenticated_credential
+from .token_verification import (
+    JWKSKeyStore,
+    JWKSUnavailableError,
+    VerifiedTokenCache,
+    record_verification,
+)
 
 # Load the shared project envs. Supabase auth and Northflank DB currently live
 # in the same env set, while V2 itself must only use Supabase for auth.
@@ -29,55 +33,60 @@ def base64url_decode(input: str) -> bytes:
         input += '=' * (4 - rem)
     return base64.urlsafe_b64decode(input)
 
+# Legacy (network) verifications carry no locally checked signature; keep them short-lived.
+LEGACY_VERIFIED_TOKEN_TTL_SECONDS = 60
+
+
 class AccessControlService:
     JWKS_URL = os.environ.get("SUPABASE_JWKS_URL") or "https://frquoinhhxkxnvcyomtr.supabase.co/auth/v1/.well-known/jwks.json"
-    JWKS_CACHE = None
-    JWKS_CACHE_AT = 0
-    JWKS_CACHE_TTL = 300  # 5 min
+    JWKS_CACHE_TTL = int(os.environ.get("SUPABASE_JWKS_REFRESH_SECONDS", "300"))
+    JWKS_STALE_IF_ERROR_SECONDS = int(os.environ.get("SUPABASE_JWKS_STALE_IF_ERROR_SECONDS", "21600"))
 
     @staticmethod
     def _get_jwks():
-        now = int(time.time())
-        if (
-            not AccessControlService.JWKS_CACHE
-            or (now - AccessControlService.JWKS_CACHE_AT) > AccessControlService.JWKS_CACHE_TTL
-        ):
-            try:
-                resp = requests.get(AccessControlService.JWKS_URL, timeout=5)
-                resp.raise_for_status()
-                AccessControlService.JWKS_CACHE = resp.json()
-                AccessControlService.JWKS_CACHE_AT = now
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Chyba načítání JWKS: {e}")
-        return AccessControlService.JWKS_CACHE
+        try:
+            return _jwks_store.get_jwks()
+        except JWKSUnavailableError as e:
+            raise HTTPException(status_code=500, detail=f"Chyba načítání JWKS: {e}")
 
     @staticmethod
-    def verify_supabase_jwt_raw(token: str):
-        if not JWT_SECRET:
-            use_legacy_fallback = allow_legacy_auth_fallback()
-            if not use_legacy_fallback and strict_production_mode():
-                raise HTTPException(status_code=500, detail="Supabase JWT verification is not configured (SUPABASE_JWT_SECRET missing)")
-            client = get_legacy_supabase_client()
-            if not client:
-                raise HTTPException(status_code=500, detail="Supabase auth is not configured")
-            try:
-                user_response = client.auth.get_user(token)
-                user = getattr(user_response, "user", None)
-                if not user:
-                    raise HTTPException(status_code=401, detail="Invalid token")
-                metadata = getattr(user, "user_metadata", None) or {}
-                app_metadata = getattr(user, "app_metadata", None) or {}
-                return {
-                    "id": str(getattr(user, "id", "")),
-                    "sub": str(getattr(user, "id", "")),
-                    "email": getattr(user, "email", None),
-                    "role": app_metadata.get("role") or metadata.get("role") or "authenticated",
-                }
-            except HTTPException:
-                raise
-            except Exception as exc:
-                raise HTTPException(status_code=401, detail=f"Invalid token: {str(exc)}") from exc
+    def _verify_with_legacy_auth(token: str):
+        use_legacy_fallback = allow_legacy_auth_fallback()
+        if not use_legacy_fallback and strict_production_mode():
+            raise HTTPException(status_code=500, detail="Supabase JWT verification is not configured (SUPABASE_JWT_SECRET missing)")
+        client = get_legacy_supabase_client()
+        if not client:
+            raise HTTPException(status_code=500, detail="Supabase auth is not configured")
+        try:
+            user_response = client.auth.get_user(token)
+            user = getattr(user_response, "user", None)
+            if not user:
+                raise HTTPException(status_code=401, detail="Invalid token")
+            metadata = getattr(user, "user_metadata", None) or {}
+            app_metadata = getattr(user, "app_metadata", None) or {}
+            payload = {
+                "id": str(getattr(user, "id", "")),
+                "sub": str(getattr(user, "id", "")),
+                "email": getattr(user, "email", None),
+                "role": app_metadata.get("role") or metadata.get("role") or "authenticated",
+            }
+        except HTTPException:
+            raise
+        except Exception as exc:
+            raise HTTPException(status_code=401, detail=f"Invalid token: {str(exc)}") from exc
+
+        # Never cache past the token's own expiry (read without verification, the
+        # signature was just checked by Supabase).
+        try:
+            unverified = jwt.decode(token, options={"verify_signature": False})
+            if isinstance(unverified.get("exp"), (int, float)):
+                payload["exp"] = unverified["exp"]
+        except Exception:
+            pass
+        return payload
 
+    @staticmethod
+    def _verify_locally(token: str):
         # Rozpoznání typu tokenu podle headeru
         headers_segment = token.split('.')[0] + "=="
         try:
@@ -106,29 +115,54 @@ class AccessControlService:
                 raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
 
         elif alg == "ES256":
-            # JWKS+JOSE-based ověření
-            jwks = AccessControlService._get_jwks()
-            keys = jwks.get("keys", [])
-            key = next((k for k in keys if k.get("kid") == kid), None)
-            if not key:
+            # JWKS-based ověření s předpřipravenými klíči
+            try:
+                key = _jwks_store.get_key(kid)
+            except JWKSUnavailableError as e:
+                raise HTTPException(status_code=500, detail=f"Chyba načítání JWKS: {e}")
+            if key is None:
                 raise HTTPException(status_code=401, detail=f"Unknown KID '{kid}' in JWT.")
             try:
-                payload = jose_jwt.decode(
+                payload = jwt.decode(
                     token,
-                    key,
+                    key.key,
                     algorithms=["ES256"],
                     options={"verify_aud": False}
                 )
                 if "id" not in payload and "sub" in payload:
                     payload["id"] = payload["sub"]
                 return payload
-            except jose_jwt.ExpiredSignatureError:
+            except jwt.ExpiredSignatureError:
                 raise HTTPException(status_code=401, detail="Token has expired")
-            except jose_jwt.JWTError as e:
+            except jwt.InvalidTokenError as e:
                 raise HTTPException(status_code=401, detail=f"Invalid token (ES256): {str(e)}")
         else:
             raise HTTPException(status_code=401, detail=f"JWT s nepodporovaným algoritmem: {alg}")
 
+    @staticmethod
+    def verify_supabase_jwt_raw(token: str):
+        started_at = time.perf_counter()
+        cached = _verified_tokens.get(token)
+        if cached is not None:
+            record_verification(started_at, cache_hit=True)
+            return cached
+
+        legacy = not JWT_SECRET
+        try:
+            if legacy:
+                payload = AccessControlService._verify_with_legacy_auth(token)
+            else:
+                payload = AccessControlService._verify_locally(token)
+        except HTTPException:
+            record_verification(started_at, failed=True, legacy=legacy)
+            raise
+
+        _verified_tokens.put(token, payload, ttl_seconds=LEGACY_VERIFIED_TOKEN_TTL_SECONDS if legacy else None)
+        if payload.get("sub"):
+            remember_authenticated_credential(token, f"user:{payload['sub']}")
+        record_verification(started_at, legacy=legacy)
+        return payload
+
     @staticmethod
     def verify_supabase_jwt(credentials: HTTPAuthorizationCredentials = Security(security)):
         return AccessControlService.verify_supabase_jwt_raw(credentials.credentials)
@@ -145,6 +179,17 @@ class AccessControlService:
             "role": payload.get("role", "authenticated")
         }
 
+_jwks_store = JWKSKeyStore(
+    AccessControlService.JWKS_URL,
+    refresh_interval_seconds=AccessControlService.JWKS_CACHE_TTL,
+    stale_if_error_seconds=AccessControlService.JWKS_STALE_IF_ERROR_SECONDS,
+)
+_verified_tokens = VerifiedTokenCache(
+    max_entries=int(os.environ.get("AUTH_VERIFIED_TOKEN_CACHE_SIZE", "20000")),
+    max_ttl_seconds=int(os.environ.get("AUTH_VERIFIED_TOKEN_CACHE_TTL_SECONDS", "300")),
+)
+
+
 def verify_supabase_token(token: str):
     return AccessControlService.verify_supabase_jwt_raw(token)
 
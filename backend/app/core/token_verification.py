@@ -0,0 +1,270 @@
+"""
+Building blocks for bearer-token verification:
+
+- ``JWKSKeyStore`` keeps the Supabase JWKS as ready-to-use key objects, refreshes it in
+  the background, re-fetches (rate limited) when a token names an unknown ``kid`` and
+  keeps serving the last good keys for a while when the JWKS endpoint is down,
+- ``VerifiedTokenCache`` remembers verified claims by token hash, never past ``exp``,
+- module-level counters exposed through ``token_verification_metrics()``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import jwt
+import requests
+
+JWKSFetcher = Callable[[str], dict]
+
+_LATENCY_BUCKETS_MS = (1, 5, 25, 100)
+
+_metrics_lock = threading.Lock()
+_METRICS: dict[str, Any] = {
+    "verifications": 0,
+    "cache_hits": 0,
+    "failures": 0,
+    "legacy_fallbacks": 0,
+    "jwks_refreshes": 0,
+    "jwks_refresh_failures": 0,
+    "jwks_kid_miss_refreshes": 0,
+    "latency_ms_total": 0.0,
+    "latency_ms_max": 0.0,
+    "latency_buckets": {**{f"le_{bucket}ms": 0 for bucket in _LATENCY_BUCKETS_MS}, "gt_100ms": 0},
+}
+
+
+def _bump(name: str, amount: int = 1) -> None:
+    with _metrics_lock:
+        _METRICS[name] = int(_METRICS.get(name) or 0) + amount
+
+
+def record_verification(started_at: float, *, cache_hit: bool = False, failed: bool = False, legacy: bool = False) -> None:
+    latency_ms = (time.perf_counter() - started_at) * 1000.0
+    bucket = next((f"le_{limit}ms" for limit in _LATENCY_BUCKETS_MS if latency_ms <= limit), "gt_100ms")
+    with _metrics_lock:
+        _METRICS["verifications"] += 1
+        if cache_hit:
+            _METRICS["cache_hits"] += 1
+        if failed:
+            _METRICS["failures"] += 1
+        if legacy:
+            _METRICS["legacy_fallbacks"] += 1
+        _METRICS["latency_ms_total"] += latency_ms
+        _METRICS["latency_ms_max"] = max(_METRICS["latency_ms_max"], latency_ms)
+        _METRICS["latency_buckets"][bucket] += 1
+
+
+def token_verification_metrics() -> dict[str, Any]:
+    with _metrics_lock:
+        out = {**_METRICS, "latency_buckets": dict(_METRICS["latency_buckets"])}
+    total = out["verifications"] or 0
+    out["avg_latency_ms"] = round(out["latency_ms_total"] / total, 3) if total else 0.0
+    out["cache_hit_rate"] = round(out["cache_hits"] / total, 4) if total else 0.0
+    out["legacy_fallback_rate"] = round(out["legacy_fallbacks"] / total, 4) if total else 0.0
+    return out
+
+
+def reset_token_verification_metrics() -> None:
+    with _metrics_lock:
+        for key, value in list(_METRICS.items()):
+            if key == "latency_buckets":
+                _METRICS[key] = {name: 0 for name in value}
+            else:
+                _METRICS[key] = 0.0 if isinstance(value, float) else 0
+
+
+class JWKSUnavailableError(RuntimeError):
+    pass
+
+
+def _fetch_jwks_http(url: str) -> dict:
+    resp = requests.get(url, timeout=5)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _run_in_thread(fn: Callable[[], None]) -> None:
+    threading.Thread(target=fn, name="jwks-refresh", daemon=True).start()
+
+
+class JWKSKeyStore:
+    def __init__(
+        self,
+        url: str,
+        *,
+        fetch: JWKSFetcher = _fetch_jwks_http,
+        refresh_interval_seconds: float = 300.0,
+        stale_if_error_seconds: float = 6 * 3600.0,
+        min_refetch_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        run_in_background: Callable[[Callable[[], None]], None] = _run_in_thread,
+    ):
+        self.url = url
+        self._fetch = fetch
+        self._refresh_interval = max(1.0, float(refresh_interval_seconds))
+        self._stale_if_error = max(0.0, float(stale_if_error_seconds))
+        self._min_refetch = max(0.0, float(min_refetch_seconds))
+        self._clock = clock
+        self._run_in_background = run_in_background
+
+        self._jwks: Optional[dict] = None
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_kid_miss_refresh: Optional[float] = None
+        self._last_attempt_at: Optional[float] = None
+        self._refresh_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._background_active = False
+
+    def get_jwks(self) -> dict:
+        self._ensure_fresh()
+        if self._jwks is None:
+            raise JWKSUnavailableError("JWKS not available")
+        return self._jwks
+
+    def get_key(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        self._ensure_fresh()
+        key = self._keys.get(str(kid))
+        if key is None and self._kid_miss_refresh_allowed():
+            # Key rotation: the issuer may already sign with a key we have not seen yet.
+            with self._refresh_lock:
+                key = self._keys.get(str(kid))
+                if key is None and self._kid_miss_refresh_allowed():
+                    self._last_kid_miss_refresh = self._clock()
+                    _bump("jwks_kid_miss_refreshes")
+                    self._refresh_locked()
+                    key = self._keys.get(str(kid))
+        return key
+
+    def refresh(self) -> bool:
+        with self._refresh_lock:
+            return self._refresh_locked()
+
+    # ------------------------------------------------------------------ internals
+
+    def _kid_miss_refresh_allowed(self) -> bool:
+        last = self._last_kid_miss_refresh
+        return last is None or (self._clock() - last) >= self._min_refetch
+
+    def _ensure_fresh(self) -> None:
+        fetched_at = self._fetched_at
+        if fetched_at is None:
+            with self._refresh_lock:
+                if self._fetched_at is None and not self._refresh_locked():
+                    raise JWKSUnavailableError("JWKS could not be fetched")
+            return
+        age = self._clock() - fetched_at
+        if age > self._refresh_interval + self._stale_if_error:
+            # Past the stale-if-error window: only a successful fetch may serve keys again.
+            with self._refresh_lock:
+                if self._fetched_at == fetched_at and not self._refresh_locked():
+                    self._keys = {}
+                    self._jwks = None
+                    raise JWKSUnavailableError("JWKS is stale and could not be refreshed")
+            return
+        if age > self._refresh_interval:
+            last_attempt = self._last_attempt_at
+            if last_attempt is None or (self._clock() - last_attempt) >= self._min_refetch or last_attempt <= fetched_at:
+                self._schedule_background()
+
+    def _schedule_background(self) -> None:
+        with self._state_lock:
+            if self._background_active:
+                return
+            self._background_active = True
+
+        def run() -> None:
+            try:
+                self.refresh()
+            finally:
+                self._background_active = False
+
+        try:
+            self._run_in_background(run)
+        except Exception:
+            self._background_active = False
+
+    def _refresh_locked(self) -> bool:
+        self._last_attempt_at = self._clock()
+        try:
+            jwks = self._fetch(self.url)
+            keys = self._build_keys(jwks)
+        except Exception as exc:
+            _bump("jwks_refresh_failures")
+            print(f"⚠️ [Auth] JWKS refresh failed: {exc}")
+            return False
+        self._jwks = jwks
+        self._keys = keys
+        self._fetched_at = self._clock()
+        _bump("jwks_refreshes")
+        return True
+
+    @staticmethod
+    def _build_keys(jwks: Any) -> dict[str, jwt.PyJWK]:
+        if not isinstance(jwks, dict) or not isinstance(jwks.get("keys"), list):
+            raise ValueError("JWKS payload has no 'keys' list")
+        keys: dict[str, jwt.PyJWK] = {}
+        for entry in jwks["keys"]:
+            if not isinstance(entry, dict) or not entry.get("kid"):
+                continue
+            try:
+                keys[str(entry["kid"])] = jwt.PyJWK(entry)
+            except Exception as exc:
+                print(f"⚠️ [Auth] skipping unusable JWKS key {entry.get('kid')}: {exc}")
+        return keys
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified claims keyed by SHA-256 of the raw token."""
+
+    def __init__(self, max_entries: int = 10000, max_ttl_seconds: float = 300.0, clock: Callable[[], float] = time.time):
+        self._max_entries = max(1, int(max_entries))
+        self._max_ttl = max(1.0, float(max_ttl_seconds))
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, claims = entry
+            if now >= expires_at:
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+        return dict(claims)
+
+    def put(self, token: str, claims: dict, *, ttl_seconds: Optional[float] = None) -> None:
+        now = self._clock()
+        expires_at = now + min(self._max_ttl, float(ttl_seconds) if ttl_seconds is not None else self._max_ttl)
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= now:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -23,6 +23,9 @@ import tempfile
 from pathlib import Path
 from datetime import datetime
 from app.domains.recommendation.learning import LifecycleBackprop
+from app.matching_engine.change_tracking import PROFILE, mark_users_dirty
+from app.ai_orchestration.context_budget import compact_text
+from app.ai_orchestration.prompt_registry import get_prompt_budget
 from app.services.azure_ai_client import call_ai_json
 from app.services.embedding_service import EmbeddingService
 
@@ -637,6 +640,7 @@ class IdentityDomainService:
             await session.commit()
             await session.refresh(profile)
             await session.refresh(user)
+            mark_users_dirty([user.id, user.supabase_id], PROFILE)
 
             return {
                 "user": user.model_dump(),
@@ -699,6 +703,7 @@ class IdentityDomainService:
             session.add(signal)
             await session.commit()
             await session.refresh(signal)
+            mark_users_dirty([user_id], PROFILE)
             return IdentityDomainService._signal_to_dict(signal)
 
     @staticmethod
@@ -1111,6 +1116,8 @@ class IdentityDomainService:
 
     @staticmethod
     def _parse_cv_text_with_ai(text_value: str, locale: str, original_name: str) -> Dict[str, Any]:
+        budget = get_prompt_budget("cv_parse")
+        cv_text = compact_text(text_value[: IdentityDomainService.CV_PARSE_TEXT_LIMIT], budget["cv_text"])
         prompt = f"""
 Extract a structured candidate profile from this CV text.
 Return only valid JSON. Use the user's likely language when writing summaries. Locale hint: {locale}.
@@ -1141,7 +1148,7 @@ Rules:
 
 File name: {original_name}
 CV text:
-{text_value[: IdentityDomainService.CV_PARSE_TEXT_LIMIT]}
+{cv_text}
 """
         payload, _result = call_ai_json(prompt, temperature=0.1, timeout=50)
         if not isinstance(payload, dict):
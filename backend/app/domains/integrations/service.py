@@ -14,6 +14,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from app.core.database import engine
+from app.core.limiter import remember_authenticated_credential
 from app.domains.handshake.models import Handshake, HandshakeEvent
 from app.domains.handshake.service import HandshakeDomainService
 from app.domains.identity.models import CandidateCVDocument, CandidateProfile, User
@@ -324,6 +325,7 @@ class IntegrationDomainService:
             key.last_used_at = now
             key.updated_at = now
             await session.commit()
+            remember_authenticated_credential(token, f"apikey:{key.id}")
             return key
 
     @staticmethod
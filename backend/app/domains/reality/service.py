@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 
+from app.core.auth_context import invalidate_auth_context
 from app.core.database import engine
 from app.core.legacy_supabase import fetch_legacy_company_for_user
 from app.core.config import APP_PUBLIC_URL
@@ -1250,6 +1251,7 @@ class RealityDomainService:
             if user.role != "recruiter":
                 user.role = "recruiter"
             await session.commit()
+            invalidate_auth_context(user_id=user_id)
             await session.refresh(company)
             return RealityDomainService._serialize_company(company) if company else None
 
@@ -1263,6 +1265,7 @@ class RealityDomainService:
             membership = CompanyUser(user_id=uuid.UUID(user_id), company_id=company.id, role="owner")
             session.add(membership)
             await session.commit()
+            invalidate_auth_context(user_id=user_id)
             await session.refresh(company)
             return RealityDomainService._serialize_company(company)
 
@@ -1644,6 +1647,7 @@ class RealityDomainService:
             membership = CompanyUser(user_id=uuid.UUID(user_id), company_id=company.id, role="owner")
             session.add(membership)
             await session.commit()
+            invalidate_auth_context(user_id=user_id)
             await session.refresh(company)
             return RealityDomainService._serialize_company(company)
 
@@ -1793,6 +1797,7 @@ class RealityDomainService:
                 user.role = "recruiter"
 
             await session.commit()
+            invalidate_auth_context(user_id=user_id)
             return {"status": "success", "company_id": str(invitation.company_id)}
 
     @staticmethod
@@ -14,6 +14,8 @@ _SUPPORTED_TABLES = {
     "recommendation_feedback_events": "created_at",
     "model_offline_evaluations": "created_at",
     "search_exposures": "shown_at",
+    "matching_batch_chunks": "created_at",
+    "matching_change_events": "created_at",
 }
 _ROW_CAP_SUPPORTED_TABLES = {"search_exposures"}
 _ROW_CAP_BATCH_SIZE = 5000
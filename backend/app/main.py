@@ -18,33 +18,75 @@ from .core.database import init_db, is_db_ready
 from .api.v2.endpoints import assets, candidate, jobs, recommendation, handshake, company, notifications, mentor, admin, billing, stripe, scraper, integrations
 from .domains.recommendation.service import RecommendationDomainService
 from .domains.identity.service import IdentityDomainService
-from .domains.identity.models import User
+from .domains.identity.models import CandidateProfile, User
 from sqlmodel import select
 from .core.database import engine
 from sqlalchemy.ext.asyncio import AsyncSession
 # Models are imported implicitly via service and endpoint registrations
 
 from .core.runtime import get_cors_origins, validate_runtime_config
+from .core.limiter import install_rate_limiting
+from .ai_orchestration.transport import aclose_ai_transport
+from .core.event_writer import close_event_writer
+from .core import config
+from .matching_engine.change_tracking import get_change_tracker
 
 from .routers import csrf
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+async def _list_matching_candidates() -> list[dict]:
+    async with AsyncSession(engine) as session:
+        result = await session.execute(
+            select(User, CandidateProfile)
+            .join(CandidateProfile, CandidateProfile.user_id == User.id, isouter=True)
+            .where(User.role == "candidate")
+        )
+        return [
+            {
+                "id": str(user.id),
+                "supabase_id": str(user.supabase_id),
+                "preferences": profile.preferences if profile else "{}",
+            }
+            for user, profile in result.all()
+        ]
+
+
+async def _notify_candidates(user_ids: list[str]) -> list[str]:
+    """Runs match notifications with bounded concurrency; returns the users that failed."""
+    semaphore = asyncio.Semaphore(config.MATCHING_NOTIFY_CONCURRENCY)
+    failed: list[str] = []
+
+    async def _notify(user_id: str) -> None:
+        async with semaphore:
+            try:
+                await RecommendationDomainService.trigger_match_notifications(user_id)
+            except Exception as e:
+                failed.append(user_id)
+                print(f"Background matching failed for {user_id}: {e}")
+
+    await asyncio.gather(*(_notify(user_id) for user_id in user_ids))
+    return failed
+
+
 async def background_matching_task():
     """
-    Periodically runs matching for all users to trigger notifications for new jobs.
+    Periodically triggers match notifications for candidates whose matches may have changed:
+    profile edits, interactions or new jobs in their market segment since the last cycle
+    (everyone once per MATCHING_FULL_REFRESH_HOURS).
     In a real app, this would be a separate worker (Celery/Temporal).
     """
+    tracker = get_change_tracker()
     while True:
         try:
-            print("Running background matching for all users...")
-            async with AsyncSession(engine) as session:
-                result = await session.execute(select(User).where(User.role == "candidate"))
-                users = result.scalars().all()
-                for user in users:
-                    await RecommendationDomainService.trigger_match_notifications(str(user.id))
-            print("Background matching completed.")
+            print("Running background matching for changed users...")
+            plan = await asyncio.to_thread(tracker.plan, "notifications")
+            candidates = await _list_matching_candidates()
+            due, _ = plan.select(candidates, user_ids=lambda candidate: [candidate["id"], candidate["supabase_id"]])
+            failed = await _notify_candidates([candidate["id"] for candidate in due])
+            await asyncio.to_thread(tracker.commit, plan, failed)
+            print(f"Background matching completed: {plan.as_dict()}")
         except Exception as e:
             print(f"Background matching failed: {e}")
         
@@ -63,6 +105,8 @@ async def lifespan(app: FastAPI):
     
     # Clean up
     task.cancel()
+    await aclose_ai_transport()
+    await asyncio.to_thread(close_event_writer)
 
 app = FastAPI(
     title="JobShaman V2 API",
@@ -96,6 +140,9 @@ async def exception_middleware(request: Request, call_next):
             }
         )
 
+# Opt-in (RATE_LIMIT_ENABLED) global, cost-weighted budget per user / API key / IP (added before CORS so 429s carry CORS headers).
+install_rate_limiting(app)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=get_cors_origins(),
@@ -0,0 +1,449 @@
+"""
+Leased work-queue executor for matching batch jobs.
+
+A run (``run_key``) splits its item ids into chunks stored in a queue. Worker threads
+lease one chunk at a time; the lease expires unless the worker checkpoints, so a chunk
+held by a crashed worker (or process) is handed to another one, which resumes at the
+last checkpointed offset. Each chunk is read in bulk (``BatchJob.load``), handled item by
+item, and written in bulk (``BatchJob.flush``) before every checkpoint, which keeps
+re-processing after a crash idempotent. Re-running the same ``run_key`` resumes the
+unfinished chunks instead of enqueueing the run again.
+
+The Supabase store leases with ``FOR UPDATE SKIP LOCKED`` (see the
+``matching_batch_chunks`` migration), so several scheduler processes can share a run; the
+in-memory store serves tests and environments without the table.
+"""
+
+import itertools
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from ..core import config
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+_worker_counter = itertools.count(1)
+
+
+@dataclass
+class Chunk:
+    id: Any
+    run_key: str
+    chunk_index: int
+    item_ids: List[str]
+    status: str = PENDING
+    leased_by: Optional[str] = None
+    lease_expires_at: float = 0.0
+    attempts: int = 0
+    checkpoint_offset: int = 0
+    processed: int = 0
+    failed: int = 0
+    last_error: Optional[str] = None
+
+
+@dataclass
+class BatchJob:
+    """
+    ``load(ids)`` bulk-reads the items of a chunk, ``handle(item, context)`` computes one
+    result (exceptions count as a failed item), ``flush(results, context)`` bulk-writes
+    results (an exception fails the chunk, which is retried from the last checkpoint).
+    ``prepare()`` builds a shared context once per run in this process.
+    """
+
+    name: str
+    load: Callable[[List[str]], List[Dict[str, Any]]]
+    handle: Callable[[Dict[str, Any], Any], Any]
+    flush: Callable[[List[Any], Any], None] = lambda results, context: None
+    prepare: Callable[[], Any] = lambda: None
+    item_id: Callable[[Dict[str, Any]], str] = lambda item: str(item.get("id") or "")
+
+
+@dataclass
+class BatchResult:
+    job: str
+    run_key: str
+    resumed: bool = False
+    chunks_total: int = 0
+    chunks_done: int = 0
+    chunks_failed: int = 0
+    processed: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+    worker_errors: List[str] = field(default_factory=list)
+
+    @property
+    def items_per_second(self) -> float:
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.failed / self.processed if self.processed else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "job": self.job,
+            "run_key": self.run_key,
+            "resumed": self.resumed,
+            "chunks_total": self.chunks_total,
+            "chunks_done": self.chunks_done,
+            "chunks_failed": self.chunks_failed,
+            "processed": self.processed,
+            "failed": self.failed,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "items_per_second": round(self.items_per_second, 2),
+            "error_rate": round(self.error_rate, 4),
+        }
+
+
+class MemoryWorkQueueStore:
+    """Thread-safe in-process queue with the same lease semantics as the table."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._chunks: Dict[str, List[Chunk]] = {}
+
+    def enqueue(self, run_key: str, chunks: Sequence[Sequence[str]]) -> bool:
+        with self._lock:
+            if run_key in self._chunks:
+                return False
+            for finished in [key for key, items in self._chunks.items() if all(chunk.status in (DONE, FAILED) for chunk in items)]:
+                del self._chunks[finished]
+            self._chunks[run_key] = [
+                Chunk(id=f"{run_key}:{index}", run_key=run_key, chunk_index=index, item_ids=list(ids))
+                for index, ids in enumerate(chunks)
+            ]
+            return True
+
+    def lease(self, run_key: str, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[Chunk]:
+        with self._lock:
+            now = self.clock()
+            for chunk in self._chunks.get(run_key, []):
+                expired = chunk.status == LEASED and chunk.lease_expires_at <= now
+                if expired and chunk.attempts >= max_attempts:
+                    chunk.status, chunk.leased_by, chunk.last_error = FAILED, None, "lease expired"
+                    continue
+                if chunk.status == PENDING or expired:
+                    chunk.status = LEASED
+                    chunk.leased_by = worker_id
+                    chunk.lease_expires_at = now + lease_seconds
+                    chunk.attempts += 1
+                    return Chunk(**vars(chunk))
+            return None
+
+    def _owned(self, chunk_id: Any, worker_id: str) -> Optional[Chunk]:
+        for chunk in itertools.chain.from_iterable(self._chunks.values()):
+            if chunk.id == chunk_id:
+                return chunk if chunk.status == LEASED and chunk.leased_by == worker_id else None
+        return None
+
+    def checkpoint(self, chunk_id: Any, worker_id: str, offset: int, processed: int, failed: int, lease_seconds: float) -> bool:
+        with self._lock:
+            chunk = self._owned(chunk_id, worker_id)
+            if chunk is None or chunk.lease_expires_at <= self.clock():
+                return False
+            chunk.checkpoint_offset, chunk.processed, chunk.failed = offset, processed, failed
+            chunk.lease_expires_at = self.clock() + lease_seconds
+            return True
+
+    def complete(self, chunk_id: Any, worker_id: str, processed: int, failed: int) -> bool:
+        with self._lock:
+            chunk = self._owned(chunk_id, worker_id)
+            if chunk is None:
+                return False
+            chunk.status, chunk.leased_by = DONE, None
+            chunk.checkpoint_offset, chunk.processed, chunk.failed = len(chunk.item_ids), processed, failed
+            return True
+
+    def release(self, chunk_id: Any, worker_id: str, error: str, max_attempts: int) -> None:
+        with self._lock:
+            chunk = self._owned(chunk_id, worker_id)
+            if chunk is None:
+                return
+            chunk.status = FAILED if chunk.attempts >= max_attempts else PENDING
+            chunk.leased_by, chunk.last_error = None, error[:500]
+
+    def chunks(self, run_key: str) -> List[Chunk]:
+        with self._lock:
+            return [Chunk(**vars(chunk)) for chunk in self._chunks.get(run_key, [])]
+
+
+class SupabaseWorkQueueStore:
+    """``matching_batch_chunks`` table; leases go through the ``lease_matching_batch_chunk`` RPC."""
+
+    table = "matching_batch_chunks"
+
+    def __init__(self, client: Any, job_name: str = ""):
+        self.client = client
+        self.job_name = job_name
+
+    @staticmethod
+    def _iso(seconds_from_now: float) -> str:
+        return (datetime.now(timezone.utc) + timedelta(seconds=seconds_from_now)).isoformat()
+
+    @staticmethod
+    def _chunk(row: Dict[str, Any]) -> Chunk:
+        expires = row.get("lease_expires_at")
+        try:
+            expires_ts = datetime.fromisoformat(str(expires).replace("Z", "+00:00")).timestamp() if expires else 0.0
+        except Exception:
+            expires_ts = 0.0
+        return Chunk(
+            id=row.get("id"),
+            run_key=str(row.get("run_key") or ""),
+            chunk_index=int(row.get("chunk_index") or 0),
+            item_ids=[str(item) for item in (row.get("item_ids") or [])],
+            status=str(row.get("status") or PENDING),
+            leased_by=row.get("leased_by"),
+            lease_expires_at=expires_ts,
+            attempts=int(row.get("attempts") or 0),
+            checkpoint_offset=int(row.get("checkpoint_offset") or 0),
+            processed=int(row.get("processed") or 0),
+            failed=int(row.get("failed") or 0),
+            last_error=row.get("last_error"),
+        )
+
+    def enqueue(self, run_key: str, chunks: Sequence[Sequence[str]]) -> bool:
+        existing = self.client.table(self.table).select("id").eq("run_key", run_key).limit(1).execute()
+        if existing.data:
+            return False
+        rows = [
+            {"run_key": run_key, "job_name": self.job_name, "chunk_index": index, "item_ids": list(ids), "status": PENDING}
+            for index, ids in enumerate(chunks)
+        ]
+        for start in range(0, len(rows), 500):
+            self.client.table(self.table).upsert(rows[start:start + 500], on_conflict="run_key,chunk_index").execute()
+        return True
+
+    def lease(self, run_key: str, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[Chunk]:
+        resp = self.client.rpc(
+            "lease_matching_batch_chunk",
+            {"p_run_key": run_key, "p_worker": worker_id, "p_lease_seconds": int(lease_seconds), "p_max_attempts": max_attempts},
+        ).execute()
+        rows = resp.data or []
+        return self._chunk(rows[0]) if rows else None
+
+    def _update_owned(self, chunk_id: Any, worker_id: str, patch: Dict[str, Any]) -> bool:
+        resp = (
+            self.client.table(self.table)
+            .update({**patch, "updated_at": self._iso(0)})
+            .eq("id", chunk_id)
+            .eq("leased_by", worker_id)
+            .eq("status", LEASED)
+            .execute()
+        )
+        return bool(resp.data)
+
+    def checkpoint(self, chunk_id: Any, worker_id: str, offset: int, processed: int, failed: int, lease_seconds: float) -> bool:
+        return self._update_owned(
+            chunk_id,
+            worker_id,
+            {"checkpoint_offset": offset, "processed": processed, "failed": failed, "lease_expires_at": self._iso(lease_seconds)},
+        )
+
+    def complete(self, chunk_id: Any, worker_id: str, processed: int, failed: int) -> bool:
+        return self._update_owned(chunk_id, worker_id, {"status": DONE, "processed": processed, "failed": failed, "leased_by": None})
+
+    def release(self, chunk_id: Any, worker_id: str, error: str, max_attempts: int) -> None:
+        resp = self.client.table(self.table).select("attempts").eq("id", chunk_id).limit(1).execute()
+        attempts = int(((resp.data or [{}])[0] or {}).get("attempts") or 0)
+        status = FAILED if attempts >= max_attempts else PENDING
+        self._update_owned(chunk_id, worker_id, {"status": status, "leased_by": None, "last_error": error[:500]})
+
+    def chunks(self, run_key: str) -> List[Chunk]:
+        resp = (
+            self.client.table(self.table)
+            .select("id,run_key,chunk_index,item_ids,status,leased_by,lease_expires_at,attempts,checkpoint_offset,processed,failed,last_error")
+            .eq("run_key", run_key)
+            .order("chunk_index")
+            .execute()
+        )
+        return [self._chunk(row) for row in resp.data or []]
+
+
+_default_store: Optional[MemoryWorkQueueStore] = None
+_default_store_lock = threading.Lock()
+
+
+def default_work_queue_store(job_name: str = "") -> Union[SupabaseWorkQueueStore, MemoryWorkQueueStore]:
+    global _default_store
+    from ..core.database import supabase
+
+    if supabase and config.MATCHING_BATCH_QUEUE_BACKEND == "supabase":
+        return SupabaseWorkQueueStore(supabase, job_name)
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = MemoryWorkQueueStore()
+        return _default_store
+
+
+def _chunked(item_ids: Iterable[Any], size: int) -> List[List[str]]:
+    ids = list(dict.fromkeys(str(item) for item in item_ids if str(item or "").strip()))
+    return [ids[start:start + size] for start in range(0, len(ids), size)]
+
+
+class _RunState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+        self.worker_errors: List[str] = []
+
+    def add(self, processed: int, failed: int) -> None:
+        with self.lock:
+            self.processed += processed
+            self.failed += failed
+
+
+def _process_chunk(job: BatchJob, store: Any, chunk: Chunk, worker_id: str, context: Any, state: _RunState, *, lease_seconds: float, checkpoint_every: int, max_attempts: int) -> None:
+    offset = chunk.checkpoint_offset
+    processed, failed = chunk.processed, chunk.failed
+    remaining = chunk.item_ids[offset:]
+    try:
+        items = {job.item_id(item): item for item in job.load(remaining) or []}
+    except Exception as exc:
+        store.release(chunk.id, worker_id, f"load: {exc}", max_attempts)
+        raise
+
+    results: List[Any] = []
+    pending_processed = pending_failed = since_checkpoint = 0
+    try:
+        for item_id in remaining:
+            offset += 1
+            since_checkpoint += 1
+            item = items.get(item_id)
+            # Items deleted since the run was enqueued are skipped.
+            if item is not None:
+                pending_processed += 1
+                try:
+                    result = job.handle(item, context)
+                    if result is not None:
+                        results.append(result)
+                except Exception:
+                    pending_failed += 1
+            if since_checkpoint >= checkpoint_every and offset < len(chunk.item_ids):
+                if results:
+                    job.flush(results, context)
+                    results = []
+                processed, failed = processed + pending_processed, failed + pending_failed
+                state.add(pending_processed, pending_failed)
+                pending_processed = pending_failed = since_checkpoint = 0
+                if not store.checkpoint(chunk.id, worker_id, offset, processed, failed, lease_seconds):
+                    return  # lease lost; another worker owns the chunk now
+        if results:
+            job.flush(results, context)
+    except Exception as exc:
+        store.release(chunk.id, worker_id, f"flush: {exc}", max_attempts)
+        raise
+    state.add(pending_processed, pending_failed)
+    store.complete(chunk.id, worker_id, processed + pending_processed, failed + pending_failed)
+
+
+def _worker_loop(job: BatchJob, store: Any, run_key: str, worker_id: str, context: Any, state: _RunState, **options) -> None:
+    while True:
+        chunk = store.lease(run_key, worker_id, options["lease_seconds"], options["max_attempts"])
+        if chunk is None:
+            return
+        try:
+            _process_chunk(job, store, chunk, worker_id, context, state, **options)
+        except Exception as exc:
+            with state.lock:
+                state.worker_errors.append(str(exc))
+
+
+def run_batch(
+    job: BatchJob,
+    item_ids: Union[Callable[[], Iterable[Any]], Iterable[Any]],
+    *,
+    run_key: str,
+    store: Any = None,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    lease_seconds: Optional[float] = None,
+    max_attempts: Optional[int] = None,
+    checkpoint_every: Optional[int] = None,
+    log: bool = True,
+) -> BatchResult:
+    """
+    Enqueue ``item_ids`` as chunks for ``run_key`` (or resume that run if it exists) and
+    drain the queue with ``workers`` threads. ``item_ids`` may be a callable so that a
+    resumed run does not list its items again. With one worker, chunks run on the calling
+    thread.
+    """
+    explicit_store = store is not None
+    store = store if explicit_store else default_work_queue_store(job.name)
+    workers = max(1, int(workers or config.MATCHING_BATCH_WORKERS))
+    chunk_size = max(1, int(chunk_size or config.MATCHING_BATCH_CHUNK_SIZE))
+    options = {
+        "lease_seconds": float(lease_seconds or config.MATCHING_BATCH_LEASE_SECONDS),
+        "max_attempts": max(1, int(max_attempts or config.MATCHING_BATCH_MAX_ATTEMPTS)),
+        "checkpoint_every": max(1, int(checkpoint_every or config.MATCHING_BATCH_CHECKPOINT_EVERY)),
+    }
+    result = BatchResult(job=job.name, run_key=run_key)
+    started = time.perf_counter()
+
+    def _fallback(exc: Exception) -> MemoryWorkQueueStore:
+        if explicit_store or isinstance(store, MemoryWorkQueueStore):
+            raise exc
+        # Queue table unavailable (e.g. migration not applied yet): run in-process.
+        print(f"⚠️ [Matching Batch] job={job.name} work queue unavailable, using in-memory queue: {exc}")
+        return MemoryWorkQueueStore()
+
+    try:
+        existing = store.chunks(run_key)
+    except Exception as exc:
+        store, existing = _fallback(exc), []
+    result.resumed = bool(existing)
+    if not existing:
+        chunks = _chunked(item_ids() if callable(item_ids) else item_ids, chunk_size)
+        try:
+            store.enqueue(run_key, chunks)
+        except Exception as exc:
+            store = _fallback(exc)
+            store.enqueue(run_key, chunks)
+    if any(chunk.status in (PENDING, LEASED) for chunk in store.chunks(run_key)):
+        context = job.prepare()
+        state = _RunState()
+        prefix = f"{socket.gethostname()}:{os.getpid()}:{next(_worker_counter)}"
+        if workers == 1:
+            _worker_loop(job, store, run_key, f"{prefix}:0", context, state, **options)
+        else:
+            threads = [
+                threading.Thread(
+                    target=_worker_loop,
+                    args=(job, store, run_key, f"{prefix}:{index}", context, state),
+                    kwargs=options,
+                    name=f"matching-batch-{job.name}-{index}",
+                    daemon=True,
+                )
+                for index in range(workers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        result.processed, result.failed, result.worker_errors = state.processed, state.failed, state.worker_errors
+
+    chunks = store.chunks(run_key)
+    result.chunks_total = len(chunks)
+    result.chunks_done = sum(1 for chunk in chunks if chunk.status == DONE)
+    result.chunks_failed = sum(1 for chunk in chunks if chunk.status == FAILED)
+    result.elapsed_seconds = time.perf_counter() - started
+    if log:
+        metrics = result.as_dict()
+        print(
+            f"🧠 [Matching Batch] job={job.name} run={run_key} resumed={metrics['resumed']} chunks={metrics['chunks_done']}/{metrics['chunks_total']} "
+            f"chunks_failed={metrics['chunks_failed']} processed={metrics['processed']} failed={metrics['failed']} "
+            f"items_per_sec={metrics['items_per_second']} error_rate={metrics['error_rate']}"
+        )
+        for error in result.worker_errors[:3]:
+            print(f"⚠️ [Matching Batch] job={job.name} chunk error: {error}")
+    return result
@@ -0,0 +1,396 @@
+"""
+Change tracking for the recommendation refresh cycles.
+
+Profile edits, job interactions and job arrivals are appended as change events. A job
+arrival is recorded per market segment (country, remote or unlocated roles of a country,
+a coarse lat/lng grid cell) rather than per user, so its cost does not grow with the user base.
+
+Each consumer (the hourly recommendation batch, the match notification loop) keeps its
+own cursor. ``plan()`` reads the events since that cursor and returns the dirty users
+and the segments that received jobs. A user is due when they are dirty, or when one of
+their segments (``candidate_segments``) got jobs; everyone else is skipped. A cycle
+without a cursor, or after ``MATCHING_FULL_REFRESH_HOURS``, refreshes everyone.
+``commit()`` moves the cursor to the start of the cycle and re-marks the users that
+failed, so nothing that arrived during the run is lost.
+"""
+
+import json
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from ..core import config
+
+PROFILE = "profile"
+INTERACTION = "interaction"
+JOBS = "jobs"
+RETRY = "retry"
+FULL = "full"
+
+USER_EVENT = "user"
+SEGMENT_EVENT = "segment"
+ANY_SEGMENT = "*"
+
+# Interactions that do not change what a user should be shown.
+_PASSIVE_INTERACTIONS = {"impression"}
+_REMOTE_PATTERN = re.compile(r"\b(remote|home office|work from home|z domova|na d[aá]lku|na diaľku)\b")
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    kind: str
+    key: str
+    reason: str
+    created_at: float
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "key": self.key,
+            "reason": self.reason,
+            "created_at": datetime.fromtimestamp(self.created_at, timezone.utc).isoformat(),
+        }
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "ChangeEvent":
+        return cls(
+            kind=str(row.get("kind") or ""),
+            key=str(row.get("key") or ""),
+            reason=str(row.get("reason") or ""),
+            created_at=_timestamp(row.get("created_at")),
+        )
+
+
+@dataclass
+class RefreshPlan:
+    consumer: str
+    started_at: float
+    full: bool
+    since: Optional[float] = None
+    dirty: Dict[str, str] = field(default_factory=dict)
+    segments: Set[str] = field(default_factory=set)
+    reasons: Dict[str, int] = field(default_factory=dict)
+    skipped: int = 0
+
+    def reason(self, user_ids: Union[str, Sequence[str]], segments: Iterable[str]) -> Optional[str]:
+        """Why one user (under any of their ids) is due this cycle, or None to skip them."""
+        if self.full:
+            return FULL
+        for user_id in [user_ids] if isinstance(user_ids, str) else user_ids:
+            if user_id in self.dirty:
+                return self.dirty[user_id]
+        if not self.segments.isdisjoint(segments):
+            return JOBS
+        return None
+
+    def select(
+        self,
+        profiles: Iterable[Dict[str, Any]],
+        *,
+        user_ids: Callable[[Dict[str, Any]], Sequence[str]] = lambda profile: [str(profile.get("id") or "")],
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split profiles into (due, skipped) and count the reasons of the due ones."""
+        due: List[Dict[str, Any]] = []
+        skipped: List[Dict[str, Any]] = []
+        for profile in profiles:
+            reason = self.reason(user_ids(profile), () if self.full else candidate_segments(profile))
+            if reason is None:
+                skipped.append(profile)
+                continue
+            due.append(profile)
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        self.skipped += len(skipped)
+        return due, skipped
+
+    def add_jobs(self, jobs: Iterable[Dict[str, Any]]) -> int:
+        """Add the segments of jobs scraped after the cursor, including ones no ingest hook announced."""
+        if self.full or self.since is None:
+            return 0
+        added = 0
+        for job in jobs:
+            if _timestamp(job.get("scraped_at") or job.get("created_at")) > self.since:
+                self.segments.update(job_segments(job))
+                added += 1
+        return added
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "consumer": self.consumer,
+            "full": self.full,
+            "dirty_users": len(self.dirty),
+            "segments_with_jobs": len(self.segments),
+            "due": sum(self.reasons.values()),
+            "skipped": self.skipped,
+            "reasons": dict(sorted(self.reasons.items())),
+        }
+
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except Exception:
+        return 0.0
+
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str) and value.strip():
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return {}
+        return parsed if isinstance(parsed, dict) else {}
+    return {}
+
+
+def _country(value: Any) -> str:
+    code = str(value or "").strip().lower()
+    return code if len(code) == 2 and code.isalpha() else ""
+
+
+def _cell(lat: Any, lng: Any) -> Optional[Tuple[int, int]]:
+    try:
+        lat_f, lng_f = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    if not (math.isfinite(lat_f) and math.isfinite(lng_f)) or (lat_f == 0.0 and lng_f == 0.0):
+        return None
+    size = config.MATCHING_SEGMENT_CELL_DEGREES
+    return math.floor(lat_f / size), math.floor(lng_f / size)
+
+
+def _cell_segment(row: int, column: int) -> str:
+    return f"cell:{row}:{column}"
+
+
+def job_segments(job: Dict[str, Any]) -> List[str]:
+    """Segments a job arrival is announced to."""
+    segments = [ANY_SEGMENT]
+    payload = _as_dict(job.get("payload_json"))
+    country = _country(job.get("country_code") or payload.get("country_code"))
+    if country:
+        segments.append(country)
+        remote_text = " ".join(str(job.get(key) or "") for key in ("work_model", "work_type", "title")).lower()
+        if _REMOTE_PATTERN.search(remote_text):
+            segments.append(f"{country}:remote")
+    cell = _cell(job.get("lat"), job.get("lng"))
+    if cell:
+        segments.append(_cell_segment(*cell))
+    elif country:
+        segments.append(f"{country}:unlocated")
+    return segments
+
+
+def candidate_segments(profile: Dict[str, Any]) -> List[str]:
+    """
+    Segments whose job arrivals can change a candidate's recommendations: the grid cells
+    around them plus remote and unlocated roles of their country, their whole country
+    without coordinates, or any arrival at all when neither is known.
+    """
+    preferences = _as_dict(profile.get("preferences"))
+    tax_profile = _as_dict(preferences.get("taxProfile"))
+    coordinates = _as_dict(preferences.get("coordinates"))
+    country = _country(preferences.get("preferredCountryCode") or tax_profile.get("countryCode") or profile.get("country_code"))
+    cell = _cell(profile.get("lat"), profile.get("lng")) or _cell(coordinates.get("lat"), coordinates.get("lon") or coordinates.get("lng"))
+    if cell:
+        segments = [_cell_segment(cell[0] + d_row, cell[1] + d_column) for d_row in (-1, 0, 1) for d_column in (-1, 0, 1)]
+        if country:
+            segments.extend([f"{country}:remote", f"{country}:unlocated"])
+        return segments
+    if country:
+        return [country]
+    return [ANY_SEGMENT]
+
+
+class MemoryChangeStore:
+    """In-process event log and cursors (tests, single-process deployments)."""
+
+    read_overlap_seconds = 0.0
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._events: List[ChangeEvent] = []
+        self._cursors: Dict[str, Tuple[float, float]] = {}
+
+    def append(self, events: Sequence[ChangeEvent]) -> None:
+        with self._lock:
+            self._events.extend(events)
+
+    def events_since(self, since: float) -> List[ChangeEvent]:
+        with self._lock:
+            return [event for event in self._events if event.created_at > since]
+
+    def get_cursor(self, consumer: str) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            return self._cursors.get(consumer)
+
+    def save_cursor(self, consumer: str, cycle_at: float, full_at: float) -> None:
+        with self._lock:
+            self._cursors[consumer] = (cycle_at, full_at)
+            # Events every consumer has moved past are not needed any more.
+            horizon = min(cursor[0] for cursor in self._cursors.values())
+            self._events = [event for event in self._events if event.created_at > horizon]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+
+class SupabaseChangeStore:
+    """``matching_change_events`` (written through the event writer) and ``matching_refresh_cursors``."""
+
+    events_table = "matching_change_events"
+    cursors_table = "matching_refresh_cursors"
+    # Events reach the table through the batched writer; read a little behind the cursor
+    # so rows queued just before a cycle started are seen by the next one.
+    read_overlap_seconds = 120.0
+
+    def __init__(self, client: Any, page_size: int = 5000):
+        self.client = client
+        self.page_size = max(1, page_size)
+
+    def append(self, events: Sequence[ChangeEvent]) -> None:
+        from ..core.event_writer import write_event
+
+        for event in events:
+            write_event(self.events_table, event.to_row())
+
+    def events_since(self, since: float) -> List[ChangeEvent]:
+        from .evaluation_engine import iter_keyset_pages
+
+        since_iso = datetime.fromtimestamp(max(0.0, since), timezone.utc).isoformat()
+        events: List[ChangeEvent] = []
+        for page in iter_keyset_pages(
+            self.client,
+            self.events_table,
+            "kind,key,reason,created_at",
+            apply_filters=lambda query: query.gt("created_at", since_iso),
+            page_size=self.page_size,
+        ):
+            events.extend(ChangeEvent.from_row(row) for row in page)
+        return events
+
+    def get_cursor(self, consumer: str) -> Optional[Tuple[float, float]]:
+        resp = self.client.table(self.cursors_table).select("last_cycle_at,last_full_at").eq("consumer", consumer).limit(1).execute()
+        rows = resp.data or []
+        if not rows:
+            return None
+        return _timestamp(rows[0].get("last_cycle_at")), _timestamp(rows[0].get("last_full_at"))
+
+    def save_cursor(self, consumer: str, cycle_at: float, full_at: float) -> None:
+        self.client.table(self.cursors_table).upsert(
+            {
+                "consumer": consumer,
+                "last_cycle_at": datetime.fromtimestamp(cycle_at, timezone.utc).isoformat(),
+                "last_full_at": datetime.fromtimestamp(full_at, timezone.utc).isoformat(),
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            },
+            on_conflict="consumer",
+        ).execute()
+
+
+class ChangeTracker:
+    def __init__(self, store: Any, clock: Callable[[], float] = time.time):
+        self.store = store
+        self.clock = clock
+
+    def mark_users(self, user_ids: Iterable[Any], reason: str, *, at: Optional[float] = None) -> int:
+        now = self.clock() if at is None else at
+        events = [ChangeEvent(USER_EVENT, user_id, reason, now) for user_id in dict.fromkeys(str(item) for item in user_ids if item)]
+        if events:
+            self.store.append(events)
+        return len(events)
+
+    def mark_interactions(self, rows: Iterable[Dict[str, Any]]) -> int:
+        active = [row.get("user_id") for row in rows if str(row.get("event_type") or "").lower() not in _PASSIVE_INTERACTIONS]
+        return self.mark_users(active, INTERACTION)
+
+    def note_jobs(self, jobs: Iterable[Dict[str, Any]]) -> int:
+        """Record job arrivals; one event per segment, however many jobs it received."""
+        now = self.clock()
+        segments: Dict[str, None] = {}
+        for job in jobs:
+            segments.update(dict.fromkeys(job_segments(job)))
+        events = [ChangeEvent(SEGMENT_EVENT, segment, JOBS, now) for segment in segments]
+        if events:
+            self.store.append(events)
+        return len(events)
+
+    def plan(self, consumer: str, *, full_refresh_seconds: Optional[float] = None) -> RefreshPlan:
+        now = self.clock()
+        full_refresh_seconds = full_refresh_seconds if full_refresh_seconds is not None else config.MATCHING_FULL_REFRESH_HOURS * 3600.0
+        cursor = self.store.get_cursor(consumer) if config.MATCHING_CHANGE_TRACKING_ENABLED else None
+        if cursor is None or now - cursor[1] >= full_refresh_seconds:
+            return RefreshPlan(consumer=consumer, started_at=now, full=True)
+        plan = RefreshPlan(consumer=consumer, started_at=now, full=False, since=cursor[0])
+        for event in self.store.events_since(cursor[0] - self.store.read_overlap_seconds):
+            if event.kind == USER_EVENT:
+                plan.dirty.setdefault(event.key, event.reason)
+            elif event.kind == SEGMENT_EVENT:
+                plan.segments.add(event.key)
+        return plan
+
+    def commit(self, plan: RefreshPlan, failed_user_ids: Iterable[Any] = ()) -> None:
+        """Move the consumer's cursor to the cycle start; failed users stay due for the next one."""
+        self.mark_users(failed_user_ids, RETRY, at=max(self.clock(), plan.started_at + 0.001))
+        cursor = self.store.get_cursor(plan.consumer)
+        full_at = plan.started_at if plan.full or cursor is None else cursor[1]
+        self.store.save_cursor(plan.consumer, plan.started_at, full_at)
+
+
+_tracker_lock = threading.Lock()
+_tracker: Optional[ChangeTracker] = None
+
+
+def get_change_tracker() -> ChangeTracker:
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            from ..core.database import supabase
+
+            if supabase and config.MATCHING_CHANGE_TRACKING_BACKEND == "supabase":
+                _tracker = ChangeTracker(SupabaseChangeStore(supabase))
+            else:
+                _tracker = ChangeTracker(MemoryChangeStore())
+        return _tracker
+
+
+def set_change_tracker(tracker: Optional[ChangeTracker]) -> None:
+    global _tracker
+    with _tracker_lock:
+        _tracker = tracker
+
+
+def mark_users_dirty(user_ids: Iterable[Any], reason: str) -> None:
+    """Hook for write paths: never raises, a missed mark is caught by the next full refresh."""
+    if not config.MATCHING_CHANGE_TRACKING_ENABLED:
+        return
+    try:
+        get_change_tracker().mark_users(user_ids, reason)
+    except Exception as exc:
+        print(f"⚠️ [Matching] change tracking mark failed: {exc}")
+
+
+def mark_interactions_dirty(rows: Iterable[Dict[str, Any]]) -> None:
+    if not config.MATCHING_CHANGE_TRACKING_ENABLED:
+        return
+    try:
+        get_change_tracker().mark_interactions(rows)
+    except Exception as exc:
+        print(f"⚠️ [Matching] change tracking mark failed: {exc}")
+
+
+def note_job_arrivals(jobs: Iterable[Dict[str, Any]]) -> None:
+    if not config.MATCHING_CHANGE_TRACKING_ENABLED:
+        return
+    try:
+        get_change_tracker().note_jobs(jobs)
+    except Exception as exc:
+        print(f"⚠️ [Matching] change tracking job arrival failed: {exc}")
@@ -1,12 +1,30 @@
 import math
+import threading
+import time
 from collections import Counter, defaultdict
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import Dict, List, Optional, Sequence
 
+from ..core import config
 from ..core.database import supabase
+from .demand_aggregate import (
+    HALF_LIFE_DAYS,
+    DemandSnapshot,
+    SkillDemandAggregate,
+    SupabaseSkillExtractionStore,
+    extract_job_skills,
+    skill_tokens,
+)
+from .evaluation_engine import iter_keyset_pages
 
-SKILL_STOPWORDS = {"and", "the", "for", "with", "from", "praxe", "junior", "senior"}
-HALF_LIFE_DAYS = 21.0
+_UPSERT_CHUNK = 1000
+
+_snapshot: Optional[DemandSnapshot] = None
+_snapshot_loaded_at = 0.0
+_snapshot_lock = threading.Lock()
+
+_aggregate: Optional[SkillDemandAggregate] = None
+_aggregate_lock = threading.Lock()
 
 
 def _exp_decay(age_days: float, half_life: float = HALF_LIFE_DAYS) -> float:
@@ -32,49 +50,141 @@ def demand_weight_for_skills(skills: List[str], country_code: str = "", city: st
     return max(0.0, min(1.0, score / counted))
 
 
-def _lookup_skill_demand(skill: str, country_code: str, city: str):
+def _load_demand_snapshot() -> DemandSnapshot:
+    """Latest materialized window of ``market_skill_demand``, read in keyset pages."""
+    latest = (
+        supabase.table("market_skill_demand")
+        .select("window_end")
+        .order("window_end", desc=True)
+        .limit(1)
+        .execute()
+    )
+    row = (latest.data or [None])[0]
+    if not row or not row.get("window_end"):
+        return DemandSnapshot()
+    window_end = row["window_end"]
+    rows = []
+    for page in iter_keyset_pages(
+        supabase,
+        "market_skill_demand",
+        "skill,country_code,city,demand_score,seasonal_factor",
+        apply_filters=lambda query: query.eq("window_end", window_end),
+        page_size=5000,
+    ):
+        rows.extend(page)
+    return DemandSnapshot(rows)
+
+
+def get_demand_snapshot() -> DemandSnapshot:
+    global _snapshot, _snapshot_loaded_at
+    now = time.monotonic()
+    snapshot = _snapshot
+    if snapshot is not None and now - _snapshot_loaded_at < config.MARKET_DEMAND_SNAPSHOT_TTL_SECONDS:
+        return snapshot
     if not supabase:
-        return None
+        return snapshot or DemandSnapshot()
+    with _snapshot_lock:
+        if _snapshot is not None and time.monotonic() - _snapshot_loaded_at < config.MARKET_DEMAND_SNAPSHOT_TTL_SECONDS:
+            return _snapshot
+        try:
+            _snapshot = _load_demand_snapshot()
+        except Exception as exc:
+            print(f"⚠️ [Matching] demand snapshot load failed: {exc}")
+            _snapshot = _snapshot or DemandSnapshot()
+        _snapshot_loaded_at = time.monotonic()
+        return _snapshot
 
-    try:
-        query = supabase.table("market_skill_demand").select("demand_score").eq("skill", skill.lower())
-        if country_code:
-            query = query.eq("country_code", country_code.lower())
-        if city:
-            query = query.eq("city", city)
-        resp = query.order("window_end", desc=True).limit(1).execute()
-        row = (resp.data or [None])[0]
-        if row and row.get("demand_score") is not None:
-            base_score = float(row["demand_score"])
-            seasonal = _seasonal_correction(skill, country_code, city)
-            return max(0.0, min(1.0, base_score * seasonal))
-    except Exception:
-        return None
-    return None
-
-
-def _seasonal_correction(skill: str, country_code: str, city: str) -> float:
+
+def set_demand_snapshot(snapshot: Optional[DemandSnapshot]) -> None:
+    global _snapshot, _snapshot_loaded_at
+    with _snapshot_lock:
+        _snapshot = snapshot
+        _snapshot_loaded_at = time.monotonic() if snapshot is not None else 0.0
+
+
+def _lookup_skill_demand(skill: str, country_code: str, city: str):
+    return get_demand_snapshot().lookup(skill, country_code, city)
+
+
+def _upsert_chunked(table: str, rows: Sequence[dict], on_conflict: str) -> None:
+    for start in range(0, len(rows), _UPSERT_CHUNK):
+        supabase.table(table).upsert(list(rows[start:start + _UPSERT_CHUNK]), on_conflict=on_conflict).execute()
+
+
+def _fetch_jobs_since(watermark: str, cutoff: str):
+    def _filters(query):
+        query = query.gte("scraped_at", cutoff)
+        if watermark:
+            query = query.gt("scraped_at", watermark)
+        return query
+
+    return iter_keyset_pages(
+        supabase,
+        "jobs",
+        "description, country_code, location, scraped_at",
+        apply_filters=_filters,
+        page_size=1000,
+    )
+
+
+def refresh_market_skill_demand() -> Dict[str, int]:
+    """
+    Incremental demand refresh: extract skills of jobs scraped since the last run, apply
+    them (and the jobs that aged out of the windows) as deltas, then materialize demand
+    with the current month's seasonal factor and swap the in-memory snapshot.
+    """
+    global _aggregate
+    empty = {"ingested": 0, "expired": 0, "demand_rows": 0, "seasonal_rows": 0}
     if not supabase:
-        return 1.0
-    month = datetime.now(timezone.utc).month
-    try:
-        query = (
-            supabase.table("seasonal_bias_corrections")
-            .select("correction_factor")
-            .eq("month", month)
-        )
-        if country_code:
-            query = query.eq("country_code", country_code.lower())
-        if city:
-            query = query.eq("city", city.lower())
-        query = query.eq("skill", skill.lower())
-        resp = query.order("updated_at", desc=True).limit(1).execute()
-        row = (resp.data or [None])[0]
-        if row and row.get("correction_factor") is not None:
-            return max(0.5, min(1.5, float(row["correction_factor"])))
-    except Exception:
-        return 1.0
-    return 1.0
+        return empty
+
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    with _aggregate_lock:
+        try:
+            aggregate = _aggregate
+            if aggregate is None:
+                aggregate = SkillDemandAggregate(SupabaseSkillExtractionStore(supabase), today)
+                aggregate.rebuild()
+            expired = aggregate.advance(today)
+            cutoff = aggregate.seasonal_cutoff.isoformat()
+            ingested = 0
+            for page in _fetch_jobs_since(aggregate.watermark, cutoff):
+                ingested += aggregate.ingest(extract_job_skills(job, today) for job in page)
+            demand_rows = aggregate.demand_rows(now)
+            seasonal_rows = aggregate.seasonal_rows(now)
+            _upsert_chunked("market_skill_demand", demand_rows, "skill,country_code,city,window_start,window_end")
+            _upsert_chunked("seasonal_bias_corrections", seasonal_rows, "month,country_code,city,skill")
+            _aggregate = aggregate
+        except Exception as exc:
+            # Aggregate state may be half-applied; rebuild from stored extractions next time.
+            _aggregate = None
+            print(f"⚠️ [Matching] incremental demand refresh failed: {exc}")
+            return empty
+
+    set_demand_snapshot(DemandSnapshot(demand_rows))
+    return {
+        "ingested": ingested,
+        "expired": expired,
+        "demand_rows": len(demand_rows),
+        "seasonal_rows": len(seasonal_rows),
+    }
+
+
+def forget_jobs_skill_demand(job_ids: Sequence[str]) -> int:
+    """Drop deleted jobs' extractions; the live aggregate (if loaded here) subtracts them."""
+    ids = [str(job_id) for job_id in job_ids if str(job_id or "").strip()]
+    if not ids or not supabase:
+        return 0
+    with _aggregate_lock:
+        try:
+            if _aggregate is not None:
+                return _aggregate.forget(ids)
+            SupabaseSkillExtractionStore(supabase).delete_many(ids)
+            return 0
+        except Exception as exc:
+            print(f"⚠️ [Matching] demand forget failed: {exc}")
+            return 0
 
 
 def recompute_market_skill_demand() -> int:
@@ -112,10 +222,7 @@ def recompute_market_skill_demand() -> int:
         decay = _exp_decay(age_days)
 
         key = ((job.get("country_code") or "").lower(), (job.get("location") or "").lower())
-        for token in (job.get("description") or "").lower().replace("/", " ").split():
-            t = token.strip(".,:;()[]{}!?\"'")
-            if len(t) < 3 or t in SKILL_STOPWORDS:
-                continue
+        for t in skill_tokens(job.get("description") or ""):
             weighted_counts[key][t] += decay
             market_totals[key] += decay
 
@@ -187,10 +294,7 @@ def recompute_seasonal_bias_corrections() -> int:
             scraped_at = now
         month = int(scraped_at.month)
         region_key = ((job.get("country_code") or "").lower(), (job.get("location") or "").lower())
-        for token in (job.get("description") or "").lower().replace("/", " ").split():
-            t = token.strip(".,:;()[]{}!?\"'")
-            if len(t) < 3 or t in SKILL_STOPWORDS:
-                continue
+        for t in skill_tokens(job.get("description") or ""):
             by_month_region_skill[(month, *region_key)][t] += 1
             overall_by_region_skill[(region_key[0], region_key[1], t)] += 1
 
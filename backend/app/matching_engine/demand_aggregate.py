@@ -0,0 +1,462 @@
+"""
+Incremental market skill demand.
+
+Skill tokens are extracted from each job description once and persisted per job
+(``job_skill_extractions``). The aggregate then only applies deltas: new and re-scraped
+jobs are added (their previous extraction subtracted first), jobs that age out of the
+demand or seasonal window are subtracted. A daily refresh therefore costs O(changed jobs)
+plus one pass over the per-market skill totals instead of re-tokenizing every description.
+
+Exponential decay is kept exact under deltas by storing each job's weight relative to a
+fixed epoch day (``count * 2 ** ((day - epoch) / half_life)``) and rescaling to "today"
+only when materializing. Materialized rows carry the seasonal factor for the current
+month, and ``DemandSnapshot`` serves lookups from a plain dict.
+"""
+
+import heapq
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+SKILL_STOPWORDS = {"and", "the", "for", "with", "from", "praxe", "junior", "senior"}
+HALF_LIFE_DAYS = 21.0
+DEMAND_WINDOW_DAYS = 120
+SEASONAL_WINDOW_DAYS = 365
+TOP_SKILLS_PER_MARKET = 180
+
+_TOKEN_STRIP = ".,:;()[]{}!?\"'"
+# Rescale the stored weights before 2 ** (days / half_life) gets anywhere near overflow.
+_REBASE_AFTER_DAYS = 3650
+
+Market = Tuple[str, str]
+
+
+def skill_tokens(description: str) -> Iterator[str]:
+    for token in (description or "").lower().replace("/", " ").split():
+        t = token.strip(_TOKEN_STRIP)
+        if len(t) < 3 or t in SKILL_STOPWORDS:
+            continue
+        yield t
+
+
+def _parse_day(value: Any, default: date) -> date:
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).date() if value.tzinfo else value.date()
+    if isinstance(value, date):
+        return value
+    if not value:
+        return default
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except Exception:
+        try:
+            return date.fromisoformat(str(value)[:10])
+        except Exception:
+            return default
+    return parsed.astimezone(timezone.utc).date() if parsed.tzinfo else parsed.date()
+
+
+@dataclass(frozen=True)
+class JobSkills:
+    """Skill token counts of one job, bucketed by the day it was scraped and its market."""
+
+    job_id: str
+    country_code: str
+    city: str
+    day: date
+    skills: Dict[str, int] = field(default_factory=dict)
+    scraped_at: str = ""
+
+    @property
+    def market(self) -> Market:
+        return (self.country_code, self.city)
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "country_code": self.country_code,
+            "city": self.city,
+            "day": self.day.isoformat(),
+            "skills": self.skills,
+            "scraped_at": self.scraped_at or None,
+        }
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "JobSkills":
+        skills = row.get("skills") if isinstance(row.get("skills"), dict) else {}
+        return cls(
+            job_id=str(row.get("job_id") or ""),
+            country_code=str(row.get("country_code") or ""),
+            city=str(row.get("city") or ""),
+            day=_parse_day(row.get("day"), date.min),
+            skills={str(skill): int(count) for skill, count in skills.items() if int(count or 0) > 0},
+            scraped_at=str(row.get("scraped_at") or ""),
+        )
+
+
+def extract_job_skills(job: Dict[str, Any], today: date) -> Optional[JobSkills]:
+    job_id = str(job.get("id") or "").strip()
+    if not job_id:
+        return None
+    return JobSkills(
+        job_id=job_id,
+        country_code=(job.get("country_code") or "").lower(),
+        city=(job.get("location") or "").lower(),
+        day=_parse_day(job.get("scraped_at"), today),
+        skills=dict(Counter(skill_tokens(job.get("description") or ""))),
+        scraped_at=str(job.get("scraped_at") or ""),
+    )
+
+
+class MemorySkillExtractionStore:
+    """Dict-backed extraction store (tests, benchmarks, single-process rebuilds)."""
+
+    def __init__(self):
+        self.rows: Dict[str, JobSkills] = {}
+
+    def get_many(self, job_ids: Sequence[str]) -> Dict[str, JobSkills]:
+        return {job_id: self.rows[job_id] for job_id in job_ids if job_id in self.rows}
+
+    def put_many(self, extractions: Sequence[JobSkills]) -> None:
+        for extraction in extractions:
+            self.rows[extraction.job_id] = extraction
+
+    def delete_many(self, job_ids: Sequence[str]) -> None:
+        for job_id in job_ids:
+            self.rows.pop(job_id, None)
+
+    def iter_all(self) -> Iterator[JobSkills]:
+        return iter(list(self.rows.values()))
+
+
+class SupabaseSkillExtractionStore:
+    """``job_skill_extractions`` table, read and written in chunks."""
+
+    table = "job_skill_extractions"
+    columns = "job_id,country_code,city,day,skills,scraped_at"
+
+    def __init__(self, client: Any, chunk_size: int = 500, page_size: int = 2000):
+        self.client = client
+        self.chunk_size = max(1, chunk_size)
+        self.page_size = max(1, page_size)
+
+    def _chunks(self, items: Sequence[Any]) -> Iterator[Sequence[Any]]:
+        for start in range(0, len(items), self.chunk_size):
+            yield items[start:start + self.chunk_size]
+
+    def get_many(self, job_ids: Sequence[str]) -> Dict[str, JobSkills]:
+        out: Dict[str, JobSkills] = {}
+        for chunk in self._chunks(list(job_ids)):
+            resp = self.client.table(self.table).select(self.columns).in_("job_id", list(chunk)).execute()
+            for row in resp.data or []:
+                extraction = JobSkills.from_row(row)
+                out[extraction.job_id] = extraction
+        return out
+
+    def put_many(self, extractions: Sequence[JobSkills]) -> None:
+        for chunk in self._chunks(list(extractions)):
+            self.client.table(self.table).upsert([item.to_row() for item in chunk], on_conflict="job_id").execute()
+
+    def delete_many(self, job_ids: Sequence[str]) -> None:
+        for chunk in self._chunks(list(job_ids)):
+            self.client.table(self.table).delete().in_("job_id", list(chunk)).execute()
+
+    def iter_all(self) -> Iterator[JobSkills]:
+        from .evaluation_engine import iter_keyset_pages
+
+        for page in iter_keyset_pages(self.client, self.table, self.columns, page_size=self.page_size):
+            for row in page:
+                yield JobSkills.from_row(row)
+
+
+class SkillDemandAggregate:
+    """
+    Per-market skill demand maintained from job extraction deltas.
+
+    ``store`` persists extractions (``get_many`` / ``put_many`` / ``delete_many`` /
+    ``iter_all``); the aggregate keeps only per-market totals and, per scrape day, the ids
+    of the jobs it counted so that expiry knows which extractions to subtract.
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        today: date,
+        *,
+        half_life_days: float = HALF_LIFE_DAYS,
+        demand_window_days: int = DEMAND_WINDOW_DAYS,
+        seasonal_window_days: int = SEASONAL_WINDOW_DAYS,
+    ):
+        self.store = store
+        self.half_life_days = max(1.0, half_life_days)
+        self.demand_window_days = demand_window_days
+        self.seasonal_window_days = max(seasonal_window_days, demand_window_days)
+        self.today = today
+        self.watermark = ""
+        self._epoch = today
+        self._weights: Dict[Market, Dict[str, float]] = defaultdict(dict)
+        self._weight_totals: Dict[Market, float] = defaultdict(float)
+        self._counts: Dict[Market, Counter] = defaultdict(Counter)
+        self._monthly: Dict[Market, Dict[int, Counter]] = defaultdict(lambda: defaultdict(Counter))
+        self._yearly: Dict[Market, Counter] = defaultdict(Counter)
+        self._jobs_by_day: Dict[date, Set[str]] = defaultdict(set)
+        self._demand_days: Set[date] = set()
+        self._job_days: Dict[str, date] = {}
+
+    @property
+    def demand_cutoff(self) -> date:
+        return self.today - timedelta(days=self.demand_window_days)
+
+    @property
+    def seasonal_cutoff(self) -> date:
+        return self.today - timedelta(days=self.seasonal_window_days)
+
+    @property
+    def job_count(self) -> int:
+        return len(self._job_days)
+
+    def _scale(self, day: date) -> float:
+        return 2.0 ** ((day - self._epoch).days / self.half_life_days)
+
+    def _rebase(self, epoch: date) -> None:
+        factor = 2.0 ** ((self._epoch - epoch).days / self.half_life_days)
+        for market, weights in self._weights.items():
+            for skill in weights:
+                weights[skill] *= factor
+            self._weight_totals[market] *= factor
+        self._epoch = epoch
+
+    def _apply_demand(self, extraction: JobSkills, sign: int) -> None:
+        market = extraction.market
+        weights = self._weights[market]
+        counts = self._counts[market]
+        scale = self._scale(extraction.day)
+        for skill, count in extraction.skills.items():
+            counts[skill] += sign * count
+            if counts[skill] <= 0:
+                # Drop the entry instead of keeping float residue of add/subtract pairs.
+                del counts[skill]
+                weights.pop(skill, None)
+                continue
+            weights[skill] = weights.get(skill, 0.0) + sign * count * scale
+        if counts:
+            self._weight_totals[market] += sign * sum(extraction.skills.values()) * scale
+        else:
+            self._weights.pop(market, None)
+            self._counts.pop(market, None)
+            self._weight_totals.pop(market, None)
+
+    def _apply_seasonal(self, extraction: JobSkills, sign: int) -> None:
+        market = extraction.market
+        monthly = self._monthly[market][extraction.day.month]
+        yearly = self._yearly[market]
+        for skill, count in extraction.skills.items():
+            monthly[skill] += sign * count
+            yearly[skill] += sign * count
+            if monthly[skill] <= 0:
+                del monthly[skill]
+            if yearly[skill] <= 0:
+                del yearly[skill]
+
+    def _add(self, extraction: JobSkills) -> bool:
+        if extraction.day < self.seasonal_cutoff:
+            return False
+        self._apply_seasonal(extraction, 1)
+        if extraction.day >= self.demand_cutoff:
+            self._apply_demand(extraction, 1)
+            self._demand_days.add(extraction.day)
+        self._jobs_by_day[extraction.day].add(extraction.job_id)
+        self._job_days[extraction.job_id] = extraction.day
+        if extraction.scraped_at > self.watermark:
+            self.watermark = extraction.scraped_at
+        return True
+
+    def _remove(self, extraction: JobSkills) -> None:
+        day = self._job_days.pop(extraction.job_id, None)
+        if day is None:
+            return
+        self._apply_seasonal(extraction, -1)
+        if day in self._demand_days:
+            self._apply_demand(extraction, -1)
+        jobs = self._jobs_by_day.get(day)
+        if jobs is not None:
+            jobs.discard(extraction.job_id)
+            if not jobs:
+                del self._jobs_by_day[day]
+                self._demand_days.discard(day)
+
+    def rebuild(self) -> int:
+        """Load every stored extraction (cold start). No description is re-tokenized."""
+        loaded = 0
+        stale: List[str] = []
+        for extraction in self.store.iter_all():
+            if self._add(extraction):
+                loaded += 1
+            else:
+                stale.append(extraction.job_id)
+        if stale:
+            self.store.delete_many(stale)
+        return loaded
+
+    def ingest(self, extractions: Iterable[JobSkills]) -> int:
+        """Add new or re-scraped jobs; a job seen before has its old extraction subtracted."""
+        latest: Dict[str, JobSkills] = {}
+        for extraction in extractions:
+            if extraction is not None and extraction.job_id:
+                latest[extraction.job_id] = extraction
+        if not latest:
+            return 0
+        previous = self.store.get_many(list(latest))
+        kept: List[JobSkills] = []
+        for job_id, extraction in latest.items():
+            if job_id in previous:
+                self._remove(previous[job_id])
+            if self._add(extraction):
+                kept.append(extraction)
+        if kept:
+            self.store.put_many(kept)
+        return len(kept)
+
+    def forget(self, job_ids: Sequence[str]) -> int:
+        """Subtract and drop deleted jobs."""
+        known = [str(job_id) for job_id in job_ids if str(job_id) in self._job_days]
+        if not known:
+            return 0
+        for extraction in self.store.get_many(known).values():
+            self._remove(extraction)
+        self.store.delete_many(known)
+        return len(known)
+
+    def advance(self, today: date) -> int:
+        """Move the windows to ``today``; subtract the jobs that fell out of them."""
+        self.today = max(self.today, today)
+        if (self.today - self._epoch).days > _REBASE_AFTER_DAYS:
+            self._rebase(self.today)
+        expired = 0
+        for day in sorted(day for day in self._jobs_by_day if day < self.demand_cutoff):
+            leaving_season = day < self.seasonal_cutoff
+            if day not in self._demand_days and not leaving_season:
+                continue
+            job_ids = list(self._jobs_by_day[day])
+            extractions = self.store.get_many(job_ids)
+            if leaving_season:
+                for extraction in extractions.values():
+                    self._remove(extraction)
+                self._jobs_by_day.pop(day, None)
+                self._demand_days.discard(day)
+                for job_id in job_ids:
+                    self._job_days.pop(job_id, None)
+                self.store.delete_many(job_ids)
+                expired += len(job_ids)
+            else:
+                for extraction in extractions.values():
+                    self._apply_demand(extraction, -1)
+                self._demand_days.discard(day)
+        return expired
+
+    def seasonal_factor(self, market: Market, skill: str, month: int) -> float:
+        count = self._monthly.get(market, {}).get(month, {}).get(skill, 0)
+        overall = self._yearly.get(market, {}).get(skill, 0)
+        if count <= 0 or overall <= 0:
+            return 1.0
+        return max(0.5, min(1.5, count / max(1e-6, overall / 12.0)))
+
+    def demand_rows(self, now: Optional[datetime] = None, top_n: int = TOP_SKILLS_PER_MARKET) -> List[Dict[str, Any]]:
+        """Materialized ``market_skill_demand`` rows for ``today``, seasonal factor included."""
+        now = now or datetime.now(timezone.utc)
+        rescale = 2.0 ** (-(self.today - self._epoch).days / self.half_life_days)
+        window_start = self.demand_cutoff.isoformat()
+        window_end = self.today.isoformat()
+        updated_at = now.isoformat()
+        rows: List[Dict[str, Any]] = []
+        for market in sorted(self._weights):
+            weights = self._weights[market]
+            total_weight = max(1e-6, self._weight_totals[market] * rescale)
+            country_code, city = market
+            for skill, weight in heapq.nlargest(top_n, weights.items(), key=lambda item: (item[1], item[0])):
+                # Regionally normalized weighted frequency in 0..1 range
+                rows.append(
+                    {
+                        "skill": skill,
+                        "country_code": country_code or None,
+                        "city": city or None,
+                        "demand_score": round(min(1.0, weight * rescale / total_weight * 12.0), 4),
+                        "seasonal_factor": round(self.seasonal_factor(market, skill, self.today.month), 4),
+                        "window_start": window_start,
+                        "window_end": window_end,
+                        "updated_at": updated_at,
+                    }
+                )
+        return rows
+
+    def seasonal_rows(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """``seasonal_bias_corrections`` rows for every month with data."""
+        updated_at = (now or datetime.now(timezone.utc)).isoformat()
+        rows: List[Dict[str, Any]] = []
+        for market in sorted(self._monthly):
+            country_code, city = market
+            for month in sorted(self._monthly[market]):
+                for skill in sorted(self._monthly[market][month]):
+                    rows.append(
+                        {
+                            "month": month,
+                            "country_code": country_code or None,
+                            "city": city or None,
+                            "skill": skill,
+                            "correction_factor": round(self.seasonal_factor(market, skill, month), 4),
+                            "updated_at": updated_at,
+                        }
+                    )
+        return rows
+
+
+def recompute_demand_rows(jobs: Iterable[Dict[str, Any]], today: date, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Full recompute over ``jobs`` with the same bucketing; the reference for the deltas."""
+    aggregate = SkillDemandAggregate(MemorySkillExtractionStore(), today)
+    aggregate.ingest(extract_job_skills(job, today) for job in jobs)
+    return aggregate.demand_rows(now)
+
+
+class DemandSnapshot:
+    """
+    Seasonally adjusted demand per (skill, country, city) in a dict.
+
+    Lookups without a city (or country) fall back to the strongest market that matches.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = ()):
+        self._exact: Dict[Tuple[str, str, str], float] = {}
+        self._by_country: Dict[Tuple[str, str], float] = {}
+        self._by_city: Dict[Tuple[str, str], float] = {}
+        self._by_skill: Dict[str, float] = {}
+        for row in rows:
+            skill = str(row.get("skill") or "").lower()
+            if not skill or row.get("demand_score") is None:
+                continue
+            try:
+                seasonal = float(row.get("seasonal_factor") or 1.0)
+                score = max(0.0, min(1.0, float(row["demand_score"]) * max(0.5, min(1.5, seasonal))))
+            except Exception:
+                continue
+            country_code = str(row.get("country_code") or "").lower()
+            city = str(row.get("city") or "").lower()
+            self._exact[(skill, country_code, city)] = score
+            self._by_country[(skill, country_code)] = max(score, self._by_country.get((skill, country_code), 0.0))
+            self._by_city[(skill, city)] = max(score, self._by_city.get((skill, city), 0.0))
+            self._by_skill[skill] = max(score, self._by_skill.get(skill, 0.0))
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def lookup(self, skill: str, country_code: str = "", city: str = "") -> Optional[float]:
+        skill = (skill or "").lower()
+        country_code = (country_code or "").lower()
+        city = (city or "").lower()
+        if country_code and city:
+            return self._exact.get((skill, country_code, city))
+        if country_code:
+            return self._by_country.get((skill, country_code))
+        if city:
+            return self._by_city.get((skill, city))
+        return self._by_skill.get(skill)
@@ -1,87 +1,9 @@
-import math
-from collections import defaultdict
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Optional
 
+from ..core import config
 from ..core.database import supabase
-
-
-def _safe_float(value, default: float = 0.0) -> float:
-    try:
-        return float(value)
-    except Exception:
-        return default
-
-
-def _auc_roc(pairs: List[Tuple[float, int]]) -> Optional[float]:
-    if not pairs:
-        return None
-
-    positives = sum(1 for _, y in pairs if y == 1)
-    negatives = len(pairs) - positives
-    if positives == 0 or negatives == 0:
-        return None
-
-    ranked = sorted(pairs, key=lambda item: item[0])
-    rank_sum_pos = 0.0
-    rank = 1
-    i = 0
-    while i < len(ranked):
-        j = i
-        score = ranked[i][0]
-        while j < len(ranked) and ranked[j][0] == score:
-            j += 1
-        avg_rank = (rank + (rank + (j - i) - 1)) / 2.0
-        pos_in_group = sum(1 for _, y in ranked[i:j] if y == 1)
-        rank_sum_pos += avg_rank * pos_in_group
-        rank += (j - i)
-        i = j
-
-    auc = (rank_sum_pos - (positives * (positives + 1) / 2.0)) / (positives * negatives)
-    return max(0.0, min(1.0, auc))
-
-
-def _log_loss(pairs: List[Tuple[float, int]]) -> Optional[float]:
-    if not pairs:
-        return None
-    eps = 1e-15
-    total = 0.0
-    for p, y in pairs:
-        p = min(max(p, eps), 1.0 - eps)
-        total += y * math.log(p) + (1 - y) * math.log(1 - p)
-    return -total / len(pairs)
-
-
-def _precision_at_k(exposures: List[Dict], positive_keys: set, k: int) -> Optional[float]:
-    if k <= 0:
-        return None
-
-    by_request = defaultdict(list)
-    for row in exposures:
-        req = row.get("request_id")
-        if not req:
-            continue
-        by_request[req].append(row)
-
-    if not by_request:
-        return None
-
-    request_scores = []
-    for rows in by_request.values():
-        rows.sort(key=lambda r: int(r.get("position") or 9999))
-        top = rows[:k]
-        if not top:
-            continue
-        hits = 0
-        for r in top:
-            key = (str(r.get("request_id") or ""), str(r.get("user_id") or ""), str(r.get("job_id") or ""))
-            if key in positive_keys:
-                hits += 1
-        request_scores.append(hits / max(1, len(top)))
-
-    if not request_scores:
-        return None
-    return sum(request_scores) / len(request_scores)
+from .evaluation_engine import EvaluationAccumulator, iter_keyset_pages, positive_keys
 
 
 def _insert_eval_row(model_key: str, model_version: str, scoring_version: Optional[str], window_days: int, sample_size: int, auc: Optional[float], log_loss: Optional[float], p5: Optional[float], p10: Optional[float], notes: str = "") -> None:
@@ -102,117 +24,95 @@ def _insert_eval_row(model_key: str, model_version: str, scoring_version: Option
     supabase.table("model_offline_evaluations").insert(payload).execute()
 
 
-def run_offline_recommendation_evaluation(window_days: int = 30) -> Dict:
+def _is_positive_apply(row: Dict) -> bool:
+    val = row.get("signal_value")
+    if val is None:
+        return True
+    try:
+        return float(val) >= 1.0
+    except Exception:
+        return False
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 6) if value is not None else None
+
+
+def run_offline_recommendation_evaluation(
+    window_days: int = 30,
+    page_size: Optional[int] = None,
+    max_exposures: Optional[int] = None,
+) -> Dict:
     if not supabase:
         return {"sample_size": 0}
 
+    page_size = page_size or config.RECOMMENDATION_EVAL_PAGE_SIZE
+    max_exposures = config.RECOMMENDATION_EVAL_MAX_EXPOSURES if max_exposures is None else max_exposures
     start_iso = (datetime.now(timezone.utc) - timedelta(days=window_days)).isoformat()
 
     try:
-        exposure_rows = (
-            supabase.table("recommendation_exposures")
-            .select("request_id,user_id,job_id,position,score,predicted_action_probability,action_model_version,scoring_version,shown_at")
-            .gte("shown_at", start_iso)
-            .order("shown_at", desc=True)
-            .limit(30000)
-            .execute()
-            .data
-            or []
+        feedback_pages = iter_keyset_pages(
+            supabase,
+            "recommendation_feedback_events",
+            "request_id,user_id,job_id,signal_type,signal_value,created_at",
+            apply_filters=lambda query: query.gte("created_at", start_iso).eq("signal_type", "apply_click"),
+            page_size=page_size,
         )
+        positive_with_request, positive_without_request = positive_keys(feedback_pages, _is_positive_apply)
     except Exception as exc:
-        print(f"⚠️ [Evaluation] failed to load exposures: {exc}")
-        return {"sample_size": 0}
-
-    if not exposure_rows:
-        return {"sample_size": 0}
+        print(f"⚠️ [Evaluation] failed to load feedback rows: {exc}")
+        positive_with_request, positive_without_request = set(), set()
 
+    accumulator = EvaluationAccumulator(positive_with_request, positive_without_request)
     try:
-        feedback_rows = (
-            supabase.table("recommendation_feedback_events")
-            .select("request_id,user_id,job_id,signal_type,signal_value,created_at")
-            .gte("created_at", start_iso)
-            .eq("signal_type", "apply_click")
-            .limit(30000)
-            .execute()
-            .data
-            or []
-        )
+        for rows in iter_keyset_pages(
+            supabase,
+            "recommendation_exposures",
+            "request_id,user_id,job_id,position,score,predicted_action_probability,action_model_version,scoring_version,source,shown_at",
+            apply_filters=lambda query: query.gte("shown_at", start_iso),
+            page_size=page_size,
+            max_rows=max_exposures or None,
+            # The cap keeps the most recent exposures of the window, as the old query did.
+            newest_first=True,
+        ):
+            accumulator.add(rows)
     except Exception as exc:
-        print(f"⚠️ [Evaluation] failed to load feedback rows: {exc}")
-        feedback_rows = []
-
-    def _is_positive_apply(row: Dict) -> bool:
-        val = row.get("signal_value")
-        if val is None:
-            return True
-        try:
-            return float(val) >= 1.0
-        except Exception:
-            return False
-
-    positive_with_request = {
-        (str(row.get("request_id") or ""), str(row.get("user_id") or ""), str(row.get("job_id") or ""))
-        for row in feedback_rows
-        if row.get("user_id") and row.get("job_id") and _is_positive_apply(row)
-    }
-    positive_without_request = {
-        (str(row.get("user_id") or ""), str(row.get("job_id") or ""))
-        for row in feedback_rows
-        if row.get("user_id") and row.get("job_id") and _is_positive_apply(row)
-    }
-
-    pairs: List[Tuple[float, int]] = []
-    by_scoring: Dict[str, List[Tuple[float, int]]] = defaultdict(list)
-
-    for row in exposure_rows:
-        req_id = str(row.get("request_id") or "")
-        user_id = str(row.get("user_id") or "")
-        job_id = str(row.get("job_id") or "")
-        if not user_id or not job_id:
-            continue
-
-        y = 1 if ((req_id, user_id, job_id) in positive_with_request or (user_id, job_id) in positive_without_request) else 0
-        pred = row.get("predicted_action_probability")
-        if pred is None:
-            pred = _safe_float(row.get("score"), 0.0) / 100.0
-        p = min(max(_safe_float(pred, 0.0), 0.000001), 0.999999)
-
-        pairs.append((p, y))
-        scoring = str(row.get("scoring_version") or "unknown")
-        by_scoring[scoring].append((p, y))
+        print(f"⚠️ [Evaluation] failed to load exposures: {exc}")
+        if not accumulator.columns():
+            return {"sample_size": 0}
 
-    auc = _auc_roc(pairs)
-    ll = _log_loss(pairs)
-    p5 = _precision_at_k(exposure_rows, positive_with_request, 5)
-    p10 = _precision_at_k(exposure_rows, positive_with_request, 10)
+    if not accumulator.columns():
+        return {"sample_size": 0}
 
-    model_version = str((exposure_rows[0] or {}).get("action_model_version") or "v1")
+    overall = accumulator.overall()
+    model_version = accumulator.latest_model_version or "v1"
     try:
         _insert_eval_row(
             model_key="job_apply_probability",
             model_version=model_version,
             scoring_version=None,
             window_days=window_days,
-            sample_size=len(pairs),
-            auc=auc,
-            log_loss=ll,
-            p5=p5,
-            p10=p10,
+            sample_size=overall["sample_size"],
+            auc=overall["auc"],
+            log_loss=overall["log_loss"],
+            p5=overall["precision_at_5"],
+            p10=overall["precision_at_10"],
             notes="overall",
         )
     except Exception as exc:
         print(f"⚠️ [Evaluation] failed writing overall eval: {exc}")
 
     per_scoring = []
-    for scoring_version, scoring_pairs in by_scoring.items():
-        s_auc = _auc_roc(scoring_pairs)
-        s_ll = _log_loss(scoring_pairs)
+    for row in accumulator.slices("scoring_version"):
+        if not row["sample_size"]:
+            continue
+        scoring_version = row["scoring_version"]
         per_scoring.append(
             {
                 "scoring_version": scoring_version,
-                "sample_size": len(scoring_pairs),
-                "auc": round(s_auc, 6) if s_auc is not None else None,
-                "log_loss": round(s_ll, 6) if s_ll is not None else None,
+                "sample_size": row["sample_size"],
+                "auc": _round(row["auc"]),
+                "log_loss": _round(row["log_loss"]),
             }
         )
         try:
@@ -221,9 +121,9 @@ def run_offline_recommendation_evaluation(window_days: int = 30) -> Dict:
                 model_version=model_version,
                 scoring_version=scoring_version,
                 window_days=window_days,
-                sample_size=len(scoring_pairs),
-                auc=s_auc,
-                log_loss=s_ll,
+                sample_size=row["sample_size"],
+                auc=row["auc"],
+                log_loss=row["log_loss"],
                 p5=None,
                 p10=None,
                 notes="per_scoring_version",
@@ -233,11 +133,43 @@ def run_offline_recommendation_evaluation(window_days: int = 30) -> Dict:
 
     per_scoring.sort(key=lambda row: row.get("auc") if row.get("auc") is not None else -1, reverse=True)
 
+    # Rows per action model only add information when several versions were live in the window.
+    model_slices = [row for row in accumulator.slices("model_version") if row["sample_size"]]
+    per_model_version = []
+    for row in model_slices:
+        per_model_version.append({key: _round(value) if isinstance(value, float) else value for key, value in row.items()})
+        if len(model_slices) > 1:
+            try:
+                _insert_eval_row(
+                    model_key="job_apply_probability",
+                    model_version=row["model_version"],
+                    scoring_version=None,
+                    window_days=window_days,
+                    sample_size=row["sample_size"],
+                    auc=row["auc"],
+                    log_loss=row["log_loss"],
+                    p5=row["precision_at_5"],
+                    p10=row["precision_at_10"],
+                    notes="per_model_version",
+                )
+            except Exception as exc:
+                print(f"⚠️ [Evaluation] failed writing per-model eval ({row['model_version']}): {exc}")
+
+    per_segment = {
+        dimension: [
+            {key: _round(value) if isinstance(value, float) else value for key, value in row.items()}
+            for row in accumulator.slices(dimension)
+        ]
+        for dimension in ("source", "position_band")
+    }
+
     return {
-        "sample_size": len(pairs),
-        "auc": round(auc, 6) if auc is not None else None,
-        "log_loss": round(ll, 6) if ll is not None else None,
-        "precision_at_5": round(p5, 6) if p5 is not None else None,
-        "precision_at_10": round(p10, 6) if p10 is not None else None,
+        "sample_size": overall["sample_size"],
+        "auc": _round(overall["auc"]),
+        "log_loss": _round(overall["log_loss"]),
+        "precision_at_5": _round(overall["precision_at_5"]),
+        "precision_at_10": _round(overall["precision_at_10"]),
         "per_scoring": per_scoring,
+        "per_model_version": per_model_version,
+        "per_segment": per_segment,
     }
@@ -0,0 +1,261 @@
+"""
+Streaming, vectorized offline evaluation of recommendation exposures.
+
+Exposures and feedback are read in keyset-paginated pages (``id > last_id``), joined to
+apply-click positives through hash sets and accumulated into compact NumPy columns
+(about 30 bytes per exposure), so millions of exposures fit in bounded memory. Metrics
+are sort-based: exact AUC from rank sums with averaged ties, log loss, and precision@k
+per request. Slices (scoring version, model version, source, position band) are computed
+from the same columns after a single pass over the data.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+SLICE_DIMENSIONS = ("scoring_version", "model_version", "source", "position_band")
+
+_POSITION_BANDS = ((5, "1-5"), (10, "6-10"), (20, "11-20"))
+
+
+def _safe_float(value, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except Exception:
+        return default
+
+
+def _safe_position(value) -> int:
+    try:
+        return int(value or 9999)
+    except Exception:
+        return 9999
+
+
+def _position_band(position: int) -> str:
+    for limit, label in _POSITION_BANDS:
+        if position <= limit:
+            return label
+    return "21+"
+
+
+def iter_keyset_pages(
+    client: Any,
+    table: str,
+    columns: str,
+    *,
+    apply_filters: Callable[[Any], Any] = lambda query: query,
+    page_size: int = 5000,
+    max_rows: Optional[int] = None,
+    newest_first: bool = False,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield pages of ``table`` ordered by primary key, continuing from the last id seen.
+    Unlike offset paging every page is an index range scan, however deep the window.
+    With ``newest_first`` the ids are walked downwards, so ``max_rows`` keeps the most
+    recent rows of a sequence-keyed table rather than the oldest.
+    """
+    last_id = None
+    fetched = 0
+    while True:
+        limit = page_size if not max_rows else min(page_size, max_rows - fetched)
+        if limit <= 0:
+            return
+        query = apply_filters(client.table(table).select(f"id,{columns}"))
+        if last_id is not None:
+            query = query.lt("id", last_id) if newest_first else query.gt("id", last_id)
+        rows = query.order("id", desc=newest_first).limit(limit).execute().data or []
+        if not rows:
+            return
+        yield rows
+        fetched += len(rows)
+        if len(rows) < limit:
+            return
+        last_id = rows[-1]["id"]
+
+
+def auc_roc(scores: np.ndarray, labels: np.ndarray) -> Optional[float]:
+    """Exact ROC AUC (Mann-Whitney U) from rank sums; tied scores share their average rank."""
+    size = len(scores)
+    if size == 0:
+        return None
+    labels = np.asarray(labels, dtype=np.float64)
+    positives = float(labels.sum())
+    negatives = size - positives
+    if positives == 0 or negatives == 0:
+        return None
+    _unique, inverse, counts = np.unique(scores, return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts, dtype=np.float64)
+    average_ranks = ends - (counts - 1) / 2.0
+    positives_per_group = np.bincount(inverse.ravel(), weights=labels, minlength=len(counts))
+    rank_sum_pos = float(np.dot(average_ranks, positives_per_group))
+    auc = (rank_sum_pos - positives * (positives + 1) / 2.0) / (positives * negatives)
+    return max(0.0, min(1.0, auc))
+
+
+def log_loss(probabilities: np.ndarray, labels: np.ndarray) -> Optional[float]:
+    if len(probabilities) == 0:
+        return None
+    eps = 1e-15
+    p = np.clip(np.asarray(probabilities, dtype=np.float64), eps, 1.0 - eps)
+    likelihood = np.where(np.asarray(labels) == 1, p, 1.0 - p)
+    return float(-np.log(likelihood).mean())
+
+
+def precision_at_k(request_keys: np.ndarray, positions: np.ndarray, hits: np.ndarray, k: int) -> Optional[float]:
+    """Mean over requests of the hit rate among their ``k`` best-positioned exposures."""
+    size = len(request_keys)
+    if k <= 0 or size == 0:
+        return None
+    # Stable order within a request: by position, then by arrival.
+    order = np.lexsort((np.arange(size), positions, request_keys))
+    keys = request_keys[order]
+    starts_mask = np.empty(size, dtype=bool)
+    starts_mask[0] = True
+    np.not_equal(keys[1:], keys[:-1], out=starts_mask[1:])
+    starts = np.flatnonzero(starts_mask)
+    group = np.cumsum(starts_mask) - 1
+    rank = np.arange(size) - starts[group]
+    top = rank < k
+    hits_per_request = np.bincount(group[top], weights=hits[order][top].astype(np.float64), minlength=len(starts))
+    shown_per_request = np.minimum(np.diff(np.append(starts, size)), k)
+    return float((hits_per_request / shown_per_request).mean())
+
+
+def positive_keys(feedback_pages: Iterable[Sequence[Dict[str, Any]]], is_positive: Callable[[Dict[str, Any]], bool]) -> Tuple[Set[int], Set[int]]:
+    """Hash sets of positive (request, user, job) and (user, job) keys from streamed feedback."""
+    with_request: Set[int] = set()
+    without_request: Set[int] = set()
+    for rows in feedback_pages:
+        for row in rows:
+            user_id = str(row.get("user_id") or "")
+            job_id = str(row.get("job_id") or "")
+            if not user_id or not job_id or not is_positive(row):
+                continue
+            with_request.add(hash((str(row.get("request_id") or ""), user_id, job_id)))
+            without_request.add(hash((user_id, job_id)))
+    return with_request, without_request
+
+
+class EvaluationAccumulator:
+    """Columnar accumulator for exposures; feed it pages, then ask for metrics."""
+
+    def __init__(self, positives_with_request: Set[int], positives_without_request: Set[int]):
+        self._with_request = positives_with_request
+        self._without_request = positives_without_request
+        self._chunks: List[Dict[str, np.ndarray]] = []
+        self._codes: Dict[str, Dict[str, int]] = {dimension: {} for dimension in SLICE_DIMENSIONS}
+        self.latest_model_version: Optional[str] = None
+        self._latest_id: Any = None
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+
+    def _code(self, dimension: str, value: str) -> int:
+        codes = self._codes[dimension]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        return code
+
+    def add(self, rows: Sequence[Dict[str, Any]]) -> None:
+        size = len(rows)
+        if not size:
+            return
+        probability = np.empty(size, dtype=np.float64)
+        labeled = np.zeros(size, dtype=bool)
+        label = np.zeros(size, dtype=np.int8)
+        hit = np.zeros(size, dtype=np.int8)
+        has_request = np.zeros(size, dtype=bool)
+        request_key = np.zeros(size, dtype=np.int64)
+        position = np.empty(size, dtype=np.int32)
+        slice_codes = {dimension: np.empty(size, dtype=np.int16) for dimension in SLICE_DIMENSIONS}
+
+        for index, row in enumerate(rows):
+            req_id = str(row.get("request_id") or "")
+            user_id = str(row.get("user_id") or "")
+            job_id = str(row.get("job_id") or "")
+            pos = _safe_position(row.get("position"))
+            position[index] = pos
+            request_hit = hash((req_id, user_id, job_id)) in self._with_request
+            if req_id:
+                has_request[index] = True
+                request_key[index] = hash(req_id)
+                hit[index] = request_hit
+            if user_id and job_id:
+                labeled[index] = True
+                label[index] = request_hit or hash((user_id, job_id)) in self._without_request
+            pred = row.get("predicted_action_probability")
+            if pred is None:
+                pred = _safe_float(row.get("score"), 0.0) / 100.0
+            probability[index] = min(max(_safe_float(pred, 0.0), 0.000001), 0.999999)
+            model_version = str(row.get("action_model_version") or "v1")
+            slice_codes["scoring_version"][index] = self._code("scoring_version", str(row.get("scoring_version") or "unknown"))
+            slice_codes["model_version"][index] = self._code("model_version", model_version)
+            slice_codes["source"][index] = self._code("source", str(row.get("source") or "unknown"))
+            slice_codes["position_band"][index] = self._code("position_band", _position_band(pos))
+            # Pages may come in either id order; rows without an id count as the newest seen.
+            row_id = row.get("id")
+            if row_id is None or self._latest_id is None or row_id > self._latest_id:
+                self._latest_id = row_id
+                self.latest_model_version = model_version
+
+        self._chunks.append(
+            {
+                "probability": probability,
+                "labeled": labeled,
+                "label": label,
+                "hit": hit,
+                "has_request": has_request,
+                "request_key": request_key,
+                "position": position,
+                **{f"slice:{dimension}": codes for dimension, codes in slice_codes.items()},
+            }
+        )
+        self._columns = None
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        if self._columns is None:
+            if not self._chunks:
+                return {}
+            self._columns = {name: np.concatenate([chunk[name] for chunk in self._chunks]) for name in self._chunks[0]}
+            self._chunks = [self._columns]
+        return self._columns
+
+    @property
+    def sample_size(self) -> int:
+        columns = self.columns()
+        return int(columns["labeled"].sum()) if columns else 0
+
+    @staticmethod
+    def _metrics(columns: Dict[str, np.ndarray], mask: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        labeled = columns["labeled"] if mask is None else columns["labeled"] & mask
+        ranked = columns["has_request"] if mask is None else columns["has_request"] & mask
+        probabilities = columns["probability"][labeled]
+        labels = columns["label"][labeled]
+        keys, positions, hits = columns["request_key"][ranked], columns["position"][ranked], columns["hit"][ranked]
+        return {
+            "sample_size": int(labeled.sum()),
+            "auc": auc_roc(probabilities, labels),
+            "log_loss": log_loss(probabilities, labels),
+            "precision_at_5": precision_at_k(keys, positions, hits, 5),
+            "precision_at_10": precision_at_k(keys, positions, hits, 10),
+        }
+
+    def overall(self) -> Dict[str, Any]:
+        columns = self.columns()
+        if not columns:
+            return {"sample_size": 0, "auc": None, "log_loss": None, "precision_at_5": None, "precision_at_10": None}
+        return self._metrics(columns)
+
+    def slices(self, dimension: str) -> List[Dict[str, Any]]:
+        """Metrics per value of ``dimension`` (one of ``SLICE_DIMENSIONS``)."""
+        columns = self.columns()
+        if not columns:
+            return []
+        codes = columns[f"slice:{dimension}"]
+        out = []
+        for value, code in self._codes[dimension].items():
+            mask = codes == code
+            if not mask.any():
+                continue
+            out.append({dimension: value, **self._metrics(columns, mask)})
+        return out
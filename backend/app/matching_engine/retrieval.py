@@ -1,9 +1,9 @@
 import json
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from ..core.database import supabase
-from ..services.jobs_postgres_store import get_job_by_id, jobs_postgres_main_enabled, read_recent_jobs
+from ..services.jobs_postgres_store import get_job_by_id, get_jobs_by_ids, jobs_postgres_main_enabled, read_recent_jobs
 
 from .embeddings import EMBEDDING_MODEL, EMBEDDING_VERSION, embed_text
 
@@ -84,22 +84,36 @@ def ensure_candidate_embedding(candidate_id: str, text: str, persist: bool = Tru
     return vector
 
 
-def ensure_job_embeddings(jobs: List[Dict], persist: bool = True) -> Dict[str, List[float]]:
-    out: Dict[str, List[float]] = {}
-    if not jobs:
-        return out
-
-    for job in jobs:
-        job_id = str(job.get("id"))
-        text = "\n".join([job.get("title") or "", job.get("description") or "", job.get("location") or ""]).strip()
-        out[job_id] = embed_text(text)
-
-    if not supabase or not persist:
-        return out
-
+def upsert_candidate_embeddings(vectors: Dict[str, List[float]]) -> int:
+    """One upsert for many candidates; raises so batch callers can retry the chunk."""
+    if not supabase or not vectors:
+        return 0
+    now_iso = datetime.now(timezone.utc).isoformat()
+    rows = [
+        {
+            "candidate_id": candidate_id,
+            "embedding": _vector_literal(vector),
+            "embedding_model": EMBEDDING_MODEL,
+            "embedding_version": EMBEDDING_VERSION,
+            "updated_at": now_iso,
+        }
+        for candidate_id, vector in vectors.items()
+    ]
+    supabase.table("candidate_embeddings").upsert(rows, on_conflict="candidate_id").execute()
+    return len(rows)
+
+
+def job_embedding_text(job: Dict) -> str:
+    return "\n".join([job.get("title") or "", job.get("description") or "", job.get("location") or ""]).strip()
+
+
+def upsert_job_embeddings(vectors: Dict[str, List[float]]) -> int:
+    """One upsert for many jobs; raises so batch callers can retry the chunk."""
+    if not supabase or not vectors:
+        return 0
     rows = []
     now_iso = datetime.now(timezone.utc).isoformat()
-    for job_id, vec in out.items():
+    for job_id, vec in vectors.items():
         try:
             rows.append(
                 {
@@ -112,16 +126,93 @@ def ensure_job_embeddings(jobs: List[Dict], persist: bool = True) -> Dict[str, L
             )
         except Exception:
             continue
-
     if rows:
-        try:
-            supabase.table("job_embeddings").upsert(rows, on_conflict="job_id").execute()
-        except Exception as exc:
-            print(f"⚠️ [Matching] job embeddings upsert failed: {exc}")
+        supabase.table("job_embeddings").upsert(rows, on_conflict="job_id").execute()
+    return len(rows)
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    try:
+        parsed = datetime.fromisoformat(str(value or "").replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def stale_job_embedding_ids(jobs: List[Dict], chunk_size: int = 500) -> List[str]:
+    """
+    Ids of ``jobs`` whose stored embedding is missing, from another embedding version,
+    or older than the job's last content change. Jobs without a content watermark,
+    and every job when stored embeddings cannot be read, count as stale.
+    """
+    ids = [str(job.get("id")) for job in jobs if str(job.get("id") or "").strip()]
+    if not supabase or not ids:
+        return ids
+    stored: Dict[str, Dict] = {}
+    numeric_ids = [int(job_id) for job_id in ids if job_id.isdigit()]
+    try:
+        for offset in range(0, len(numeric_ids), chunk_size):
+            resp = (
+                supabase.table("job_embeddings")
+                .select("job_id,embedding_version,updated_at")
+                .in_("job_id", numeric_ids[offset:offset + chunk_size])
+                .execute()
+            )
+            stored.update({str(row.get("job_id")): row for row in resp.data or []})
+    except Exception as exc:
+        print(f"⚠️ [Matching] job embedding watermarks unavailable: {exc}")
+        return ids
+
+    stale = []
+    for job in jobs:
+        job_id = str(job.get("id") or "")
+        row = stored.get(job_id)
+        changed_at = _parse_timestamp(job.get("content_changed_at"))
+        embedded_at = _parse_timestamp((row or {}).get("updated_at"))
+        if (
+            row is None
+            or row.get("embedding_version") != EMBEDDING_VERSION
+            or changed_at is None
+            or embedded_at is None
+            or embedded_at < changed_at
+        ):
+            stale.append(job_id)
+    return [job_id for job_id in stale if job_id]
+
+
+def ensure_job_embeddings(jobs: List[Dict], persist: bool = True) -> Dict[str, List[float]]:
+    out: Dict[str, List[float]] = {}
+    if not jobs:
+        return out
+
+    for job in jobs:
+        out[str(job.get("id"))] = embed_text(job_embedding_text(job))
+
+    if not supabase or not persist:
+        return out
+
+    try:
+        upsert_job_embeddings(out)
+    except Exception as exc:
+        print(f"⚠️ [Matching] job embeddings upsert failed: {exc}")
 
     return out
 
 
+def fetch_jobs_by_ids(job_ids: List[str]) -> List[Dict]:
+    ids = [str(job_id) for job_id in job_ids if str(job_id or "").strip()]
+    if not ids:
+        return []
+    if jobs_postgres_main_enabled():
+        return _attach_job_intelligence(get_jobs_by_ids(ids))
+    if not supabase:
+        return []
+    resp = supabase.table("jobs").select("*").in_("id", ids).execute()
+    return _attach_job_intelligence(resp.data or [])
+
+
 def fetch_recent_jobs(limit: int = 500, days: int = 30) -> List[Dict]:
     if jobs_postgres_main_enabled():
         return _attach_job_intelligence(read_recent_jobs(limit=limit, days=days))
@@ -230,3 +321,26 @@ def write_recommendation_cache(user_id: str, rows: List[Dict], ttl_minutes: int
         supabase.table("recommendation_cache").upsert(payload, on_conflict="user_id,job_id,model_version").execute()
     except Exception as exc:
         print(f"⚠️ [Matching] recommendation cache write failed: {exc}")
+
+
+def extend_recommendation_cache(user_ids: List[str], ttl_minutes: int = 60, chunk_size: int = 500) -> int:
+    """Keep the unexpired cache rows of users a refresh cycle skipped (nothing changed for them)."""
+    if not supabase or not user_ids:
+        return 0
+    now_iso = datetime.now(timezone.utc).isoformat()
+    expires_at = (datetime.now(timezone.utc) + timedelta(minutes=ttl_minutes)).isoformat()
+    extended = 0
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = list(user_ids[start:start + chunk_size])
+        try:
+            (
+                supabase.table("recommendation_cache")
+                .update({"expires_at": expires_at})
+                .in_("user_id", chunk)
+                .gte("expires_at", now_iso)
+                .execute()
+            )
+            extended += len(chunk)
+        except Exception as exc:
+            print(f"⚠️ [Matching] recommendation cache extend failed: {exc}")
+    return extended
@@ -19,15 +19,23 @@ from ..core.runtime_config import (
     resolve_scoring_model_for_user,
 )
 from ..services.recommendation_intelligence import get_candidate_recommendation_intelligence
-from .demand import recompute_market_skill_demand
-from .embeddings import EMBEDDING_VERSION
+from .batch_executor import BatchJob, run_batch
+from .change_tracking import get_change_tracker
+from .demand import refresh_market_skill_demand
+from .embeddings import EMBEDDING_VERSION, embed_text
 from .evaluation import run_offline_recommendation_evaluation
 from .feature_store import extract_candidate_features, extract_job_features
 from .retrieval import (
     ensure_candidate_embedding,
     ensure_job_embeddings,
+    extend_recommendation_cache,
+    fetch_jobs_by_ids,
     fetch_recent_jobs,
+    job_embedding_text,
     read_cached_recommendations,
+    stale_job_embedding_ids,
+    upsert_candidate_embeddings,
+    upsert_job_embeddings,
     write_recommendation_cache,
 )
 from .scoring import configure_scoring_weights, predict_action_probability, score_from_embeddings, score_job
@@ -1368,12 +1376,71 @@ def recommend_jobs_for_user(
     return top
 
 
+_CANDIDATE_EMBEDDING_COLUMNS = "id, job_title, cv_text, cv_ai_text, story, skills, inferred_skills, strengths, leadership, values, motivations, work_preferences, work_history, education, address, preferences"
+_RECOMMENDATION_PROFILE_COLUMNS = "id,job_title,cv_text,cv_ai_text,story,skills,inferred_skills,strengths,leadership,values,motivations,work_preferences,work_history,education,address,lat,lng,preferences"
+
+
+def _hourly_run_key(name: str) -> str:
+    # A restart within the same hour resumes the unfinished chunks of that hour's run.
+    return f"{name}:{datetime.now(timezone.utc).strftime('%Y-%m-%dT%H')}"
+
+
+def _prefetched_loader(prefetched: Dict[str, Dict], load_missing):
+    """Serve chunk items from the listing read; only a resumed run reads them again, in bulk."""
+
+    def _load(ids: List[str]) -> List[Dict]:
+        missing = [item_id for item_id in ids if item_id not in prefetched]
+        return [prefetched[item_id] for item_id in ids if item_id in prefetched] + (load_missing(missing) if missing else [])
+
+    return _load
+
+
+def _candidate_profiles_batch(columns: str, limit: int, select=None):
+    """
+    Item ids for ``run_batch`` (profiles are kept for the chunks) and the chunk loader.
+    ``select(profiles)`` may narrow the listing to the ids worth processing; ids outside
+    the listed profiles are read by the loader.
+    """
+    prefetched: Dict[str, Dict] = {}
+
+    def _list_ids() -> List[str]:
+        resp = supabase.table("candidate_profiles").select(columns).limit(limit).execute()
+        prefetched.update({str(row.get("id")): row for row in resp.data or [] if row.get("id")})
+        return list(prefetched) if select is None else select(list(prefetched.values()))
+
+    def _load_missing(ids: List[str]) -> List[Dict]:
+        return supabase.table("candidate_profiles").select(columns).in_("id", ids).execute().data or []
+
+    return _list_ids, _prefetched_loader(prefetched, _load_missing)
+
+
+def _embed_job(job: Dict, _context) -> tuple:
+    return str(job.get("id")), embed_text(job_embedding_text(job))
+
+
+def _embed_candidate(profile: Dict, _context) -> tuple:
+    intelligence = get_candidate_recommendation_intelligence(profile, user_id=profile.get("id"))
+    features = extract_candidate_features(profile, intelligence=intelligence)
+    return str(profile.get("id")), embed_text(features.get("text") or "")
+
+
 def batch_refresh_job_embeddings() -> int:
     jobs = fetch_recent_jobs(limit=3000, days=30)
     if not jobs:
         return 0
-    ensure_job_embeddings(jobs, persist=True)
-    return len(jobs)
+    # Only jobs whose content changed since they were last embedded are re-embedded.
+    stale = set(stale_job_embedding_ids(jobs))
+    prefetched = {str(job.get("id")): job for job in jobs if str(job.get("id")) in stale}
+    if not prefetched:
+        return 0
+    job = BatchJob(
+        name="job_embeddings",
+        load=_prefetched_loader(prefetched, fetch_jobs_by_ids),
+        handle=_embed_job,
+        flush=lambda results, _context: upsert_job_embeddings(dict(results)),
+    )
+    result = run_batch(job, list(prefetched), run_key=_hourly_run_key(job.name))
+    return result.processed - result.failed
 
 
 def batch_refresh_job_intelligence(*, force: bool = False, limit: Optional[int] = None) -> Dict[str, int | str]:
@@ -1389,69 +1456,110 @@ def batch_refresh_job_intelligence(*, force: bool = False, limit: Optional[int]
 def batch_refresh_candidate_embeddings() -> int:
     if not supabase:
         return 0
+    list_ids, load = _candidate_profiles_batch(_CANDIDATE_EMBEDDING_COLUMNS, 2000)
+    job = BatchJob(
+        name="candidate_embeddings",
+        load=load,
+        handle=_embed_candidate,
+        flush=lambda results, _context: upsert_candidate_embeddings(dict(results)),
+    )
     try:
-        resp = supabase.table("candidate_profiles").select("id, job_title, cv_text, cv_ai_text, story, skills, inferred_skills, strengths, leadership, values, motivations, work_preferences, work_history, education, address, preferences").limit(2000).execute()
+        result = run_batch(job, list_ids, run_key=_hourly_run_key(job.name))
     except Exception as exc:
         print(f"⚠️ [Matching] batch candidate embeddings fetch failed: {exc}")
         return 0
-
-    profiles = resp.data or []
-    updated = 0
-    for profile in profiles:
-        intelligence = get_candidate_recommendation_intelligence(profile, user_id=profile.get("id"))
-        features = extract_candidate_features(profile, intelligence=intelligence)
-        ensure_candidate_embedding(profile.get("id"), features.get("text") or "", persist=True)
-        updated += 1
-    return updated
+    return result.processed - result.failed
 
 
 def batch_refresh_recommendations() -> int:
     if not supabase:
         return 0
-    model_cfg = get_active_model_config("matching", "recommendations")
-    cfg = model_cfg.get("config_json") or {}
-    recommendations_days = max(14, min(180, int(cfg.get("recommendation_job_window_days") or 90)))
-    recommendations_pool_limit = max(500, min(5000, int(cfg.get("recommendation_job_pool_limit") or 1500)))
+
+    context: Dict = {"jobs": None, "job_embeddings": {}, "generated": 0, "failed_ids": [], "lock": Lock()}
+    cycle: Dict = {"plan": None, "skipped": []}
+    tracker = get_change_tracker()
+
+    def _job_pool() -> List[Dict]:
+        if context["jobs"] is None:
+            model_cfg = get_active_model_config("matching", "recommendations")
+            cfg = model_cfg.get("config_json") or {}
+            recommendations_days = max(14, min(180, int(cfg.get("recommendation_job_window_days") or 90)))
+            recommendations_pool_limit = max(500, min(5000, int(cfg.get("recommendation_job_pool_limit") or 1500)))
+            context["jobs"] = fetch_recent_jobs(limit=recommendations_pool_limit, days=recommendations_days)
+        return context["jobs"]
+
+    def _select_due(profiles: List[Dict]) -> List[str]:
+        # Only users with a change (profile, interactions, retry) or with new jobs in one of
+        # their segments since the last cycle are recomputed; the rest keep their cache.
+        plan = tracker.plan("recommendations")
+        plan.add_jobs(_job_pool())
+        due, skipped = plan.select(profiles)
+        listed = {str(profile.get("id")) for profile in profiles}
+        cycle["plan"], cycle["skipped"] = plan, [str(profile.get("id")) for profile in skipped]
+        return [str(profile.get("id")) for profile in due] + [user_id for user_id in plan.dirty if user_id not in listed]
+
+    def _prepare() -> Dict:
+        # The job pool and its embeddings are shared by every worker of the run.
+        jobs = _job_pool()
+        context["job_embeddings"] = ensure_job_embeddings(jobs, persist=False) if jobs else {}
+        return context
+
+    def _recommend(row: Dict, shared: Dict):
+        if not shared["jobs"]:
+            return None
+        try:
+            recs = recommend_jobs_for_user(
+                str(row.get("id")),
+                limit=80,
+                allow_cache=False,
+                candidate=row,
+                jobs=shared["jobs"],
+                job_embeddings=shared["job_embeddings"],
+            )
+        except Exception:
+            with shared["lock"]:
+                shared["failed_ids"].append(str(row.get("id")))
+            raise
+        return row.get("id") if recs else None
+
+    def _count_generated(results: List, shared: Dict) -> None:
+        # recommend_jobs_for_user writes the cache itself; only count users that got results.
+        with shared["lock"]:
+            shared["generated"] += len(results)
+
+    list_ids, load = _candidate_profiles_batch(_RECOMMENDATION_PROFILE_COLUMNS, 1500, select=_select_due)
+    job = BatchJob(
+        name="recommendations",
+        load=load,
+        handle=_recommend,
+        flush=_count_generated,
+        prepare=_prepare,
+    )
     try:
-        resp = (
-            supabase.table("candidate_profiles")
-            .select("id,job_title,cv_text,cv_ai_text,story,skills,inferred_skills,strengths,leadership,values,motivations,work_preferences,work_history,education,address,lat,lng,preferences")
-            .limit(1500)
-            .execute()
-        )
+        run_batch(job, list_ids, run_key=_hourly_run_key(job.name))
     except Exception as exc:
         print(f"⚠️ [Matching] batch recommendation fetch failed: {exc}")
         return 0
 
-    profiles = resp.data or []
-    jobs = fetch_recent_jobs(limit=recommendations_pool_limit, days=recommendations_days)
-    if not jobs:
-        return 0
-    job_embeddings = ensure_job_embeddings(jobs, persist=False)
-    generated = 0
-    for row in profiles:
-        user_id = row.get("id")
-        if not user_id:
-            continue
-        recs = recommend_jobs_for_user(
-            user_id,
-            limit=80,
-            allow_cache=False,
-            candidate=row,
-            jobs=jobs,
-            job_embeddings=job_embeddings,
-        )
-        if recs:
-            generated += 1
-    return generated
+    plan = cycle["plan"]
+    # A resumed run has no plan of its own and an empty job pool refreshed nobody: the
+    # cursor stays put so the next cycle sees the same changes.
+    if plan is not None and context["jobs"]:
+        extend_recommendation_cache(cycle["skipped"], ttl_minutes=60)
+        try:
+            tracker.commit(plan, context["failed_ids"])
+        except Exception as exc:
+            print(f"⚠️ [Matching] change tracking commit failed: {exc}")
+        print(f"🧠 [Matching Batch] job=recommendations change_tracking={json.dumps(plan.as_dict())}")
+    return int(context["generated"])
 
 
 def batch_refresh_market_layers() -> Dict[str, int]:
-    demand_rows = recompute_market_skill_demand()
-    from .demand import recompute_seasonal_bias_corrections
-    seasonal_rows = recompute_seasonal_bias_corrections()
+    # Demand and seasonal corrections come from one incremental aggregate (deltas of new and
+    # expired jobs); recompute_market_skill_demand() remains for a manual full rebuild.
+    demand = refresh_market_skill_demand()
     # salary normalization currently managed by data table updates, no recompute function yet
-    return {"demand_rows": demand_rows, "seasonal_rows": seasonal_rows, "salary_rows": 0}
+    return {"demand_rows": demand["demand_rows"], "seasonal_rows": demand["seasonal_rows"], "salary_rows": 0}
 
 
 def run_hourly_batch_jobs() -> None:
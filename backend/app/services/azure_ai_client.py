@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import time
@@ -187,14 +188,15 @@ def _usage_counts(payload: Dict[str, Any]) -> tuple[int, int]:
     )
 
 
-def call_ai_text(
+def build_chat_request(
     prompt: str,
     *,
     model_name: Optional[str] = None,
     temperature: float = 0.2,
-    timeout: int = 90,
+    top_p: float = 1,
     response_format: Optional[Dict[str, Any]] = None,
-) -> tuple[str, AzureAIResult]:
+) -> tuple[str, dict[str, str], Dict[str, Any], str]:
+    """URL, headers, JSON payload and resolved deployment for one chat completion."""
     url, headers, model_in_body = _chat_endpoint()
     # Pokud přijde model_name začínající na mistral, ignoruj jej a použij default podle prostředí
     model = model_name
@@ -213,7 +215,26 @@ def call_ai_text(
     # GPT-5 family deployments can reject temperature/top_p on some Azure routes.
     if _env("AZURE_AI_INCLUDE_SAMPLING_PARAMS", "false").lower() in {"1", "true", "yes", "on"}:
         payload["temperature"] = temperature
-        payload["top_p"] = 1
+        payload["top_p"] = top_p
+    return url, headers, payload, model
+
+
+def call_ai_text(
+    prompt: str,
+    *,
+    model_name: Optional[str] = None,
+    temperature: float = 0.2,
+    top_p: float = 1,
+    timeout: int = 90,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> tuple[str, AzureAIResult]:
+    url, headers, payload, model = build_chat_request(
+        prompt,
+        model_name=model_name,
+        temperature=temperature,
+        top_p=top_p,
+        response_format=response_format,
+    )
 
     started = time.perf_counter()
     try:
@@ -268,12 +289,104 @@ def call_ai_json(
     return _extract_json_object(text), result
 
 
-def call_ai_embed(
+def _fallback_deployment_name() -> Optional[str]:
+    return (
+        _env("AZURE_OPENAI_FALLBACK_DEPLOYMENT_NAME")
+        or _env("AZURE_AI_FALLBACK_DEPLOYMENT_NAME")
+        or _env("AZURE_AI_FALLBACK_MODEL")
+    )
+
+
+def _chat_request_chain(
+    prompt: str,
+    *,
+    model_name: Optional[str],
+    temperature: float,
+    response_format: Optional[Dict[str, Any]],
+):
+    from ..ai_orchestration.transport import ChatRequest
+
+    chain = []
+    fallback = _fallback_deployment_name()
+    for candidate in [model_name] + ([fallback] if fallback else []):
+        url, headers, payload, model = build_chat_request(
+            prompt,
+            model_name=candidate,
+            temperature=temperature,
+            response_format=response_format,
+        )
+        # Deployment-style URLs ignore the requested model, so a "fallback" would be the same call.
+        if all(existing.url != url or existing.payload != payload for existing in chain):
+            chain.append(ChatRequest("azure", model, url, headers, payload))
+    return chain
+
+
+async def acall_ai_text(
+    prompt: str,
+    *,
+    model_name: Optional[str] = None,
+    temperature: float = 0.2,
+    deadline_seconds: Optional[float] = None,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> tuple[str, AzureAIResult]:
+    """
+    Non-blocking ``call_ai_text`` on the pooled async transport. When a fallback
+    deployment is configured it is hedged in once the primary is unusually slow.
+    """
+    from ..ai_orchestration.client import AIClientError
+    from ..ai_orchestration.transport import get_ai_transport
+
+    chain = _chat_request_chain(prompt, model_name=model_name, temperature=temperature, response_format=response_format)
+    try:
+        result, _ = await get_ai_transport().complete(chain, deadline_seconds=deadline_seconds)
+    except AIClientError as exc:
+        raise AzureAIClientError(f"Azure AI request failed: {exc}") from exc
+    return result.text, AzureAIResult(
+        text=result.text,
+        model_name=result.model_name,
+        tokens_in=result.tokens_in,
+        tokens_out=result.tokens_out,
+        latency_ms=result.latency_ms,
+    )
+
+
+async def acall_ai_json(
+    prompt: str,
+    *,
+    model_name: Optional[str] = None,
+    temperature: float = 0.2,
+    deadline_seconds: Optional[float] = None,
+) -> tuple[Dict[str, Any], AzureAIResult]:
+    text, result = await acall_ai_text(
+        prompt,
+        model_name=model_name,
+        temperature=temperature,
+        deadline_seconds=deadline_seconds,
+        response_format={"type": "json_object"},
+    )
+    return _extract_json_object(text), result
+
+
+def stream_ai_text(
+    prompt: str,
+    *,
+    model_name: Optional[str] = None,
+    temperature: float = 0.2,
+    deadline_seconds: Optional[float] = None,
+):
+    """Token stream (``AIStream``) for ``prompt``; hedged on time-to-first-token."""
+    from ..ai_orchestration.transport import get_ai_transport
+
+    chain = _chat_request_chain(prompt, model_name=model_name, temperature=temperature, response_format=None)
+    return get_ai_transport().stream(chain, deadline_seconds=deadline_seconds)
+
+
+def build_embedding_request(
     texts: list[str],
     *,
     model_name: Optional[str] = None,
-    timeout: int = 60,
-) -> AzureAIEmbeddingResult:
+) -> tuple[str, dict[str, str], Dict[str, Any], str]:
+    """URL, headers, JSON payload and resolved model for one embeddings call."""
     key = _api_key()
     if not key:
         raise AzureAIClientError("Azure AI key is not configured")
@@ -321,13 +434,23 @@ def call_ai_embed(
     if model_in_body:
         payload["model"] = model
 
-    started = time.perf_counter()
     headers = {
         "api-key": key,
         "Authorization": f"Bearer {key}",
         "Content-Type": "application/json",
         "Accept": "application/json",
     }
+    return url, headers, payload, model
+
+
+def call_ai_embed(
+    texts: list[str],
+    *,
+    model_name: Optional[str] = None,
+    timeout: int = 60,
+) -> AzureAIEmbeddingResult:
+    url, headers, payload, model = build_embedding_request(texts, model_name=model_name)
+    started = time.perf_counter()
     resp = None
     for attempt in range(1, 6):
         logger.debug("POST embeddings %s (model=%s) attempt=%s", url, model, attempt)
@@ -360,3 +483,52 @@ def call_ai_embed(
         tokens_used=int(usage.get("total_tokens") or usage.get("prompt_tokens") or 0),
         latency_ms=int((time.perf_counter() - started) * 1000),
     )
+
+
+async def acall_ai_embed(
+    texts: list[str],
+    *,
+    model_name: Optional[str] = None,
+    deadline_seconds: Optional[float] = 60,
+) -> AzureAIEmbeddingResult:
+    from ..ai_orchestration.client import AIClientError
+    from ..ai_orchestration.transport import ChatRequest, get_ai_transport
+
+    url, headers, payload, model = build_embedding_request(texts, model_name=model_name)
+    request = ChatRequest("azure", model, url, headers, payload)
+    transport = get_ai_transport()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + float(deadline_seconds or transport.default_deadline)
+    started = time.perf_counter()
+    resp = None
+    try:
+        for attempt in range(1, 6):
+            resp = await transport.post_json(request, deadline_seconds=deadline - loop.time())
+            if resp.status_code != 429:
+                break
+            retry_after = resp.headers.get("Retry-After")
+            try:
+                delay = float(retry_after) if retry_after else float(attempt * 2)
+            except ValueError:
+                delay = float(attempt * 2)
+            await asyncio.sleep(max(0.0, min(delay, 15.0, deadline - loop.time())))
+    except AIClientError as exc:
+        raise AzureAIClientError(f"Azure AI embeddings request failed: {exc}") from exc
+    assert resp is not None
+    if resp.status_code >= 400:
+        raise AzureAIClientError(f"Azure AI embeddings HTTP {resp.status_code}: {resp.text[:500]}")
+    try:
+        response_payload = resp.json()
+    except Exception as exc:
+        raise AzureAIClientError(f"Azure AI embeddings returned invalid JSON (status {resp.status_code})") from exc
+    data = response_payload.get("data") or []
+    if not data:
+        raise AzureAIClientError("Azure AI embeddings response contained no data")
+    data.sort(key=lambda item: item.get("index", 0))
+    usage = response_payload.get("usage") or {}
+    return AzureAIEmbeddingResult(
+        embeddings=[item["embedding"] for item in data],
+        model_name=model,
+        tokens_used=int(usage.get("total_tokens") or usage.get("prompt_tokens") or 0),
+        latency_ms=int((time.perf_counter() - started) * 1000),
+    )
@@ -1,17 +1,25 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
 import os
 import json
 import unicodedata
 
+_INTENT_CACHE_MAX_ENTRIES = 16384
+
 
 def _normalize_text(value: Any) -> str:
     text = str(value or "").lower()
-    text = unicodedata.normalize("NFKD", text)
-    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        # Strip each distinct combining mark with one C-level pass instead of a per-character loop.
+        for mark in {ch for ch in set(text) if unicodedata.combining(ch)}:
+            text = text.replace(mark, "")
     return " ".join(text.split())
 
 
@@ -68,8 +76,79 @@ def _load_taxonomy() -> Dict[str, Any]:
         return json.load(handle)
 
 
-def _domains() -> Dict[str, Dict[str, Any]]:
-    return dict(_load_taxonomy().get("domains") or {})
+class CandidateIntentIndex:
+    """
+    Domain keywords normalized once per taxonomy load.
+
+    Every distinct literal (whole keywords and the parts of multi-word keywords) gets a
+    bit; a profile text is tested once per literal and domains are scored from the
+    resulting presence bitmap: a whole keyword scores 3.0, otherwise a multi-word keyword
+    whose parts all occur scores 1.5.
+    """
+
+    def __init__(self, taxonomy: Dict[str, Any]):
+        self.version = str(taxonomy.get("version") or "")
+        domains = dict(taxonomy.get("domains") or {})
+        bits: Dict[str, int] = {}
+
+        def bit(literal: str) -> int:
+            if literal not in bits:
+                bits[literal] = 1 << len(bits)
+            return bits[literal]
+
+        self._domain_keywords: Dict[str, Tuple[Tuple[int, int], ...]] = {}
+        self._raw_keywords: Dict[str, Tuple[str, ...]] = {}
+        self._related: Dict[str, Tuple[str, ...]] = {}
+        for domain_key, definition in domains.items():
+            definition = definition or {}
+            entries: List[Tuple[int, int]] = []
+            for keyword in definition.get("keywords") or []:
+                normalized_keyword = _normalize_text(keyword)
+                if not normalized_keyword:
+                    continue
+                parts = [part for part in normalized_keyword.split(" ") if part]
+                parts_mask = 0
+                if len(parts) > 1:
+                    for part in parts:
+                        parts_mask |= bit(part)
+                entries.append((bit(normalized_keyword), parts_mask))
+            self._domain_keywords[domain_key] = tuple(entries)
+            self._raw_keywords[domain_key] = tuple(str(item) for item in definition.get("keywords") or [] if str(item or "").strip())
+            self._related[domain_key] = tuple(str(item) for item in definition.get("related") or [] if str(item or "").strip())
+        self._literals: Tuple[Tuple[str, int], ...] = tuple(bits.items())
+
+    def presence(self, joined: str) -> int:
+        mask = 0
+        for literal, literal_bit in self._literals:
+            if literal in joined:
+                mask |= literal_bit
+        return mask
+
+    def score(self, joined: str) -> List[Dict[str, Any]]:
+        present = self.presence(joined)
+        scores: List[Dict[str, Any]] = []
+        for domain_key, entries in self._domain_keywords.items():
+            score = 0.0
+            for keyword_bit, parts_mask in entries:
+                if present & keyword_bit:
+                    score += 3.0
+                elif parts_mask and present & parts_mask == parts_mask:
+                    score += 1.5
+            if score > 0:
+                scores.append({"domain": domain_key, "score": score})
+        scores.sort(key=lambda item: item["score"], reverse=True)
+        return scores
+
+    def keywords(self, domain_key: str) -> List[str]:
+        return list(self._raw_keywords.get(domain_key, ()))
+
+    def related(self, domain_key: str) -> List[str]:
+        return list(self._related.get(domain_key, ()))
+
+
+@lru_cache(maxsize=1)
+def _intent_index() -> CandidateIntentIndex:
+    return CandidateIntentIndex(_load_taxonomy())
 
 
 def _candidate_profile_obj(candidate_profile: Any) -> Dict[str, Any]:
@@ -101,24 +180,7 @@ def _score_domains(chunks: List[str]) -> List[Dict[str, Any]]:
     joined = "\n".join(_normalize_text(chunk) for chunk in chunks if str(chunk or "").strip())
     if not joined:
         return []
-
-    scores: List[Dict[str, Any]] = []
-    for domain_key, definition in _domains().items():
-        score = 0.0
-        for keyword in definition.get("keywords") or []:
-            normalized_keyword = _normalize_text(keyword)
-            if not normalized_keyword:
-                continue
-            if normalized_keyword in joined:
-                score += 3.0
-                continue
-            parts = [part for part in normalized_keyword.split(" ") if part]
-            if len(parts) > 1 and all(part in joined for part in parts):
-                score += 1.5
-        if score > 0:
-            scores.append({"domain": domain_key, "score": score})
-    scores.sort(key=lambda item: item["score"], reverse=True)
-    return scores
+    return _intent_index().score(joined)
 
 
 def _infer_seniority(*sources: Any) -> Optional[str]:
@@ -154,18 +216,66 @@ def get_domain_keywords(domain_key: Optional[str]) -> List[str]:
     key = str(domain_key or "").strip()
     if not key:
         return []
-    return [str(item) for item in (_domains().get(key, {}) or {}).get("keywords") or [] if str(item or "").strip()]
+    return _intent_index().keywords(key)
 
 
 def get_related_domains(domain_key: Optional[str]) -> List[str]:
     key = str(domain_key or "").strip()
     if not key:
         return []
-    return [str(item) for item in (_domains().get(key, {}) or {}).get("related") or [] if str(item or "").strip()]
+    return _intent_index().related(key)
+
+
+_intent_cache_lock = Lock()
+_intent_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def _profile_version(profile: Dict[str, Any]) -> str:
+    """Fingerprint of exactly the profile fields the intent resolution reads."""
+    preferences = profile.get("preferences") if isinstance(profile.get("preferences"), dict) else {}
+    payload = {
+        "taxonomy": _intent_index().version,
+        "job_title": profile.get("job_title"),
+        "cv_text": profile.get("cv_text"),
+        "cv_ai_text": profile.get("cv_ai_text"),
+        "skills": profile.get("skills"),
+        "inferred_skills": profile.get("inferred_skills"),
+        "desired_role": preferences.get("desired_role"),
+        "search_profile": preferences.get("searchProfile"),
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(encoded.encode("utf-8", "surrogatepass"), digest_size=20).hexdigest()
+
+
+def _copy_intent(intent: Dict[str, Any]) -> Dict[str, Any]:
+    return {**intent, "secondary_domains": list(intent["secondary_domains"])}
+
+
+def clear_candidate_intent_cache() -> None:
+    with _intent_cache_lock:
+        _intent_cache.clear()
 
 
 def resolve_candidate_intent_profile(candidate_profile: Any) -> Dict[str, Any]:
+    """Intent (domains, role, seniority) for a profile, cached per profile version."""
     profile = _candidate_profile_obj(candidate_profile)
+    version = _profile_version(profile)
+    with _intent_cache_lock:
+        cached = _intent_cache.get(version)
+        if cached is not None:
+            _intent_cache.move_to_end(version)
+    if cached is not None:
+        return _copy_intent(cached)
+
+    intent = _resolve_candidate_intent_profile(profile)
+    with _intent_cache_lock:
+        _intent_cache[version] = _copy_intent(intent)
+        while len(_intent_cache) > _INTENT_CACHE_MAX_ENTRIES:
+            _intent_cache.popitem(last=False)
+    return intent
+
+
+def _resolve_candidate_intent_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
     preferences = profile.get("preferences") if isinstance(profile.get("preferences"), dict) else {}
     search_profile = preferences.get("searchProfile") if isinstance(preferences.get("searchProfile"), dict) else {}
     chunks = _collect_profile_chunks(profile)
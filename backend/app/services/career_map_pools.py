@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import gzip
+import json
+import os
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from math import asin, cos, radians, sin, sqrt
-from threading import Lock
-from typing import Any, Optional
+from threading import Lock, Thread
+from typing import Any, Callable, Optional
+
+import numpy as np
 
 from ..core import config
-from .job_intelligence import _ensure_job_intelligence_schema_for_read
+from .job_intelligence import _ensure_job_intelligence_schema_for_read, _infer_seniority
 from .jobs_postgres_store import (
     _connect,
     _ensure_schema_for_read,
@@ -20,9 +26,16 @@ _DEFAULT_MARKETS = ("CZ", "SK", "PL", "DE", "AT")
 _POOL_LIMIT_PER_MARKET = 2400
 _POOL_LIMIT_GLOBAL = 4800
 _POOL_STALE_AFTER = timedelta(hours=9)
+_POOL_REFRESH_RETRY_AFTER = timedelta(minutes=5)
+_SNAPSHOT_VERSION = 1
 
 _cache_lock = Lock()
+# cache key (market code or "GLOBAL") -> {"generated_at", "index", "scope", "country_code"}
 _career_map_pool_cache: dict[str, dict[str, Any]] = {}
+_active_job_count: dict[str, Any] = {"value": None, "updated_at": None}
+_refresh_inflight: set[str] = set()
+_last_refresh_attempt: dict[str, datetime] = {}
+_snapshot_loaded = False
 
 
 def _utcnow() -> datetime:
@@ -90,11 +103,8 @@ def _matches_work_arrangement(job: dict[str, Any], work_arrangement: str, remote
     return arrangement != "remote"
 
 
-def _matches_contract_types(job: dict[str, Any], contract_types: list[str]) -> bool:
-    normalized_types = [str(item or "").strip().lower() for item in contract_types if str(item or "").strip()]
-    if not normalized_types:
-        return True
-
+def _contract_flags(job: dict[str, Any]) -> tuple[bool, bool]:
+    """(looks like employment, looks like contracting) from contract type, title and description."""
     haystack = " ".join(
         [
             _normalize_text(job.get("contract_type")),
@@ -102,17 +112,21 @@ def _matches_contract_types(job: dict[str, Any], contract_types: list[str]) -> b
             _normalize_text(job.get("description")),
         ]
     )
+    is_employee = any(token in haystack for token in ("hpp", "full-time", "full time", "zamestnani", "employment"))
+    is_contractor = any(token in haystack for token in ("ico", "contractor", "freelance", "contract", "b2b"))
+    return is_employee, is_contractor
 
-    def _is_employee() -> bool:
-        return any(token in haystack for token in ("hpp", "full-time", "full time", "zamestnani", "employment"))
 
-    def _is_contractor() -> bool:
-        return any(token in haystack for token in ("ico", "contractor", "freelance", "contract", "b2b"))
+def _matches_contract_types(job: dict[str, Any], contract_types: list[str]) -> bool:
+    normalized_types = [str(item or "").strip().lower() for item in contract_types if str(item or "").strip()]
+    if not normalized_types:
+        return True
 
+    is_employee, is_contractor = _contract_flags(job)
     allowed = False
-    if "employee" in normalized_types and _is_employee():
+    if "employee" in normalized_types and is_employee:
         allowed = True
-    if "contractor" in normalized_types and _is_contractor():
+    if "contractor" in normalized_types and is_contractor:
         allowed = True
     return allowed
 
@@ -163,6 +177,7 @@ def _serialize_pool_rows(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
             "domain_key": row.get("domain_key"),
             "market_code": row.get("market_code"),
             "mapping_confidence": row.get("mapping_confidence"),
+            "seniority": row.get("seniority"),
         }
         if any(value not in (None, "", []) for value in intelligence.values()):
             copy["job_intelligence"] = intelligence
@@ -195,7 +210,8 @@ def _read_pool_rows(country_code: Optional[str], *, limit: int) -> list[dict[str
                 ji.role_family,
                 ji.domain_key,
                 ji.market_code,
-                ji.mapping_confidence
+                ji.mapping_confidence,
+                ji.seniority
             FROM {config.JOBS_POSTGRES_JOBS_TABLE} j
             LEFT JOIN {config.JOBS_POSTGRES_JOB_INTELLIGENCE_TABLE} ji
               ON ji.job_id = j.id
@@ -213,6 +229,153 @@ def _read_pool_rows(country_code: Optional[str], *, limit: int) -> list[dict[str
     return _serialize_pool_rows(rows)
 
 
+
+
+def _safe_int(value: Any) -> int:
+    parsed = _safe_float(value)
+    return int(parsed) if parsed is not None else 0
+
+
+def _bitmaps(values: list[str]) -> dict[str, np.ndarray]:
+    column = np.array(values, dtype=object)
+    return {value: column == value for value in set(values)}
+
+
+class CareerMapPoolIndex:
+    """
+    Columnar view of one pool. Categorical fields (country, role family, work model,
+    seniority) get one boolean bitmap per value and numeric fields one NumPy column, so
+    a request ANDs a handful of arrays instead of re-deriving every job dict.
+    """
+
+    _BENEFIT_MEMO_SIZE = 64
+
+    def __init__(self, jobs: list[dict[str, Any]]):
+        self.jobs = list(jobs)
+        size = len(self.jobs)
+        countries: list[str] = []
+        arrangements: list[str] = []
+        role_families: list[str] = []
+        seniorities: list[str] = []
+        self.is_employee = np.zeros(size, dtype=bool)
+        self.is_contractor = np.zeros(size, dtype=bool)
+        self.salary_from = np.zeros(size, dtype=np.int64)
+        self.lat = np.full(size, np.nan)
+        self.lng = np.full(size, np.nan)
+        self._benefit_texts: list[str] = []
+
+        for position, job in enumerate(self.jobs):
+            intelligence = job.get("job_intelligence") or {}
+            countries.append(_normalize_country_code(job.get("country_code")))
+            arrangements.append(_infer_work_arrangement(job))
+            role_families.append(_normalize_text(intelligence.get("role_family")))
+            seniorities.append(_normalize_text(intelligence.get("seniority")) or _infer_seniority(job.get("title")))
+            self.is_employee[position], self.is_contractor[position] = _contract_flags(job)
+            self.salary_from[position] = _safe_int(job.get("salary_from"))
+            lat = _safe_float(job.get("lat"))
+            lng = _safe_float(job.get("lng"))
+            if lat is not None and lng is not None:
+                self.lat[position] = lat
+                self.lng[position] = lng
+            self._benefit_texts.append(
+                " ".join(str(item or "").strip().lower() for item in (job.get("benefits") or []) if str(item or "").strip())
+            )
+
+        self.bitmaps = {
+            "country": _bitmaps(countries),
+            "work_arrangement": _bitmaps(arrangements),
+            "role_family": _bitmaps(role_families),
+            "seniority": _bitmaps(seniorities),
+        }
+        self._benefit_masks: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def any_of(self, field: str, values: list[str]) -> np.ndarray:
+        mask = np.zeros(len(self.jobs), dtype=bool)
+        for value in values:
+            bitmap = self.bitmaps[field].get(value)
+            if bitmap is not None:
+                mask |= bitmap
+        return mask
+
+    def _benefit_mask(self, benefit: str) -> np.ndarray:
+        mask = self._benefit_masks.get(benefit)
+        if mask is None:
+            mask = np.fromiter((benefit in text for text in self._benefit_texts), dtype=bool, count=len(self._benefit_texts))
+            self._benefit_masks[benefit] = mask
+            while len(self._benefit_masks) > self._BENEFIT_MEMO_SIZE:
+                self._benefit_masks.popitem(last=False)
+        return mask
+
+    def _within_radius(self, user_lat: float, user_lng: float, radius_km: float) -> np.ndarray:
+        lat1 = np.radians(user_lat)
+        lat2 = np.radians(self.lat)
+        delta_lat = lat2 - lat1
+        delta_lng = np.radians(self.lng - user_lng)
+        value = np.sin(delta_lat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(delta_lng / 2) ** 2
+        with np.errstate(invalid="ignore"):
+            return (2 * 6371.0 * np.arcsin(np.sqrt(value))) <= radius_km
+
+    def select(
+        self,
+        *,
+        country_code: str = "",
+        limit: int = 1200,
+        user_lat: Optional[float] = None,
+        user_lng: Optional[float] = None,
+        radius_km: Optional[float] = None,
+        remote_only: bool = False,
+        work_arrangement: str = "all",
+        contract_types: Optional[list[str]] = None,
+        min_salary: Optional[int] = None,
+        benefits: Optional[list[str]] = None,
+        role_families: Optional[list[str]] = None,
+        seniority_levels: Optional[list[str]] = None,
+    ) -> list[dict[str, Any]]:
+        """Same semantics and order as the per-job ``_matches_*`` predicates, first ``limit`` hits."""
+        mask = np.ones(len(self.jobs), dtype=bool)
+        if country_code:
+            mask &= self.any_of("country", [country_code])
+
+        arrangement = str(work_arrangement or "all").strip().lower()
+        if remote_only or arrangement == "remote":
+            mask &= self.any_of("work_arrangement", ["remote"])
+        elif arrangement in {"hybrid", "onsite"}:
+            mask &= self.any_of("work_arrangement", [arrangement])
+        else:
+            mask &= ~self.any_of("work_arrangement", ["remote"])
+
+        normalized_types = [str(item or "").strip().lower() for item in (contract_types or []) if str(item or "").strip()]
+        if normalized_types:
+            allowed = np.zeros(len(self.jobs), dtype=bool)
+            if "employee" in normalized_types:
+                allowed |= self.is_employee
+            if "contractor" in normalized_types:
+                allowed |= self.is_contractor
+            mask &= allowed
+
+        if min_salary:
+            mask &= self.salary_from >= int(min_salary)
+        for benefit in [str(item or "").strip().lower() for item in (benefits or []) if str(item or "").strip()]:
+            mask &= self._benefit_mask(benefit)
+        if role_families:
+            mask &= self.any_of("role_family", [_normalize_text(item) for item in role_families])
+        if seniority_levels:
+            mask &= self.any_of("seniority", [_normalize_text(item) for item in seniority_levels])
+
+        if radius_km and not remote_only and arrangement != "remote":
+            if user_lat is not None and user_lng is not None and radius_km > 0:
+                mask &= self._within_radius(float(user_lat), float(user_lng), float(radius_km))
+
+        positions = np.flatnonzero(mask)[: max(1, int(limit or 1200))]
+        return [self.jobs[position] for position in positions]
+
+
+_EMPTY_INDEX = CareerMapPoolIndex([])
+
+
 def _cache_entry_stale(entry: Optional[dict[str, Any]]) -> bool:
     if not entry:
         return True
@@ -222,7 +385,145 @@ def _cache_entry_stale(entry: Optional[dict[str, Any]]) -> bool:
     return (_utcnow() - generated_at) > _POOL_STALE_AFTER
 
 
+def _run_in_background(fn: Callable[[], None]) -> None:
+    Thread(target=fn, name="career-map-pool-refresh", daemon=True).start()
+
+
+def _refresh_active_job_count() -> int:
+    value = count_active_main_jobs()
+    with _cache_lock:
+        _active_job_count.update({"value": value, "updated_at": _utcnow()})
+    return value
+
+
+def _cached_active_job_count() -> int:
+    """Last known active job count; refreshed in the background once older than the TTL."""
+    with _cache_lock:
+        value = _active_job_count.get("value")
+        updated_at = _active_job_count.get("updated_at")
+        stale = not isinstance(updated_at, datetime) or (
+            (_utcnow() - updated_at).total_seconds() > config.CAREER_MAP_ACTIVE_COUNT_TTL_SECONDS
+        )
+        schedule = stale and "__count__" not in _refresh_inflight
+        if schedule:
+            _refresh_inflight.add("__count__")
+
+    if schedule:
+        def run() -> None:
+            try:
+                _refresh_active_job_count()
+            except Exception as exc:
+                print(f"⚠️ [CareerMap] active job count refresh failed: {exc}")
+            finally:
+                with _cache_lock:
+                    _refresh_inflight.discard("__count__")
+
+        _run_in_background(run)
+    return int(value or 0)
+
+
+def _schedule_pool_refresh(cache_key: str) -> bool:
+    """Start at most one background rebuild per pool; failed rebuilds back off before retrying."""
+    now = _utcnow()
+    with _cache_lock:
+        if cache_key in _refresh_inflight:
+            return False
+        last_attempt = _last_refresh_attempt.get(cache_key)
+        if last_attempt is not None and (now - last_attempt) < _POOL_REFRESH_RETRY_AFTER:
+            return False
+        _refresh_inflight.add(cache_key)
+        _last_refresh_attempt[cache_key] = now
+
+    def run() -> None:
+        try:
+            refresh_career_map_pools(country_codes=None if cache_key == "GLOBAL" else [cache_key])
+        except Exception as exc:
+            print(f"⚠️ [CareerMap] background pool refresh for {cache_key} failed: {exc}")
+        finally:
+            with _cache_lock:
+                _refresh_inflight.discard(cache_key)
+
+    _run_in_background(run)
+    return True
+
+
+def _write_pool_snapshot() -> None:
+    path = config.CAREER_MAP_POOL_SNAPSHOT_PATH
+    if not path:
+        return
+    with _cache_lock:
+        pools = {
+            key: {
+                "generated_at": entry["generated_at"].isoformat(),
+                "scope": entry.get("scope"),
+                "country_code": entry.get("country_code"),
+                "jobs": entry["index"].jobs,
+            }
+            for key, entry in _career_map_pool_cache.items()
+        }
+        count_updated_at = _active_job_count.get("updated_at")
+        payload = {
+            "version": _SNAPSHOT_VERSION,
+            "pools": pools,
+            "active_job_count": _active_job_count.get("value"),
+            "active_job_count_updated_at": count_updated_at.isoformat() if isinstance(count_updated_at, datetime) else None,
+        }
+    try:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=3) as handle:
+            json.dump(payload, handle, default=str)
+        os.replace(tmp_path, path)
+    except Exception as exc:
+        print(f"⚠️ [CareerMap] pool snapshot write failed: {exc}")
+
+
+def load_career_map_pool_snapshot() -> int:
+    """Seed empty pools from the on-disk snapshot so a fresh worker serves immediately."""
+    global _snapshot_loaded
+    with _cache_lock:
+        if _snapshot_loaded:
+            return 0
+        _snapshot_loaded = True
+
+    path = config.CAREER_MAP_POOL_SNAPSHOT_PATH
+    if not path or not os.path.exists(path):
+        return 0
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            payload = json.load(handle)
+        if payload.get("version") != _SNAPSHOT_VERSION:
+            return 0
+        entries = {
+            key: {
+                "generated_at": datetime.fromisoformat(pool["generated_at"]),
+                "index": CareerMapPoolIndex(pool.get("jobs") or []),
+                "scope": pool.get("scope"),
+                "country_code": pool.get("country_code"),
+            }
+            for key, pool in (payload.get("pools") or {}).items()
+        }
+    except Exception as exc:
+        print(f"⚠️ [CareerMap] ignoring unreadable pool snapshot {path}: {exc}")
+        return 0
+
+    with _cache_lock:
+        for key, entry in entries.items():
+            _career_map_pool_cache.setdefault(key, entry)
+        if _active_job_count.get("value") is None and payload.get("active_job_count") is not None:
+            count_updated_at = payload.get("active_job_count_updated_at")
+            _active_job_count.update(
+                {
+                    "value": int(payload["active_job_count"]),
+                    "updated_at": datetime.fromisoformat(count_updated_at) if count_updated_at else None,
+                }
+            )
+    return len(entries)
+
+
 def refresh_career_map_pools(*, country_codes: Optional[list[str]] = None) -> dict[str, Any]:
+    """Rebuild pools (scheduler / background only). Readers keep the old pools until the swap."""
     if not jobs_postgres_main_enabled():
         return {"enabled": False, "markets": {}, "global": 0}
 
@@ -236,7 +537,7 @@ def refresh_career_map_pools(*, country_codes: Optional[list[str]] = None) -> di
         jobs = _read_pool_rows(country_code, limit=_POOL_LIMIT_PER_MARKET)
         next_cache[country_code] = {
             "generated_at": generated_at,
-            "jobs": jobs,
+            "index": CareerMapPoolIndex(jobs),
             "scope": "domestic",
             "country_code": country_code,
         }
@@ -245,19 +546,25 @@ def refresh_career_map_pools(*, country_codes: Optional[list[str]] = None) -> di
     global_jobs = _read_pool_rows(None, limit=_POOL_LIMIT_GLOBAL)
     next_cache["GLOBAL"] = {
         "generated_at": generated_at,
-        "jobs": global_jobs,
+        "index": CareerMapPoolIndex(global_jobs),
         "scope": "all",
         "country_code": None,
     }
 
     with _cache_lock:
         _career_map_pool_cache.update(next_cache)
+        for key in next_cache:
+            _last_refresh_attempt.pop(key, None)
+
+    active_count = _refresh_active_job_count()
+    _write_pool_snapshot()
 
     return {
         "enabled": True,
         "generated_at": generated_at.isoformat(),
         "markets": refreshed,
         "global": len(global_jobs),
+        "active_count": active_count,
     }
 
 
@@ -274,57 +581,60 @@ def get_career_map_pool(
     contract_types: Optional[list[str]] = None,
     min_salary: Optional[int] = None,
     benefits: Optional[list[str]] = None,
+    role_families: Optional[list[str]] = None,
+    seniority_levels: Optional[list[str]] = None,
 ) -> dict[str, Any]:
     normalized_scope = "all" if str(scope or "").strip().lower() == "all" else "domestic"
     normalized_country = _normalize_country_code(country_code)
     cache_key = "GLOBAL" if normalized_scope == "all" or not normalized_country else normalized_country
+    enabled = jobs_postgres_main_enabled()
+
+    if not _snapshot_loaded:
+        load_career_map_pool_snapshot()
 
     with _cache_lock:
         entry = _career_map_pool_cache.get(cache_key)
 
-    if _cache_entry_stale(entry):
-        refresh_career_map_pools(country_codes=None if cache_key == "GLOBAL" else [cache_key])
-        with _cache_lock:
-            entry = _career_map_pool_cache.get(cache_key)
-
-    base_jobs = list((entry or {}).get("jobs") or [])
-    filtered: list[dict[str, Any]] = []
-    normalized_contract_types = [str(item or "").strip().lower() for item in (contract_types or []) if str(item or "").strip()]
-    normalized_benefits = [str(item or "").strip().lower() for item in (benefits or []) if str(item or "").strip()]
-
-    for job in base_jobs:
-        if normalized_scope == "domestic" and normalized_country:
-            if _normalize_country_code(job.get("country_code")) != normalized_country:
-                continue
-        if not _matches_work_arrangement(job, work_arrangement, remote_only):
-            continue
-        if not _matches_contract_types(job, normalized_contract_types):
-            continue
-        if min_salary and int(job.get("salary_from") or 0) < int(min_salary):
-            continue
-        if not _has_required_benefits(job, normalized_benefits):
-            continue
-        if radius_km and not remote_only and str(work_arrangement or "all").strip().lower() != "remote":
-            if not _matches_commute(job, user_lat, user_lng, radius_km):
-                continue
-        filtered.append(job)
-        if len(filtered) >= max(1, int(limit or 1200)):
-            break
+    # Never rebuild inside the request: serve what we have (possibly stale or empty while warming).
+    stale = _cache_entry_stale(entry)
+    if stale and enabled:
+        _schedule_pool_refresh(cache_key)
+
+    index: CareerMapPoolIndex = (entry or {}).get("index") or _EMPTY_INDEX
+    filtered = index.select(
+        country_code=normalized_country if normalized_scope == "domestic" else "",
+        limit=limit,
+        user_lat=user_lat,
+        user_lng=user_lng,
+        radius_km=radius_km,
+        remote_only=remote_only,
+        work_arrangement=work_arrangement,
+        contract_types=contract_types,
+        min_salary=min_salary,
+        benefits=benefits,
+        role_families=role_families,
+        seniority_levels=seniority_levels,
+    )
 
     generated_at = (entry or {}).get("generated_at")
     cache_age_seconds = None
     if isinstance(generated_at, datetime):
         cache_age_seconds = max(0, int((_utcnow() - generated_at).total_seconds()))
 
+    with _cache_lock:
+        refreshing = cache_key in _refresh_inflight
+
     return {
         "jobs": filtered,
         "meta": {
             "scope": normalized_scope,
             "country_code": normalized_country or None,
-            "base_pool_count": len(base_jobs),
+            "base_pool_count": len(index),
             "filtered_count": len(filtered),
             "generated_at": generated_at.isoformat() if isinstance(generated_at, datetime) else None,
             "cache_age_seconds": cache_age_seconds,
-            "database_total_count": count_active_main_jobs() if jobs_postgres_main_enabled() else 0,
+            "stale": stale,
+            "refreshing": refreshing,
+            "database_total_count": _cached_active_job_count() if enabled else 0,
         },
     }
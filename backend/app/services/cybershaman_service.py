@@ -2,7 +2,9 @@ import json
 from pathlib import Path
 from typing import Any, Dict, List
 
-from app.services.azure_ai_client import AzureAIClientError, call_ai_json
+from app.ai_orchestration.context_budget import compact_json, compact_messages
+from app.ai_orchestration.prompt_registry import get_prompt_budget
+from app.services.azure_ai_client import AzureAIClientError, acall_ai_json, call_ai_json
 from app.services.shami_persona import shami_persona_prompt
 
 
@@ -85,18 +87,19 @@ def _profile_context(profile: Dict[str, Any] | None) -> Dict[str, Any]:
     }
 
 
-def build_cybershaman_reply(
+def _build_cybershaman_reply_prompt(
     *,
     message: str,
     profile: Dict[str, Any] | None,
     recent_messages: List[Dict[str, str]] | None = None,
     job_recommendations: List[Dict[str, Any]] | None = None,
-) -> Dict[str, Any]:
+) -> str:
     cleaned_message = str(message or "").strip()
     if not cleaned_message:
         raise ValueError("message is required")
 
     lang = _detect_language(profile, cleaned_message)
+    budget = get_prompt_budget("mentor_chat")
 
     prompt = f"""
 System Instructions:
@@ -110,13 +113,13 @@ You have FULL ACCESS to the candidate's profile data below. The "has_cv" field t
 - For jobs: recommend strictly from the database list below. If the list is empty, say no matching recommendation is available from current data.
 
 Candidate context:
-{json.dumps(_profile_context(profile), ensure_ascii=False, default=str)}
+{compact_json(_profile_context(profile), budget["profile"])}
 
 Job recommendations from database:
-{json.dumps(job_recommendations or [], ensure_ascii=False, default=str)}
+{compact_json(job_recommendations or [], budget["job_recommendations"])}
 
 Recent conversation:
-{json.dumps(recent_messages or [], ensure_ascii=False, default=str)}
+{compact_json(compact_messages(recent_messages or [], budget["history"]), budget["history"])}
 
 User message:
 {cleaned_message}
@@ -136,7 +139,10 @@ Output format:
   ]
 }}
 """
-    payload, result = call_ai_json(prompt, temperature=0.45, timeout=45)
+    return prompt
+
+
+def _build_cybershaman_reply_result(payload: Dict[str, Any], result: Any, job_recommendations: List[Dict[str, Any]] | None) -> Dict[str, Any]:
     reply_val = payload.get("reply")
     if isinstance(reply_val, dict) and "reply" in reply_val:
         reply = str(reply_val.get("reply") or "").strip()
@@ -171,3 +177,28 @@ Output format:
             "out": result.tokens_out,
         },
     }
+
+
+def build_cybershaman_reply(
+    *,
+    message: str,
+    profile: Dict[str, Any] | None,
+    recent_messages: List[Dict[str, str]] | None = None,
+    job_recommendations: List[Dict[str, Any]] | None = None,
+) -> Dict[str, Any]:
+    prompt = _build_cybershaman_reply_prompt(message=message, profile=profile, recent_messages=recent_messages, job_recommendations=job_recommendations)
+    payload, result = call_ai_json(prompt, temperature=0.45, timeout=45)
+    return _build_cybershaman_reply_result(payload, result, job_recommendations)
+
+
+async def abuild_cybershaman_reply(
+    *,
+    message: str,
+    profile: Dict[str, Any] | None,
+    recent_messages: List[Dict[str, str]] | None = None,
+    job_recommendations: List[Dict[str, Any]] | None = None,
+) -> Dict[str, Any]:
+    """Non-blocking variant for async endpoints (pooled transport, 45 s deadline)."""
+    prompt = _build_cybershaman_reply_prompt(message=message, profile=profile, recent_messages=recent_messages, job_recommendations=job_recommendations)
+    payload, result = await acall_ai_json(prompt, temperature=0.45, deadline_seconds=45)
+    return _build_cybershaman_reply_result(payload, result, job_recommendations)
@@ -1,7 +1,8 @@
 from __future__ import annotations
-import json
 from typing import Any, Dict, List
 from ..ai_orchestration.client import call_primary_with_fallback, _extract_json, AIClientError
+from ..ai_orchestration.context_budget import compact_json
+from ..ai_orchestration.prompt_registry import get_prompt_budget
 from ..core.runtime_config import get_active_model_config
 
 DEFAULT_REPORT = {
@@ -371,7 +372,8 @@ def _build_fallback_report(payload: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _build_prompt(payload: Dict[str, Any]) -> str:
+def _build_prompt(payload: Dict[str, Any], budget: Dict[str, int] | None = None) -> str:
+    budget = budget or get_prompt_budget("jcfpm_report")
     return f"""
 Vytvoř personalizovaný career report na základě následujícího profilu.
 Piš česky, srozumitelně pro netechnického uživatele. Styl: věcný, podpůrný, konkrétní.
@@ -400,7 +402,7 @@ Pravidla:
 - U top_roles vždy přidej "proč" ve formě: "Sedí díky [dimenze A] + [dimenze B] a tomu, jak se to projevuje v praxi."
 
 Profil:
-{json.dumps(payload, ensure_ascii=False, indent=2)}
+{compact_json(payload, budget["payload"])}
 """.strip()
 
 
@@ -412,7 +414,7 @@ def generate_jcfpm_report(payload: Dict[str, Any]) -> Dict[str, Any]:
         "temperature": cfg.get("temperature", 0.2),
         "top_p": cfg.get("top_p", 1),
     }
-    prompt = _build_prompt(payload)
+    prompt = _build_prompt(payload, get_prompt_budget("jcfpm_report", cfg.get("token_budget")))
     try:
         result, _ = call_primary_with_fallback(prompt, primary, fallback, generation_config=generation_config)
         parsed = _extract_json(result.text)
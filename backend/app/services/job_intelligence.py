@@ -419,6 +419,8 @@ Shortlist:
             get_default_primary_model(),
             get_default_fallback_model(),
             generation_config={"temperature": 0, "top_p": 1, "top_k": 1},
+            cache=True,
+            cache_valid=lambda text: str(_extract_json(text).get("role_id") or "").strip() in _roles_by_id(),
         )
         parsed = _extract_json(result.text)
     except (AIClientError, ValueError, TypeError, json.JSONDecodeError):
@@ -768,7 +770,9 @@ def _jobs_needing_refresh(
         where_parts.append("j.id = ANY(%s)")
         params.append([str(item).strip() for item in job_ids if str(item).strip()])
     if not force:
-        where_parts.append("(ji.job_id IS NULL OR ji.source_updated_at < j.updated_at)")
+        # Rewrites that leave the job's content fingerprint alone do not move
+        # content_changed_at, so they do not queue the job for remapping.
+        where_parts.append("(ji.job_id IS NULL OR ji.source_updated_at < COALESCE(j.content_changed_at, j.updated_at))")
     where_parts.append("COALESCE(j.status, 'active') = 'active'")
     where_parts.append("COALESCE(j.legality_status, 'legal') = 'legal'")
     where_sql = " AND ".join(where_parts) if where_parts else "TRUE"
@@ -777,7 +781,8 @@ def _jobs_needing_refresh(
         cur.execute(
             f"""
             SELECT j.id, j.title, j.company, j.location, j.description, j.role_summary, j.work_model, j.work_type,
-                   j.country_code, j.language_code, j.tags, j.payload_json, j.updated_at
+                   j.country_code, j.language_code, j.tags, j.payload_json,
+                   COALESCE(j.content_changed_at, j.updated_at) AS updated_at
             FROM {config.JOBS_POSTGRES_JOBS_TABLE} j
             LEFT JOIN {config.JOBS_POSTGRES_JOB_INTELLIGENCE_TABLE} ji
               ON ji.job_id = j.id
@@ -12,6 +12,7 @@ from ..ai_orchestration.client import (
     call_primary_with_fallback,
     get_default_fallback_model,
     get_default_primary_model,
+    is_json_object,
     resolve_ai_provider,
 )
 from ..core import config
@@ -1535,6 +1536,7 @@ Rules:
             fallback_model=_signal_boost_fallback_model(),
             generation_config={"temperature": 0.35, "top_p": 0.9},
             provider_override=_signal_boost_ai_provider(),
+            cache=False,
         )
         parsed = _extract_json(result.text)
         response_payload = {
@@ -1709,6 +1711,8 @@ Rules:
             fallback_model=_signal_boost_fallback_model(),
             generation_config={"temperature": 0.1, "top_p": 0.9},
             provider_override=_signal_boost_ai_provider(),
+            cache=True,
+            cache_valid=is_json_object,
         )
         parsed = _extract_json(result.text)
         scores_raw = dict(parsed.get("scores") or {})
@@ -292,6 +292,7 @@ def _generate_application_draft_text(prompt: str) -> tuple[str, dict[str, Any]]:
         primary_model,
         fallback_model,
         generation_config=generation_config,
+        cache=False,
     )
     text = _clip_words(result.text or "", 220)
     return text, {
@@ -7,6 +7,7 @@ from typing import Any
 from fastapi import Request
 
 from ..core.database import supabase
+from ..core.event_writer import write_event
 from ..core.security import verify_supabase_token
 from ..utils.helpers import now_iso
 from .jobs_shared import (
@@ -332,22 +333,18 @@ def _write_analytics_event(
 ) -> None:
     if not supabase or not event_type:
         return
-    try:
-        supabase.table("analytics_events").insert(
-            {
-                "event_type": event_type,
-                "user_id": user_id or None,
-                "company_id": company_id or None,
-                "feature": feature or None,
-                "tier": tier or None,
-                "metadata": metadata or {},
-                "created_at": now_iso(),
-            }
-        ).execute()
-    except Exception as exc:
-        if _is_missing_table_error(exc, "analytics_events"):
-            return
-        print(f"⚠️ Failed to write analytics event {event_type}: {exc}")
+    write_event(
+        "analytics_events",
+        {
+            "event_type": event_type,
+            "user_id": user_id or None,
+            "company_id": company_id or None,
+            "feature": feature or None,
+            "tier": tier or None,
+            "metadata": metadata or {},
+            "created_at": now_iso(),
+        },
+    )
 
 
 def _write_interaction_feedback_rows(
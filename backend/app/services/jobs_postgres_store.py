@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import sys
 import time
+import unicodedata
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from threading import Lock
@@ -438,6 +440,15 @@ def _ensure_schema() -> None:
             cur.execute(
                 f"ALTER TABLE {config.JOBS_POSTGRES_JOBS_TABLE} ADD COLUMN IF NOT EXISTS payload_json JSONB NOT NULL DEFAULT '{{}}'::jsonb"
             )
+            cur.execute(
+                f"ALTER TABLE {config.JOBS_POSTGRES_JOBS_TABLE} ADD COLUMN IF NOT EXISTS content_hash TEXT"
+            )
+            cur.execute(
+                f"ALTER TABLE {config.JOBS_POSTGRES_JOBS_TABLE} ADD COLUMN IF NOT EXISTS content_fingerprint TEXT"
+            )
+            cur.execute(
+                f"ALTER TABLE {config.JOBS_POSTGRES_JOBS_TABLE} ADD COLUMN IF NOT EXISTS content_changed_at TIMESTAMPTZ"
+            )
             cur.execute(
                 f"CREATE INDEX IF NOT EXISTS idx_{config.JOBS_POSTGRES_JOBS_TABLE}_scraped_at ON {config.JOBS_POSTGRES_JOBS_TABLE} (scraped_at DESC)"
             )
@@ -629,6 +640,15 @@ def _coerce_int(value: Any) -> int | None:
         return None
 
 
+def _coerce_text(value: Any) -> str | None:
+    # Binary COPY only dumps str into text columns; ids and notes can arrive as ints/UUIDs.
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
 def _coerce_float(value: Any) -> float | None:
     if value is None or value == "":
         return None
@@ -722,150 +742,302 @@ def read_external_cache_jobs(
     return jobs
 
 
+_JOBS_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("id", "text"),
+    ("company_id", "text"),
+    ("posted_by", "text"),
+    ("recruiter_id", "text"),
+    ("title", "text"),
+    ("company", "text"),
+    ("location", "text"),
+    ("description", "text"),
+    ("role_summary", "text"),
+    ("first_reply_prompt", "text"),
+    ("company_truth_hard", "text"),
+    ("company_truth_fail", "text"),
+    ("benefits", "jsonb"),
+    ("tags", "jsonb"),
+    ("contract_type", "text"),
+    ("salary_from", "int4"),
+    ("salary_to", "int4"),
+    ("salary_timeframe", "text"),
+    ("currency", "text"),
+    ("salary_currency", "text"),
+    ("work_type", "text"),
+    ("work_model", "text"),
+    ("source", "text"),
+    ("source_kind", "text"),
+    ("url", "text"),
+    ("education_level", "text"),
+    ("lat", "float8"),
+    ("lng", "float8"),
+    ("country_code", "text"),
+    ("language_code", "text"),
+    ("legality_status", "text"),
+    ("verification_notes", "text"),
+    ("ai_analysis", "jsonb"),
+    ("open_dialogues_count", "int4"),
+    ("dialogue_capacity_limit", "int4"),
+    ("reaction_window_hours", "int4"),
+    ("reaction_window_days", "int4"),
+    ("status", "text"),
+    ("is_active", "bool"),
+    ("challenge_format", "text"),
+    ("payload_json", "jsonb"),
+    ("created_at", "timestamptz"),
+    ("scraped_at", "timestamptz"),
+    ("updated_at", "timestamptz"),
+    ("content_hash", "text"),
+    ("content_fingerprint", "text"),
+    ("content_changed_at", "timestamptz"),
+)
+# Re-scraping stamps these on every pass; they are not part of a job's content.
+_JOBS_VOLATILE_FIELDS = ("created_at", "scraped_at", "updated_at")
+_JOBS_STAGE_SQL_TYPES = {
+    "text": "TEXT",
+    "jsonb": "TEXT",
+    "int4": "INTEGER",
+    "float8": "DOUBLE PRECISION",
+    "bool": "BOOLEAN",
+    "timestamptz": "TIMESTAMPTZ",
+}
+_CONTENT_FINGERPRINT_TEXT_FIELDS = ("title", "company", "location", "description", "role_summary")
+_bulk_upsert_unavailable = False
+
+
+def _fingerprint_text(value: Any) -> str:
+    return " ".join(unicodedata.normalize("NFKC", str(value or "")).casefold().split())
+
+
+def job_content_fingerprint(doc: dict[str, Any]) -> str:
+    """
+    Fingerprint of what a candidate reads in a job: normalized title, company,
+    location, description and salary. Whitespace, case and Unicode form do not count.
+    """
+    salary = [_coerce_int(doc.get("salary_from")), _coerce_int(doc.get("salary_to"))]
+    parts = [_fingerprint_text(doc.get(name)) for name in _CONTENT_FINGERPRINT_TEXT_FIELDS]
+    parts += ["" if value is None else str(value) for value in salary]
+    parts += [
+        _fingerprint_text(doc.get("salary_currency") or doc.get("currency")),
+        _fingerprint_text(doc.get("salary_timeframe")),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _job_content_hash(row: dict[str, Any], doc: dict[str, Any]) -> str:
+    content = {
+        name: row.get(name)
+        for name, _kind in _JOBS_COLUMNS
+        if name not in _JOBS_VOLATILE_FIELDS
+        and name not in {"payload_json", "content_hash", "content_fingerprint", "content_changed_at"}
+    }
+    content["payload"] = {key: value for key, value in doc.items() if key not in _JOBS_VOLATILE_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _job_row(doc: dict[str, Any]) -> dict[str, Any]:
+    row = {
+        "source_kind": _normalize_main_source_kind(doc),
+        "id": str(doc.get("id") or ""),
+        "company_id": doc.get("company_id"),
+        "posted_by": doc.get("posted_by"),
+        "recruiter_id": doc.get("recruiter_id"),
+        "title": str(doc.get("title") or ""),
+        "company": str(doc.get("company") or ""),
+        "location": str(doc.get("location") or ""),
+        "description": str(doc.get("description") or ""),
+        "role_summary": doc.get("role_summary"),
+        "first_reply_prompt": doc.get("first_reply_prompt"),
+        "company_truth_hard": doc.get("company_truth_hard"),
+        "company_truth_fail": doc.get("company_truth_fail"),
+        "benefits": _json_dumps(_coerce_json_list(doc.get("benefits"))),
+        "tags": _json_dumps(_coerce_json_list(doc.get("tags"))),
+        "contract_type": doc.get("contract_type"),
+        "salary_from": _coerce_int(doc.get("salary_from")),
+        "salary_to": _coerce_int(doc.get("salary_to")),
+        "salary_timeframe": doc.get("salary_timeframe"),
+        "currency": doc.get("currency"),
+        "salary_currency": doc.get("salary_currency"),
+        "work_type": doc.get("work_type"),
+        "work_model": doc.get("work_model"),
+        "source": doc.get("source"),
+        "url": doc.get("url"),
+        "education_level": doc.get("education_level"),
+        "lat": _coerce_float(doc.get("lat")),
+        "lng": _coerce_float(doc.get("lng")),
+        "country_code": doc.get("country_code"),
+        "language_code": doc.get("language_code"),
+        "legality_status": str(doc.get("legality_status") or "legal"),
+        "verification_notes": doc.get("verification_notes"),
+        "ai_analysis": _json_dumps(doc.get("ai_analysis") or {}),
+        "open_dialogues_count": _coerce_int(doc.get("open_dialogues_count")),
+        "dialogue_capacity_limit": _coerce_int(doc.get("dialogue_capacity_limit")),
+        "reaction_window_hours": _coerce_int(doc.get("reaction_window_hours")),
+        "reaction_window_days": _coerce_int(doc.get("reaction_window_days")),
+        "status": str(doc.get("status") or "active"),
+        "is_active": bool(doc.get("is_active", True)),
+        "challenge_format": doc.get("challenge_format"),
+        "payload_json": _json_dumps(doc),
+        "created_at": _coerce_timestamp(doc.get("created_at")),
+        "scraped_at": _coerce_timestamp(doc.get("scraped_at"), default=_coerce_timestamp(doc.get("created_at"))),
+        "updated_at": _coerce_timestamp(doc.get("updated_at"), default=_utcnow()),
+    }
+    for name, kind in _JOBS_COLUMNS:
+        if kind == "text" and name in row:
+            row[name] = _coerce_text(row[name])
+    row["content_hash"] = _job_content_hash(row, doc)
+    row["content_fingerprint"] = job_content_fingerprint(doc)
+    row["content_changed_at"] = row["updated_at"]
+    return row
+
+
+def _jobs_update_assignments() -> list[str]:
+    # content_changed_at is the watermark for embeddings, job intelligence and the
+    # sitemap; it only moves when the fingerprint does, not on every rewrite.
+    assignments = [f"{name} = EXCLUDED.{name}" for name, _kind in _JOBS_COLUMNS if name not in {"id", "content_changed_at"}]
+    assignments.append(
+        "content_changed_at = CASE WHEN t.content_fingerprint IS DISTINCT FROM EXCLUDED.content_fingerprint "
+        "THEN EXCLUDED.content_changed_at ELSE t.content_changed_at END"
+    )
+    return assignments
+
+
+def _jobs_upsert_rows_sql(table: str) -> str:
+    names = [name for name, _kind in _JOBS_COLUMNS]
+    values = [f"%({name})s::jsonb" if kind == "jsonb" else f"%({name})s" for name, kind in _JOBS_COLUMNS]
+    return (
+        f"INSERT INTO {table} AS t ({', '.join(names)}) VALUES ({', '.join(values)}) "
+        f"ON CONFLICT (id) DO UPDATE SET {', '.join(_jobs_update_assignments())}"
+    )
+
+
+def _jobs_merge_staged_sql(table: str, stage: str) -> str:
+    names = [name for name, _kind in _JOBS_COLUMNS]
+    selects = [f"{name}::jsonb" if kind == "jsonb" else name for name, kind in _JOBS_COLUMNS]
+    # Rows whose content hash did not change are left alone; their scraped_at is only
+    # moved forward once it lags by more than the touch interval, so retention and
+    # freshness still see re-scraped jobs without rewriting every row on every pass.
+    return f"""
+        WITH batch AS (
+            SELECT DISTINCT ON (id) * FROM {stage} ORDER BY id, ord DESC
+        ), merged AS (
+            INSERT INTO {table} AS t ({', '.join(names)})
+            SELECT {', '.join(selects)} FROM batch
+            ON CONFLICT (id) DO UPDATE SET {', '.join(_jobs_update_assignments())}
+            WHERE t.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+            RETURNING t.id, (t.xmax = 0) AS inserted
+        ), touched AS (
+            UPDATE {table} AS t SET scraped_at = b.scraped_at
+            FROM batch b
+            WHERE t.id = b.id
+              AND t.content_hash = b.content_hash
+              AND t.scraped_at < b.scraped_at - make_interval(mins => %s::int)
+            RETURNING t.id
+        )
+        SELECT
+            (SELECT COUNT(*) FROM batch) AS staged_count,
+            COALESCE(array_agg(id) FILTER (WHERE inserted), ARRAY[]::text[]) AS inserted_ids,
+            COUNT(*) FILTER (WHERE NOT inserted) AS updated_count,
+            (SELECT COUNT(*) FROM touched) AS touched_count
+        FROM merged
+    """
+
+
+def _upsert_job_rows_legacy(conn, rows: list[dict[str, Any]]) -> tuple[set[str], int, int]:
+    """Row-by-row upsert; returns (inserted ids, updated count, unchanged count)."""
+    table = config.JOBS_POSTGRES_JOBS_TABLE
+    ids = list(dict.fromkeys(row["id"] for row in rows))
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT id FROM {table} WHERE id = ANY(%s)", (ids,))
+        existing_ids = {str((row or {}).get("id") or "") for row in (cur.fetchall() or [])}
+        cur.executemany(_jobs_upsert_rows_sql(table), rows)
+    return {job_id for job_id in ids if job_id not in existing_ids}, len(existing_ids), 0
+
+
+def _upsert_job_rows_bulk(conn, rows: list[dict[str, Any]]) -> tuple[set[str], int, int]:
+    """
+    Binary COPY the batch into a session-local staging table and merge it with one
+    statement. Returns (inserted ids, updated count, unchanged count).
+    """
+    table = config.JOBS_POSTGRES_JOBS_TABLE
+    stage = f"{table}_stage"
+    names = [name for name, _kind in _JOBS_COLUMNS]
+    with conn.transaction():
+        with conn.cursor() as cur:
+            # A TEMP table is never WAL-logged and is private to this connection, so
+            # concurrent scraper processes cannot see or clobber each other's batches.
+            columns = ", ".join(f"{name} {_JOBS_STAGE_SQL_TYPES[kind]}" for name, kind in _JOBS_COLUMNS)
+            cur.execute(f"CREATE TEMP TABLE IF NOT EXISTS {stage} (ord INTEGER NOT NULL, {columns}) ON COMMIT DELETE ROWS")
+            with cur.copy(f"COPY {stage} (ord, {', '.join(names)}) FROM STDIN (FORMAT BINARY)") as copy:
+                copy.set_types(["int4"] + ["text" if kind == "jsonb" else kind for _name, kind in _JOBS_COLUMNS])
+                for ord_, row in enumerate(rows):
+                    copy.write_row([ord_] + [row[name] for name in names])
+            cur.execute(_jobs_merge_staged_sql(table, stage), (config.JOBS_POSTGRES_UNCHANGED_TOUCH_MINUTES,))
+            result = cur.fetchone() or {}
+    staged_count = int(result.get("staged_count") or 0)
+    inserted_ids = {str(job_id) for job_id in (result.get("inserted_ids") or [])}
+    updated_count = int(result.get("updated_count") or 0)
+    return inserted_ids, updated_count, max(0, staged_count - len(inserted_ids) - updated_count)
+
+
 def upsert_jobs_documents(documents: list[dict[str, Any]]) -> dict[str, int]:
     """
     Upsert documents with retry logic and connection pooling.
     Uses exponential backoff for transient failures.
+
+    Batches are bulk-loaded and merged set-based, skipping rows whose content hash is
+    unchanged (see ``_upsert_job_rows_bulk``); with JOBS_POSTGRES_BULK_UPSERT_ENABLED
+    off, or when the database refuses temp tables, rows are upserted one by one.
     """
+    global _bulk_upsert_unavailable
+    empty = {"imported_count": 0, "upserted_count": 0, "matched_count": 0}
     if not jobs_postgres_enabled() or not config.JOBS_POSTGRES_WRITE_MAIN:
-        return {"imported_count": 0, "upserted_count": 0, "matched_count": 0}
+        return dict(empty)
     _ensure_schema()
     if not documents:
-        return {"imported_count": 0, "upserted_count": 0, "matched_count": 0}
-    
-    ids = [str(doc.get("id") or "") for doc in documents if str(doc.get("id") or "").strip()]
-    if not ids:
-        return {"imported_count": 0, "upserted_count": 0, "matched_count": 0}
-    
+        return dict(empty)
+
+    documents = [doc for doc in documents if str(doc.get("id") or "").strip()]
+    if not documents:
+        return dict(empty)
+    rows = [_job_row(doc) for doc in documents]
+
     # Retry logic with exponential backoff
     max_retries = 3
     retry_delay = 0.5  # seconds
-    
+
     for attempt in range(max_retries):
         conn = None
         try:
             conn = _connect()
-            
-            with conn.cursor() as cur:
-                # Get existing IDs (skip expensive duplicate lookup - we use ON CONFLICT instead)
-                cur.execute(
-                    f"SELECT id FROM {config.JOBS_POSTGRES_JOBS_TABLE} WHERE id = ANY(%s)",
-                    (ids,),
-                )
-                existing_ids = {str((row or {}).get("id") or "") for row in (cur.fetchall() or [])}
-                
-                # Batch upsert with ON CONFLICT for duplicate handling
-                cur.executemany(
-                    f"""
-                    INSERT INTO {config.JOBS_POSTGRES_JOBS_TABLE}
-                        (id, company_id, posted_by, recruiter_id, title, company, location, description, role_summary, first_reply_prompt, company_truth_hard, company_truth_fail, benefits, tags, contract_type, salary_from, salary_to, salary_timeframe, currency, salary_currency, work_type, work_model, source, source_kind, url, education_level, lat, lng, country_code, language_code, legality_status, verification_notes, ai_analysis, open_dialogues_count, dialogue_capacity_limit, reaction_window_hours, reaction_window_days, status, is_active, challenge_format, payload_json, created_at, scraped_at, updated_at)
-                    VALUES (%(id)s, %(company_id)s, %(posted_by)s, %(recruiter_id)s, %(title)s, %(company)s, %(location)s, %(description)s, %(role_summary)s, %(first_reply_prompt)s, %(company_truth_hard)s, %(company_truth_fail)s, %(benefits)s::jsonb, %(tags)s::jsonb, %(contract_type)s, %(salary_from)s, %(salary_to)s, %(salary_timeframe)s, %(currency)s, %(salary_currency)s, %(work_type)s, %(work_model)s, %(source)s, %(source_kind)s, %(url)s, %(education_level)s, %(lat)s, %(lng)s, %(country_code)s, %(language_code)s, %(legality_status)s, %(verification_notes)s, %(ai_analysis)s::jsonb, %(open_dialogues_count)s, %(dialogue_capacity_limit)s, %(reaction_window_hours)s, %(reaction_window_days)s, %(status)s, %(is_active)s, %(challenge_format)s, %(payload_json)s::jsonb, %(created_at)s, %(scraped_at)s, %(updated_at)s)
-                    ON CONFLICT (id) DO UPDATE SET
-                        company_id = EXCLUDED.company_id,
-                        posted_by = EXCLUDED.posted_by,
-                        recruiter_id = EXCLUDED.recruiter_id,
-                        title = EXCLUDED.title,
-                        company = EXCLUDED.company,
-                        location = EXCLUDED.location,
-                        description = EXCLUDED.description,
-                        role_summary = EXCLUDED.role_summary,
-                        first_reply_prompt = EXCLUDED.first_reply_prompt,
-                        company_truth_hard = EXCLUDED.company_truth_hard,
-                        company_truth_fail = EXCLUDED.company_truth_fail,
-                        benefits = EXCLUDED.benefits,
-                        tags = EXCLUDED.tags,
-                        contract_type = EXCLUDED.contract_type,
-                        salary_from = EXCLUDED.salary_from,
-                        salary_to = EXCLUDED.salary_to,
-                        salary_timeframe = EXCLUDED.salary_timeframe,
-                        currency = EXCLUDED.currency,
-                        salary_currency = EXCLUDED.salary_currency,
-                        work_type = EXCLUDED.work_type,
-                        work_model = EXCLUDED.work_model,
-                        source = EXCLUDED.source,
-                        source_kind = EXCLUDED.source_kind,
-                        url = EXCLUDED.url,
-                        education_level = EXCLUDED.education_level,
-                        lat = EXCLUDED.lat,
-                        lng = EXCLUDED.lng,
-                        country_code = EXCLUDED.country_code,
-                        language_code = EXCLUDED.language_code,
-                        legality_status = EXCLUDED.legality_status,
-                        verification_notes = EXCLUDED.verification_notes,
-                        ai_analysis = EXCLUDED.ai_analysis,
-                        open_dialogues_count = EXCLUDED.open_dialogues_count,
-                        dialogue_capacity_limit = EXCLUDED.dialogue_capacity_limit,
-                        reaction_window_hours = EXCLUDED.reaction_window_hours,
-                        reaction_window_days = EXCLUDED.reaction_window_days,
-                        status = EXCLUDED.status,
-                        is_active = EXCLUDED.is_active,
-                        challenge_format = EXCLUDED.challenge_format,
-                        payload_json = EXCLUDED.payload_json,
-                        created_at = EXCLUDED.created_at,
-                        scraped_at = EXCLUDED.scraped_at,
-                        updated_at = EXCLUDED.updated_at
-                    """,
-                    [
-                        {
-                            "source_kind": _normalize_main_source_kind(doc),
-                            "id": str(doc.get("id") or ""),
-                            "company_id": doc.get("company_id"),
-                            "posted_by": doc.get("posted_by"),
-                            "recruiter_id": doc.get("recruiter_id"),
-                            "title": str(doc.get("title") or ""),
-                            "company": str(doc.get("company") or ""),
-                            "location": str(doc.get("location") or ""),
-                            "description": str(doc.get("description") or ""),
-                            "role_summary": doc.get("role_summary"),
-                            "first_reply_prompt": doc.get("first_reply_prompt"),
-                            "company_truth_hard": doc.get("company_truth_hard"),
-                            "company_truth_fail": doc.get("company_truth_fail"),
-                            "benefits": _json_dumps(_coerce_json_list(doc.get("benefits"))),
-                            "tags": _json_dumps(_coerce_json_list(doc.get("tags"))),
-                            "contract_type": doc.get("contract_type"),
-                            "salary_from": _coerce_int(doc.get("salary_from")),
-                            "salary_to": _coerce_int(doc.get("salary_to")),
-                            "salary_timeframe": doc.get("salary_timeframe"),
-                            "currency": doc.get("currency"),
-                            "salary_currency": doc.get("salary_currency"),
-                            "work_type": doc.get("work_type"),
-                            "work_model": doc.get("work_model"),
-                            "source": doc.get("source"),
-                            "url": doc.get("url"),
-                            "education_level": doc.get("education_level"),
-                            "lat": _coerce_float(doc.get("lat")),
-                            "lng": _coerce_float(doc.get("lng")),
-                            "country_code": doc.get("country_code"),
-                            "language_code": doc.get("language_code"),
-                            "legality_status": str(doc.get("legality_status") or "legal"),
-                            "verification_notes": doc.get("verification_notes"),
-                            "ai_analysis": _json_dumps(doc.get("ai_analysis") or {}),
-                            "open_dialogues_count": _coerce_int(doc.get("open_dialogues_count")),
-                            "dialogue_capacity_limit": _coerce_int(doc.get("dialogue_capacity_limit")),
-                            "reaction_window_hours": _coerce_int(doc.get("reaction_window_hours")),
-                            "reaction_window_days": _coerce_int(doc.get("reaction_window_days")),
-                            "status": str(doc.get("status") or "active"),
-                            "is_active": bool(doc.get("is_active", True)),
-                            "challenge_format": doc.get("challenge_format"),
-                            "payload_json": _json_dumps(doc),
-                            "created_at": _coerce_timestamp(doc.get("created_at")),
-                            "scraped_at": _coerce_timestamp(doc.get("scraped_at"), default=_coerce_timestamp(doc.get("created_at"))),
-                            "updated_at": _coerce_timestamp(doc.get("updated_at"), default=_utcnow()),
-                        }
-                        for doc in documents
-                        if str(doc.get("id") or "").strip()
-                    ],
-                )
-            
-            imported_count = len(ids)
-            matched_count = len(existing_ids)
+            if config.JOBS_POSTGRES_BULK_UPSERT_ENABLED and not _bulk_upsert_unavailable:
+                try:
+                    inserted_ids, updated_count, unchanged_count = _upsert_job_rows_bulk(conn, rows)
+                except Exception as exc:
+                    if not _is_nonfatal_schema_bootstrap_error(exc):
+                        raise
+                    _bulk_upsert_unavailable = True
+                    print(f"⚠️ [Jobs Postgres] Bulk upsert unavailable, falling back to row upserts: {exc}")
+                    inserted_ids, updated_count, unchanged_count = _upsert_job_rows_legacy(conn, rows)
+            else:
+                inserted_ids, updated_count, unchanged_count = _upsert_job_rows_legacy(conn, rows)
+
+            imported_count = len(rows)
+            matched_count = updated_count + unchanged_count
             upserted_count = max(0, imported_count - matched_count)
+            from ..matching_engine.change_tracking import note_job_arrivals
+
+            note_job_arrivals([doc for doc in documents if str(doc.get("id")) in inserted_ids])
             return {
                 "imported_count": imported_count,
                 "upserted_count": upserted_count,
                 "matched_count": matched_count,
+                "inserted_count": len(inserted_ids),
+                "updated_count": updated_count,
+                "unchanged_count": unchanged_count,
             }
-        
+
         except Exception as exc:
             error_msg = str(exc).lower()
             is_transient = any(phrase in error_msg for phrase in [
@@ -886,9 +1058,9 @@ def upsert_jobs_documents(documents: list[dict[str, Any]]) -> dict[str, int]:
                 print(f"    ❌ Database write failed (attempt {attempt + 1}/{max_retries}): {exc}")
                 if conn:
                     _return_pool_conn(conn)
-                return {"imported_count": 0, "upserted_count": 0, "matched_count": 0}
+                return dict(empty)
     
-    return {"imported_count": 0, "upserted_count": 0, "matched_count": 0}
+    return dict(empty)
 
 
 def read_recent_jobs(*, limit: int = 500, days: int = 30) -> list[dict[str, Any]]:
@@ -901,7 +1073,7 @@ def read_recent_jobs(*, limit: int = 500, days: int = 30) -> list[dict[str, Any]
     with conn.cursor() as cur:
         cur.execute(
             f"""
-            SELECT payload_json
+            SELECT payload_json, COALESCE(content_changed_at, updated_at) AS content_changed_at
             FROM {config.JOBS_POSTGRES_JOBS_TABLE}
             WHERE scraped_at >= %s
               AND COALESCE(status, 'active') = 'active'
@@ -917,7 +1089,10 @@ def read_recent_jobs(*, limit: int = 500, days: int = 30) -> list[dict[str, Any]
     for row in rows:
         payload = _json_load((row or {}).get("payload_json"), {})
         if isinstance(payload, dict):
-            jobs.append(dict(payload))
+            job = dict(payload)
+            if isinstance(row.get("content_changed_at"), datetime):
+                job["content_changed_at"] = row["content_changed_at"].isoformat()
+            jobs.append(job)
     return jobs
 
 
@@ -1117,6 +1292,62 @@ def get_job_by_url(url: Any) -> dict[str, Any] | None:
     return None
 
 
+
+def list_job_urls(*, batch_size: int = 5000):
+    """
+    Yield ``(id, url, updated_at)`` of every live job that has a URL, in id order and
+    in keyset-paginated batches; used to rebuild the scrapers' known-URL filter.
+    """
+    if not jobs_postgres_main_enabled():
+        return
+    _ensure_schema_for_read()
+    conn = _connect()
+    cutoff_sql, cutoff_params = _jobs_main_cutoff_sql()
+    limit = max(1, int(batch_size or 5000))
+    last_id = ""
+    while True:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT id, url, updated_at
+                FROM {config.JOBS_POSTGRES_JOBS_TABLE}
+                WHERE id > %s AND COALESCE(url, '') <> '' AND {cutoff_sql}
+                ORDER BY id
+                LIMIT %s
+                """,
+                (last_id, *cutoff_params, limit),
+            )
+            rows = cur.fetchall() or []
+        for row in rows:
+            yield str(row["id"]), str(row["url"]), row.get("updated_at")
+        if len(rows) < limit:
+            return
+        last_id = str(rows[-1]["id"])
+
+
+def mark_jobs_seen(job_ids: list[Any]) -> int:
+    """
+    Move ``scraped_at`` forward for jobs that were still listed but whose detail page
+    was not fetched again, so retention keeps them; rows touched within the last
+    JOBS_POSTGRES_UNCHANGED_TOUCH_MINUTES are left alone.
+    """
+    ids = list(dict.fromkeys(str(job_id) for job_id in job_ids or [] if str(job_id or "").strip()))
+    if not ids or not jobs_postgres_enabled() or not config.JOBS_POSTGRES_WRITE_MAIN:
+        return 0
+    _ensure_schema()
+    conn = _connect()
+    now = _utcnow()
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""
+            UPDATE {config.JOBS_POSTGRES_JOBS_TABLE}
+            SET scraped_at = %s
+            WHERE id = ANY(%s) AND scraped_at < %s
+            """,
+            (now, ids, now - timedelta(minutes=max(0, int(config.JOBS_POSTGRES_UNCHANGED_TOUCH_MINUTES or 0)))),
+        )
+        return int(cur.rowcount or 0)
+
 def list_company_jobs(*, company_id: str, limit: int = 200) -> list[dict[str, Any]]:
     if not jobs_postgres_main_enabled():
         return []
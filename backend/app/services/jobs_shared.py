@@ -246,6 +246,9 @@ def _delete_main_job_shadow_from_supabase(job_id: Any) -> bool:
         return False
     try:
         supabase.table("jobs").delete().eq("id", normalized_id).execute()
+        from ..matching_engine.demand import forget_jobs_skill_demand
+
+        forget_jobs_skill_demand([str(normalized_id)])
         return True
     except Exception as exc:
         print(f"⚠️ Failed to delete job {normalized_id} from Supabase jobs shadow: {exc}")
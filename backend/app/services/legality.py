@@ -1,156 +1,325 @@
+import hashlib
 import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Iterable, Mapping, Optional
+
+# Bump whenever a rule, score or anchor changes: cached results are keyed by it.
+LEGALITY_RULESET_VERSION = "2026-10-19.1"
+
+_RESULT_CACHE_MAX_ENTRIES = 20000
+
+
+@dataclass(frozen=True)
+class LegalityRule:
+    pattern: str
+    reason: str
+    score: float
+    # Literals, at least one of which occurs in every match of ``pattern``. Empty = always evaluate.
+    anchors: tuple[str, ...] = ()
+
+
+# CRITICAL PATTERNS - Immediate rejection (1.0+ risk each)
+CRITICAL_RULES: tuple[LegalityRule, ...] = (
+    # Scams & Fraud
+    LegalityRule(r"(výdělek|peníze|zisk).*bez (práce|úsilí|investice)", "🚨 Slibuje výdělek bez práce - podezření na podvod", 1.0, ("bez práce", "bez úsilí", "bez investice")),
+    LegalityRule(r"rychl[éý].*peníze|peníze.*rychle", "🚨 Slibuje rychlé peníze - typický scam", 1.0, ("peníze",)),
+    LegalityRule(r"(poplatek|platba|zaplatit).*předem", "🚨 Vyžaduje platbu předem - podvod", 1.0, ("předem",)),
+    LegalityRule(r"garantovan[ýá].*výdělek", "🚨 Garantovaný výdělek - nereálné sliby", 1.0, ("garantovan",)),
+    # Illegal Activities
+    LegalityRule(r"pilot.*letadlo|řidič.*letadla", "🚨 Nabídka pilota/letadla - mimo zaměření portálu", 1.0, ("letadl",)),
+    LegalityRule(r"pašování|nelegální|černá práce", "🚨 Zmínka o nelegálních aktivitách", 1.0, ("pašování", "nelegální", "černá práce")),
+    LegalityRule(r"bez smlouvy|bez odvodu|na černo", "🚨 Práce na černo", 1.0, ("bez smlouvy", "bez odvodu", "na černo")),
+    # MLM & Pyramid Schemes
+    LegalityRule(r"(multi.*level|mlm|síťový marketing)", "🚨 MLM/Síťový marketing - podezřelý model", 1.0, ("multi", "mlm", "síťový marketing")),
+    LegalityRule(r"(buduj|vytvoř).*tým.*pod sebou", "🚨 Pyramidový systém", 1.0, ("pod sebou",)),
+    LegalityRule(r"pasivní příjem|zisk.*spánku", "🚨 Pasivní příjem - typický MLM", 1.0, ("pasivní příjem", "spánku")),
+    # Cryptocurrency Scams
+    LegalityRule(r"(bitcoin|krypto|crypto).*záruka.*zisk", "🚨 Krypto scam s garantovaným ziskem", 1.0, ("záruka",)),
+    LegalityRule(r"investice.*krypto.*bez rizika", "🚨 Podvodná krypto investice", 1.0, ("bez rizika",)),
+)
+
+# HIGH RISK PATTERNS - Manual review required (0.5 risk each)
+HIGH_RISK_RULES: tuple[LegalityRule, ...] = (
+    # Unrealistic Promises
+    LegalityRule(r"\d{4,}.*kč.*hodinu.*bez (zkušeností|praxe)", "⚠️ Nerealistický plat pro začátečníky", 0.5, ("hodinu",)),
+    LegalityRule(r"(50|60|70|80|90|100).*tisíc.*měsíc.*bez (zkušeností|praxe)", "⚠️ Podezřele vysoký plat bez požadavků", 0.5, ("tisíc",)),
+    LegalityRule(r"vydělávejte.*doma|práce.*z.*pohodlí", "⚠️ Práce z domu s podezřelými sliby", 0.4, ("vydělávejte", "pohodlí")),
+    # Suspicious Requirements
+    LegalityRule(r"(investice|vklad|kapitál).*nutný", "⚠️ Vyžaduje investici od zaměstnance", 0.6, ("nutný",)),
+    LegalityRule(r"kup.*produkt|zakup.*balíček", "⚠️ Vyžaduje nákup produktů", 0.6, ("kup",)),
+    LegalityRule(r"školení.*za.*poplatek", "⚠️ Placené školení před nástupem", 0.4, ("poplatek",)),
+    # MLM Indicators
+    LegalityRule(r"(neomezen[ýá]|unlimited).*výdělek", "⚠️ Neomezený výdělek - typické pro MLM", 0.5, ("výdělek",)),
+    LegalityRule(r"buď.*svým.*šéfem|vlastní.*boss", "⚠️ MLM marketing fráze", 0.3, ("šéfem", "boss")),
+    LegalityRule(r"finanční.*svoboda|time.*freedom", "⚠️ MLM marketing fráze", 0.3, ("svoboda", "freedom")),
+    # Vague or Missing Information
+    LegalityRule(r"^.{0,50}$", "⚠️ Příliš krátký popis pozice", 0.3),  # Very short description
+    LegalityRule(r"kontakt.*pouze.*sms|pouze.*whatsapp", "⚠️ Podezřelý způsob kontaktu", 0.4, ("pouze",)),
+    # Gambling & Adult Content
+    LegalityRule(r"(casino|kasino|sázky|gambling)", "⚠️ Gambling/sázky - vyžaduje revizi", 0.5, ("casino", "kasino", "sázky", "gambling")),
+    LegalityRule(r"(escort|adult|erotick)", "⚠️ Adult content - mimo zaměření", 0.6, ("escort", "adult", "erotick")),
+    # Suspicious Company Names
+    LegalityRule(r"(neznámá|unknown|anonymní).*společnost", "⚠️ Neznámá nebo anonymní společnost", 0.4, ("společnost",)),
+)
+
+# Suspicious email domains in description (evaluated after the country rules)
+PERSONAL_EMAIL_RULE = LegalityRule(r"(gmail\.com|seznam\.cz|email\.cz).*kontakt", "⚠️ Používá osobní email místo firemního", 0.2, ("kontakt",))
+
+# AT: salary disclosure is mandatory (Kollektivvertrag / Mindestgehalt)
+_AT_SALARY_KEYWORDS = (
+    r"\b(€|eur)\b",
+    r"gehalt", r"lohn", r"entgelt", r"brutto",
+    r"kollektivvertrag", r"\bkv\b", r"mindestgehalt",
+)
+# AT: potential Scheinselbständigkeit risk (single-client contractor)
+_AT_CONTRACTOR_MARKERS = (
+    r"\bi[čc]o\b", r"\bb2b\b", r"contractor", r"self[-\s]?employed",
+    r"freelanc", r"selbst[äa]ndig", r"freier\s*dienstnehmer", r"werkvertrag",
+)
+_AT_SINGLE_CLIENT_MARKERS = (
+    r"exklusiv", r"nur\s*f[üu]r\s*uns", r"nur\s*einen\s*kunden",
+    r"for\s*one\s*client", r"single\s*client", r"pro\s*jednoho\s*klienta",
+)
+
+# Location keywords in priority order: the first country with any hit wins.
+_COUNTRY_LOCATION_KEYWORDS = (
+    ("at", ("österreich", "austria", "wien", "vienna", "salzburg", "graz", "linz", "innsbruck")),
+    ("pl", ("polska", "poland", "warszawa", "kraków", "krakow", "wroclaw", "gdańsk", "gdansk")),
+    ("de", ("deutschland", "germany", "berlin", "münchen", "munchen", "hamburg", "köln", "koln")),
+    ("sk", ("slovensko", "slovakia", "bratislava", "košice", "kosice")),
+    ("cs", ("česko", "cesko", "czech", "praha", "brno", "ostrava")),
+)
+
+
+# Characters that re.IGNORECASE matches against anchor letters although they are
+# their own lowercase; folded before scanning so anchors see what the rules see.
+_SCAN_FOLD = {"ı": "i", "ſ": "s"}
+
+
+def _fold_for_scan(text: str) -> str:
+    for char, replacement in _SCAN_FOLD.items():
+        if char in text:
+            text = text.replace(char, replacement)
+    return text
+
+
+def _literal_scanner(literals: Iterable[str]) -> tuple[re.Pattern, tuple[str, ...]]:
+    """Alternation of literals, longest first; a match reports ``literals[match.lastindex - 1]``."""
+    ordered = tuple(sorted(set(literals), key=lambda literal: (-len(literal), literal)))
+    return re.compile("|".join(f"({re.escape(literal)})" for literal in ordered)), ordered
+
+
+def _scan_hits(scanner: re.Pattern, text: str):
+    """
+    Every position where a literal starts, with the longest literal there. Resuming one
+    character after each hit (not after its end) keeps overlapping literals visible.
+    """
+    position = 0
+    search = scanner.search
+    while True:
+        match = search(text, position)
+        if match is None:
+            return
+        yield match.lastindex - 1
+        position = match.start() + 1
+
+
+class LegalityRuleSet:
+    """
+    All legality rules compiled once. A document is first checked for the rules' anchor
+    literals (plain substring tests); only rules whose anchor occurred (plus the few
+    anchor-less ones) run their full regex, in declaration order so scores and reasons
+    match the rule tables.
+    """
+
+    def __init__(self, version: str, critical: tuple[LegalityRule, ...], high_risk: tuple[LegalityRule, ...], personal_email: LegalityRule):
+        self.version = version
+        self.scored_rules = critical + high_risk
+        self.personal_email = personal_email
+        all_rules = self.scored_rules + (personal_email,)
+        self._compiled = [re.compile(rule.pattern, re.IGNORECASE) for rule in self.scored_rules]
+        # Personal email check was case-sensitive over the lowercased text.
+        self._personal_email = re.compile(personal_email.pattern)
+        self._always = frozenset(index for index, rule in enumerate(all_rules) if not rule.anchors)
+
+        rules_by_anchor: dict[str, set[int]] = {}
+        for index, rule in enumerate(all_rules):
+            for anchor in rule.anchors:
+                rules_by_anchor.setdefault(anchor, set()).add(index)
+        self._rules_by_anchor = tuple((anchor, frozenset(rules)) for anchor, rules in rules_by_anchor.items())
+
+        self._at_salary = re.compile("|".join(_AT_SALARY_KEYWORDS) + r"|\d{2,}\s*(€|eur)", re.IGNORECASE)
+        self._at_contractor = re.compile("|".join(_AT_CONTRACTOR_MARKERS), re.IGNORECASE)
+        self._at_single_client = re.compile("|".join(_AT_SINGLE_CLIENT_MARKERS), re.IGNORECASE)
+
+        country_priority: dict[str, tuple[int, str]] = {}
+        for priority, (country, keywords) in enumerate(_COUNTRY_LOCATION_KEYWORDS):
+            for keyword in keywords:
+                country_priority.setdefault(keyword, (priority, country))
+        self._country_scanner, keywords = _literal_scanner(country_priority)
+        self._country_for_hit = tuple(
+            min(country_priority[keyword] for keyword in country_priority if keyword in literal) for literal in keywords
+        )
+
+    def infer_country(self, country_code: Optional[str], location: Optional[str], full_text: str) -> Optional[str]:
+        if country_code:
+            return country_code.lower()
+        loc = (location or "").lower()
+        best: Optional[tuple[int, str]] = None
+        for hit in _scan_hits(self._country_scanner, loc):
+            candidate = self._country_for_hit[hit]
+            if best is None or candidate < best:
+                best = candidate
+                if best[0] == 0:
+                    break
+        if best is not None:
+            return best[1]
+        if "österreich" in full_text or "austria" in full_text:
+            return "at"
+        return None
+
+    def _candidate_rules(self, full_text: str) -> set[int]:
+        text = _fold_for_scan(full_text)
+        candidates = set(self._always)
+        for anchor, rules in self._rules_by_anchor:
+            if anchor in text:
+                candidates |= rules
+        return candidates
+
+    def evaluate(self, title: str, company: str, description: str, country_code: Optional[str] = None, location: Optional[str] = None):
+        risk_score = 0.0
+        reasons: list[str] = []
+
+        full_text = f"{title} {company} {description}".lower()
+        country = self.infer_country(country_code, location, full_text)
+        candidates = self._candidate_rules(full_text)
+
+        for index, rule in enumerate(self.scored_rules):
+            if index in candidates and self._compiled[index].search(full_text):
+                risk_score += rule.score
+                reasons.append(rule.reason)
+
+        # --- Country-specific rules ---
+        if country == "at":
+            if not self._at_salary.search(full_text):
+                risk_score += 0.6
+                reasons.append("⚠️ AT: Chybí povinné údaje o mzdě (Kollektivvertrag/Mindestgehalt)")
+            if self._at_contractor.search(full_text) and self._at_single_client.search(full_text):
+                risk_score += 0.6
+                reasons.append("⚠️ AT: Riziko Scheinselbständigkeit (contractor + jediný klient)")
+
+        # Check for excessive exclamation marks (spam indicator)
+        exclamation_count = full_text.count('!')
+        if exclamation_count > 5:
+            risk_score += 0.3
+            reasons.append(f"⚠️ Nadměrné použití vykřičníků ({exclamation_count}x) - spam indikátor")
+
+        # Check for ALL CAPS in title (spam indicator)
+        if title.isupper() and len(title) > 10:
+            risk_score += 0.2
+            reasons.append("⚠️ Titulek celý velkými písmeny - spam indikátor")
+
+        if len(self.scored_rules) in candidates and self._personal_email.search(full_text):
+            risk_score += self.personal_email.score
+            reasons.append(self.personal_email.reason)
+
+        # Determine legality status
+        is_legal = risk_score < 1.0
+        needs_manual_review = 0.5 <= risk_score < 1.0
+
+        # Cap risk score at reasonable maximum
+        risk_score = min(risk_score, 10.0)
+
+        return risk_score, is_legal, reasons, needs_manual_review
+
+
+_RULESET = LegalityRuleSet(LEGALITY_RULESET_VERSION, CRITICAL_RULES, HIGH_RISK_RULES, PERSONAL_EMAIL_RULE)
+
+_result_cache_lock = Lock()
+_result_cache: "OrderedDict[str, tuple[float, bool, tuple[str, ...], bool]]" = OrderedDict()
+_CACHE_STATS = {"hits": 0, "misses": 0}
+
+
+def _content_key(title: str, company: str, description: str, country_code: Optional[str], location: Optional[str]) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    for part in (_RULESET.version, title, company, description, country_code or "", location or ""):
+        digest.update(str(part).encode("utf-8", "surrogatepass"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
 
 def _infer_country(country_code: str | None, location: str | None, full_text: str) -> str | None:
-    if country_code:
-        return country_code.lower()
-    loc = (location or "").lower()
-    if any(k in loc for k in ["österreich", "austria", "wien", "vienna", "salzburg", "graz", "linz", "innsbruck"]):
-        return "at"
-    if any(k in loc for k in ["polska", "poland", "warszawa", "kraków", "krakow", "wroclaw", "gdańsk", "gdansk"]):
-        return "pl"
-    if any(k in loc for k in ["deutschland", "germany", "berlin", "münchen", "munchen", "hamburg", "köln", "koln"]):
-        return "de"
-    if any(k in loc for k in ["slovensko", "slovakia", "bratislava", "košice", "kosice"]):
-        return "sk"
-    if any(k in loc for k in ["česko", "cesko", "czech", "praha", "brno", "ostrava"]):
-        return "cs"
-    if "österreich" in full_text or "austria" in full_text:
-        return "at"
-    return None
+    return _RULESET.infer_country(country_code, location, full_text)
+
 
 def check_legality_rules(title: str, company: str, description: str, country_code: str | None = None, location: str | None = None):
     """
     Check job posting for illegal, scam, or suspicious content.
     Returns: (risk_score, is_legal, reasons, needs_manual_review)
-    
+
     Risk Score Thresholds:
     - >= 1.0: Illegal (auto-reject)
     - 0.5-0.99: Needs manual review
     - < 0.5: Legal (auto-approve)
+
+    Results are cached by a hash of the rule set version and the inputs.
+    """
+    title, company, description = title or "", company or "", description or ""
+    key = _content_key(title, company, description, country_code, location)
+    with _result_cache_lock:
+        cached = _result_cache.get(key)
+        if cached is not None:
+            _result_cache.move_to_end(key)
+            _CACHE_STATS["hits"] += 1
+    if cached is not None:
+        risk_score, is_legal, reasons, needs_review = cached
+        return risk_score, is_legal, list(reasons), needs_review
+
+    risk_score, is_legal, reasons, needs_review = _RULESET.evaluate(title, company, description, country_code, location)
+    with _result_cache_lock:
+        _CACHE_STATS["misses"] += 1
+        _result_cache[key] = (risk_score, is_legal, tuple(reasons), needs_review)
+        while len(_result_cache) > _RESULT_CACHE_MAX_ENTRIES:
+            _result_cache.popitem(last=False)
+    return risk_score, is_legal, reasons, needs_review
+
+
+def check_legality_batch(jobs: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
     """
-    risk_score = 0.0
-    reasons = []
-    
-    # Combine all text for checking
-    full_text = f"{title} {company} {description}".lower()
-    country = _infer_country(country_code, location, full_text)
-    
-    # CRITICAL PATTERNS - Immediate rejection (1.0+ risk each)
-    critical_patterns = [
-        # Scams & Fraud
-        (r"(výdělek|peníze|zisk).*bez (práce|úsilí|investice)", "🚨 Slibuje výdělek bez práce - podezření na podvod", 1.0),
-        (r"rychl[éý].*peníze|peníze.*rychle", "🚨 Slibuje rychlé peníze - typický scam", 1.0),
-        (r"(poplatek|platba|zaplatit).*předem", "🚨 Vyžaduje platbu předem - podvod", 1.0),
-        (r"garantovan[ýá].*výdělek", "🚨 Garantovaný výdělek - nereálné sliby", 1.0),
-        
-        # Illegal Activities
-        (r"pilot.*letadlo|řidič.*letadla", "🚨 Nabídka pilota/letadla - mimo zaměření portálu", 1.0),
-        (r"pašování|nelegální|černá práce", "🚨 Zmínka o nelegálních aktivitách", 1.0),
-        (r"bez smlouvy|bez odvodu|na černo", "🚨 Práce na černo", 1.0),
-        
-        # MLM & Pyramid Schemes
-        (r"(multi.*level|mlm|síťový marketing)", "🚨 MLM/Síťový marketing - podezřelý model", 1.0),
-        (r"(buduj|vytvoř).*tým.*pod sebou", "🚨 Pyramidový systém", 1.0),
-        (r"pasivní příjem|zisk.*spánku", "🚨 Pasivní příjem - typický MLM", 1.0),
-        
-        # Cryptocurrency Scams
-        (r"(bitcoin|krypto|crypto).*záruka.*zisk", "🚨 Krypto scam s garantovaným ziskem", 1.0),
-        (r"investice.*krypto.*bez rizika", "🚨 Podvodná krypto investice", 1.0),
-    ]
-    
-    # HIGH RISK PATTERNS - Manual review required (0.5 risk each)
-    high_risk_patterns = [
-        # Unrealistic Promises
-        (r"\d{4,}.*kč.*hodinu.*bez (zkušeností|praxe)", "⚠️ Nerealistický plat pro začátečníky", 0.5),
-        (r"(50|60|70|80|90|100).*tisíc.*měsíc.*bez (zkušeností|praxe)", "⚠️ Podezřele vysoký plat bez požadavků", 0.5),
-        (r"vydělávejte.*doma|práce.*z.*pohodlí", "⚠️ Práce z domu s podezřelými sliby", 0.4),
-        
-        # Suspicious Requirements
-        (r"(investice|vklad|kapitál).*nutný", "⚠️ Vyžaduje investici od zaměstnance", 0.6),
-        (r"kup.*produkt|zakup.*balíček", "⚠️ Vyžaduje nákup produktů", 0.6),
-        (r"školení.*za.*poplatek", "⚠️ Placené školení před nástupem", 0.4),
-        
-        # MLM Indicators
-        (r"(neomezen[ýá]|unlimited).*výdělek", "⚠️ Neomezený výdělek - typické pro MLM", 0.5),
-        (r"buď.*svým.*šéfem|vlastní.*boss", "⚠️ MLM marketing fráze", 0.3),
-        (r"finanční.*svoboda|time.*freedom", "⚠️ MLM marketing fráze", 0.3),
-        
-        # Vague or Missing Information
-        (r"^.{0,50}$", "⚠️ Příliš krátký popis pozice", 0.3),  # Very short description
-        (r"kontakt.*pouze.*sms|pouze.*whatsapp", "⚠️ Podezřelý způsob kontaktu", 0.4),
-        
-        # Gambling & Adult Content
-        (r"(casino|kasino|sázky|gambling)", "⚠️ Gambling/sázky - vyžaduje revizi", 0.5),
-        (r"(escort|adult|erotick)", "⚠️ Adult content - mimo zaměření", 0.6),
-        
-        # Suspicious Company Names
-        (r"(neznámá|unknown|anonymní).*společnost", "⚠️ Neznámá nebo anonymní společnost", 0.4),
-    ]
-    
-    # Check critical patterns first
-    for pattern, reason, score in critical_patterns:
-        if re.search(pattern, full_text, re.IGNORECASE):
-            risk_score += score
-            reasons.append(reason)
-    
-    # Check high risk patterns
-    for pattern, reason, score in high_risk_patterns:
-        if re.search(pattern, full_text, re.IGNORECASE):
-            risk_score += score
-            reasons.append(reason)
-
-    # --- Country-specific rules ---
-    if country == "at":
-        # AT: salary disclosure is mandatory (Kollektivvertrag / Mindestgehalt)
-        salary_keywords = [
-            r"\b(€|eur)\b",
-            r"gehalt", r"lohn", r"entgelt", r"brutto",
-            r"kollektivvertrag", r"\bkv\b", r"mindestgehalt"
-        ]
-        has_salary_info = any(re.search(k, full_text, re.IGNORECASE) for k in salary_keywords) or re.search(r"\d{2,}\s*(€|eur)", full_text)
-        if not has_salary_info:
-            risk_score += 0.6
-            reasons.append("⚠️ AT: Chybí povinné údaje o mzdě (Kollektivvertrag/Mindestgehalt)")
-
-        # AT: potential Scheinselbständigkeit risk (single-client contractor)
-        contractor_markers = [
-            r"\bi[čc]o\b", r"\bb2b\b", r"contractor", r"self[-\s]?employed",
-            r"freelanc", r"selbst[äa]ndig", r"freier\s*dienstnehmer", r"werkvertrag"
-        ]
-        single_client_markers = [
-            r"exklusiv", r"nur\s*f[üu]r\s*uns", r"nur\s*einen\s*kunden",
-            r"for\s*one\s*client", r"single\s*client", r"pro\s*jednoho\s*klienta"
-        ]
-        has_contractor = any(re.search(k, full_text, re.IGNORECASE) for k in contractor_markers)
-        has_single_client = any(re.search(k, full_text, re.IGNORECASE) for k in single_client_markers)
-        if has_contractor and has_single_client:
-            risk_score += 0.6
-            reasons.append("⚠️ AT: Riziko Scheinselbständigkeit (contractor + jediný klient)")
-    
-    # Additional checks
-    
-    # Check for excessive exclamation marks (spam indicator)
-    exclamation_count = full_text.count('!')
-    if exclamation_count > 5:
-        risk_score += 0.3
-        reasons.append(f"⚠️ Nadměrné použití vykřičníků ({exclamation_count}x) - spam indikátor")
-    
-    # Check for ALL CAPS in title (spam indicator)
-    if title.isupper() and len(title) > 10:
-        risk_score += 0.2
-        reasons.append("⚠️ Titulek celý velkými písmeny - spam indikátor")
-    
-    # Check for suspicious email domains in description
-    suspicious_domains = r"(gmail\.com|seznam\.cz|email\.cz).*kontakt"
-    if re.search(suspicious_domains, full_text):
-        risk_score += 0.2
-        reasons.append("⚠️ Používá osobní email místo firemního")
-    
-    # Determine legality status
-    is_legal = risk_score < 1.0
-    needs_manual_review = 0.5 <= risk_score < 1.0
-    
-    # Cap risk score at reasonable maximum
-    risk_score = min(risk_score, 10.0)
-    
-    return risk_score, is_legal, reasons, needs_manual_review
+    Ingest helper: evaluates job dicts (``title``, ``company``, ``description``,
+    ``country_code``, ``location``) and returns one result dict per job, in order.
+    Duplicate postings inside the batch or seen recently are served from the cache.
+    """
+    results: list[dict[str, Any]] = []
+    for job in jobs:
+        risk_score, is_legal, reasons, needs_review = check_legality_rules(
+            str(job.get("title") or ""),
+            str(job.get("company") or ""),
+            str(job.get("description") or ""),
+            job.get("country_code"),
+            job.get("location"),
+        )
+        results.append(
+            {
+                "risk_score": risk_score,
+                "is_legal": is_legal,
+                "reasons": reasons,
+                "needs_manual_review": needs_review,
+                "legality_status": "illegal" if not is_legal else ("review" if needs_review else "legal"),
+                "ruleset_version": _RULESET.version,
+            }
+        )
+    return results
+
+
+def legality_cache_stats() -> dict[str, Any]:
+    with _result_cache_lock:
+        return {**_CACHE_STATS, "entries": len(_result_cache), "ruleset_version": _RULESET.version}
+
+
+def clear_legality_cache() -> None:
+    with _result_cache_lock:
+        _result_cache.clear()
+        _CACHE_STATS.update({"hits": 0, "misses": 0})
@@ -12,6 +12,7 @@ from ..ai_orchestration.client import (
     call_primary_with_fallback,
     get_default_fallback_model,
     get_default_primary_model,
+    is_json_object,
 )
 from ..core.runtime_config import get_active_model_config, get_release_flag
 from .candidate_intent import get_domain_keywords, resolve_candidate_intent_profile
@@ -168,6 +169,8 @@ def get_candidate_recommendation_intelligence(candidate_profile: Dict[str, Any],
             primary_model,
             fallback_model,
             generation_config=generation_config,
+            cache=True,
+            cache_valid=is_json_object,
         )
         parsed = _extract_json(result.text)
         payload = {
@@ -13,6 +13,7 @@ from ..ai_orchestration.client import (
     call_primary_with_fallback,
     get_default_fallback_model,
     get_default_primary_model,
+    is_json_object,
 )
 from ..core.runtime_config import get_active_model_config, get_release_flag
 
@@ -114,6 +115,8 @@ def enrich_search_query(search_term: str, language: str = "cs", subject_id: Opti
             primary_model,
             fallback_model,
             generation_config=generation_config,
+            cache=True,
+            cache_valid=is_json_object,
         )
         parsed = _extract_json(result.text)
         normalized_query = str(parsed.get("normalized_query") or raw).strip()
@@ -326,6 +326,8 @@ def _ai_parse(query: str, locale: str) -> Optional[Dict[str, Any]]:
             primary,
             get_default_fallback_model(),
             generation_config={"temperature": 0, "top_p": 1},
+            cache=True,
+            cache_valid=lambda text: isinstance(_extract_json_safe(text), dict),
         )
     except Exception as exc:
         logger.info("AI search parse failed, using heuristic fallback: %s", exc)
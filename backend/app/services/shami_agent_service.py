@@ -3,8 +3,10 @@ import logging
 from typing import Any, Dict, List
 from datetime import datetime
 
+from app.ai_orchestration.context_budget import compact_json, compact_messages, fold_memory
+from app.ai_orchestration.prompt_registry import get_prompt_budget
 from app.core.database import supabase
-from app.services.azure_ai_client import AzureAIClientError, call_ai_json
+from app.services.azure_ai_client import AzureAIClientError, acall_ai_json, call_ai_json
 from app.services.shami_persona import output_language_name, shami_persona_prompt
 
 logger = logging.getLogger(__name__)
@@ -63,6 +65,48 @@ def get_agent_memory(user_id: str) -> dict:
         "agent_state": row.get("agent_state"),
     }
 
+def agent_memory_context(memory: dict, incoming_messages: list, *, keep_last: int = 4) -> list:
+    """
+    Conversation context for the recruiter agent: the memory checkpoint summary (if any),
+    then the last persisted messages and the inline ones from the request.
+    """
+    persisted = memory.get("chat_history", []) or []
+    recent = list(persisted[-keep_last:]) + list(incoming_messages or [])
+    agent_state = memory.get("agent_state")
+    checkpoint = agent_state.get("memory_checkpoint") if isinstance(agent_state, dict) else None
+    summary = str((checkpoint or {}).get("summary") or "").strip()
+    if summary:
+        recent = [{"role": "summary", "message": summary}] + recent
+    return recent
+
+
+def checkpoint_agent_memory(chat_history: list, agent_state: dict | None, *, keep_last: int = 20) -> tuple[list, dict | None]:
+    """Fold messages beyond ``keep_last`` into the agent_state memory checkpoint instead of dropping them."""
+    budget = get_prompt_budget("recruiter_chat")
+    state = dict(agent_state) if isinstance(agent_state, dict) else {}
+    history = [item for item in chat_history or [] if isinstance(item, dict) and item.get("role") != "summary"]
+    history, checkpoint = fold_memory(
+        history,
+        state.get("memory_checkpoint"),
+        keep_last=keep_last,
+        summary_tokens=budget["memory_summary"],
+    )
+    if checkpoint:
+        state["memory_checkpoint"] = checkpoint
+    return history, state or None
+
+
+def record_agent_turn(memory: dict, incoming_messages: list, message: str, reply: str, *, keep_last: int = 20) -> tuple[list, dict | None]:
+    """
+    Chat history and agent_state to store after one recruiter turn. The whole persisted
+    history goes through the checkpoint, so turns past ``keep_last`` are folded into the
+    summary rather than lost; only the prompt (agent_memory_context) uses a short slice.
+    """
+    history = list(memory.get("chat_history", []) or []) + list(incoming_messages or [])
+    history += [{"role": "user", "message": message}, {"role": "agent", "message": reply}]
+    return checkpoint_agent_memory(history, memory.get("agent_state"), keep_last=keep_last)
+
+
 def save_agent_memory(user_id: str, chat_history: list, agent_state: dict = None):
     """Uloží nebo aktualizuje paměť agenta pro daného uživatele."""
     now = datetime.utcnow().isoformat() + "Z"
@@ -88,19 +132,21 @@ def save_agent_memory(user_id: str, chat_history: list, agent_state: dict = None
         payload["created_at"] = now
         supabase.table("shami_agent_memory").insert(payload).execute()
 
-def build_shami_recruiter_agent_reply(
+def _build_shami_recruiter_agent_reply_prompt(
     *,
     message: str,
     company: Dict[str, Any] | None,
     roles: List[Dict[str, Any]] | None,
     candidates: List[Dict[str, Any]] | None,
     recent_messages: List[Dict[str, str]] | None = None,
-) -> Dict[str, Any]:
+) -> str:
     cleaned_message = str(message or "").strip()
     if not cleaned_message:
         raise ValueError("message is required")
 
     lang = _detect_recruiter_language(company, cleaned_message)
+    budget = get_prompt_budget("recruiter_chat")
+    history_budget = budget["history"] + budget["memory_summary"]
 
     # Format brief contexts to avoid overloading tokens
     company_name = (company or {}).get("name") or "company"
@@ -203,13 +249,13 @@ Company context:
 {json.dumps(company_context, ensure_ascii=False, default=str)}
 
 Active positions:
-{json.dumps(simplified_roles[:10], ensure_ascii=False, default=str)}
+{compact_json(simplified_roles[:10], budget["roles"])}
 
 Candidates in talent pool:
-{json.dumps(simplified_candidates[:12], ensure_ascii=False, default=str)}
+{compact_json(simplified_candidates[:12], budget["candidates"])}
 
 Recent conversation:
-{json.dumps(recent_messages or [], ensure_ascii=False, default=str)}
+{compact_json(compact_messages(recent_messages or [], history_budget, max_message_tokens=max(300, budget["memory_summary"])), history_budget)}
 
 User message:
 {cleaned_message}
@@ -230,13 +276,10 @@ Output format (return only valid JSON):
   "profile_update_request": null OR {{"language": "cs", "preferences": {{...}}}} if user asks for profile changes
 }}
 """
-    try:
-        # Sweden Central calls using our Sweden Central primary deployment (gpt-5-mini)
-        payload, result = call_ai_json(prompt, temperature=0.5, timeout=45)
-    except AzureAIClientError as exc:
-        logger.warning("AzureAIClientError in build_shami_recruiter_agent_reply: %s", exc)
-        raise
+    return prompt
 
+
+def _build_shami_recruiter_agent_reply_result(payload: Dict[str, Any], result: Any) -> Dict[str, Any]:
     reply = str(payload.get("reply") or "").strip()
     if not reply:
         raise AzureAIClientError("AI response did not include reply")
@@ -256,14 +299,49 @@ Output format (return only valid JSON):
     }
 
 
-def build_shami_role_detail_insight(
+def build_shami_recruiter_agent_reply(
+    *,
+    message: str,
+    company: Dict[str, Any] | None,
+    roles: List[Dict[str, Any]] | None,
+    candidates: List[Dict[str, Any]] | None,
+    recent_messages: List[Dict[str, str]] | None = None,
+) -> Dict[str, Any]:
+    prompt = _build_shami_recruiter_agent_reply_prompt(message=message, company=company, roles=roles, candidates=candidates, recent_messages=recent_messages)
+    try:
+        # Sweden Central calls using our Sweden Central primary deployment (gpt-5-mini)
+        payload, result = call_ai_json(prompt, temperature=0.5, timeout=45)
+    except AzureAIClientError as exc:
+        logger.warning("AzureAIClientError in build_shami_recruiter_agent_reply: %s", exc)
+        raise
+    return _build_shami_recruiter_agent_reply_result(payload, result)
+
+
+async def abuild_shami_recruiter_agent_reply(
+    *,
+    message: str,
+    company: Dict[str, Any] | None,
+    roles: List[Dict[str, Any]] | None,
+    candidates: List[Dict[str, Any]] | None,
+    recent_messages: List[Dict[str, str]] | None = None,
+) -> Dict[str, Any]:
+    """Non-blocking variant for async endpoints (pooled transport, 45 s deadline)."""
+    prompt = _build_shami_recruiter_agent_reply_prompt(message=message, company=company, roles=roles, candidates=candidates, recent_messages=recent_messages)
+    try:
+        payload, result = await acall_ai_json(prompt, temperature=0.5, deadline_seconds=45)
+    except AzureAIClientError as exc:
+        logger.warning("AzureAIClientError in build_shami_recruiter_agent_reply: %s", exc)
+        raise
+    return _build_shami_recruiter_agent_reply_result(payload, result)
+
+
+def _build_shami_role_detail_insight_prompt(
     *,
     role: Dict[str, Any],
     blueprint: Dict[str, Any] | None,
     profile: Dict[str, Any] | None,
     locale: str = "en",
-) -> Dict[str, Any]:
-    """Build a concise candidate-facing interpretation for a role detail page."""
+) -> str:
     role_title = str(role.get("title") or "").strip()
     if not role_title:
         raise ValueError("role.title is required")
@@ -367,8 +445,10 @@ Return only valid JSON:
   "suggested_first_move": "one concrete first move before starting the handshake"
 }}
 """
-    payload, result = call_ai_json(prompt, temperature=0.35, timeout=45)
+    return prompt
 
+
+def _build_shami_role_detail_insight_result(payload: Dict[str, Any], result: Any) -> Dict[str, Any]:
     signals = payload.get("signals") if isinstance(payload.get("signals"), list) else []
     cleaned_signals = []
     for signal in signals[:3]:
@@ -391,3 +471,29 @@ Return only valid JSON:
         "model": result.model_name,
         "latency_ms": result.latency_ms,
     }
+
+
+def build_shami_role_detail_insight(
+    *,
+    role: Dict[str, Any],
+    blueprint: Dict[str, Any] | None,
+    profile: Dict[str, Any] | None,
+    locale: str = "en",
+) -> Dict[str, Any]:
+    """Build a concise candidate-facing interpretation for a role detail page."""
+    prompt = _build_shami_role_detail_insight_prompt(role=role, blueprint=blueprint, profile=profile, locale=locale)
+    payload, result = call_ai_json(prompt, temperature=0.35, timeout=45)
+    return _build_shami_role_detail_insight_result(payload, result)
+
+
+async def abuild_shami_role_detail_insight(
+    *,
+    role: Dict[str, Any],
+    blueprint: Dict[str, Any] | None,
+    profile: Dict[str, Any] | None,
+    locale: str = "en",
+) -> Dict[str, Any]:
+    """Non-blocking variant for async endpoints (pooled transport, 45 s deadline)."""
+    prompt = _build_shami_role_detail_insight_prompt(role=role, blueprint=blueprint, profile=profile, locale=locale)
+    payload, result = await acall_ai_json(prompt, temperature=0.35, deadline_seconds=45)
+    return _build_shami_role_detail_insight_result(payload, result)
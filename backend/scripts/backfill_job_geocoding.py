@@ -16,7 +16,7 @@ if __name__ == "__main__":
 try:
     from scraper.geocoding import ( # type: ignore
         MAJOR_CITIES_CACHE,
-        geocode_location,
+        geocode_many,
         normalize_address,
     )
     from scraper.scraper_base import get_supabase_client # type: ignore
@@ -28,6 +28,9 @@ except (ImportError, ModuleNotFoundError):
     )
     from scraper_base import get_supabase_client # type: ignore
 
+    def geocode_many(locations): # type: ignore
+        return {location: geocode_location(location) for location in dict.fromkeys(locations)}
+
 
 DEFAULT_BATCH_SIZE = int(os.getenv("BACKFILL_GEO_BATCH_SIZE", "300"))
 DEFAULT_SLEEP_SECONDS = float(os.getenv("BACKFILL_GEO_SLEEP_SECONDS", "0.1"))
@@ -202,6 +205,23 @@ def backfill(
         if not rows:
             break
 
+        selected = [
+            row
+            for row in rows
+            if should_process_row(
+                location=row.get("location"),
+                lat=row.get("lat"),
+                lng=row.get("lng"),
+                mode=mode,
+                normalized_city_cache=normalized_city_cache,
+                city_match_km=city_match_km,
+            )
+        ]
+        # Repeated locations in a batch are geocoded once; the shared persistent cache
+        # answers the ones the scrapers (or an earlier run) already resolved.
+        batch_geo = geocode_many(row.get("location") for row in selected)
+        selected_ids = {id(row) for row in selected}
+
         for row in rows:
             scanned += 1
             job_id = row.get("id")
@@ -209,19 +229,12 @@ def backfill(
             lat = row.get("lat")
             lng = row.get("lng")
 
-            if not should_process_row(
-                location=location,
-                lat=lat,
-                lng=lng,
-                mode=mode,
-                normalized_city_cache=normalized_city_cache,
-                city_match_km=city_match_km,
-            ):
+            if id(row) not in selected_ids:
                 last_id = job_id
                 continue
 
             candidates += 1
-            new_geo = geocode_location(location)
+            new_geo = batch_geo.get(location)
             if not new_geo:
                 failed += 1
                 print(f"⚠️ {job_id}: geocode failed for '{location}'")
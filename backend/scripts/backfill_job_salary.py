@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+from collections import defaultdict
+
+# Allow importing from backend/scraper when run as a script
+if __name__ == "__main__":
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    scraper_dir = os.path.join(backend_dir, "scraper")
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+    if scraper_dir not in sys.path:
+        sys.path.insert(0, scraper_dir)
+
+try:
+    from scraper.scraper_base import get_supabase_client, parse_salaries # type: ignore
+except (ImportError, ModuleNotFoundError):
+    from scraper_base import get_supabase_client, parse_salaries # type: ignore
+
+
+BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "200"))
+SLEEP_SECONDS = float(os.getenv("BACKFILL_SLEEP_SECONDS", "0.2"))
+
+
+def salary_updates(rows):
+    """(job id, columns) for rows whose description names a salary next to a currency."""
+    by_country = defaultdict(list)
+    for row in rows:
+        by_country[(row.get("country_code") or "").lower()].append(row)
+
+    updates = []
+    for country, country_rows in by_country.items():
+        # Anchored: only numbers written against a currency, not dates or head counts.
+        infos = parse_salaries([row.get("description") or "" for row in country_rows], country=country, anchored=True)
+        for row, info in zip(country_rows, infos):
+            if info.salary_from:
+                fields = info.to_job_fields()
+                if not fields["salary_timeframe"]:
+                    fields.pop("salary_timeframe")
+                updates.append((row.get("id"), fields))
+    return updates
+
+
+def backfill() -> None:
+    supabase = get_supabase_client()
+    if not supabase:
+        print("❌ Supabase klient není dostupný.")
+        return
+
+    last_id = 0
+    total_scanned = 0
+    total_updated = 0
+
+    print("🚀 Backfill salary_from/salary_to: start")
+
+    while True:
+        # Fetch next batch of jobs without a salary
+        res = (
+            supabase
+            .table("jobs")
+            .select("id,description,country_code")
+            .is_("salary_from", "null")
+            .gt("id", last_id)
+            .order("id", desc=False)
+            .limit(BATCH_SIZE)
+            .execute()
+        )
+
+        rows = res.data or []
+        if not rows:
+            break
+
+        total_scanned += len(rows)
+        last_id = rows[-1].get("id")
+        for job_id, fields in salary_updates(rows):
+            try:
+                supabase.table("jobs").update(fields).eq("id", job_id).execute()
+                total_updated += 1
+                print(f"✅ {job_id} -> {fields['salary_from']}-{fields['salary_to']} {fields['salary_currency']}")
+            except Exception as e:
+                print(f"❌ Update failed for {job_id}: {e}")
+
+            if SLEEP_SECONDS > 0:
+                time.sleep(SLEEP_SECONDS)
+
+        print(f"📦 Batch done. scanned={total_scanned} updated={total_updated}")
+
+    print(f"🏁 Backfill done. scanned={total_scanned} updated={total_updated}")
+
+
+if __name__ == "__main__":
+    backfill()
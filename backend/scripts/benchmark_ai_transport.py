@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Async AI transport latency against a local stub provider.
+
+Measures time-to-first-token vs. full-response latency for a streamed answer, and
+p50/p95 latency of a primary -> fallback chain when a share of primary calls stall,
+with and without hedging.
+
+Usage:
+  cd backend && python scripts/benchmark_ai_transport.py [--calls 40] [--stall-share 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from app.ai_orchestration.transport import AITransport, ChatRequest
+
+
+def _start_stub(stall_share: float, stall_seconds: float, token_delay: float) -> str:
+    rng = random.Random(3)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with lock:
+                stalled = body["model"] == "primary" and rng.random() < stall_share
+            time.sleep(0.05 + (stall_seconds if stalled else 0.0))
+            tokens = ["token "] * 20
+            if body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for token in tokens:
+                    self.wfile.write(f"data: {json.dumps({'choices': [{'delta': {'content': token}}]})}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(token_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+                return
+            time.sleep(token_delay * len(tokens))
+            encoded = json.dumps({"choices": [{"message": {"content": "".join(tokens)}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            pass
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _run(url: str, calls: int) -> None:
+    def request(model: str) -> ChatRequest:
+        return ChatRequest("stub", model, url, {"Content-Type": "application/json"}, {"model": model, "messages": []})
+
+    transport = AITransport(hedge_min_delay=0.2, hedge_default_delay=0.6)
+    ttft, full = [], []
+    for _ in range(calls // 2):
+        started = time.perf_counter()
+        async for _delta in transport.stream([request("fallback")]):
+            if len(ttft) == len(full):
+                ttft.append(time.perf_counter() - started)
+        full.append(time.perf_counter() - started)
+    print(f"streaming:  time to first token p50 {statistics.median(ttft) * 1000:7.0f} ms, full answer p50 {statistics.median(full) * 1000:7.0f} ms")
+
+    for label, hedge in (("sequential", 1e9), ("hedged", None)):
+        chain_transport = AITransport(hedge_min_delay=0.2, hedge_default_delay=hedge or 0.6, hedge_max_delay=hedge or 20.0)
+        latencies = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            await chain_transport.complete([request("primary"), request("fallback")])
+            latencies.append(time.perf_counter() - started)
+        await chain_transport.aclose()
+        print(f"{label:<11} chain: p50 {_percentile(latencies, 0.5) * 1000:7.0f} ms, p95 {_percentile(latencies, 0.95) * 1000:7.0f} ms")
+    await transport.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--stall-share", type=float, default=0.2)
+    parser.add_argument("--stall-seconds", type=float, default=3.0)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    url = _start_stub(args.stall_share, args.stall_seconds, args.token_delay)
+    print(f"{args.calls} calls, {args.stall_share:.0%} of primary calls stall for {args.stall_seconds:.1f} s")
+    asyncio.run(_run(url, args.calls))
+
+
+if __name__ == "__main__":
+    main()
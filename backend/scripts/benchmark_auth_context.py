@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Per-request overhead of resolving the legacy auth context.
+
+Compares the old cache (dict + deepcopy on every hit) with the frozen
+AuthContextResolver, and the cold-path round trips of both loaders.
+
+Usage:
+  cd backend && python scripts/benchmark_auth_context.py [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from copy import deepcopy
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.core.auth_context import AuthContextResolver, build_auth_context
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+
+# Round trips on a cold token: auth.get_user + Supabase reads + V2 SQL statements.
+LEGACY_COLD_ROUND_TRIPS = 1 + 4 + 2
+RESOLVER_COLD_ROUND_TRIPS = 1 + 1 + 1
+
+
+def _profile() -> dict:
+    return {
+        "id": USER_ID,
+        "role": "recruiter",
+        "full_name": "Benchmark Recruiter",
+        "preferences": {"lang": "cs", "notifications": {"email": True, "push": False}, "tags": ["it", "sales"]},
+        "skills": [f"skill-{i}" for i in range(25)],
+    }
+
+
+def _context():
+    companies = [{"id": f"company-{i}", "name": f"Company {i}", "type": "owner" if i == 0 else "member"} for i in range(5)]
+    v2_companies = [{"id": f"v2-company-{i}", "name": f"V2 Company {i}", "role": "recruiter"} for i in range(3)]
+    return build_auth_context(
+        user_id=USER_ID,
+        email="bench@example.com",
+        profile_row=_profile(),
+        supabase_companies=companies,
+        v2_user={"id": "v2-user", "role": "recruiter"},
+        v2_companies=v2_companies,
+    )
+
+
+def bench_legacy_hits(requests: int) -> float:
+    cached = _context().as_user()
+    cached["preferences"] = deepcopy(_profile()["preferences"])
+    cache = {"token": cached}
+    started = time.perf_counter()
+    for _ in range(requests):
+        deepcopy(cache["token"])
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def bench_resolver_hits(requests: int) -> float:
+    context = _context()
+
+    async def loader(_token):
+        return context
+
+    resolver = AuthContextResolver(loader, max_entries=5000, ttl_seconds=3600)
+
+    async def run() -> float:
+        await resolver.resolve("token")
+        started = time.perf_counter()
+        for _ in range(requests):
+            (await resolver.resolve("token")).as_user()
+        return (time.perf_counter() - started) / requests * 1e6
+
+    return asyncio.run(run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    legacy_us = bench_legacy_hits(args.requests)
+    resolver_us = bench_resolver_hits(args.requests)
+    print(f"cache hit, dict + deepcopy:     {legacy_us:8.2f} us/request")
+    print(f"cache hit, frozen context:      {resolver_us:8.2f} us/request ({legacy_us / max(resolver_us, 1e-9):.1f}x)")
+    print(f"cold token round trips, legacy: {LEGACY_COLD_ROUND_TRIPS}")
+    print(f"cold token round trips, now:    {RESOLVER_COLD_ROUND_TRIPS}")
+
+
+if __name__ == "__main__":
+    main()
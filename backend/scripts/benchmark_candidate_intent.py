@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Candidate intent resolution: per-profile keyword loop vs. the precompiled CandidateIntentIndex.
+
+Scores synthetic profiles (title, CV text, skills) against the domain taxonomy, then
+resolves them again to show the per-version intent cache (digest and recommendation
+runs resolve the same profiles repeatedly).
+
+Usage:
+  cd backend && python scripts/benchmark_candidate_intent.py [--profiles 10000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("CANDIDATE_INTENT_TAXONOMY_PATH", str(BACKEND_DIR.parent / "frontend" / "src" / "shared" / "candidate_intent_taxonomy.json"))
+
+from app.services import candidate_intent
+
+
+def _linear_normalize(value) -> str:
+    text = str(value or "").lower()
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.split())
+
+
+def _linear_score_domains(chunks):
+    normalize = _linear_normalize
+    joined = "\n".join(normalize(chunk) for chunk in chunks if str(chunk or "").strip())
+    if not joined:
+        return []
+    scores = []
+    for domain_key, definition in (candidate_intent._load_taxonomy().get("domains") or {}).items():
+        score = 0.0
+        for keyword in definition.get("keywords") or []:
+            normalized_keyword = normalize(keyword)
+            if not normalized_keyword:
+                continue
+            if normalized_keyword in joined:
+                score += 3.0
+                continue
+            parts = [part for part in normalized_keyword.split(" ") if part]
+            if len(parts) > 1 and all(part in joined for part in parts):
+                score += 1.5
+        if score > 0:
+            scores.append({"domain": domain_key, "score": score})
+    scores.sort(key=lambda item: item["score"], reverse=True)
+    return scores
+
+
+def _profiles(count: int) -> list[dict]:
+    rng = random.Random(42)
+    domains = candidate_intent._load_taxonomy()["domains"]
+    words = [word for definition in domains.values() for keyword in definition["keywords"] for word in keyword.split()]
+    words += ["zkušenosti", "práce", "tým", "firma", "projekt", "vývoj", "klient", "odpovědnost"] * 30
+    return [
+        {
+            "id": index,
+            "job_title": rng.choice(["Senior Product Manager", "Účetní", "Vedoucí skladu", "Backend developer"]),
+            "cv_text": " ".join(rng.choice(words) for _ in range(rng.randint(80, 400))),
+            "skills": rng.sample(words, 6),
+        }
+        for index in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=int, default=10000)
+    args = parser.parse_args()
+
+    profiles = _profiles(args.profiles)
+    chunks = [candidate_intent._collect_profile_chunks(profile) for profile in profiles]
+
+    started = time.perf_counter()
+    for item in chunks:
+        _linear_score_domains(item)
+    linear = time.perf_counter() - started
+
+    started = time.perf_counter()
+    candidate_intent._intent_index()
+    build_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for item in chunks:
+        candidate_intent._score_domains(item)
+    indexed = time.perf_counter() - started
+
+    candidate_intent.clear_candidate_intent_cache()
+    started = time.perf_counter()
+    for profile in profiles:
+        candidate_intent.resolve_candidate_intent_profile(profile)
+    resolve_cold = time.perf_counter() - started
+    started = time.perf_counter()
+    for profile in profiles:
+        candidate_intent.resolve_candidate_intent_profile(profile)
+    resolve_warm = time.perf_counter() - started
+
+    per_profile = lambda seconds: seconds / len(profiles) * 1e6
+    print(f"{len(profiles)} profiles, taxonomy {candidate_intent._intent_index().version}")
+    print(f"index build:            {build_ms:8.1f} ms (once per taxonomy load)")
+    print(f"keyword loop:           {per_profile(linear):8.1f} us/profile")
+    print(f"presence bitmap:        {per_profile(indexed):8.1f} us/profile ({linear / max(indexed, 1e-9):.1f}x)")
+    print(f"resolve (cold cache):   {per_profile(resolve_cold):8.1f} us/profile")
+    print(f"resolve (same version): {per_profile(resolve_warm):8.1f} us/profile")
+
+
+if __name__ == "__main__":
+    main()
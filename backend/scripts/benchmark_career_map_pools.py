@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Career map pool filtering: per-job predicates vs. the columnar CareerMapPoolIndex.
+
+Builds a synthetic global-sized pool and times every combination of the map
+filters (scope, work model, contract type, salary floor, benefits, commute radius).
+
+Usage:
+  cd backend && python scripts/benchmark_career_map_pools.py [--jobs 4800] [--rounds 3]
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from app.services import career_map_pools as pools
+
+
+def _jobs(count: int) -> list[dict]:
+    rng = random.Random(42)
+    titles = ["Senior Python Developer", "Junior Accountant", "Warehouse Operator", "Team Lead Sales", "Product Manager"]
+    descriptions = [
+        "Full-time HPP in our Prague office. " * 20,
+        "B2B contract, home office possible. " * 20,
+        "Hybrid work with flexible hours. " * 20,
+        "Freelance ICO cooperation. " * 20,
+    ]
+    return [
+        {
+            "id": index,
+            "title": rng.choice(titles),
+            "description": rng.choice(descriptions),
+            "country_code": rng.choice(["CZ", "SK", "PL", "DE", "AT"]),
+            "work_model": rng.choice(["", "remote", "hybrid", "onsite"]),
+            "salary_from": rng.choice([None, 25000, 45000, 80000]),
+            "benefits": rng.choice([["Meal vouchers", "Sick days"], ["Home office"], [], ["Multisport card"]]),
+            "lat": 50.08 + rng.uniform(-2, 2),
+            "lng": 14.43 + rng.uniform(-2, 2),
+            "job_intelligence": {"role_family": rng.choice(["software_engineering", "finance", "operations"])},
+        }
+        for index in range(count)
+    ]
+
+
+def _linear(jobs, *, country_code, work_arrangement, remote_only, contract_types, min_salary, benefits, radius_km, limit=1200):
+    out = []
+    for job in jobs:
+        if country_code and pools._normalize_country_code(job.get("country_code")) != country_code:
+            continue
+        if not pools._matches_work_arrangement(job, work_arrangement, remote_only):
+            continue
+        if not pools._matches_contract_types(job, contract_types):
+            continue
+        if min_salary and int(job.get("salary_from") or 0) < int(min_salary):
+            continue
+        if not pools._has_required_benefits(job, benefits):
+            continue
+        if radius_km and not remote_only and work_arrangement != "remote":
+            if not pools._matches_commute(job, 50.08, 14.43, radius_km):
+                continue
+        out.append(job)
+        if len(out) >= limit:
+            break
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=4800)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    jobs = _jobs(args.jobs)
+    started = time.perf_counter()
+    index = pools.CareerMapPoolIndex(jobs)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    combos = list(
+        itertools.product(
+            ["", "CZ"],
+            ["all", "remote", "hybrid"],
+            [False, True],
+            [[], ["employee"]],
+            [None, 40000],
+            [[], ["meal vouchers"]],
+            [None, 50.0],
+        )
+    )
+    linear_total = indexed_total = 0.0
+    for _ in range(args.rounds):
+        for country, arrangement, remote_only, contract_types, min_salary, benefits, radius in combos:
+            kwargs = dict(
+                country_code=country,
+                work_arrangement=arrangement,
+                remote_only=remote_only,
+                contract_types=contract_types,
+                min_salary=min_salary,
+                benefits=benefits,
+                radius_km=radius,
+            )
+            started = time.perf_counter()
+            _linear(jobs, **kwargs)
+            linear_total += time.perf_counter() - started
+            started = time.perf_counter()
+            index.select(user_lat=50.08, user_lng=14.43, limit=1200, **kwargs)
+            indexed_total += time.perf_counter() - started
+
+    calls = len(combos) * args.rounds
+    print(f"pool size {args.jobs}, {len(combos)} filter combinations x {args.rounds} rounds")
+    print(f"index build:            {build_ms:8.1f} ms (once per background refresh)")
+    print(f"per-job predicates:     {linear_total / calls * 1000:8.3f} ms/request")
+    print(f"columnar bitmaps:       {indexed_total / calls * 1000:8.3f} ms/request ({linear_total / max(indexed_total, 1e-9):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Change-driven recommendation refresh: per-cycle work of a full refresh vs. dirty users only.
+
+Generates --users candidates (clustered around Czech cities, some without a location),
+then for each arrival rate in --arrivals runs one cycle in which --churn of the users
+edit their profile or interact and that many jobs arrive (--remote-share of them remote).
+Reports how many users the plan makes due, the planning time, and the recompute time at
+--recompute-ms per user against recomputing everyone.
+
+Usage:
+  cd backend && python scripts/benchmark_change_tracking.py [--users 100000] [--churn 0.01] [--arrivals 0,5,25,100]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from app.matching_engine.change_tracking import PROFILE, ChangeTracker, MemoryChangeStore
+
+CITIES = [
+    (50.08, 14.43, 0.30),  # Praha
+    (49.19, 16.61, 0.12),  # Brno
+    (49.82, 18.26, 0.08),  # Ostrava
+    (49.74, 13.37, 0.05),  # Plzeň
+    (50.77, 15.06, 0.04),  # Liberec
+    (49.59, 17.25, 0.04),  # Olomouc
+]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+def _place(rng: random.Random):
+    roll = rng.random()
+    for lat, lng, share in CITIES:
+        if roll < share:
+            return lat + rng.gauss(0, 0.08), lng + rng.gauss(0, 0.12)
+        roll -= share
+    if roll < 0.30:
+        return rng.uniform(48.6, 51.0), rng.uniform(12.1, 18.8)
+    return None
+
+
+def _users(count: int, rng: random.Random):
+    users = []
+    for index in range(count):
+        profile = {"id": f"user-{index}", "preferences": {"preferredCountryCode": "CZ"}}
+        place = _place(rng)
+        if place:
+            profile["lat"], profile["lng"] = place
+        users.append(profile)
+    return users
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--churn", type=float, default=0.01)
+    parser.add_argument("--arrivals", default="0,5,25,100")
+    parser.add_argument("--remote-share", type=float, default=0.05)
+    parser.add_argument("--recompute-ms", type=float, default=25.0)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    users = _users(args.users, rng)
+    full_s = args.users * args.recompute_ms / 1000.0
+    print(f"users={args.users} churn={args.churn:.1%} full refresh ≈ {full_s:,.0f} s of recompute per cycle")
+    print(f"{'arrivals':>8} {'dirty':>7} {'due':>8} {'due %':>6} {'plan ms':>8} {'recompute s':>12} {'saved':>6}")
+
+    for arrivals in [int(value) for value in args.arrivals.split(",") if value.strip()]:
+        clock = _Clock()
+        tracker = ChangeTracker(MemoryChangeStore(), clock=clock)
+        tracker.commit(tracker.plan("recommendations"))
+        clock.now += 60
+
+        changed = rng.sample(users, int(args.users * args.churn))
+        half = len(changed) // 2
+        tracker.mark_users([user["id"] for user in changed[:half]], PROFILE)
+        tracker.mark_interactions({"user_id": user["id"], "event_type": "save"} for user in changed[half:])
+        jobs = []
+        for index in range(arrivals):
+            place = _place(rng) or (50.08, 14.43)
+            remote = rng.random() < args.remote_share
+            jobs.append({"id": index, "country_code": "cz", "title": "Remote developer" if remote else "Skladník", "lat": place[0], "lng": place[1]})
+        tracker.note_jobs(jobs)
+        clock.now += 3600
+
+        started = time.perf_counter()
+        plan = tracker.plan("recommendations")
+        due, _ = plan.select(users)
+        plan_ms = (time.perf_counter() - started) * 1000.0
+        recompute_s = len(due) * args.recompute_ms / 1000.0
+        print(
+            f"{arrivals:>8} {len(plan.dirty):>7} {len(due):>8} {len(due) / args.users:>6.1%} {plan_ms:>8.0f} "
+            f"{recompute_s:>12,.0f} {1.0 - recompute_s / full_s:>6.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Prompt size reduction from context budgeting on the fixture CVs.
+
+For every CV in tests/fixtures/cv_samples.json, prints the approximate token count of the
+raw text and of its compacted form at the cv_parse budget and at tighter budgets, plus the
+time compaction takes.
+
+Usage:
+  cd backend && python scripts/benchmark_context_budget.py [--budgets 4000,1500,600] [--repeat 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from app.ai_orchestration.context_budget import compact_text, count_tokens
+from app.ai_orchestration.prompt_registry import get_prompt_budget
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fixtures", default=str(BACKEND_DIR / "tests" / "fixtures" / "cv_samples.json"))
+    parser.add_argument("--budgets", default="")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    cvs = json.loads(Path(args.fixtures).read_text(encoding="utf-8"))
+    default_budget = get_prompt_budget("cv_parse")["cv_text"]
+    budgets = [int(value) for value in args.budgets.split(",") if value.strip()] or [default_budget, 1500, 600]
+
+    def cell(tokens: int, raw: int) -> str:
+        return f"{tokens:>6} ({1 - tokens / max(1, raw):>5.0%})"
+
+    print(f"{'cv':<24} {'raw tok':>8} " + " ".join(f"{'@' + str(budget):>14}" for budget in budgets))
+    totals = {"raw": 0, **{budget: 0 for budget in budgets}}
+    for cv in cvs:
+        raw = count_tokens(cv["text"])
+        totals["raw"] += raw
+        cells = []
+        for budget in budgets:
+            compacted = count_tokens(compact_text(cv["text"], budget))
+            totals[budget] += compacted
+            cells.append(cell(compacted, raw))
+        print(f"{cv['id']:<24} {raw:>8} " + " ".join(f"{value:>14}" for value in cells))
+    print(f"{'total':<24} {totals['raw']:>8} " + " ".join(f"{cell(totals[budget], totals['raw']):>14}" for budget in budgets))
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for cv in cvs:
+            compact_text(cv["text"], budgets[-1])
+    elapsed = time.perf_counter() - started
+    print(f"compaction: {elapsed / (args.repeat * len(cvs)) * 1000:.2f} ms per CV")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+GermanyScraper detail throughput: detail pages and their iframes fetched one after
+the other against the bounded fetch_details pool.
+
+A local server emulates Stellenanzeigen's listing -> detail page -> ad iframe ->
+jobstatic frame chain, each response after --latency seconds (plus up to --jitter).
+The real scrape_stellenanzeigen_de runs against it with saving stubbed out, once with
+SCRAPER_DETAIL_WORKERS=1 and once per --workers value; the per-host throttle stays in
+the loop with --min-delay seconds between requests to the fixture host. The last
+column compares with the serial run plus the 3 s pause the parser used to take
+after every saved job.
+
+Usage:
+  cd backend && python scripts/benchmark_detail_fetch.py [--jobs 24] [--latency 0.2] [--workers 2 4 8]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+# scraper_de falls back to a top-level ``import scraper_base`` when loaded through the bridge.
+RUNTIME_SCRAPER_DIR = CURRENT_FILE.parents[2] / "runtime-services" / "scraper"
+if str(RUNTIME_SCRAPER_DIR) not in sys.path:
+    sys.path.insert(0, str(RUNTIME_SCRAPER_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+os.environ.setdefault("SCRAPER_HTTP_CACHE_ENABLED", "false")
+os.environ.setdefault("SCRAPER_URL_DEDUPE_ENABLED", "false")
+
+from scraper import scraper_de as de_bridge
+
+scraper_de = de_bridge._runtime_module
+# The scraper_base instance scraper_de fetches through.
+de_base = sys.modules[scraper_de.scrape_page.__module__]
+detail_fetch = de_base._detail_fetch
+AD_TEXT = "Ihre Aufgaben umfassen die Kommissionierung, Verladung und Inventur im Zentrallager Nord. " * 6
+PREVIOUS_PAUSE_SECONDS = 3.0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *_args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency + random.uniform(0.0, server.jitter))
+        job_id = self.path.rstrip("/").rsplit("-", 1)[-1].rsplit("/", 1)[-1]
+        if self.path == "/listing":
+            html = "".join(f"<a href='{server.base}/job/lagerlogistiker-{10000 + job}/'>Job</a>" for job in range(server.jobs))
+        elif self.path.startswith("/job/"):
+            html = f"<h1>Lagerlogistiker {job_id}</h1><iframe data-testid='qa-job-ad-iframe' src='{server.base}/api/jobs/iframe/{job_id}'></iframe>"
+        elif self.path.startswith("/api/jobs/iframe/"):
+            html = f"<iframe src='/jobstatic/{job_id}'></iframe>"
+        else:
+            posting = {"@type": "JobPosting", "title": f"Lagerlogistiker {job_id}", "description": f"<p>{AD_TEXT}</p>"}
+            html = f"<script type='application/ld+json'>{json.dumps(posting)}</script>"
+        body = f"<html><body>{html}</body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _run(server, workers: int):
+    saved = []
+    detail_fetch.SCRAPER_DETAIL_WORKERS = workers
+    scraper_de.save_job_to_supabase = lambda _supabase, job, _seen: saved.append(job) or True
+    listing = de_base.scrape_page(server.base + "/listing")
+    started = time.perf_counter()
+    scraper_de.GermanyScraper().scrape_page_jobs(listing, "stellenanzeigen.de")
+    return len(saved), time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--min-delay", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.jobs, server.latency, server.jitter = args.jobs, args.latency, args.jitter
+    server.base = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    de_base._DOMAIN_MIN_DELAY[de_base._get_domain(server.base)] = args.min_delay
+
+    print(f"jobs={args.jobs} latency={args.latency}s+{args.jitter}s min-delay={args.min_delay}s (3 fetches per job)")
+    print(f"{'workers':>8} {'saved':>6} {'seconds':>8} {'jobs/min':>9} {'speedup':>8} {'vs +3s pause':>13}")
+    serial = previous = None
+    for workers in [1] + [count for count in args.workers if count != 1]:
+        saved, elapsed = _run(server, workers)
+        rate = saved / elapsed * 60 if elapsed else 0.0
+        if serial is None:
+            serial = rate
+            previous = saved / (elapsed + PREVIOUS_PAUSE_SECONDS * saved) * 60
+        print(f"{workers:>8} {saved:>6} {elapsed:>8.2f} {rate:>9.0f} {rate / serial:>7.1f}x {rate / previous:>12.1f}x")
+    print(f"previous parser (serial + {PREVIOUS_PAUSE_SECONDS:.0f}s pause per job): {previous:.0f} jobs/min")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Geocoding throughput: per-call gazetteer rebuild and linear scan vs. the prebuilt index,
+and a cold vs. warm persistent cache for locations only Nominatim knows.
+
+Generates --rows job locations (cities, districts, street addresses and admin-area
+strings built from the static gazetteer, --unknown-share of them unknown towns), with
+--distinct different strings overall. Nominatim is simulated at --nominatim-ms per call.
+The warm run starts with empty in-process caches, as a fresh scraper process would.
+
+Usage:
+  cd backend && python scripts/benchmark_geocoding.py [--rows 20000] [--distinct 3000] [--unknown-share 0.05]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from scraper import geocoding as bridge
+
+geocoding = bridge._runtime_module
+
+
+def _linear_lookup(location):
+    normalized_cache = {}
+    for key, coords in geocoding.MAJOR_CITIES_CACHE.items():
+        normalized_cache.setdefault(geocoding.normalize_address(key), coords)
+    simplified = geocoding._simplify_location_for_geocoding(location)
+    normalized = geocoding.normalize_address(simplified or location)
+    primary_segment = geocoding.normalize_address((simplified or location).split(",")[0].strip())
+    if normalized in normalized_cache or primary_segment in normalized_cache:
+        return normalized_cache.get(normalized) or normalized_cache[primary_segment]
+    primary_tokens = primary_segment.split()
+    has_admin_context = any(tok in geocoding._ADMIN_AREA_TOKENS for tok in primary_tokens)
+    for key in sorted(normalized_cache.keys(), key=len, reverse=True):
+        key_tokens = key.split()
+        if not key_tokens or (has_admin_context and len(key_tokens) == 1):
+            continue
+        for i in range(0, max(0, len(primary_tokens) - len(key_tokens) + 1)):
+            if primary_tokens[i:i + len(key_tokens)] == key_tokens:
+                return normalized_cache[key]
+    return None
+
+
+def _locations(rows: int, distinct: int, unknown_share: float, rng: random.Random):
+    keys = list(geocoding.MAJOR_CITIES_CACHE)
+    pool = []
+    for index in range(distinct):
+        if rng.random() < unknown_share:
+            pool.append(f"Obec {index}, okres Venkov")
+            continue
+        city = rng.choice(keys).title()
+        shape = rng.random()
+        if shape < 0.4:
+            pool.append(f"{city} - část {index}")
+        elif shape < 0.7:
+            pool.append(f"Ulice {index % 90 + 1}, {city}")
+        else:
+            pool.append(f"{city}, okres {rng.choice(keys).title()} {index}")
+    return [rng.choice(pool) for _ in range(rows)]
+
+
+def _reset_process_caches():
+    geocoding._SUCCESSFUL_LOOKUPS.clear()
+    geocoding._FAILED_LOOKUPS.clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--distinct", type=int, default=3000)
+    parser.add_argument("--unknown-share", type=float, default=0.05)
+    parser.add_argument("--nominatim-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    locations = _locations(args.rows, args.distinct, args.unknown_share, rng)
+    nominatim_calls = [0]
+
+    def fake_search(address):
+        nominatim_calls[0] += 1
+        time.sleep(args.nominatim_ms / 1000.0)
+        if address.startswith("Obec"):
+            return {"lat": 49.5, "lon": 15.5, "country": "CZ", "source": "nominatim_api"}, True
+        return None, True
+
+    geocoding._nominatim_search = fake_search
+    print(f"rows={args.rows} distinct={len(set(locations))} nominatim={args.nominatim_ms:.0f} ms/call")
+    print(f"{'mode':<34} {'seconds':>8} {'rows/s':>10} {'nominatim':>10}")
+
+    static_locations = [location for location in locations if not location.startswith("Obec")]
+    started = time.perf_counter()
+    for location in static_locations:
+        _linear_lookup(location)
+    linear = time.perf_counter() - started
+    print(f"{'static: rebuild + linear scan':<34} {linear:>8.2f} {len(static_locations) / linear:>10.0f} {'-':>10}")
+
+    geocoding.set_geocode_cache(None)
+    _reset_process_caches()
+    started = time.perf_counter()
+    for location in static_locations:
+        geocoding.geocode_location(location)
+        geocoding._SUCCESSFUL_LOOKUPS.clear()
+    indexed = time.perf_counter() - started
+    print(f"{'static: prebuilt index':<34} {indexed:>8.2f} {len(static_locations) / indexed:>10.0f} {'-':>10}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "geocode.sqlite3")
+        for label in ["all: geocode_many, cold cache", "all: geocode_many, warm cache"]:
+            geocoding.set_geocode_cache(geocoding.GeocodeCache(path))
+            _reset_process_caches()
+            nominatim_calls[0] = 0
+            started = time.perf_counter()
+            geocoding.geocode_many(locations)
+            elapsed = time.perf_counter() - started
+            print(f"{label:<34} {elapsed:>8.2f} {len(locations) / elapsed:>10.0f} {nominatim_calls[0]:>10}")
+    geocoding.set_geocode_cache(None)
+
+
+if __name__ == "__main__":
+    main()
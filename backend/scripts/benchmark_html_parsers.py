@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Scraper HTML parsing per site and per parser backend.
+
+Every recorded site in backend/tests/fixtures/scraper_html (the pages the parser
+parity test runs on) is parsed with each installed backend of html_parser.make_soup,
+and the tree is walked the way the site parsers do: select the links, collect
+p/li/h2/h3 text and take the page text. Recorded pages are small, so --scale repeats
+each page's <body> to bring it near the 100-300 KB of a live listing or detail page.
+
+Usage:
+  cd backend && python scripts/benchmark_html_parsers.py [--scale 40] [--repeats 20]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from scraper import html_parser as parser_bridge
+
+html_parser = parser_bridge._runtime_module
+FIXTURES = BACKEND_DIR / "tests" / "fixtures" / "scraper_html"
+
+
+def _scaled(page: bytes, scale: int) -> bytes:
+    match = re.search(rb"<body[^>]*>(.*)</body>", page, re.S)
+    if not match or scale <= 1:
+        return page
+    return page[: match.start(1)] + match.group(1) * scale + page[match.end(1):]
+
+
+def _walk(soup) -> int:
+    links = soup.select("a[href]")
+    parts = [elem.get_text(" ", strip=True) for elem in soup.find_all(["p", "li", "h2", "h3"])]
+    return len(links) + len(parts) + len(soup.get_text(" "))
+
+
+def _time(page: bytes, backend: str, repeats: int):
+    parse_seconds = walk_seconds = 0.0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        soup = html_parser.make_soup(page, backend)
+        parse_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        _walk(soup)
+        walk_seconds += time.perf_counter() - started
+    return parse_seconds / repeats * 1000, walk_seconds / repeats * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=40)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--site", action="append", help="fixture directory to run (default: all)")
+    args = parser.parse_args()
+
+    backends = html_parser.available_backends()
+    sites = args.site or sorted(path.name for path in FIXTURES.iterdir() if path.is_dir())
+    print(f"backends={', '.join(backends)} scale={args.scale} repeats={args.repeats}")
+    print(f"{'site':<14} {'page':<8} {'KB':>6} " + " ".join(f"{name + ' parse/walk ms':>26}" for name in backends) + f" {'speedup':>8}")
+    totals = {name: 0.0 for name in backends}
+    for site in sites:
+        for page_name in ("listing", "detail"):
+            path = FIXTURES / site / f"{page_name}.html"
+            if not path.exists():
+                continue
+            page = _scaled(path.read_bytes(), args.scale)
+            results = {name: _time(page, name, args.repeats) for name in backends}
+            for name, (parse_ms, walk_ms) in results.items():
+                totals[name] += parse_ms + walk_ms
+            fallback = sum(results[html_parser.FALLBACK_BACKEND])
+            fastest = min(sum(result) for result in results.values())
+            cells = " ".join(f"{parse_ms:>17.2f} / {walk_ms:>6.2f}" for parse_ms, walk_ms in results.values())
+            print(f"{site:<14} {page_name:<8} {len(page) / 1024:>6.0f} {cells} {fallback / fastest:>7.1f}x")
+
+    print("\ntotal ms per pass: " + ", ".join(f"{name} {total:.1f}" for name, total in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Scraper HTTP cache: bytes on the wire and parse time for a cold run, a conditional
+(revalidated) run and an offline replay of the same pages.
+
+A local server serves --pages listing pages of about --page-kb KB each with ETags,
+plus a --feed-items item RSS feed. --changed-share of the pages change between runs.
+Pages are fetched and parsed the way scrape_page does; the feed goes through
+_fetch_rss_items, so an unchanged feed is not parsed again.
+
+Usage:
+  cd backend && python scripts/benchmark_http_cache.py [--pages 100] [--page-kb 60]
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+import requests
+from bs4 import BeautifulSoup
+
+from scraper import scraper_api_sources as api_bridge
+
+api_sources = api_bridge._runtime_module
+http_cache = api_sources._http_cache
+
+
+def _page(index: int, version: int, size_kb: int) -> bytes:
+    card = f"<div class='job'><h2><a href='/job/{index}-{{n}}'>Skladník {{n}}</a></h2><p>Praha, 32 000 Kč, v{version}</p></div>"
+    cards = "".join(card.format(n=n) for n in range(max(1, size_kb * 1024 // len(card))))
+    return f"<html><body>{cards}</body></html>".encode("utf-8")
+
+
+def _feed(items: int) -> bytes:
+    body = "".join(
+        f"<item><title>Engineer {index} at Acme</title><link>https://example.com/{index}</link>"
+        f"<description>&lt;p&gt;Remote, Europe. {'Details. ' * 40}&lt;/p&gt;</description><category>Europe</category></item>"
+        for index in range(items)
+    )
+    return f"<?xml version='1.0'?><rss><channel>{body}</channel></rss>".encode("utf-8")
+
+
+def _serve(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *_args):
+            pass
+
+        def do_GET(self):
+            body = state["feed"] if self.path == "/feed.rss" else state["pages"].get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def _run(base: str, paths, cache):
+    before = cache.stats()
+    session = requests.Session()
+    fetch_seconds = parse_seconds = 0.0
+    for path in paths:
+        started = time.perf_counter()
+        response = http_cache.fetch(session, base + path, timeout=10)
+        fetch_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        BeautifulSoup(response.content, "html.parser").select("div.job a")
+        parse_seconds += time.perf_counter() - started
+    started = time.perf_counter()
+    api_sources._fetch_rss_items(base + "/feed.rss")
+    feed_seconds = time.perf_counter() - started
+    after = cache.stats()
+    delta = {key: after[key] - before.get(key, 0) for key in ("bytes_downloaded", "bytes_saved", "not_modified", "changed", "parse_hits")}
+    return fetch_seconds, parse_seconds, feed_seconds, delta
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--page-kb", type=int, default=60)
+    parser.add_argument("--feed-items", type=int, default=500)
+    parser.add_argument("--changed-share", type=float, default=0.05)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    paths = [f"/list?page={index}" for index in range(args.pages)]
+    state = {"pages": {path: _page(index, 0, args.page_kb) for index, path in enumerate(paths)}, "feed": _feed(args.feed_items)}
+    httpd = _serve(state)
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    codec = "zstd" if http_cache.zstandard is not None else "zlib"
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = http_cache.HTTPCache(os.path.join(directory, "http.sqlite3"))
+        http_cache.set_http_cache(cache, replay=False)
+        print(f"pages={args.pages} x ~{args.page_kb} KB, feed={args.feed_items} items, changed={args.changed_share:.0%}, codec={codec}")
+        print(f"{'run':<14} {'MB down':>8} {'MB saved':>9} {'304s':>6} {'fetch s':>8} {'parse s':>8} {'feed s':>7}")
+        for label in ["cold", "revalidate", "replay"]:
+            if label == "revalidate":
+                for index in rng.sample(range(args.pages), int(args.pages * args.changed_share)):
+                    state["pages"][paths[index]] = _page(index, 1, args.page_kb)
+            if label == "replay":
+                httpd.shutdown()
+                http_cache.set_http_cache(cache, replay=True)
+            fetch_seconds, parse_seconds, feed_seconds, delta = _run(base, paths, cache)
+            print(
+                f"{label:<14} {delta['bytes_downloaded'] / 1e6:>8.1f} {delta['bytes_saved'] / 1e6:>9.1f} {delta['not_modified']:>6} "
+                f"{fetch_seconds:>8.2f} {parse_seconds:>8.2f} {feed_seconds:>7.3f}"
+            )
+        stats = cache.stats()
+        raw = sum(len(body) for body in state["pages"].values()) + len(state["feed"])
+        print(f"\nstore: {stats['entries']} responses, {stats['stored_bytes'] / 1e6:.1f} MB on disk for {raw / 1e6:.1f} MB of bodies")
+        http_cache.set_http_cache(None, replay=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Write volume of repeated scrapes of the same job set: every row rewritten (the previous
+behaviour), rows rewritten only when their content hash changed, and rows whose content
+fingerprint changed (which is all that re-queues embeddings, job intelligence and
+sitemap lastmod).
+
+A fixture of --jobs postings is re-scraped --rounds times. Each round re-renders the
+text with formatting noise (whitespace, non-breaking spaces, tracking query strings) on
+--noise-share of the jobs and really edits --changed-share of them. Rows are built with
+the store's own row builder, so hashes and fingerprints are the ones written to Postgres.
+
+Usage:
+  cd backend && python scripts/benchmark_job_change_detection.py [--jobs 20000] [--rounds 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from app.services import jobs_postgres_store as store
+
+
+def _fixture(count: int, rng: random.Random):
+    return [
+        {
+            "id": f"job-{index}",
+            "title": f"Skladník / skladnice {index}",
+            "company": f"Logistika {index % 700} s.r.o.",
+            "location": rng.choice(["Praha 9", "Brno", "Ostrava", "Plzeň"]),
+            "description": "Nabízíme práci ve skladu ve dvousměnném provozu. Stravenky, příspěvek na dopravu. " * 6,
+            "salary_from": 30000 + index % 9 * 1000,
+            "salary_to": 36000 + index % 9 * 1000,
+            "salary_currency": "CZK",
+            "url": f"https://example.cz/nabidka/{index}",
+            "tags": ["sklad"],
+        }
+        for index in range(count)
+    ]
+
+
+def _rescrape(job: dict, scraped_at: datetime, noisy: bool, edited: bool, round_index: int) -> dict:
+    doc = dict(job)
+    if noisy:
+        doc["description"] = doc["description"].replace(". ", ".\n  ").replace("ve skladu", "ve\u00a0skladu")
+        doc["url"] = f"{job['url']}?utm_source=feed&r={round_index}"
+    if edited:
+        job["salary_to"] += 1000
+        doc["salary_to"] = job["salary_to"]
+    stamp = scraped_at.isoformat()
+    doc.update({"scraped_at": stamp, "created_at": stamp, "updated_at": stamp})
+    return doc
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--noise-share", type=float, default=0.3)
+    parser.add_argument("--changed-share", type=float, default=0.02)
+    args = parser.parse_args()
+
+    rng = random.Random(17)
+    fixture = _fixture(args.jobs, rng)
+    stored_hash, stored_fingerprint = {}, {}
+    started_at = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    totals = {"rewrite all": 0, "hash changed": 0, "fingerprint changed": 0, "payload MB": 0.0, "skipped MB": 0.0}
+
+    print(f"jobs={args.jobs} noise={args.noise_share:.0%} changed={args.changed_share:.0%}")
+    print(f"{'round':>5} {'rewrite all':>12} {'hash changed':>13} {'fingerprint changed':>20} {'row build ms':>13}")
+    for round_index in range(args.rounds + 1):
+        scraped_at = started_at + timedelta(hours=6 * round_index)
+        docs = [
+            _rescrape(job, scraped_at, round_index > 0 and rng.random() < args.noise_share, round_index > 0 and rng.random() < args.changed_share, round_index)
+            for job in fixture
+        ]
+        began = time.perf_counter()
+        rows = [store._job_row(doc) for doc in docs]
+        build_ms = (time.perf_counter() - began) * 1000
+        rewritten = [row for row in rows if stored_hash.get(row["id"]) != row["content_hash"]]
+        fingerprint_changed = sum(1 for row in rows if stored_fingerprint.get(row["id"]) != row["content_fingerprint"])
+        stored_hash.update({row["id"]: row["content_hash"] for row in rows})
+        stored_fingerprint.update({row["id"]: row["content_fingerprint"] for row in rows})
+        print(f"{round_index:>5} {len(rows):>12} {len(rewritten):>13} {fingerprint_changed:>20} {build_ms:>13.0f}")
+        if round_index == 0:
+            continue  # the first scrape writes everything either way
+        totals["rewrite all"] += len(rows)
+        totals["hash changed"] += len(rewritten)
+        totals["fingerprint changed"] += fingerprint_changed
+        written = {row["id"] for row in rewritten}
+        for row in rows:
+            size = len(row["payload_json"]) / 1e6
+            totals["payload MB"] += size
+            if row["id"] not in written:
+                totals["skipped MB"] += size
+
+    print(
+        f"\nre-scrapes: {totals['rewrite all']} row writes before, {totals['hash changed']} now "
+        f"({totals['skipped MB']:.1f} of {totals['payload MB']:.1f} MB of payload not rewritten); "
+        f"{totals['fingerprint changed']} content changes re-queue downstream work instead of {totals['rewrite all']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Jobs Postgres write throughput: row-by-row executemany upserts vs. binary COPY into a
+staging table plus one set-based merge that skips rows whose content hash is unchanged.
+
+For every --sizes batch size, each mode writes into its own scratch table: a cold load of
+new jobs, a re-scrape where nothing changed, and a re-scrape where --changed-share of the
+jobs changed. Scratch tables are dropped afterwards. Needs a Postgres to write to, given
+by --url or JOBS_POSTGRES_BENCHMARK_URL.
+
+Usage:
+  cd backend && python scripts/benchmark_jobs_bulk_upsert.py --url postgresql://localhost/jobs [--sizes 1000,10000,50000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from app.matching_engine import change_tracking
+from app.services import jobs_postgres_store as store
+
+
+def _documents(count: int, scraped_at: datetime, changed: set, rng: random.Random):
+    docs = []
+    for index in range(count):
+        title = f"Skladník {index}" + (" (nová směna)" if index in changed else "")
+        docs.append({
+            "id": f"bench-{index}",
+            "title": title,
+            "company": f"Firma {index % 500}",
+            "location": rng.choice(["Praha", "Brno", "Ostrava", "Plzeň"]),
+            "description": "Práce ve skladu, dvousměnný provoz, stravenky a příspěvek na dopravu. " * 8,
+            "benefits": ["Stravenky", "Sick days"],
+            "tags": ["sklad", "logistika"],
+            "salary_from": 30000 + index % 7 * 1000,
+            "salary_to": 38000 + index % 7 * 1000,
+            "url": f"https://example.cz/nabidka/{index}",
+            "source": "example.cz",
+            "country_code": "cz",
+            "lat": 50.08,
+            "lng": 14.43,
+            "created_at": scraped_at.isoformat(),
+            "scraped_at": scraped_at.isoformat(),
+            "updated_at": scraped_at.isoformat(),
+        })
+    return docs
+
+
+def _write(docs, batch_size: int) -> float:
+    started = time.perf_counter()
+    for offset in range(0, len(docs), batch_size):
+        store.upsert_jobs_documents(docs[offset:offset + batch_size])
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=os.getenv("JOBS_POSTGRES_BENCHMARK_URL", ""))
+    parser.add_argument("--sslmode", default="disable")
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--batch-size", type=int, default=0, help="rows per upsert call (default: whole size)")
+    parser.add_argument("--changed-share", type=float, default=0.1)
+    args = parser.parse_args()
+    if not args.url:
+        parser.error("a Postgres URL is required (--url or JOBS_POSTGRES_BENCHMARK_URL)")
+
+    store.config.JOBS_POSTGRES_ENABLED = True
+    store.config.JOBS_POSTGRES_WRITE_MAIN = True
+    store.config.JOBS_POSTGRES_URL = args.url
+    store.config.JOBS_POSTGRES_SSLMODE = args.sslmode
+    change_tracking.config.MATCHING_CHANGE_TRACKING_ENABLED = False
+
+    rng = random.Random(11)
+    now = datetime.now(timezone.utc)
+    tables = []
+    print(f"{'rows':>7} {'mode':<7} {'cold s':>8} {'same s':>8} {'changed s':>10} {'cold rows/s':>12}")
+    try:
+        for size in [int(value) for value in args.sizes.split(",") if value.strip()]:
+            batch_size = args.batch_size or size
+            changed = set(rng.sample(range(size), int(size * args.changed_share)))
+            cold = _documents(size, now, set(), rng)
+            same = _documents(size, now + timedelta(hours=2), set(), rng)
+            edited = _documents(size, now + timedelta(hours=4), changed, rng)
+            for mode, bulk in [("legacy", False), ("bulk", True)]:
+                table = f"jobs_bulk_bench_{mode}_{uuid.uuid4().hex[:8]}"
+                tables.append(table)
+                store.config.JOBS_POSTGRES_JOBS_TABLE = table
+                store.config.JOBS_POSTGRES_BULK_UPSERT_ENABLED = bulk
+                store._schema_ready = False
+                store._ensure_schema()
+                timings = [_write(docs, batch_size) for docs in (cold, same, edited)]
+                print(f"{size:>7} {mode:<7} {timings[0]:>8.2f} {timings[1]:>8.2f} {timings[2]:>10.2f} {size / timings[0]:>12.0f}")
+    finally:
+        with store._connect().cursor() as cur:
+            for table in tables:
+                cur.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+if __name__ == "__main__":
+    main()
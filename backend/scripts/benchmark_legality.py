@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Legality rule throughput in documents per second.
+
+Runs the fixture corpus (scaled up with realistic description lengths) through the
+compiled rule set with the result cache disabled, then through check_legality_batch
+with a share of re-imported duplicates as seen during ingest.
+
+Usage:
+  cd backend && python scripts/benchmark_legality.py [--docs 20000] [--duplicate-share 0.3]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services import legality
+
+FILLER = (
+    "Nabízíme stabilní zázemí, práci v přátelském kolektivu, 5 týdnů dovolené, stravenky a příspěvek na penzijní "
+    "připojištění. Požadujeme SŠ/VŠ vzdělání, zodpovědnost a samostatnost. "
+)
+
+
+def _documents(count: int, duplicate_share: float) -> list[dict]:
+    corpus = json.loads((BACKEND_DIR / "tests" / "fixtures" / "legality_corpus.json").read_text(encoding="utf-8"))
+    rng = random.Random(7)
+    docs: list[dict] = []
+    for index in range(count):
+        if docs and rng.random() < duplicate_share:
+            docs.append(rng.choice(docs))
+            continue
+        case = rng.choice(corpus)
+        docs.append({**case, "description": f"{case['description']} {FILLER * rng.randint(2, 12)} #{index}"})
+    return docs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--duplicate-share", type=float, default=0.3)
+    args = parser.parse_args()
+
+    docs = _documents(args.docs, args.duplicate_share)
+    ruleset = legality._RULESET
+
+    started = time.perf_counter()
+    for doc in docs:
+        ruleset.evaluate(doc["title"], doc["company"], doc["description"], doc["country_code"], doc["location"])
+    uncached = time.perf_counter() - started
+
+    legality.clear_legality_cache()
+    started = time.perf_counter()
+    legality.check_legality_batch(docs)
+    batched = time.perf_counter() - started
+
+    stats = legality.legality_cache_stats()
+    print(f"{len(docs)} documents, avg {sum(len(doc['description']) for doc in docs) // len(docs)} chars, ruleset {ruleset.version}")
+    print(f"compiled rule set:          {len(docs) / uncached:10.0f} docs/s")
+    print(f"check_legality_batch:       {len(docs) / batched:10.0f} docs/s (cache hits {stats['hits']}, misses {stats['misses']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Market skill demand: full recompute vs. incremental daily refresh.
+
+Generates --jobs synthetic jobs spread over the seasonal window, then times
+  - a full recompute (tokenize every description, aggregate, materialize),
+  - one incremental day (advance the windows, ingest --daily new jobs, materialize),
+  - demand_weight_for_skills lookups served from the in-memory snapshot.
+
+Usage:
+  cd backend && python scripts/benchmark_market_demand.py [--jobs 100000] [--daily 1500]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from app.matching_engine import demand
+from app.matching_engine.demand_aggregate import (
+    DemandSnapshot,
+    MemorySkillExtractionStore,
+    SkillDemandAggregate,
+    extract_job_skills,
+    recompute_demand_rows,
+)
+
+MARKETS = [("cz", city) for city in ("praha", "brno", "ostrava", "plzeň", "olomouc")] + [("de", "berlin"), ("de", "münchen"), ("sk", "bratislava"), ("", "")]
+
+
+def _jobs(count: int, today: date, start_id: int, max_age_days: int, seed: int):
+    rng = random.Random(seed)
+    vocabulary = [f"skill{index}" for index in range(4000)]
+    common = ["python", "excel", "sap", "sql", "komunikace", "řidičský", "němčina", "angličtina"]
+    for offset in range(count):
+        words = rng.choices(vocabulary, k=90) + rng.choices(common, k=30)
+        country, city = rng.choice(MARKETS)
+        day = today - timedelta(days=rng.randint(0, max_age_days))
+        yield {
+            "id": start_id + offset,
+            "description": " ".join(words),
+            "country_code": country,
+            "location": city,
+            "scraped_at": datetime(day.year, day.month, day.day, 9, tzinfo=timezone.utc).isoformat(),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--daily", type=int, default=1500)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    today = datetime.now(timezone.utc).date()
+    jobs = list(_jobs(args.jobs, today, 1, 364, seed=3))
+
+    started = time.perf_counter()
+    full_rows = recompute_demand_rows(jobs, today)
+    full_s = time.perf_counter() - started
+    print(f"full recompute   {args.jobs:>7} jobs  {full_s:>7.2f} s  rows={len(full_rows)}")
+
+    aggregate = SkillDemandAggregate(MemorySkillExtractionStore(), today)
+    aggregate.ingest(extract_job_skills(job, today) for job in jobs)
+    tomorrow = today + timedelta(days=1)
+    new_jobs = list(_jobs(args.daily, tomorrow, args.jobs + 1, 0, seed=4))
+    started = time.perf_counter()
+    expired = aggregate.advance(tomorrow)
+    aggregate.ingest(extract_job_skills(job, tomorrow) for job in new_jobs)
+    rows = aggregate.demand_rows()
+    incremental_s = time.perf_counter() - started
+    print(f"incremental day  {args.daily:>7} new   {incremental_s:>7.2f} s  rows={len(rows)} expired={expired} ({full_s / max(1e-9, incremental_s):.0f}x)")
+
+    demand.set_demand_snapshot(DemandSnapshot(rows))
+    skills = ["python", "sql", "excel", "skill12", "skill999", "neznámá"]
+    started = time.perf_counter()
+    for index in range(args.lookups):
+        demand.demand_weight_for_skills(skills, "cz", MARKETS[index % 5][1])
+    lookup_s = time.perf_counter() - started
+    print(f"snapshot lookups {args.lookups:>7} calls {lookup_s:>7.2f} s  ({lookup_s / args.lookups * 1e6:.1f} µs per call, {len(skills)} skills)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Offline recommendation evaluation: in-memory pure-Python metrics vs. the streaming,
+vectorized engine.
+
+Synthetic exposures are generated page by page (as keyset pagination would return
+them) for increasing sizes. For each size the script reports wall time and peak traced
+memory of the engine, and of the previous list-based metrics up to --legacy-max rows.
+
+Usage:
+  cd backend && python scripts/benchmark_offline_evaluation.py [--sizes 30000,300000,1000000] [--page-size 5000]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from app.matching_engine.evaluation_engine import EvaluationAccumulator
+
+
+# The previous list-based metrics, for the legacy column.
+def _auc_roc(pairs):
+    positives = sum(1 for _, y in pairs if y == 1)
+    negatives = len(pairs) - positives
+    if not pairs or positives == 0 or negatives == 0:
+        return None
+    ranked = sorted(pairs, key=lambda item: item[0])
+    rank_sum_pos = 0.0
+    rank = 1
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j < len(ranked) and ranked[j][0] == ranked[i][0]:
+            j += 1
+        avg_rank = (rank + (rank + (j - i) - 1)) / 2.0
+        rank_sum_pos += avg_rank * sum(1 for _, y in ranked[i:j] if y == 1)
+        rank += j - i
+        i = j
+    auc = (rank_sum_pos - (positives * (positives + 1) / 2.0)) / (positives * negatives)
+    return max(0.0, min(1.0, auc))
+
+
+def _log_loss(pairs):
+    if not pairs:
+        return None
+    eps = 1e-15
+    total = 0.0
+    for p, y in pairs:
+        p = min(max(p, eps), 1.0 - eps)
+        total += y * math.log(p) + (1 - y) * math.log(1 - p)
+    return -total / len(pairs)
+
+
+def _precision_at_k(exposures, positive_keys, k):
+    by_request = defaultdict(list)
+    for row in exposures:
+        if row.get("request_id"):
+            by_request[row["request_id"]].append(row)
+    request_scores = []
+    for rows in by_request.values():
+        top = sorted(rows, key=lambda r: int(r.get("position") or 9999))[:k]
+        hits = sum(1 for r in top if (str(r.get("request_id") or ""), str(r.get("user_id") or ""), str(r.get("job_id") or "")) in positive_keys)
+        request_scores.append(hits / max(1, len(top)))
+    return sum(request_scores) / len(request_scores) if request_scores else None
+
+
+def _pages(total: int, page_size: int, seed: int = 5):
+    rng = random.Random(seed)
+    produced = 0
+    request = 0
+    while produced < total:
+        page = []
+        while len(page) < page_size and produced < total:
+            request += 1
+            for position in range(1, 11):
+                score = rng.random()
+                page.append(
+                    {
+                        "id": produced + 1,
+                        "request_id": f"req-{request}",
+                        "user_id": f"user-{request % 5000}",
+                        "job_id": str(rng.randint(1, 50000)),
+                        "position": position,
+                        "score": score * 100,
+                        "predicted_action_probability": round(score, 3),
+                        "action_model_version": "apply-v2",
+                        "scoring_version": "s1" if request % 2 else "s2",
+                        "source": "recommendations_api",
+                    }
+                )
+                produced += 1
+        yield page
+
+
+def _positives(total: int, page_size: int):
+    """Apply clicks for ~3% of exposures, more likely for high scores (so AUC is meaningful)."""
+    rng = random.Random(9)
+    with_request, without_request = set(), set()
+    for page in _pages(total, page_size):
+        for row in page:
+            if rng.random() < 0.06 * row["predicted_action_probability"]:
+                with_request.add((row["request_id"], row["user_id"], row["job_id"]))
+                without_request.add((row["user_id"], row["job_id"]))
+    return with_request, without_request
+
+
+def _run_engine(total: int, page_size: int, positives) -> dict:
+    with_request, without_request = positives
+    accumulator = EvaluationAccumulator({hash(key) for key in with_request}, {hash(key) for key in without_request})
+    for page in _pages(total, page_size):
+        accumulator.add(page)
+    return accumulator.overall()
+
+
+def _run_legacy(total: int, page_size: int, positives) -> dict:
+    with_request, without_request = positives
+    rows = [row for page in _pages(total, page_size) for row in page]
+    pairs = []
+    for row in rows:
+        key = (row["request_id"], row["user_id"], row["job_id"])
+        y = 1 if key in with_request or key[1:] in without_request else 0
+        pairs.append((min(max(row["predicted_action_probability"], 0.000001), 0.999999), y))
+    return {
+        "auc": _auc_roc(pairs),
+        "log_loss": _log_loss(pairs),
+        "precision_at_5": _precision_at_k(rows, with_request, 5),
+    }
+
+
+def _measure(fn, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - started
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="30000,300000,1000000")
+    parser.add_argument("--page-size", type=int, default=5000)
+    parser.add_argument("--legacy-max", type=int, default=300000)
+    args = parser.parse_args()
+
+    print(f"{'exposures':>10} {'engine s':>9} {'engine MB':>10} {'legacy s':>9} {'legacy MB':>10}  auc (engine / legacy)")
+    for total in [int(value) for value in args.sizes.split(",") if value.strip()]:
+        positives = _positives(total, args.page_size)
+        engine, engine_s, engine_mb = _measure(_run_engine, total, args.page_size, positives)
+        legacy_cells = f"{'-':>9} {'-':>10}"
+        auc_cells = f"{engine['auc']:.6f}"
+        if total <= args.legacy_max:
+            legacy, legacy_s, legacy_mb = _measure(_run_legacy, total, args.page_size, positives)
+            legacy_cells = f"{legacy_s:>9.2f} {legacy_mb:>10.1f}"
+            auc_cells += f" / {legacy['auc']:.6f}"
+        print(f"{total:>10} {engine_s:>9.2f} {engine_mb:>10.1f} {legacy_cells}  {auc_cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Per-request overhead of the global rate limiter.
+
+Measures one limiter decision per storage backend and the full ASGI middleware
+round trip (key derivation + decision + header injection) around a no-op app.
+
+Usage:
+  cd backend && python scripts/benchmark_rate_limiter.py [--requests 20000] [--redis-url redis://localhost:6379/0]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.core.limiter import (
+    MemoryRateLimitStorage,
+    RateLimiter,
+    RateLimitMiddleware,
+    RedisRateLimitStorage,
+    SQLiteRateLimitStorage,
+)
+
+
+def bench_decisions(rate_limiter: RateLimiter, requests: int) -> float:
+    started = time.perf_counter()
+    for index in range(requests):
+        rate_limiter.check(f"user:{index % 500}", 1)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def bench_middleware(rate_limiter: RateLimiter, requests: int) -> tuple[float, float]:
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(_message):
+        pass
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v2/jobs/hybrid-search-v2",
+        "headers": [(b"authorization", b"Bearer unverified")],
+        "client": ("10.0.0.1", 1234),
+        "query_string": b"",
+    }
+    wrapped = RateLimitMiddleware(endpoint, rate_limiter=rate_limiter)
+
+    async def run(app) -> float:
+        started = time.perf_counter()
+        for _ in range(requests):
+            await app(scope, receive, send)
+        return (time.perf_counter() - started) / requests * 1e6
+
+    bare_us = asyncio.run(run(endpoint))
+    limited_us = asyncio.run(run(wrapped))
+    return bare_us, limited_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--redis-url", default=os.getenv("RATE_LIMIT_STORAGE_URL", "") if os.getenv("RATE_LIMIT_STORAGE_URL", "").startswith("redis") else "")
+    args = parser.parse_args()
+
+    budget = f"{args.requests * 100}/minute"
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "memory": MemoryRateLimitStorage(),
+            "sqlite": SQLiteRateLimitStorage(os.path.join(tmp, "limits.sqlite3")),
+        }
+        if args.redis_url:
+            backends["redis"] = RedisRateLimitStorage(args.redis_url, prefix="rl-bench:")
+
+        for name, storage in backends.items():
+            decision_us = bench_decisions(RateLimiter(storage, budget=budget), args.requests)
+            print(f"{name:>6} decision:             {decision_us:8.2f} us/request")
+
+        bare_us, limited_us = bench_middleware(RateLimiter(backends["sqlite"], budget=budget), args.requests)
+        print(f"sqlite middleware overhead:   {limited_us - bare_us:8.2f} us/request (bare app {bare_us:.2f} us)")
+
+
+if __name__ == "__main__":
+    main()
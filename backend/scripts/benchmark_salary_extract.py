@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Salary extraction throughput: the previous per-call parsing against salary_extract.
+
+The recorded CZ/SK/PL/DE/AT salary texts in backend/tests/fixtures/salary_cases.json
+are run as short salary fields and embedded in description-length texts (--padding
+sentences of filler around them, which is what the API sources and the backfill parse).
+Each text gets a counter so nothing is served from a cache; rates are the best of
+three runs.
+
+- range: findall + any() thousand markers vs SalaryExtractor.salary_range (what
+  extract_salary returns);
+- parse: the same old parsing vs the structured SalaryExtractor.parse / parse_many
+  (which also reads currency, period and gross/net);
+- period: the per-country any() token scans vs SalaryExtractor.period;
+- benefits: re.search per German keyword vs the precompiled BenefitMatcher.find.
+
+Usage:
+  cd backend && python scripts/benchmark_salary_extract.py [--copies 200] [--padding 20]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from scraper import scraper_base as base_bridge
+from scraper import scraper_de as de_bridge
+
+salary_extract = base_bridge._runtime_module._salary_extract
+scraper_de = de_bridge._runtime_module
+CASES = BACKEND_DIR / "tests" / "fixtures" / "salary_cases.json"
+FILLER = "Wir suchen eine engagierte Fachkraft für unser Team in Wien mit Erfahrung in der Logistik. "
+
+
+def _legacy_salary(text):
+    vals = []
+    for x in re.findall(r"\d[\d\s\.,]*", text):
+        cleaned = x.replace(" ", "").replace("\u00a0", "").replace(".", "")
+        if "," in cleaned:
+            parts = cleaned.split(",")
+            cleaned = parts[0] if len(parts) > 1 and len(parts[-1]) == 2 else cleaned.replace(",", "")
+        if cleaned:
+            try:
+                val = int(cleaned)
+            except ValueError:
+                continue
+            if val > 100:
+                vals.append(val)
+    low = text.lower()
+    if any(word in low for word in ["tis", "tisíc", "thousand", "tys"]):
+        vals = [v * 1000 if v < 1000 else v for v in vals]
+    if len(vals) >= 2:
+        return min(vals[0], vals[1]), max(vals[0], vals[1])
+    return (vals[0], None) if vals else (None, None)
+
+
+def _legacy_period(text, tokens):
+    low = text.lower()
+    for period, period_tokens in tokens.items():
+        if any(tok in low for tok in period_tokens):
+            return period
+    return None
+
+
+def _rate(func, texts, runs=3):
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        func(texts)
+        best = min(best, time.perf_counter() - started)
+    return len(texts) / best if best else float("inf")
+
+
+def _row(stage, old, new):
+    print(f"{stage:<22} {old:>12.0f} {new:>12.0f} {new / old if old else 0:>8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copies", type=int, default=200)
+    parser.add_argument("--padding", type=int, default=20)
+    args = parser.parse_args()
+
+    salaries = [case["text"] for case in json.loads(CASES.read_text(encoding="utf-8"))]
+    fields = [f"{text} ({index})" for index in range(args.copies) for text in salaries]
+    descriptions = [FILLER * args.padding + text + " " + FILLER * args.padding for text in fields]
+    extractor = salary_extract.get_salary_extractor("de")
+    de_tokens = salary_extract.COUNTRY_PERIOD_TOKENS["de"]
+    benefits = scraper_de._DE_BENEFITS
+    keywords = list(zip(benefits.labels, (pattern.pattern for pattern in benefits._patterns)))
+
+    print(f"salary fields={len(fields)} descriptions={len(descriptions)} (~{len(descriptions[0]) // 1000} KB each)")
+    print(f"{'stage (texts/s)':<22} {'old':>12} {'new':>12} {'speedup':>9}")
+    legacy = lambda texts: [_legacy_salary(t) for t in texts]  # noqa: E731
+    _row("range field", _rate(legacy, fields), _rate(lambda texts: [extractor.salary_range(t) for t in texts], fields))
+    _row("range description", _rate(legacy, descriptions),
+         _rate(lambda texts: [extractor.salary_range(t) for t in texts], descriptions))
+    _row("parse field", _rate(legacy, fields), _rate(lambda texts: [extractor.parse(t) for t in texts], fields))
+    _row("parse_many field", _rate(legacy, fields), _rate(extractor.parse_many, fields))
+    _row("parse description", _rate(legacy, descriptions),
+         _rate(lambda texts: [extractor.parse(t) for t in texts], descriptions))
+    _row("period description", _rate(lambda texts: [_legacy_period(t, de_tokens) for t in texts], descriptions),
+         _rate(lambda texts: [extractor.period(t) for t in texts], descriptions))
+    _row("benefits description",
+         _rate(lambda texts: [[label for label, pattern in keywords if re.search(pattern, t.lower())] for t in texts], descriptions),
+         _rate(benefits.find_many, descriptions))
+
+
+if __name__ == "__main__":
+    main()
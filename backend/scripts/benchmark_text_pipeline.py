@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Description cleaning per stage: the previous implementation against text_pipeline.
+
+Runs the recorded samples in backend/tests/fixtures/text_pipeline_cases.json
+(repeated --copies times, with a counter appended so every copy is a distinct text)
+through each stage the scrapers apply before saving a job:
+
+- junk filter: per-line any() over JUNK_TOKENS vs the compiled JunkFilter;
+- ftfy: unconditional fix_text vs needs_text_repair + fix_text when needed;
+- language: langdetect detect_langs vs the profile identifier;
+- memo: normalize_description_for_storage on repeated descriptions.
+
+Usage:
+  cd backend && python scripts/benchmark_text_pipeline.py [--copies 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from scraper import scraper_base as base_bridge
+
+scraper_base = base_bridge._runtime_module
+text_pipeline = scraper_base._text_pipeline
+CASES = BACKEND_DIR / "tests" / "fixtures" / "text_pipeline_cases.json"
+
+
+def _legacy_junk(text, junk_tokens):
+    kept = []
+    for line in text.split("\n"):
+        stripped = line.strip()
+        low = stripped.lower()
+        if stripped and len(stripped) < 100 and any(tok in low for tok in junk_tokens):
+            continue
+        if stripped and any(tok == low for tok in junk_tokens):
+            continue
+        kept.append(stripped)
+    return "\n".join(kept)
+
+
+def _legacy_language(text):
+    try:
+        langs = text_pipeline.detect_langs(text)
+    except Exception:
+        return None
+    return str(langs[0]).split(":")[0] if langs else None
+
+
+def _time(func, texts):
+    started = time.perf_counter()
+    for text in texts:
+        func(text)
+    elapsed = time.perf_counter() - started
+    return len(texts) / elapsed if elapsed else float("inf")
+
+
+def _row(stage, old, new):
+    print(f"{stage:<10} {old:>14.0f} {new:>14.0f} {new / old if old else 0:>8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copies", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = json.loads(CASES.read_text(encoding="utf-8"))
+    descriptions = cases["descriptions"] + [case["text"] for case in cases["languages"]]
+    texts = [f"{text}\n{index}" for index in range(args.copies) for text in descriptions]
+    repair = [f"{text} {index}" for index in range(args.copies) for text in cases["repair"] + descriptions]
+
+    print(f"texts={len(texts)} (copies={args.copies})")
+    print(f"{'stage':<10} {'old texts/s':>14} {'new texts/s':>14} {'speedup':>9}")
+
+    junk = scraper_base.JunkFilter(scraper_base.JUNK_TOKENS)
+    _row("junk", _time(lambda text: _legacy_junk(text, scraper_base.JUNK_TOKENS), texts), _time(junk.clean, texts))
+
+    if scraper_base.ftfy_fix_text:
+        fix = scraper_base.ftfy_fix_text
+
+        def fast_fix(text):
+            return fix(text, normalization="NFC") if text_pipeline.needs_text_repair(text) else text
+
+        _row("ftfy", _time(lambda text: fix(text, normalization="NFC"), repair), _time(fast_fix, repair))
+        skipped = sum(not text_pipeline.needs_text_repair(text) for text in repair)
+        print(f"{'':<10} ftfy skipped for {skipped}/{len(repair)} texts")
+
+    if text_pipeline.get_language_identifier() is not None:
+        _row("language", _time(_legacy_language, texts), _time(text_pipeline.identify_language, texts))
+
+    # Same description seen from several searches: the first pass fills the memo.
+    text_pipeline.get_text_memo().clear()
+    cold = _time(scraper_base.normalize_description_for_storage, texts)
+    warm = _time(scraper_base.normalize_description_for_storage, texts)
+    _row("memo", cold, warm)
+    print(f"\nmemo stats: {text_pipeline.get_text_memo().stats()}")
+
+
+if __name__ == "__main__":
+    main()
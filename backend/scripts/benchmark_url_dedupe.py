@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Detail-page fetches across repeated scraper runs: an in-memory seen set per run (the
+previous behaviour) against the persistent known-URL store.
+
+A recorded fixture of --runs daily listing crawls is generated: each run lists
+--listed jobs, --churn-share of them new since the day before, and --noise-share of
+the links carry tracking parameters or another spelling of the same URL. A job is
+fetched when the store does not know it or last fetched it more than
+SCRAPER_URL_DEDUPE_REFETCH_HOURS ago. Keys are built with scraper_base's own
+canonical_job_key, and the store is rebuilt once from the previous run's jobs, like
+run_all_parallel does before it forks its workers.
+
+Usage:
+  cd backend && python scripts/benchmark_url_dedupe.py [--listed 20000] [--runs 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+BACKEND_DIR = CURRENT_FILE.parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from scraper import scraper_base as base_bridge
+
+scraper_base = base_bridge._runtime_module
+url_dedupe = scraper_base._url_dedupe
+
+
+def _spelling(job: int, rng: random.Random, noise_share: float) -> str:
+    url = f"https://www.jobs.cz/rpd/{2000000000 + job}/?searchId=41"
+    if rng.random() < noise_share:
+        url = rng.choice([
+            url + f"&utm_source=listing&utm_campaign=run{rng.randrange(99)}",
+            url.replace("https://www.", "http://") + "#detail",
+            url.replace("/?", "?") + f"&gclid={rng.getrandbits(32):x}",
+        ])
+    return url
+
+
+def _recorded_runs(listed: int, runs: int, churn_share: float, noise_share: float, rng: random.Random):
+    live = list(range(listed))
+    next_job = listed
+    recorded = []
+    for _ in range(runs):
+        recorded.append([_spelling(job, rng, noise_share) for job in live])
+        churn = int(listed * churn_share)
+        live = live[churn:] + list(range(next_job, next_job + churn))
+        next_job += churn
+    return recorded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--listed", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--churn-share", type=float, default=0.08)
+    parser.add_argument("--noise-share", type=float, default=0.25)
+    parser.add_argument("--hours-between-runs", type=float, default=24.0)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    recorded = _recorded_runs(args.listed, args.runs, args.churn_share, args.noise_share, rng)
+    refetch_seconds = url_dedupe.SCRAPER_URL_DEDUPE_REFETCH_HOURS * 3600
+    now = [1_750_000_000.0]
+    totals = {"before": 0, "after": 0}
+
+    with tempfile.TemporaryDirectory() as directory:
+        dedupe = url_dedupe.URLDedupe(directory, capacity=max(1000, args.listed * 2), clock=lambda: now[0])
+        print(f"listed={args.listed} churn={args.churn_share:.0%} noise={args.noise_share:.0%} refetch={url_dedupe.SCRAPER_URL_DEDUPE_REFETCH_HOURS}h")
+        print(f"{'run':>4} {'listed':>8} {'fetch before':>13} {'fetch after':>12} {'skipped':>8} {'lookup us':>10} {'rebuild s':>10}")
+        database = {}
+        for run_index, urls in enumerate(recorded):
+            rebuild_seconds = 0.0
+            if run_index == 1:
+                began = time.perf_counter()
+                dedupe.rebuild((scraper_base.canonical_job_key(url), job_id, fetched_at) for job_id, (url, fetched_at) in database.items())
+                rebuild_seconds = time.perf_counter() - began
+
+            seen_this_run = set()
+            before = after = 0
+            fetched = []
+            began = time.perf_counter()
+            for url in urls:
+                if url not in seen_this_run:
+                    before += 1
+                seen_this_run.add(url)
+                key = scraper_base.canonical_job_key(url)
+                if dedupe.fresh_job_id(key, refetch_seconds) is None:
+                    after += 1
+                    fetched.append((key, scraper_base.build_job_id_from_url(url.strip())))
+                    database[fetched[-1][1]] = (url, now[0])
+            lookup_us = (time.perf_counter() - began) / max(1, len(urls)) * 1e6
+            dedupe.add_many(fetched)
+            totals["before"] += before
+            totals["after"] += after
+            print(f"{run_index:>4} {len(urls):>8} {before:>13} {after:>12} {before - after:>8} {lookup_us:>10.1f} {rebuild_seconds:>10.2f}")
+            now[0] += args.hours_between_runs * 3600
+
+        stats = dedupe.stats()
+        size_mb = os.path.getsize(dedupe.bloom_path) / 1e6
+        print(
+            f"\ndetail fetches: {totals['before']} before, {totals['after']} now "
+            f"({1 - totals['after'] / max(1, totals['before']):.0%} skipped); filter {size_mb:.1f} MB, "
+            f"{stats['filter_hashes']} hashes, {stats['false_positives']} false positives caught by the exact check"
+        )
+
+
+if __name__ == "__main__":
+    main()
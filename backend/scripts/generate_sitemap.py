@@ -58,12 +58,14 @@ async def generate_sitemap():
             urls.append(f"  <url>\n    <loc>{BASE_URL}/candidate/role/{job_id}</loc>\n    <lastmod>{lastmod}</lastmod>\n    <changefreq>weekly</changefreq>\n    <priority>0.6</priority>\n  </url>")
             
         # Scraped Jobs (jobs_nf) - only last 30 days
+        # lastmod follows real content changes; liveness follows scraped_at, which
+        # re-scrapes keep moving even when the job itself did not change.
         scraped_query = text("""
-            SELECT id, updated_at, created_at 
+            SELECT id, COALESCE(content_changed_at, updated_at), created_at 
             FROM jobs_nf 
             WHERE COALESCE(is_active, true) = true 
             AND COALESCE(status, 'active') NOT IN ('archived', 'deleted', 'inactive')
-            AND (updated_at > NOW() - INTERVAL '30 days' OR created_at > NOW() - INTERVAL '30 days')
+            AND (scraped_at > NOW() - INTERVAL '30 days' OR created_at > NOW() - INTERVAL '30 days')
         """)
         result = await session.execute(scraped_query)
         for row in result:
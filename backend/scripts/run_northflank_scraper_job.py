@@ -43,6 +43,8 @@ def main() -> int:
         raise FileNotFoundError(f"Unified ingest script not found: {target}")
 
     os.environ.setdefault("JOBSHAMAN_SKIP_VENV_REEXEC", "1")
+    # The conditional-fetch store is for scraper runs only; API processes leave it off.
+    os.environ.setdefault("SCRAPER_HTTP_CACHE_ENABLED", "1")
 
     args = [sys.executable, str(target)]
     _append_flag(args, "SCRAPER_JOB_SKIP_SCRAPER_MULTI", "--skip-scraper-multi")
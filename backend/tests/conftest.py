@@ -4,3 +4,12 @@ import os
 # Minimal config so backend modules importing app.core.config are test-safe.
 os.environ.setdefault("JWT_SECRET", "test-secret")
 
+# Keep the global rate limiter per-process during tests (no shared SQLite file in /tmp).
+os.environ.setdefault("RATE_LIMIT_STORAGE_URL", "memory://")
+
+# No persistent AI response cache shared between test runs.
+os.environ.setdefault("AI_RESPONSE_CACHE_ENABLED", "false")
+
+# Scraper tests install their own response and known-URL stores.
+os.environ.setdefault("SCRAPER_HTTP_CACHE_ENABLED", "false")
+os.environ.setdefault("SCRAPER_URL_DEDUPE_ENABLED", "false")
@@ -0,0 +1,164 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.ai_orchestration import client, response_cache
+from backend.app.ai_orchestration.response_cache import AIResponseCache, response_cache_key
+
+
+class _StubAI:
+    """Local OpenAI-compatible chat completions endpoint that counts upstream requests."""
+
+    def __init__(self):
+        self.requests = []
+        self.delay = 0.0
+        self.failing_models = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests.append(body)
+                time.sleep(stub.delay)
+                if body["model"] in stub.failing_models:
+                    self.send_response(404)
+                    self.end_headers()
+                    self.wfile.write(b"model not found")
+                    return
+                payload = {
+                    "choices": [{"message": {"content": f"{body['model']}:{len(stub.requests)}"}}],
+                    "usage": {"prompt_tokens": 11, "completion_tokens": 7},
+                }
+                encoded = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def stub_ai(monkeypatch, tmp_path):
+    stub = _StubAI()
+    monkeypatch.setenv("AI_PROVIDER", "openai")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_ENDPOINT", stub.url)
+    monkeypatch.setenv("AI_RESCUE_MODELS", "rescue-model")
+    cache = AIResponseCache(str(tmp_path / "ai_cache.sqlite3"))
+    response_cache.set_ai_response_cache(cache)
+    yield stub
+    response_cache.set_ai_response_cache(None)
+    stub.server.shutdown()
+
+
+def _call(prompt="Summarize the CV", **kwargs):
+    kwargs.setdefault("cache", True)
+    return client.call_primary_with_fallback(prompt, "primary-model", "fallback-model", **kwargs)
+
+
+def test_identical_calls_hit_upstream_once(stub_ai):
+    first, fallback_used = _call(generation_config={"temperature": 0})
+    second, _ = _call("Summarize the CV  \r\n", generation_config={"temperature": 0})
+
+    assert len(stub_ai.requests) == 1
+    assert fallback_used is False
+    assert second.text == first.text == "primary-model:1"
+    assert first.cached is False and first.tokens_in == 11
+    assert second.cached is True and second.tokens_in == 0 and second.tokens_out == 0
+
+    _call(generation_config={"temperature": 0.5})
+    _call(generation_config={"temperature": 0}, prompt_version="v2")
+    assert len(stub_ai.requests) == 3
+
+
+def test_call_sites_that_do_not_opt_in_always_call_upstream(stub_ai):
+    _call(cache=False)
+    _call(cache=False)
+    client.call_primary_with_fallback("Summarize the CV", "primary-model", "fallback-model")
+    assert len(stub_ai.requests) == 3
+
+
+def test_output_that_fails_validation_is_not_cached(stub_ai):
+    first, _ = _call(cache_valid=client.is_json_object)
+    second, _ = _call(cache_valid=client.is_json_object)
+    assert not first.cached and not second.cached
+    assert len(stub_ai.requests) == 2
+
+    # An entry stored without the check is not served to a caller that rejects it.
+    _call(prompt="Parse the query")
+    retried, _ = _call(prompt="Parse the query", cache_valid=lambda text: text.startswith("{"))
+    assert not retried.cached and len(stub_ai.requests) == 4
+
+
+def test_fallback_result_and_flag_are_cached(stub_ai):
+    stub_ai.failing_models.add("primary-model")
+    result, fallback_used = _call()
+    again, fallback_again = _call()
+
+    assert result.model_name == again.model_name == "fallback-model"
+    assert fallback_used is fallback_again is True
+    assert [body["model"] for body in stub_ai.requests] == ["primary-model", "fallback-model"]
+
+
+def test_concurrent_identical_calls_share_one_upstream_request(stub_ai):
+    stub_ai.delay = 0.3
+    results = []
+
+    def worker():
+        results.append(_call("Evaluate this signal boost answer")[0].text)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(stub_ai.requests) == 1
+    assert results == ["primary-model:1"] * 8
+    assert response_cache.get_ai_response_cache().stats()["shared"] == 7
+
+
+def test_failures_are_not_cached(stub_ai):
+    stub_ai.failing_models.update({"primary-model", "fallback-model", "rescue-model"})
+    with pytest.raises(client.AIClientError):
+        _call()
+    stub_ai.failing_models.clear()
+    result, _ = _call()
+    assert result.cached is False
+    assert len(stub_ai.requests) == 4
+
+
+def test_ttl_size_cap_and_persistence(tmp_path):
+    now = {"t": 1000.0}
+    path = str(tmp_path / "cache.sqlite3")
+    cache = AIResponseCache(path, ttl_seconds=60, max_bytes=400, clock=lambda: now["t"])
+    key = response_cache_key(provider="openai", models=["m"], prompt="p")
+
+    cache.set(key, {"text": "answer"})
+    assert AIResponseCache(path, clock=lambda: now["t"]).get(key) == {"text": "answer"}
+    now["t"] += 61
+    assert cache.get(key) is None
+
+    for index in range(10):
+        now["t"] += 1
+        cache.set(f"k{index}", {"text": "x" * 80})
+    cache.prune()
+    stats = cache.stats()
+    assert stats["bytes"] <= 400
+    assert cache.get("k9") is not None and cache.get("k0") is None
@@ -0,0 +1,253 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.ai_orchestration import client, response_cache, transport
+from backend.app.ai_orchestration.transport import AITransport, ChatRequest, LatencyTracker
+
+# model name -> behaviour of the stub provider
+BEHAVIOUR = {
+    "fast": {},
+    "slow": {"delay": 2.0},
+    "failing": {"status": 500},
+    "streaming": {"chunks": ["Hel", "lo ", "wor", "ld"], "chunk_delay": 0.25},
+    "slow-start": {"delay": 1.5, "chunks": ["late"]},
+}
+
+
+class _StubProvider:
+    """OpenAI-compatible endpoint simulating slow, failing and streaming models."""
+
+    def __init__(self):
+        self.requests = []
+        self.client_ports = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests.append(body["model"])
+                stub.client_ports.append(self.client_address[1])
+                behaviour = BEHAVIOUR[body["model"]]
+                time.sleep(behaviour.get("delay", 0.0))
+                if behaviour.get("status"):
+                    self._send(behaviour["status"], b"upstream exploded")
+                    return
+                chunks = behaviour.get("chunks") or [f"answer from {body['model']}"]
+                if body.get("stream"):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Connection", "close")
+                    self.end_headers()
+                    for chunk in chunks:
+                        self._event({"choices": [{"delta": {"content": chunk}}]})
+                        time.sleep(behaviour.get("chunk_delay", 0.0))
+                    self._event({"choices": [], "usage": {"prompt_tokens": 5, "completion_tokens": len(chunks)}})
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.close_connection = True
+                    return
+                payload = {"choices": [{"message": {"content": "".join(chunks)}}], "usage": {"prompt_tokens": 5, "completion_tokens": 3}}
+                self._send(200, json.dumps(payload).encode(), "application/json")
+
+            def _send(self, status, body, content_type="text/plain"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _event(self, payload):
+                self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+                self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+
+            def handle_error(self, request, client_address):
+                pass  # cancelled hedges reset their connections
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def request(self, model):
+        return ChatRequest("openai", model, self.url, {"Content-Type": "application/json"}, {"model": model, "messages": []})
+
+
+@pytest.fixture
+def stub():
+    provider = _StubProvider()
+    yield provider
+    provider.server.shutdown()
+
+
+def _transport(**overrides):
+    params = dict(hedge_min_delay=0.0, hedge_default_delay=0.3, hedge_max_delay=5.0, default_deadline=10.0)
+    params.update(overrides)
+    return AITransport(**params)
+
+
+def test_hedged_fallback_starts_before_slow_primary_finishes(stub):
+    async def run():
+        started = time.perf_counter()
+        result, index = await _transport().complete([stub.request("slow"), stub.request("fast")])
+        return result, index, time.perf_counter() - started
+
+    result, index, elapsed = asyncio.run(run())
+    assert (result.model_name, index) == ("fast", 1)
+    assert result.text == "answer from fast"
+    assert elapsed < 1.5  # the primary alone takes 2 s
+    assert stub.requests == ["slow", "fast"]
+
+
+def test_failed_primary_moves_on_without_waiting_for_the_hedge(stub):
+    async def run():
+        started = time.perf_counter()
+        result, index = await _transport(hedge_default_delay=5.0).complete([stub.request("failing"), stub.request("fast")])
+        return result, index, time.perf_counter() - started
+
+    result, index, elapsed = asyncio.run(run())
+    assert (result.model_name, index) == ("fast", 1)
+    assert elapsed < 1.0
+
+
+def test_deadline_bounds_the_whole_chain(stub):
+    async def run():
+        started = time.perf_counter()
+        with pytest.raises(transport.AIClientError, match="deadline"):
+            await _transport().complete([stub.request("slow"), stub.request("slow")], deadline_seconds=0.6)
+        return time.perf_counter() - started
+
+    assert asyncio.run(run()) < 1.2
+
+
+def test_streaming_time_to_first_token(stub):
+    async def run():
+        stream = _transport().stream([stub.request("streaming")])
+        started = time.perf_counter()
+        arrivals = []
+        async for delta in stream:
+            arrivals.append((delta, time.perf_counter() - started))
+        return stream, arrivals
+
+    stream, arrivals = asyncio.run(run())
+    assert "".join(delta for delta, _ in arrivals) == "Hello world"
+    ttft, total = arrivals[0][1], arrivals[-1][1]
+    assert ttft < 0.2 and total > 0.6
+    assert stream.first_token_ms is not None and stream.first_token_ms < 200
+    assert stream.result.text == "Hello world"
+    assert (stream.result.tokens_in, stream.result.tokens_out) == (5, 4)
+
+
+def test_stream_hedges_on_first_token(stub):
+    async def run():
+        stream = _transport().stream([stub.request("slow-start"), stub.request("streaming")])
+        return await stream.collect(), stream
+
+    result, stream = asyncio.run(run())
+    assert result.model_name == "streaming" and stream.winner_index == 1
+    assert result.text == "Hello world"
+    assert stream.first_token_ms < 1000
+
+
+def test_hedge_delay_follows_observed_latency_percentile():
+    tracker = LatencyTracker(min_samples=10)
+    hedging = AITransport(latencies=tracker, hedge_percentile=0.9, hedge_min_delay=0.5, hedge_max_delay=10.0, hedge_default_delay=8.0)
+    request = ChatRequest("openai", "m", "http://x/v1", {}, {})
+    assert hedging.hedge_delay(request, "complete") == 8.0
+
+    for seconds in [1.0] * 9 + [3.0]:
+        tracker.observe(("openai", "m", "complete"), seconds)
+    assert hedging.hedge_delay(request, "complete") == 3.0
+    for _ in range(100):
+        tracker.observe(("openai", "m", "complete"), 0.1)
+    assert hedging.hedge_delay(request, "complete") == 0.5
+
+
+def test_async_orchestration_call_reuses_pooled_connections(stub, monkeypatch):
+    monkeypatch.setenv("AI_PROVIDER", "openai")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_ENDPOINT", stub.url)
+    monkeypatch.setenv("AI_RESCUE_MODELS", "fast")
+    transport.set_ai_transport(_transport())
+    response_cache.set_ai_response_cache(None)
+
+    async def run():
+        results = []
+        for prompt in ("one", "two", "three"):
+            results.append(await client.acall_primary_with_fallback(prompt, "failing", None, deadline_seconds=5))
+        await transport.aclose_ai_transport()
+        return results
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        transport.set_ai_transport(None)
+    assert all(result.model_name == "fast" and fallback_used for result, fallback_used in results)
+    # Six requests over keep-alive connections: far fewer sockets than requests.
+    assert len(stub.requests) == 6
+    assert len(set(stub.client_ports)) <= 2
+
+
+class _ThreadRecordingCache:
+    def __init__(self):
+        self.entries = {}
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return self.entries.get(key)
+
+    def set(self, key, value, ttl_seconds=None):
+        self.threads.append(threading.get_ident())
+        self.entries[key] = value
+
+
+def test_async_call_keeps_response_cache_io_off_the_event_loop(stub, monkeypatch):
+    monkeypatch.setenv("AI_PROVIDER", "openai")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_ENDPOINT", stub.url)
+    monkeypatch.setenv("AI_RESCUE_MODELS", "fast")
+    cache = _ThreadRecordingCache()
+    monkeypatch.setattr(client, "get_ai_response_cache", lambda: cache)
+    transport.set_ai_transport(_transport())
+
+    async def run():
+        loop_thread = threading.get_ident()
+        first = await client.acall_primary_with_fallback("same", "fast", None, deadline_seconds=5, cache=True)
+        second = await client.acall_primary_with_fallback("same", "fast", None, deadline_seconds=5, cache=True)
+        await transport.aclose_ai_transport()
+        return loop_thread, first, second
+
+    try:
+        loop_thread, (first, _), (second, _) = asyncio.run(run())
+    finally:
+        transport.set_ai_transport(None)
+    assert not first.cached and second.cached and second.text == first.text
+    assert len(cache.threads) == 3 and loop_thread not in cache.threads
+
+
+def test_azure_chat_request_forwards_top_p(monkeypatch):
+    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com/")
+    monkeypatch.setenv("AZURE_AI_INCLUDE_SAMPLING_PARAMS", "true")
+
+    request = client.build_chat_request("hi", "gpt-test", {"temperature": 0.2, "top_p": 0.9, "top_k": 1}, provider="azure")
+
+    assert request.payload["temperature"] == 0.2 and request.payload["top_p"] == 0.9
+    assert "top_k" not in request.payload
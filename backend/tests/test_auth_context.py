@@ -0,0 +1,246 @@
+import asyncio
+import json
+import sys
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Mapping
+
+import pytest
+from fastapi import HTTPException
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.core import legacy_compat
+
+# legacy_compat imports ``app.core.auth_context``; use that very module instance.
+auth_context = sys.modules[legacy_compat.AuthContextResolver.__module__]
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+V2_USER_ID = uuid.UUID("22222222-2222-2222-2222-222222222222")
+V2_COMPANY_ID = uuid.UUID("33333333-3333-3333-3333-333333333333")
+
+PROFILE = {"id": USER_ID, "role": "recruiter", "full_name": "Rita", "preferences": {"lang": "cs", "tags": ["a"]}}
+SUPABASE_COMPANIES = {
+    "owner": [{"id": "c-owner", "name": "Owner Co"}],
+    "created": [{"id": "c-owner", "name": "Owner Co"}, {"id": "c-created", "name": "Created Co"}],
+    "members": [{"company_id": "c-member", "companies": {"name": "Member Co"}}],
+}
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, client, name, params=None):
+        self.client = client
+        self.name = name
+        self.filters = dict(params or {})
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def eq(self, key, value):
+        self.filters[key] = value
+        return self
+
+    def execute(self):
+        return self.client.execute(self.name, self.filters)
+
+
+class _FakeSupabase:
+    def __init__(self, *, rpc_available=True):
+        self.rpc_available = rpc_available
+        self.calls = []
+        self.auth = SimpleNamespace(get_user=self._get_user)
+
+    def _get_user(self, token):
+        self.calls.append("auth.get_user")
+        if token == "bad":
+            return SimpleNamespace(user=None)
+        return SimpleNamespace(user=SimpleNamespace(id=USER_ID, email="rita@example.com"))
+
+    def rpc(self, name, params):
+        return _Query(self, f"rpc:{name}", params)
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def execute(self, name, filters):
+        self.calls.append(name)
+        if name == "rpc:get_auth_context":
+            if not self.rpc_available:
+                raise RuntimeError("PGRST202 Could not find the function public.get_auth_context")
+            companies = [{"id": c["id"], "name": c["name"], "type": "owner"} for c in SUPABASE_COMPANIES["owner"] + SUPABASE_COMPANIES["created"]]
+            companies += [{"id": m["company_id"], "name": m["companies"]["name"], "type": "member"} for m in SUPABASE_COMPANIES["members"]]
+            return _Response({"profile": dict(PROFILE), "companies": companies})
+        if name == "profiles":
+            return _Response([dict(PROFILE)])
+        if name == "companies":
+            return _Response(SUPABASE_COMPANIES["owner"] if "owner_id" in filters else SUPABASE_COMPANIES["created"])
+        if name == "company_members":
+            return _Response(SUPABASE_COMPANIES["members"])
+        raise AssertionError(f"unexpected table {name}")
+
+
+class _Mappings:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return _Mappings(self.rows)
+
+
+class _FakeSessionFactory:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        return False
+
+    async def execute(self, statement, _params=None):
+        self.statements.append(str(statement))
+        await asyncio.sleep(0.01)
+        return _Result(
+            [{"user_id": V2_USER_ID, "user_role": "recruiter", "company_id": V2_COMPANY_ID, "company_name": "V2 Co", "membership_role": "owner"}]
+        )
+
+
+@pytest.fixture
+def env(monkeypatch):
+    client = _FakeSupabase()
+    sessions = _FakeSessionFactory()
+    monkeypatch.setattr(legacy_compat, "supabase", client)
+    monkeypatch.setattr(legacy_compat, "async_session_factory", sessions)
+    monkeypatch.setattr(legacy_compat, "_auth_context_rpc_available", True)
+    resolver = legacy_compat.AuthContextResolver(legacy_compat._load_auth_context, max_entries=3, ttl_seconds=30)
+    monkeypatch.setattr(legacy_compat, "_auth_context_resolver", resolver)
+    monkeypatch.setattr(auth_context, "_resolvers", [resolver])
+    return SimpleNamespace(client=client, sessions=sessions, resolver=resolver)
+
+
+def _plain(value):
+    if isinstance(value, Mapping):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+EXPECTED_USER = {
+    **PROFILE,
+    "auth_id": USER_ID,
+    "email": "rita@example.com",
+    "user_type": "company",
+    "associations": [{"id": str(V2_COMPANY_ID), "name": "V2 Co", "type": "owner"}],
+    "company_id": str(V2_COMPANY_ID),
+    "company_name": "V2 Co",
+    "authorized_ids": [USER_ID, "c-owner", "c-created", "c-member", str(V2_COMPANY_ID)],
+}
+
+
+def test_cold_resolve_uses_one_supabase_and_one_v2_query(env):
+    user = asyncio.run(legacy_compat.verify_supabase_token_legacy("token-a"))
+
+    assert _plain(user) == EXPECTED_USER
+    assert env.client.calls == ["auth.get_user", "rpc:get_auth_context"]
+    assert len(env.sessions.statements) == 1
+
+
+def test_rpc_and_fallback_paths_produce_identical_context(env, monkeypatch):
+    via_rpc = asyncio.run(legacy_compat.verify_supabase_token_legacy("token-a"))
+
+    fallback_client = _FakeSupabase(rpc_available=False)
+    monkeypatch.setattr(legacy_compat, "supabase", fallback_client)
+    via_tables = asyncio.run(legacy_compat.verify_supabase_token_legacy("token-b"))
+
+    assert via_tables == via_rpc
+    assert fallback_client.calls == ["auth.get_user", "rpc:get_auth_context", "profiles", "companies", "companies", "company_members"]
+    assert legacy_compat._auth_context_rpc_available is False
+
+
+def test_concurrent_requests_share_one_load_and_hits_issue_no_queries(env):
+    async def burst():
+        return await asyncio.gather(*(legacy_compat.verify_supabase_token_legacy("token-a") for _ in range(100)))
+
+    users = asyncio.run(burst())
+    assert all(_plain(user) == EXPECTED_USER for user in users)
+    assert env.client.calls == ["auth.get_user", "rpc:get_auth_context"]
+    assert len(env.sessions.statements) == 1
+
+    for _ in range(50):
+        asyncio.run(legacy_compat.verify_supabase_token_legacy("token-a"))
+    assert len(env.client.calls) == 2
+    assert env.resolver.stats["hits"] == 50
+
+
+def test_cache_hits_are_isolated(env):
+    first = asyncio.run(legacy_compat.verify_supabase_token_legacy("token-a"))
+    first["subscription_tier"] = "premium"
+    first["authorized_ids"].append("intruder")
+    first["preferences"]["lang"] = "en"
+    first["preferences"]["tags"].append("b")
+
+    second = asyncio.run(legacy_compat.verify_supabase_token_legacy("token-a"))
+    assert "subscription_tier" not in second
+    assert "intruder" not in second["authorized_ids"]
+    assert second["preferences"] == {"lang": "cs", "tags": ["a"]}
+
+
+def test_nested_profile_json_comes_back_as_plain_dicts_and_lists(env):
+    user = asyncio.run(legacy_compat.verify_supabase_token_legacy("token-a"))
+    user = asyncio.run(legacy_compat.verify_supabase_token_legacy("token-a"))  # cache hit
+
+    assert type(user["preferences"]) is dict and type(user["preferences"]["tags"]) is list
+    assert all(type(item) is dict for item in user["associations"])
+    assert json.loads(json.dumps(user)) == EXPECTED_USER
+
+
+def test_membership_change_invalidates_cached_context(env):
+    asyncio.run(legacy_compat.verify_supabase_token_legacy("token-a"))
+    hook = auth_context.invalidate_auth_context
+
+    hook(user_id=str(V2_USER_ID))
+    asyncio.run(legacy_compat.verify_supabase_token_legacy("token-a"))
+    assert env.client.calls.count("auth.get_user") == 2
+
+    hook(company_id="c-member")
+    asyncio.run(legacy_compat.verify_supabase_token_legacy("token-a"))
+    assert env.client.calls.count("auth.get_user") == 3
+
+    hook(company_id="unrelated")
+    asyncio.run(legacy_compat.verify_supabase_token_legacy("token-a"))
+    assert env.client.calls.count("auth.get_user") == 3
+
+
+def test_lru_is_bounded_and_failures_are_not_cached(env):
+    for index in range(5):
+        asyncio.run(legacy_compat.verify_supabase_token_legacy(f"token-{index}"))
+    assert len(env.resolver) == 3
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(legacy_compat.verify_supabase_token_legacy("bad"))
+        assert exc_info.value.status_code == 401
+    assert env.client.calls.count("auth.get_user") == 7
@@ -0,0 +1,210 @@
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.matching_engine import batch_executor
+from backend.app.matching_engine.batch_executor import DONE, FAILED, LEASED, BatchJob, MemoryWorkQueueStore, run_batch
+
+
+class SimulatedCrash(BaseException):
+    """Escapes the executor's error handling, like a killed worker process would."""
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Recorder:
+    def __init__(self, items, crash_on=None, fail_on=()):
+        self.items = {item["id"]: item for item in items}
+        self.crash_on = set(crash_on or ())
+        self.fail_on = set(fail_on)
+        self.lock = threading.Lock()
+        self.loads = []
+        self.handled = Counter()
+        self.flushed = Counter()
+        self.flush_sizes = []
+
+    def load(self, ids):
+        with self.lock:
+            self.loads.append(list(ids))
+        return [self.items[item_id] for item_id in ids if item_id in self.items]
+
+    def handle(self, item, _context):
+        with self.lock:
+            self.handled[item["id"]] += 1
+        if item["id"] in self.crash_on:
+            self.crash_on.discard(item["id"])
+            raise SimulatedCrash(item["id"])
+        if item["id"] in self.fail_on:
+            raise ValueError("bad item")
+        return item["id"]
+
+    def flush(self, results, _context):
+        with self.lock:
+            self.flush_sizes.append(len(results))
+            self.flushed.update(results)
+
+    def job(self):
+        return BatchJob(name="test", load=self.load, handle=self.handle, flush=self.flush)
+
+
+def _items(count):
+    return [{"id": str(index)} for index in range(count)]
+
+
+def test_threads_process_every_item_once_with_chunked_bulk_io():
+    recorder = _Recorder(_items(1000))
+    result = run_batch(recorder.job(), [str(i) for i in range(1000)], run_key="r1", store=MemoryWorkQueueStore(), workers=4, chunk_size=64, checkpoint_every=16, log=False)
+
+    assert result.processed == 1000 and result.failed == 0
+    assert result.chunks_total == result.chunks_done == 16
+    assert set(recorder.flushed.values()) == {1} and len(recorder.flushed) == 1000
+    assert len(recorder.loads) == 16  # one bulk read per chunk
+    assert max(recorder.flush_sizes) == 16
+    assert result.items_per_second > 0 and result.error_rate == 0.0
+
+
+def test_crashed_worker_chunk_is_resumed_from_its_checkpoint_after_the_lease_expires():
+    clock = _Clock()
+    store = MemoryWorkQueueStore(clock=clock)
+    recorder = _Recorder(_items(200), crash_on={"37"})
+    ids = [str(i) for i in range(200)]
+    options = dict(run_key="r2", store=store, workers=1, chunk_size=50, checkpoint_every=10, lease_seconds=60, log=False)
+
+    with pytest.raises(SimulatedCrash):
+        run_batch(recorder.job(), ids, **options)
+    crashed = store.chunks("r2")[0]
+    assert crashed.status == LEASED and crashed.checkpoint_offset == 30
+
+    # Restart before the lease expires: the other chunks run, the crashed one is left alone.
+    resumed = run_batch(recorder.job(), lambda: pytest.fail("a resumed run must not list items again"), **options)
+    assert resumed.resumed and resumed.chunks_done == 3
+
+    clock.now += 61
+    final = run_batch(recorder.job(), ids, **options)
+    assert final.chunks_done == 4 and final.processed == 20
+    assert recorder.loads[-1] == ids[30:50]
+    # Results flushed before the crash are not redone; the rest is flushed exactly once.
+    assert len(recorder.flushed) == 200 and set(recorder.flushed.values()) == {1}
+    assert all(recorder.handled[str(i)] == 1 for i in range(30))
+    assert all(recorder.handled[str(i)] == 2 for i in range(30, 38))
+    assert store.chunks("r2")[0].attempts == 2
+
+
+def test_a_dead_worker_thread_does_not_stop_the_others(monkeypatch):
+    monkeypatch.setattr(threading, "excepthook", lambda _args: None)
+    clock = _Clock()
+    store = MemoryWorkQueueStore(clock=clock)
+    recorder = _Recorder(_items(400), crash_on={"5"})
+    options = dict(run_key="r3", store=store, workers=4, chunk_size=40, checkpoint_every=100, lease_seconds=30, log=False)
+
+    first = run_batch(recorder.job(), [str(i) for i in range(400)], **options)
+    assert first.chunks_done == 9
+    assert [chunk.status for chunk in store.chunks("r3")].count(LEASED) == 1
+
+    clock.now += 31
+    second = run_batch(recorder.job(), [], **options)
+    assert second.chunks_done == 10
+    assert len(recorder.flushed) == 400 and set(recorder.flushed.values()) == {1}
+
+
+def test_checkpoint_after_a_lost_lease_abandons_the_chunk():
+    clock = _Clock()
+    store = MemoryWorkQueueStore(clock=clock)
+    store.enqueue("r4", [["a", "b", "c", "d"]])
+    slow = store.lease("r4", "slow-worker", 10, 3)
+    clock.now += 11
+    fast = store.lease("r4", "fast-worker", 10, 3)
+
+    assert fast.id == slow.id and fast.attempts == 2
+    assert not store.checkpoint(slow.id, "slow-worker", 2, 2, 0, 10)
+    assert not store.complete(slow.id, "slow-worker", 4, 0)
+    assert store.complete(fast.id, "fast-worker", 4, 0)
+    assert store.chunks("r4")[0].status == DONE
+
+
+def test_item_errors_are_metrics_and_flush_errors_retry_the_chunk_until_max_attempts():
+    recorder = _Recorder(_items(100), fail_on={str(i) for i in range(0, 100, 10)})
+    result = run_batch(recorder.job(), [str(i) for i in range(100)], run_key="r5", store=MemoryWorkQueueStore(), workers=2, chunk_size=25, log=False)
+    assert result.processed == 100 and result.failed == 10
+    assert result.error_rate == pytest.approx(0.1)
+
+    store = MemoryWorkQueueStore()
+    broken = BatchJob(name="broken", load=lambda ids: [{"id": i} for i in ids], handle=lambda item, _c: item["id"], flush=lambda results, _c: 1 / 0)
+    outcome = run_batch(broken, ["x", "y"], run_key="r6", store=store, workers=1, max_attempts=3, log=False)
+    chunk = store.chunks("r6")[0]
+    assert chunk.status == FAILED and chunk.attempts == 3 and "division by zero" in chunk.last_error
+    assert outcome.chunks_failed == 1 and len(outcome.worker_errors) == 3
+
+
+def test_job_embeddings_batch_upserts_once_per_chunk(monkeypatch):
+    from backend.app.matching_engine import serve
+
+    jobs = [{"id": index, "title": f"Job {index}", "description": "Popis", "location": "Praha"} for index in range(1, 251)]
+    upserts = []
+    monkeypatch.setattr(serve, "fetch_recent_jobs", lambda limit, days: jobs)
+    monkeypatch.setattr(serve, "embed_text", lambda text: [float(len(text))])
+    monkeypatch.setattr(serve, "upsert_job_embeddings", lambda vectors: upserts.append(dict(vectors)))
+    monkeypatch.setattr(batch_executor, "default_work_queue_store", lambda _name="": MemoryWorkQueueStore())
+    monkeypatch.setattr(batch_executor.config, "MATCHING_BATCH_CHUNK_SIZE", 100)
+    monkeypatch.setattr(batch_executor.config, "MATCHING_BATCH_CHECKPOINT_EVERY", 100)
+
+    assert serve.batch_refresh_job_embeddings() == 250
+    assert sorted(len(batch) for batch in upserts) == [50, 100, 100]
+    assert set().union(*upserts) == {str(job["id"]) for job in jobs}
+
+
+def test_job_embeddings_batch_skips_jobs_embedded_after_their_last_content_change(monkeypatch):
+    from backend.app.matching_engine import retrieval, serve
+
+    jobs = [
+        {"id": 1, "title": "Unchanged", "content_changed_at": "2026-03-01T08:00:00+00:00"},
+        {"id": 2, "title": "Edited since", "content_changed_at": "2026-03-02T08:00:00Z"},
+        {"id": 3, "title": "Never embedded", "content_changed_at": "2026-03-01T08:00:00+00:00"},
+        {"id": 4, "title": "Old model version", "content_changed_at": "2026-03-01T08:00:00+00:00"},
+        {"id": 5, "title": "No watermark"},
+    ]
+    stored = [
+        {"job_id": 1, "embedding_version": retrieval.EMBEDDING_VERSION, "updated_at": "2026-03-01T09:00:00+00:00"},
+        {"job_id": 2, "embedding_version": retrieval.EMBEDDING_VERSION, "updated_at": "2026-03-01T09:00:00+00:00"},
+        {"job_id": 4, "embedding_version": "v0", "updated_at": "2026-03-05T09:00:00+00:00"},
+        {"job_id": 5, "embedding_version": retrieval.EMBEDDING_VERSION, "updated_at": "2026-03-05T09:00:00+00:00"},
+    ]
+
+    class _Query:
+        def select(self, *_args):
+            return self
+
+        def in_(self, _column, ids):
+            self.ids = set(ids)
+            return self
+
+        def execute(self):
+            return type("Resp", (), {"data": [row for row in stored if row["job_id"] in self.ids]})()
+
+    monkeypatch.setattr(retrieval, "supabase", type("Client", (), {"table": lambda self, _name: _Query()})())
+    assert retrieval.stale_job_embedding_ids(jobs) == ["2", "3", "4", "5"]
+
+    upserts = []
+    monkeypatch.setattr(serve, "fetch_recent_jobs", lambda limit, days: jobs)
+    monkeypatch.setattr(serve, "embed_text", lambda text: [float(len(text))])
+    monkeypatch.setattr(serve, "upsert_job_embeddings", lambda vectors: upserts.append(dict(vectors)))
+    monkeypatch.setattr(batch_executor, "default_work_queue_store", lambda _name="": MemoryWorkQueueStore())
+    assert serve.batch_refresh_job_embeddings() == 4
+    assert set().union(*upserts) == {"2", "3", "4", "5"}
+
+    # Once everything is embedded, only the job without a watermark keeps coming back.
+    stored[:] = [{"job_id": job["id"], "embedding_version": retrieval.EMBEDDING_VERSION, "updated_at": "2026-03-09T00:00:00+00:00"} for job in jobs]
+    assert retrieval.stale_job_embedding_ids(jobs) == ["5"]
@@ -0,0 +1,101 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.services import candidate_intent
+
+TAXONOMY_PATH = ROOT / "frontend" / "src" / "shared" / "candidate_intent_taxonomy.json"
+
+
+@pytest.fixture(autouse=True)
+def _taxonomy(monkeypatch):
+    monkeypatch.setenv("CANDIDATE_INTENT_TAXONOMY_PATH", str(TAXONOMY_PATH))
+    candidate_intent._load_taxonomy.cache_clear()
+    candidate_intent._intent_index.cache_clear()
+    candidate_intent.clear_candidate_intent_cache()
+    yield
+    candidate_intent._load_taxonomy.cache_clear()
+    candidate_intent._intent_index.cache_clear()
+    candidate_intent.clear_candidate_intent_cache()
+
+
+def _reference_score_domains(chunks):
+    """The per-profile keyword loop that _score_domains used before the index."""
+    normalize = candidate_intent._normalize_text
+    joined = "\n".join(normalize(chunk) for chunk in chunks if str(chunk or "").strip())
+    if not joined:
+        return []
+    scores = []
+    for domain_key, definition in (candidate_intent._load_taxonomy().get("domains") or {}).items():
+        score = 0.0
+        for keyword in definition.get("keywords") or []:
+            normalized_keyword = normalize(keyword)
+            if not normalized_keyword:
+                continue
+            if normalized_keyword in joined:
+                score += 3.0
+                continue
+            parts = [part for part in normalized_keyword.split(" ") if part]
+            if len(parts) > 1 and all(part in joined for part in parts):
+                score += 1.5
+        if score > 0:
+            scores.append({"domain": domain_key, "score": score})
+    scores.sort(key=lambda item: item["score"], reverse=True)
+    return scores
+
+
+def _synthetic_profiles(count, seed=5):
+    rng = random.Random(seed)
+    domains = candidate_intent._load_taxonomy()["domains"]
+    words = [word for definition in domains.values() for keyword in definition["keywords"] for word in keyword.split()]
+    words += ["Vývojář", "ŘÍZENÍ", "týmu", "zkušenosti", "Backendpoint", "managerka", "go-to-market", "", "  "]
+    profiles = []
+    for _ in range(count):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 60)))
+        profiles.append(
+            {
+                "job_title": rng.choice(["", "Senior Product Manager", "Účetní", "Vedoucí skladu", None]),
+                "cv_text": text,
+                "skills": rng.sample(words, rng.randint(0, 4)),
+                "preferences": {"searchProfile": {"targetRole": rng.choice(["", "Data analyst"])}},
+            }
+        )
+    return profiles
+
+
+def test_index_scores_match_the_previous_keyword_loop():
+    for profile in _synthetic_profiles(400):
+        chunks = candidate_intent._collect_profile_chunks(profile)
+        assert candidate_intent._score_domains(chunks) == _reference_score_domains(chunks)
+
+
+def test_domain_keyword_lookups_come_from_the_index():
+    domains = candidate_intent._load_taxonomy()["domains"]
+    for domain_key, definition in domains.items():
+        assert candidate_intent.get_domain_keywords(domain_key) == [str(item) for item in definition["keywords"] if str(item).strip()]
+        assert candidate_intent.get_related_domains(domain_key) == list(definition.get("related") or [])
+    assert candidate_intent.get_domain_keywords("missing") == []
+    assert candidate_intent.get_related_domains(None) == []
+
+
+def test_resolved_intent_is_cached_per_profile_version(monkeypatch):
+    calls = []
+    real_score = candidate_intent._score_domains
+    monkeypatch.setattr(candidate_intent, "_score_domains", lambda chunks: calls.append(1) or real_score(chunks))
+    profile = {"job_title": "Product owner", "cv_text": "roadmap, backlog, discovery", "skills": ["SQL"]}
+
+    first = candidate_intent.resolve_candidate_intent_profile(profile)
+    first["secondary_domains"].append("tampered")
+    second = candidate_intent.resolve_candidate_intent_profile([dict(profile)])
+    assert len(calls) == 1
+    assert second["primary_domain"] == "product_management"
+    assert "tampered" not in second["secondary_domains"]
+
+    candidate_intent.resolve_candidate_intent_profile({**profile, "cv_text": "pricing strategy"})
+    assert len(calls) == 2
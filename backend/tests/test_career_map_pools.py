@@ -0,0 +1,190 @@
+import itertools
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.services import career_map_pools as pools
+
+
+def _synthetic_jobs(count: int, country_code: str, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    titles = ["Senior Python Developer", "Junior Accountant", "Warehouse Operator", "Team Lead Sales", "Product Manager"]
+    descriptions = ["Full-time HPP in office", "B2B contract, home office", "Hybrid work, flexible hours", "Freelance ICO", "On site"]
+    benefits = [["Meal vouchers", "Sick days"], ["Home office"], [], ["Multisport card", "Meal vouchers"]]
+    jobs = []
+    for index in range(count):
+        jobs.append(
+            {
+                "id": f"{country_code}-{index}",
+                "title": rng.choice(titles),
+                "description": rng.choice(descriptions),
+                "country_code": rng.choice([country_code, country_code.lower(), "DE"]),
+                "work_model": rng.choice(["", "remote", "hybrid", "onsite"]),
+                "salary_from": rng.choice([None, 0, 25000, 45000, 80000, "52000"]),
+                "benefits": rng.choice(benefits),
+                "lat": rng.choice([None, 50.08 + rng.uniform(-1, 1)]),
+                "lng": 14.43 + rng.uniform(-1, 1),
+                "job_intelligence": {
+                    "role_family": rng.choice(["software_engineering", "finance", "operations"]),
+                    "seniority": rng.choice([None, "junior", "senior"]),
+                },
+            }
+        )
+    return jobs
+
+
+def _linear_filter(jobs, *, country_code, work_arrangement, remote_only, contract_types, min_salary, benefits, user_lat, user_lng, radius_km, limit):
+    """The per-job filter that get_career_map_pool used before the columnar index."""
+    out = []
+    for job in jobs:
+        if country_code and pools._normalize_country_code(job.get("country_code")) != country_code:
+            continue
+        if not pools._matches_work_arrangement(job, work_arrangement, remote_only):
+            continue
+        if not pools._matches_contract_types(job, contract_types):
+            continue
+        if min_salary and pools._safe_int(job.get("salary_from")) < int(min_salary):
+            continue
+        if not pools._has_required_benefits(job, benefits):
+            continue
+        if radius_km and not remote_only and work_arrangement != "remote":
+            if not pools._matches_commute(job, user_lat, user_lng, radius_km):
+                continue
+        out.append(job)
+        if len(out) >= limit:
+            break
+    return out
+
+
+@pytest.fixture
+def pool_env(monkeypatch, tmp_path):
+    reads = []
+    counts = []
+    scheduled = []
+    now = {"t": datetime(2026, 10, 19, 8, 0, tzinfo=timezone.utc)}
+
+    def read_pool_rows(country_code, *, limit):
+        reads.append(country_code)
+        return _synthetic_jobs(40, country_code or "CZ")[:limit]
+
+    def count_active():
+        counts.append(1)
+        return 12345
+
+    monkeypatch.setattr(pools, "_career_map_pool_cache", {})
+    monkeypatch.setattr(pools, "_active_job_count", {"value": None, "updated_at": None})
+    monkeypatch.setattr(pools, "_refresh_inflight", set())
+    monkeypatch.setattr(pools, "_last_refresh_attempt", {})
+    monkeypatch.setattr(pools, "_snapshot_loaded", False)
+    monkeypatch.setattr(pools.config, "CAREER_MAP_POOL_SNAPSHOT_PATH", str(tmp_path / "pools.json.gz"))
+    monkeypatch.setattr(pools, "jobs_postgres_main_enabled", lambda: True)
+    monkeypatch.setattr(pools, "_read_pool_rows", read_pool_rows)
+    monkeypatch.setattr(pools, "count_active_main_jobs", count_active)
+    monkeypatch.setattr(pools, "_run_in_background", scheduled.append)
+    monkeypatch.setattr(pools, "_utcnow", lambda: now["t"])
+
+    class Env:
+        pass
+
+    env = Env()
+    env.reads, env.counts, env.scheduled, env.now = reads, counts, scheduled, now
+
+    def run_scheduled():
+        while scheduled:
+            scheduled.pop(0)()
+
+    env.run_scheduled = run_scheduled
+    return env
+
+
+def test_requests_never_refresh_synchronously(pool_env):
+    cold = pools.get_career_map_pool(country_code="CZ")
+    assert cold["jobs"] == []
+    assert cold["meta"]["refreshing"] is True
+    assert pool_env.reads == [] and pool_env.counts == []
+    assert len(pool_env.scheduled) == 2  # pool rebuild + active count
+
+    pool_env.run_scheduled()
+    warm = pools.get_career_map_pool(country_code="CZ")
+    assert warm["meta"]["base_pool_count"] == 40
+    assert warm["meta"]["database_total_count"] == 12345
+    assert warm["meta"]["stale"] is False
+    reads_after_refresh = len(pool_env.reads)
+
+    pool_env.now["t"] += timedelta(hours=10)
+    for _ in range(20):
+        stale = pools.get_career_map_pool(country_code="CZ", work_arrangement="hybrid")
+        assert stale["meta"]["stale"] is True
+        assert stale["meta"]["base_pool_count"] == 40
+    assert len(pool_env.reads) == reads_after_refresh
+    # One pool rebuild and one count refresh queued, no matter how many requests noticed.
+    assert len(pool_env.scheduled) == 2
+
+    pool_env.run_scheduled()
+    assert pools.get_career_map_pool(country_code="CZ")["meta"]["stale"] is False
+
+
+def test_columnar_filters_match_the_linear_filter():
+    jobs = _synthetic_jobs(600, "CZ", seed=11)
+    index = pools.CareerMapPoolIndex(jobs)
+    combos = itertools.product(
+        ["", "CZ"],
+        ["all", "remote", "hybrid", "onsite"],
+        [False, True],
+        [[], ["employee"], ["contractor"], ["employee", "contractor"]],
+        [None, 40000],
+        [[], ["meal vouchers"], ["home office", "meal"]],
+        [None, 60.0],
+    )
+    for country, arrangement, remote_only, contract_types, min_salary, benefits, radius in combos:
+        kwargs = dict(
+            country_code=country,
+            work_arrangement=arrangement,
+            remote_only=remote_only,
+            contract_types=contract_types,
+            min_salary=min_salary,
+            benefits=benefits,
+            user_lat=50.08,
+            user_lng=14.43,
+            radius_km=radius,
+            limit=250,
+        )
+        expected = [job["id"] for job in _linear_filter(jobs, **kwargs)]
+        assert [job["id"] for job in index.select(**kwargs)] == expected, kwargs
+
+
+def test_role_family_and_seniority_bitmaps():
+    jobs = _synthetic_jobs(300, "SK", seed=3)
+    index = pools.CareerMapPoolIndex(jobs)
+
+    selected = index.select(role_families=["finance"], seniority_levels=["senior", "lead"], limit=1000)
+    assert selected
+    for job in selected:
+        assert job["job_intelligence"]["role_family"] == "finance"
+        seniority = job["job_intelligence"]["seniority"] or pools._infer_seniority(job["title"])
+        assert seniority in {"senior", "lead"}
+
+
+def test_snapshot_lets_a_new_worker_start_warm(pool_env, monkeypatch):
+    result = pools.refresh_career_map_pools(country_codes=["CZ"])
+    assert result["markets"] == {"CZ": 40}
+    reads_after_refresh = len(pool_env.reads)
+
+    # Simulate a fresh worker process.
+    monkeypatch.setattr(pools, "_career_map_pool_cache", {})
+    monkeypatch.setattr(pools, "_active_job_count", {"value": None, "updated_at": None})
+    monkeypatch.setattr(pools, "_snapshot_loaded", False)
+
+    payload = pools.get_career_map_pool(country_code="CZ", scope="domestic")
+    assert payload["meta"]["base_pool_count"] == 40
+    assert payload["meta"]["database_total_count"] == 12345
+    assert payload["meta"]["stale"] is False
+    assert len(pool_env.reads) == reads_after_refresh
+    assert pool_env.scheduled == []
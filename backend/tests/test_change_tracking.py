@@ -0,0 +1,272 @@
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.matching_engine import batch_executor
+from backend.app.matching_engine.batch_executor import MemoryWorkQueueStore
+from backend.app.matching_engine.change_tracking import (
+    FULL,
+    INTERACTION,
+    JOBS,
+    PROFILE,
+    RETRY,
+    ChangeTracker,
+    MemoryChangeStore,
+    candidate_segments,
+    job_segments,
+)
+
+PRAHA = (50.08, 14.43)
+MELNIK = (50.35, 14.47)
+BRNO = (49.19, 16.61)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _tracker():
+    clock = _Clock()
+    return ChangeTracker(MemoryChangeStore(), clock=clock), clock
+
+
+def _user(user_id, coords=None, country="CZ"):
+    profile = {"id": user_id, "preferences": {"preferredCountryCode": country} if country else {}}
+    if coords:
+        profile["lat"], profile["lng"] = coords
+    return profile
+
+
+def _job(job_id, coords=None, country="cz", title="Skladník"):
+    job = {"id": job_id, "title": title, "country_code": country}
+    if coords:
+        job["lat"], job["lng"] = coords
+    return job
+
+
+def _due(plan, profiles):
+    due, _ = plan.select(profiles)
+    return {profile["id"] for profile in due}
+
+
+def _start_tracking(tracker, clock, consumer="recommendations"):
+    plan = tracker.plan(consumer)
+    assert plan.full
+    tracker.commit(plan)
+    clock.now += 3600
+
+
+def test_first_cycle_is_full_then_only_dirty_users_are_due():
+    tracker, clock = _tracker()
+    users = [_user(f"u{index}", PRAHA) for index in range(10)]
+    first = tracker.plan("recommendations")
+    assert _due(first, users) == {user["id"] for user in users} and first.reasons == {FULL: 10}
+    tracker.commit(first)
+
+    clock.now += 60
+    tracker.mark_users(["u1"], PROFILE)
+    tracker.mark_interactions([
+        {"user_id": "u2", "event_type": "swipe_right"},
+        {"user_id": "u3", "event_type": "impression"},
+    ])
+    clock.now += 3600
+    second = tracker.plan("recommendations")
+    assert not second.full
+    assert _due(second, users) == {"u1", "u2"}
+    assert second.reasons == {PROFILE: 1, INTERACTION: 1} and second.skipped == 8
+
+    # Marks made while a cycle runs belong to the next one.
+    clock.now += 10
+    tracker.mark_users(["u4"], PROFILE)
+    tracker.commit(second)
+    clock.now += 3600
+    assert _due(tracker.plan("recommendations"), users) == {"u4"}
+
+
+def test_job_arrivals_reach_only_users_of_that_segment():
+    tracker, clock = _tracker()
+    praha, melnik, brno, nowhere = _user("praha", PRAHA), _user("melnik", MELNIK), _user("brno", BRNO), _user("nowhere", country=None)
+    slovak = _user("slovak", country="SK")
+    users = [praha, melnik, brno, nowhere, slovak]
+    _start_tracking(tracker, clock)
+
+    tracker.note_jobs([_job(1, PRAHA), _job(2, PRAHA)])
+    plan = tracker.plan("recommendations")
+    # Mělník is one grid cell away and commutable; Brno is not. A user without any
+    # location cares about every arrival, a Slovak one about none of these.
+    assert _due(plan, users) == {"praha", "melnik", "nowhere"}
+    assert plan.reasons == {JOBS: 3}
+
+    tracker.commit(plan)
+    clock.now += 3600
+    tracker.note_jobs([_job(3, BRNO, title="Remote Python developer")])
+    assert _due(tracker.plan("recommendations"), users) == {"praha", "melnik", "brno", "nowhere"}
+
+    tracker.commit(tracker.plan("recommendations"))
+    clock.now += 3600
+    tracker.note_jobs([_job(4, country="sk")])  # no coordinates
+    assert _due(tracker.plan("recommendations"), users) == {"nowhere", "slovak"}
+
+
+def test_segments_of_jobs_and_candidates():
+    assert job_segments(_job(1, PRAHA)) == ["*", "cz", "cell:200:57"]
+    assert "cz:remote" in job_segments({"country_code": "CZ", "work_model": "Home office", "lat": PRAHA[0], "lng": PRAHA[1]})
+    assert job_segments({"payload_json": '{"country_code": "de"}'}) == ["*", "de", "de:unlocated"]
+    assert job_segments({}) == ["*"]
+
+    segments = candidate_segments({"preferences": '{"taxProfile": {"countryCode": "CZ"}, "coordinates": {"lat": 50.08, "lon": 14.43}}'})
+    assert len(segments) == 11 and "cell:200:57" in segments and "cell:199:56" in segments
+    assert segments[-2:] == ["cz:remote", "cz:unlocated"]
+    assert candidate_segments({"lat": 0, "lng": 0, "preferences": {}}) == ["*"]
+
+
+def test_failed_users_are_retried_and_the_full_refresh_interval_is_honoured():
+    tracker, clock = _tracker()
+    users = [_user(f"u{index}", BRNO) for index in range(5)]
+    _start_tracking(tracker, clock)
+
+    tracker.mark_users(["u0", "u1"], PROFILE)
+    plan = tracker.plan("recommendations")
+    assert _due(plan, users) == {"u0", "u1"}
+    tracker.commit(plan, failed_user_ids=["u1"])
+    clock.now += 3600
+    retry = tracker.plan("recommendations")
+    assert _due(retry, users) == {"u1"} and retry.reasons == {RETRY: 1}
+    tracker.commit(retry)
+
+    clock.now += 24 * 3600
+    assert tracker.plan("recommendations").full
+    assert not tracker.plan("recommendations", full_refresh_seconds=48 * 3600).full
+
+
+def test_consumers_keep_their_own_cursor_and_the_log_is_pruned():
+    tracker, clock = _tracker()
+    users = [_user("a", PRAHA), _user("b", PRAHA)]
+    _start_tracking(tracker, clock, "recommendations")
+    _start_tracking(tracker, clock, "notifications")
+
+    tracker.mark_users(["a"], PROFILE)
+    clock.now += 600
+    recommendations = tracker.plan("recommendations")
+    tracker.commit(recommendations)
+    clock.now += 3600
+    tracker.mark_users(["b"], PROFILE)
+    clock.now += 600
+
+    # The notification loop has not run since "a" changed, so it still sees both.
+    notifications = tracker.plan("notifications")
+    assert _due(notifications, users) == {"a", "b"}
+    assert _due(tracker.plan("recommendations"), users) == {"b"}
+    tracker.commit(notifications)
+    assert len(tracker.store) == 1
+
+
+def test_pool_jobs_scraped_after_the_cursor_mark_their_segments():
+    tracker, clock = _tracker()
+    _start_tracking(tracker, clock)
+    plan = tracker.plan("recommendations")
+    since = plan.since
+    from datetime import datetime, timezone
+
+    def _scraped(offset):
+        return datetime.fromtimestamp(since + offset, timezone.utc).isoformat()
+
+    old, new = {**_job(1, BRNO), "scraped_at": _scraped(-60)}, {**_job(2, PRAHA), "scraped_at": _scraped(60)}
+    assert plan.add_jobs([old, new]) == 1
+    assert _due(plan, [_user("praha", PRAHA), _user("brno", BRNO)]) == {"praha"}
+
+
+def test_randomised_event_stream_matches_a_brute_force_oracle():
+    rng = random.Random(7)
+    tracker, clock = _tracker()
+    places = [PRAHA, MELNIK, BRNO, (48.15, 17.11), None]
+    users = [_user(f"u{index}", rng.choice(places), rng.choice(["CZ", "SK", None])) for index in range(300)]
+    _start_tracking(tracker, clock)
+
+    for _cycle in range(6):
+        changed_users, arrivals = set(), []
+        for _event in range(40):
+            roll = rng.random()
+            clock.now += rng.randint(1, 30)
+            if roll < 0.4:
+                user_id = rng.choice(users)["id"]
+                tracker.mark_users([user_id], PROFILE)
+                changed_users.add(user_id)
+            elif roll < 0.7:
+                row = {"user_id": rng.choice(users)["id"], "event_type": rng.choice(["impression", "save", "open_detail"])}
+                tracker.mark_interactions([row])
+                if row["event_type"] != "impression":
+                    changed_users.add(row["user_id"])
+            elif roll < 0.8:
+                job = _job(rng.randint(1, 10**6), rng.choice(places), rng.choice(["cz", "sk", ""]), rng.choice(["Skladník", "Remote tester"]))
+                tracker.note_jobs([job])
+                arrivals.append(job)
+
+        clock.now += 5
+        plan = tracker.plan("recommendations")
+        arrival_segments = {segment for job in arrivals for segment in job_segments(job)}
+        expected = {
+            user["id"]
+            for user in users
+            if user["id"] in changed_users or arrival_segments.intersection(candidate_segments(user))
+        }
+        assert _due(plan, users) == expected
+        tracker.commit(plan)
+        clock.now += 300
+
+
+def test_batch_refresh_recommendations_recomputes_only_due_users(monkeypatch):
+    from backend.app.matching_engine import serve
+
+    profiles = [{"id": f"u{index}", "lat": PRAHA[0] if index < 5 else BRNO[0], "lng": PRAHA[1] if index < 5 else BRNO[1], "preferences": {}} for index in range(20)]
+
+    class _Query:
+        def select(self, *_args):
+            return self
+
+        def limit(self, *_args):
+            return self
+
+        def in_(self, _column, ids):
+            self.ids = set(ids)
+            return self
+
+        def execute(self):
+            ids = getattr(self, "ids", None)
+            return type("Resp", (), {"data": [row for row in profiles if ids is None or row["id"] in ids]})()
+
+    class _Client:
+        def table(self, _name):
+            return _Query()
+
+    tracker, clock = _tracker()
+    computed, extended = [], []
+    monkeypatch.setattr(serve, "supabase", _Client())
+    monkeypatch.setattr(serve, "get_change_tracker", lambda: tracker)
+    monkeypatch.setattr(serve, "get_active_model_config", lambda *_args: {})
+    monkeypatch.setattr(serve, "fetch_recent_jobs", lambda limit, days: [{"id": 1, "title": "Job"}])
+    monkeypatch.setattr(serve, "ensure_job_embeddings", lambda jobs, persist: {})
+    monkeypatch.setattr(serve, "recommend_jobs_for_user", lambda user_id, **_kwargs: computed.append(user_id) or [{"job": {"id": 1}}])
+    monkeypatch.setattr(serve, "extend_recommendation_cache", lambda user_ids, ttl_minutes: extended.extend(user_ids))
+    monkeypatch.setattr(serve, "_hourly_run_key", lambda name: f"{name}:{clock.now}")
+    monkeypatch.setattr(batch_executor, "default_work_queue_store", lambda _name="": MemoryWorkQueueStore())
+
+    assert serve.batch_refresh_recommendations() == 20
+    assert len(computed) == 20 and extended == []
+
+    clock.now += 3600
+    computed.clear()
+    tracker.mark_users(["u7", "ghost"], PROFILE)
+    tracker.note_jobs([_job(9, PRAHA)])
+    clock.now += 60
+    assert serve.batch_refresh_recommendations() == 6
+    assert sorted(computed) == ["u0", "u1", "u2", "u3", "u4", "u7"]
+    assert len(extended) == 14 and "u7" not in extended
@@ -0,0 +1,188 @@
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.ai_orchestration import pipeline
+from backend.app.ai_orchestration.context_budget import (
+    allocate_budget,
+    compact_json,
+    compact_messages,
+    compact_text,
+    count_tokens,
+    fold_memory,
+    truncate_to_tokens,
+)
+from backend.app.ai_orchestration.prompt_registry import get_prompt_budget
+
+FIXTURE_CVS = json.loads((Path(__file__).parent / "fixtures" / "cv_samples.json").read_text(encoding="utf-8"))
+
+
+def _cv(cv_id):
+    return next(cv["text"] for cv in FIXTURE_CVS if cv["id"] == cv_id)
+
+
+def test_token_count_approximation_is_in_a_sane_range():
+    text = "Backend engineer with 11 years of experience building payment platforms in Python."
+    assert 13 <= count_tokens(text) <= 20
+    assert count_tokens("") == 0
+    # Diacritics cost more than plain ASCII words of the same length.
+    assert count_tokens("Projektová manažerka") > count_tokens("Projektova manazerka")
+
+
+def test_truncation_respects_the_budget():
+    text = _cv("en-backend-engineer")
+    for budget in (1, 2, 10, 137):
+        assert count_tokens(truncate_to_tokens(text, budget)) <= budget
+    assert truncate_to_tokens("short text", 50) == "short text"
+
+
+def test_compact_text_enforces_budgets_on_fixture_cvs():
+    for cv in FIXTURE_CVS:
+        for budget in (4000, 1200, 400, 60):
+            compacted = compact_text(cv["text"], budget)
+            assert count_tokens(compacted) <= budget
+            assert compacted == compact_text(cv["text"], budget)  # deterministic
+
+
+def test_boilerplate_and_repeated_page_headers_are_removed_within_budget():
+    compacted = compact_text(_cv("cs-project-manager"), 4000)
+    assert "zpracováním osobních údajů" not in compacted
+    assert "Strana 2 z 6" not in compacted
+    assert "Curriculum Vitae" not in compacted
+    assert compacted.count("| jana.dvorakova@example.cz") == 1  # repeated on every page
+    assert "PRINCE2 Foundation (2018)" in compacted
+
+
+def test_tight_budget_keeps_the_cv_skeleton_and_drops_low_priority_sections():
+    compacted = compact_text(_cv("cs-project-manager"), 400)
+    for employer in ("Alza.cz", "DHL Supply Chain", "Rohlik Group", "Kiwi.com", "Zásilkovna", "GLS Czech Republic"):
+        assert employer in compacted
+    assert "Masarykova univerzita" in compacted
+    assert "Power BI" in compacted
+    assert "horská turistika" not in compacted
+    assert "Zájmy" not in compacted  # no orphan heading once its content is dropped
+
+
+def test_short_cv_is_left_as_is():
+    text = _cv("cs-warehouse-short")
+    assert compact_text(text, 4000) == " ".join(text.split())
+
+
+def test_compact_json_stays_valid_and_within_budget():
+    payload = {
+        "archetype": "Strategický koordinátor",
+        "dimension_scores": [{"dimension": f"D{i}", "score": i * 7, "note": "x" * 400} for i in range(1, 13)],
+        "top_roles": [{"title": f"Role {i}", "reason": "důvod " * 80} for i in range(10)],
+        "empty": None,
+    }
+    for budget in (5000, 800, 200, 30):
+        text = compact_json(payload, budget)
+        assert count_tokens(text) <= budget
+        assert isinstance(json.loads(text), dict)
+    assert json.loads(compact_json({"a": 1}, 100)) == {"a": 1}
+
+
+def test_allocate_budget_gives_short_parts_everything_they_need():
+    assert allocate_budget([10, 500, 3000, 40], 1000) == [10, 475, 475, 40]
+    assert allocate_budget([10, 20], 1000) == [10, 20]
+    assert sum(allocate_budget([900, 900, 900], 1000)) <= 1000
+
+
+def test_profile_generation_prompt_is_bounded_by_its_budget():
+    budget = get_prompt_budget("profile_generate")
+    steps = [{"id": f"step-{i}", "text": _cv("en-backend-engineer")[:5000]} for i in range(6)]
+    existing = {"skills": [f"skill-{i}" for i in range(300)], "story": _cv("cs-project-manager")}
+
+    small = pipeline._build_generation_prompt("SYSTEM", "cs", {}, [{"id": "s", "text": "Ahoj"}])
+    overhead = count_tokens(small)
+    prompt = pipeline._build_generation_prompt("SYSTEM", "cs", existing, steps)
+
+    assert count_tokens(prompt) <= overhead + budget["steps"] + budget["existing_profile"]
+    assert all(f"[step-{i}]" in prompt for i in range(6))
+
+
+def test_prompt_budget_overrides_only_known_parts():
+    assert get_prompt_budget("cv_parse", {"cv_text": 900, "unknown": 5, "x": "bad"}) == {"cv_text": 900}
+    assert get_prompt_budget("cv_parse", "not-a-dict") == get_prompt_budget("cv_parse")
+    assert get_prompt_budget("no-such-feature") == {}
+
+
+def test_cv_parse_prompt_is_compacted(monkeypatch):
+    from app.domains.identity import service as identity_service
+
+    captured = {}
+
+    def fake_call_ai_json(prompt, **_kwargs):
+        captured["prompt"] = prompt
+        return {"name": "Michael Turner", "skills": ["Python"]}, None
+
+    monkeypatch.setattr(identity_service, "call_ai_json", fake_call_ai_json)
+    long_text = " ".join([_cv("en-backend-engineer")] * 3)
+    identity_service.IdentityDomainService._parse_cv_text_with_ai(long_text, "en", "cv.pdf")
+
+    cv_part = captured["prompt"].split("CV text:", 1)[1]
+    assert count_tokens(cv_part) <= get_prompt_budget("cv_parse")["cv_text"]
+    assert "Michael Turner" in cv_part and "Page 1 of 7" not in cv_part
+
+
+def test_memory_checkpoint_folds_old_turns_into_a_bounded_summary():
+    history = [{"role": "user" if i % 2 == 0 else "agent", "message": f"Turn {i} about role {i}. Extra detail."} for i in range(30)]
+    recent, checkpoint = fold_memory(history, None, keep_last=20, summary_tokens=200)
+
+    assert recent == history[-20:]
+    assert checkpoint["folded"] == 10
+    assert checkpoint["summary"].startswith("user: Turn 0 about role 0.")
+    assert "Extra detail" not in checkpoint["summary"]
+
+    later = [{"role": "user", "message": f"Later question {i}."} for i in range(25)]
+    _recent, checkpoint = fold_memory(later, checkpoint, keep_last=20, summary_tokens=60)
+    assert checkpoint["folded"] == 15
+    assert count_tokens(checkpoint["summary"]) <= 60
+    assert checkpoint["summary"].endswith("user: Later question 4.")
+
+
+def test_compact_messages_keeps_the_summary_and_newest_turns():
+    messages = [{"role": "summary", "message": "user: Hledám roli v logistice."}]
+    messages += [{"role": "user", "message": f"Zpráva {i} " + "slovo " * 40} for i in range(20)]
+    kept = compact_messages(messages, 200, max_message_tokens=50)
+
+    assert kept[0]["role"] == "summary"
+    assert kept[-1]["message"].startswith("Zpráva 19")
+    assert sum(count_tokens(item["message"]) + 2 for item in kept) <= 200
+
+
+def test_recruiter_memory_checkpoint_round_trip():
+    from app.services.shami_agent_service import agent_memory_context, checkpoint_agent_memory
+
+    history = [{"role": "user", "message": f"Question {i}."} for i in range(24)]
+    kept, state = checkpoint_agent_memory(history, {"other": 1}, keep_last=20)
+    assert len(kept) == 20 and state["other"] == 1
+    assert state["memory_checkpoint"]["summary"].splitlines()[0] == "user: Question 0."
+
+    context = agent_memory_context({"chat_history": kept, "agent_state": state}, [{"role": "user", "message": "New"}])
+    assert context[0]["role"] == "summary"
+    assert [item["message"] for item in context[1:]] == ["Question 20.", "Question 21.", "Question 22.", "Question 23.", "New"]
+
+
+def test_recruiter_turns_beyond_keep_last_are_folded_not_dropped():
+    from app.services.shami_agent_service import agent_memory_context, record_agent_turn
+
+    memory = {"chat_history": [], "agent_state": None}
+    for turn in range(15):
+        chat_history, agent_state = record_agent_turn(memory, [], f"Question {turn}.", f"Answer {turn}.", keep_last=20)
+        memory = {"chat_history": chat_history, "agent_state": agent_state}
+
+    # 30 messages: the newest 20 stay verbatim, the 10 older ones live in the summary.
+    assert len(memory["chat_history"]) == 20
+    assert memory["chat_history"][0]["message"] == "Question 5."
+    checkpoint = memory["agent_state"]["memory_checkpoint"]
+    assert checkpoint["folded"] == 10
+    assert checkpoint["summary"].splitlines()[:2] == ["user: Question 0.", "agent: Answer 0."]
+    assert "agent: Answer 4." in checkpoint["summary"]
+
+    context = agent_memory_context(memory, [])
+    assert context[0]["role"] == "summary" and len(context) == 5
@@ -0,0 +1,300 @@
+import math
+import random
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.matching_engine import evaluation
+from backend.app.matching_engine.evaluation_engine import (
+    EvaluationAccumulator,
+    auc_roc,
+    iter_keyset_pages,
+    log_loss,
+    positive_keys,
+    precision_at_k,
+)
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, client, table):
+        self.client = client
+        self.table_name = table
+        self.filters = []
+        self.limit_value = None
+        self.descending = False
+
+    def select(self, _columns):
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: str(row[column]) >= str(value))
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gt(self, column, value):
+        self.client.keyset_calls.append((self.table_name, value))
+        self.filters.append(lambda row: row[column] > value)
+        return self
+
+    def lt(self, column, value):
+        self.client.keyset_calls.append((self.table_name, value))
+        self.filters.append(lambda row: row[column] < value)
+        return self
+
+    def order(self, column, desc=False):
+        assert column == "id"
+        self.descending = desc
+        return self
+
+    def limit(self, value):
+        self.limit_value = value
+        return self
+
+    def execute(self):
+        rows = [row for row in self.client.tables[self.table_name] if all(check(row) for check in self.filters)]
+        rows.sort(key=lambda row: row["id"], reverse=self.descending)
+        return _Response(rows[: self.limit_value])
+
+
+class _FakeSupabase:
+    def __init__(self, tables):
+        self.tables = tables
+        self.keyset_calls = []
+        self.tables.setdefault("model_offline_evaluations", [])
+
+    def table(self, name):
+        if name == "model_offline_evaluations":
+            return _Insert(self.tables[name])
+        return _Query(self, name)
+
+
+class _Insert:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def insert(self, payload):
+        self.rows.append(payload)
+        return self
+
+    def execute(self):
+        return _Response([])
+
+
+def _dataset(seed=7, requests=300):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).isoformat()
+    exposures, feedback = [], []
+    for r in range(requests):
+        request_id = f"req-{r}"
+        user_id = f"user-{r % 40}"
+        for position in range(1, rng.randint(3, 14)):
+            job_id = str(rng.randint(1, 400))
+            score = round(rng.random() * 100, 1)
+            exposures.append(
+                {
+                    "id": len(exposures) + 1,
+                    "request_id": request_id,
+                    "user_id": user_id,
+                    "job_id": job_id,
+                    "position": position,
+                    "score": score,
+                    # Coarse probabilities so that ties exercise the rank averaging.
+                    "predicted_action_probability": None if rng.random() < 0.2 else round(score / 100, 1),
+                    "action_model_version": "apply-v2" if r % 3 else "apply-v1",
+                    "scoring_version": rng.choice(["s1", "s2"]),
+                    "source": "recommendations_api",
+                    "shown_at": now,
+                }
+            )
+            if rng.random() < 0.12 + score / 400:
+                feedback.append(
+                    {
+                        "id": len(feedback) + 1,
+                        "request_id": request_id if rng.random() < 0.7 else None,
+                        "user_id": user_id,
+                        "job_id": job_id,
+                        "signal_type": "apply_click",
+                        "signal_value": rng.choice([None, 1, 0]),
+                        "created_at": now,
+                    }
+                )
+    return exposures, feedback
+
+
+# The list-based metrics the NumPy engine replaced, kept here as the reference.
+def _auc_roc(pairs):
+    positives = sum(1 for _, y in pairs if y == 1)
+    negatives = len(pairs) - positives
+    if not pairs or positives == 0 or negatives == 0:
+        return None
+    ranked = sorted(pairs, key=lambda item: item[0])
+    rank_sum_pos = 0.0
+    rank = 1
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j < len(ranked) and ranked[j][0] == ranked[i][0]:
+            j += 1
+        avg_rank = (rank + (rank + (j - i) - 1)) / 2.0
+        rank_sum_pos += avg_rank * sum(1 for _, y in ranked[i:j] if y == 1)
+        rank += j - i
+        i = j
+    auc = (rank_sum_pos - (positives * (positives + 1) / 2.0)) / (positives * negatives)
+    return max(0.0, min(1.0, auc))
+
+
+def _log_loss(pairs):
+    if not pairs:
+        return None
+    eps = 1e-15
+    total = 0.0
+    for p, y in pairs:
+        p = min(max(p, eps), 1.0 - eps)
+        total += y * math.log(p) + (1 - y) * math.log(1 - p)
+    return -total / len(pairs)
+
+
+def _precision_at_k(exposures, positive_keys, k):
+    by_request = defaultdict(list)
+    for row in exposures:
+        if row.get("request_id"):
+            by_request[row["request_id"]].append(row)
+    request_scores = []
+    for rows in by_request.values():
+        top = sorted(rows, key=lambda r: int(r.get("position") or 9999))[:k]
+        hits = sum(1 for r in top if (str(r.get("request_id") or ""), str(r.get("user_id") or ""), str(r.get("job_id") or "")) in positive_keys)
+        request_scores.append(hits / max(1, len(top)))
+    return sum(request_scores) / len(request_scores) if request_scores else None
+
+
+def _reference(exposures, feedback):
+    """The previous in-memory implementation, built from the original metric functions."""
+    positives = [row for row in feedback if evaluation._is_positive_apply(row)]
+    with_request = {(str(row.get("request_id") or ""), row["user_id"], row["job_id"]) for row in positives}
+    without_request = {(row["user_id"], row["job_id"]) for row in positives}
+    pairs = []
+    for row in exposures:
+        key = (str(row.get("request_id") or ""), row["user_id"], row["job_id"])
+        y = 1 if key in with_request or (row["user_id"], row["job_id"]) in without_request else 0
+        pred = row["predicted_action_probability"]
+        if pred is None:
+            pred = row["score"] / 100.0
+        pairs.append((min(max(float(pred), 0.000001), 0.999999), y))
+    return {
+        "pairs": pairs,
+        "auc": _auc_roc(pairs),
+        "log_loss": _log_loss(pairs),
+        "precision_at_5": _precision_at_k(exposures, with_request, 5),
+        "precision_at_10": _precision_at_k(exposures, with_request, 10),
+    }
+
+
+def test_auc_matches_reference_including_ties():
+    rng = random.Random(3)
+    for size in (2, 10, 500, 3000):
+        pairs = [(round(rng.random(), 1), int(rng.random() < 0.3)) for _ in range(size)]
+        if len({y for _, y in pairs}) < 2:
+            continue
+        scores = np.array([p for p, _ in pairs])
+        labels = np.array([y for _, y in pairs])
+        assert auc_roc(scores, labels) == pytest.approx(_auc_roc(pairs), abs=1e-12)
+        assert log_loss(scores, labels) == pytest.approx(_log_loss(pairs), rel=1e-9)
+    assert auc_roc(np.array([0.2, 0.4]), np.array([1, 1])) is None
+    assert auc_roc(np.array([]), np.array([])) is None
+
+
+def test_precision_at_k_matches_reference():
+    exposures, feedback = _dataset()
+    reference = _reference(exposures, feedback)
+    with_request, _ = positive_keys([feedback], evaluation._is_positive_apply)
+    keys = np.array([hash(row["request_id"]) for row in exposures], dtype=np.int64)
+    positions = np.array([row["position"] for row in exposures])
+    hits = np.array([hash((row["request_id"], row["user_id"], row["job_id"])) in with_request for row in exposures], dtype=np.int8)
+    assert precision_at_k(keys, positions, hits, 5) == pytest.approx(reference["precision_at_5"], abs=1e-12)
+    assert precision_at_k(keys, positions, hits, 10) == pytest.approx(reference["precision_at_10"], abs=1e-12)
+    assert precision_at_k(keys, positions, hits, 0) is None
+
+
+def test_keyset_pages_cover_every_row_once():
+    rows = [{"id": index, "shown_at": "2026"} for index in range(1, 1038)]
+    client = _FakeSupabase({"recommendation_exposures": rows})
+    pages = list(iter_keyset_pages(client, "recommendation_exposures", "shown_at", page_size=100))
+
+    assert [row["id"] for page in pages for row in page] == list(range(1, 1038))
+    assert len(pages) == 11
+    assert client.keyset_calls[0] == ("recommendation_exposures", 100)
+    capped = list(iter_keyset_pages(client, "recommendation_exposures", "shown_at", page_size=100, max_rows=250))
+    assert sum(len(page) for page in capped) == 250
+    newest = list(iter_keyset_pages(client, "recommendation_exposures", "shown_at", page_size=100, max_rows=250, newest_first=True))
+    assert [row["id"] for page in newest for row in page] == list(range(1037, 787, -1))
+
+
+def test_streamed_evaluation_matches_in_memory_reference(monkeypatch):
+    exposures, feedback = _dataset()
+    client = _FakeSupabase({"recommendation_exposures": exposures, "recommendation_feedback_events": feedback})
+    monkeypatch.setattr(evaluation, "supabase", client)
+
+    result = evaluation.run_offline_recommendation_evaluation(window_days=30, page_size=97)
+    reference = _reference(exposures, feedback)
+
+    assert result["sample_size"] == len(reference["pairs"])
+    assert result["auc"] == round(reference["auc"], 6)
+    assert result["log_loss"] == round(reference["log_loss"], 6)
+    assert result["precision_at_5"] == round(reference["precision_at_5"], 6)
+    assert result["precision_at_10"] == round(reference["precision_at_10"], 6)
+
+    for row in result["per_scoring"]:
+        subset = [pair for pair, exposure in zip(reference["pairs"], exposures) if exposure["scoring_version"] == row["scoring_version"]]
+        assert row["sample_size"] == len(subset)
+        assert row["auc"] == round(_auc_roc(subset), 6)
+
+    inserted = client.tables["model_offline_evaluations"]
+    assert [row["notes"] for row in inserted].count("overall") == 1
+    assert {row["model_version"] for row in inserted if row["notes"] == "per_model_version"} == {"apply-v1", "apply-v2"}
+    assert inserted[0]["model_version"] == exposures[-1]["action_model_version"]
+
+
+def test_capped_evaluation_keeps_the_newest_exposures(monkeypatch):
+    exposures, feedback = _dataset()
+    client = _FakeSupabase({"recommendation_exposures": exposures, "recommendation_feedback_events": feedback})
+    monkeypatch.setattr(evaluation, "supabase", client)
+
+    result = evaluation.run_offline_recommendation_evaluation(window_days=30, page_size=97, max_exposures=500)
+    reference = _reference(exposures[-500:], feedback)
+
+    assert result["sample_size"] == 500
+    assert result["auc"] == round(reference["auc"], 6)
+    assert result["precision_at_10"] == round(reference["precision_at_10"], 6)
+    assert client.tables["model_offline_evaluations"][0]["model_version"] == exposures[-1]["action_model_version"]
+
+
+def test_slices_equal_metrics_of_the_subset():
+    exposures, feedback = _dataset(seed=11, requests=120)
+    accumulator = EvaluationAccumulator(*positive_keys([feedback], evaluation._is_positive_apply))
+    for start in range(0, len(exposures), 50):
+        accumulator.add(exposures[start:start + 50])
+
+    for row in accumulator.slices("model_version"):
+        subset = [exposure for exposure in exposures if exposure["action_model_version"] == row["model_version"]]
+        expected = _reference(subset, feedback)
+        assert row["auc"] == pytest.approx(expected["auc"], abs=1e-12)
+        assert row["precision_at_5"] == pytest.approx(expected["precision_at_5"], abs=1e-12)
+    bands = {row["position_band"]: row["sample_size"] for row in accumulator.slices("position_band")}
+    assert sum(bands.values()) == accumulator.sample_size
+    assert set(bands) <= {"1-5", "6-10", "11-20", "21+"}
@@ -0,0 +1,187 @@
+import sys
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.core import database, event_writer
+from backend.app.core.event_writer import EventRejected, EventWriter
+
+
+class _FakeSink:
+    """Records every bulk insert; can be made unavailable or blocked."""
+
+    def __init__(self):
+        self.calls = []
+        self.available = True
+        self.gate = threading.Event()
+        self.gate.set()
+        self.rejected_rows = set()
+
+    def __call__(self, table, rows):
+        self.gate.wait(5)
+        if not self.available:
+            raise ConnectionError("database unavailable")
+        if any(row.get("n") in self.rejected_rows for row in rows):
+            raise EventRejected("violates check constraint")
+        self.calls.append((table, [dict(row) for row in rows]))
+        return [{**row, "id": f"{table}-{row.get('n')}"} for row in rows]
+
+    def rows(self, table):
+        return [row["n"] for name, rows in self.calls if name == table for row in rows]
+
+
+def _writer(sink, **overrides):
+    params = dict(max_queue=1000, batch_size=10, flush_interval=5.0, replay_interval=0.0)
+    params.update(overrides)
+    return EventWriter(sink, **params)
+
+
+def test_rows_are_written_in_size_bounded_batches_in_order():
+    sink = _FakeSink()
+    writer = _writer(sink)
+    for n in range(25):
+        writer.submit("analytics_events", {"n": n})
+    assert writer.flush(5)
+
+    assert [len(rows) for _, rows in sink.calls] == [10, 10, 5]
+    assert sink.rows("analytics_events") == list(range(25))
+    assert writer.stats()["written"] == 25
+    writer.close()
+
+
+def test_partial_batch_is_flushed_after_the_interval():
+    sink = _FakeSink()
+    writer = _writer(sink, flush_interval=0.1)
+    writer.submit("ai_generation_logs", {"n": 1})
+    writer.submit("analytics_events", {"n": 2})
+    for _ in range(50):
+        if len(sink.calls) == 2:
+            break
+        threading.Event().wait(0.02)
+    assert sink.calls == [("ai_generation_logs", [{"n": 1}]), ("analytics_events", [{"n": 2}])]
+    writer.close()
+
+
+def test_full_queue_drops_and_counts_instead_of_blocking():
+    sink = _FakeSink()
+    sink.gate.clear()  # the database hangs
+    writer = _writer(sink, max_queue=5, batch_size=1)
+    accepted = [writer.submit("analytics_events", {"n": n}) for n in range(20)]
+
+    # One row is stuck in the sink, five wait in the queue, the rest are dropped.
+    assert accepted.count(True) <= 6
+    assert writer.stats()["dropped"] == accepted.count(False) >= 14
+    sink.gate.set()
+    writer.close()
+    assert sink.rows("analytics_events") == [n for n, ok in enumerate(accepted) if ok]
+
+
+def test_close_flushes_everything_still_queued():
+    sink = _FakeSink()
+    writer = _writer(sink, batch_size=500, flush_interval=60.0)
+    for n in range(42):
+        writer.submit("analytics_events", {"n": n})
+    writer.close()
+
+    assert sink.rows("analytics_events") == list(range(42))
+    assert writer.submit("analytics_events", {"n": 99}) is False
+
+
+def test_outage_spills_to_disk_and_replays_in_order(tmp_path):
+    sink = _FakeSink()
+    sink.available = False
+    writer = _writer(sink, batch_size=4, spill_dir=str(tmp_path), replay_interval=3600)
+    for n in range(10):
+        writer.submit("ai_generation_logs", {"n": n})
+    writer.flush(5)
+    assert writer.stats()["spilled"] == 10
+    assert sink.calls == []
+
+    sink.available = True
+    writer.submit("ai_generation_logs", {"n": 10})
+    writer.flush(5)
+    assert writer.replay_spilled() == 10
+
+    assert sink.rows("ai_generation_logs") == [10] + list(range(10))
+    assert list(tmp_path.iterdir()) == []
+    writer.close()
+
+
+def test_spill_file_survives_a_restart(tmp_path):
+    sink = _FakeSink()
+    sink.available = False
+    first = _writer(sink, spill_dir=str(tmp_path))
+    first.submit("analytics_events", {"n": 1, "metadata": {"source": "test"}})
+    first.close()
+
+    sink.available = True
+    second = _writer(sink, spill_dir=str(tmp_path))
+    assert second.replay_spilled() == 1
+    assert sink.calls == [("analytics_events", [{"n": 1, "metadata": {"source": "test"}}])]
+    second.close()
+
+
+def test_rejected_row_does_not_sink_its_batch():
+    sink = _FakeSink()
+    sink.rejected_rows.add(3)
+    writer = _writer(sink)
+    for n in range(6):
+        writer.submit("analytics_events", {"n": n})
+    writer.close()
+
+    assert sink.rows("analytics_events") == [0, 1, 2, 4, 5]
+    assert writer.stats()["rejected"] == 1
+
+
+def test_after_write_hook_sees_inserted_ids(monkeypatch):
+    sink = _FakeSink()
+    seen = []
+    monkeypatch.setitem(event_writer._after_write, "ai_generation_logs", lambda rows, inserted: seen.extend(row["id"] for row in inserted))
+    writer = _writer(sink)
+    writer.submit("ai_generation_logs", {"n": 7})
+    writer.close()
+    assert seen == ["ai_generation_logs-7"]
+
+
+class _MissingTableClient:
+    def __init__(self):
+        self.inserts = 0
+
+    def table(self, _name):
+        return self
+
+    def insert(self, _rows):
+        self.inserts += 1
+        return self
+
+    def execute(self):
+        error = Exception("Could not find the table 'public.analytics_events' in the schema cache")
+        error.code = "PGRST205"
+        raise error
+
+
+def test_missing_table_is_latched_not_reported_as_rejected_rows(monkeypatch, capsys):
+    client = _MissingTableClient()
+    monkeypatch.setattr(database, "supabase", client)
+    monkeypatch.setattr(event_writer, "_unavailable_tables", set())
+    writer = _writer(event_writer.supabase_sink)
+    for n in range(25):
+        writer.submit("analytics_events", {"n": n})
+    writer.flush(5)
+    writer.submit("analytics_events", {"n": 25})
+    writer.close()
+
+    stats = writer.stats()
+    assert stats["rejected"] == 0 and stats["spilled"] == 0 and stats["lost"] == 0
+    assert stats["discarded"] == 26
+    # One insert found the table missing; nothing after that reached the database.
+    assert client.inserts == 1
+    assert capsys.readouterr().out.count("analytics_events table missing") == 1
+
+    monkeypatch.setattr(event_writer, "_writer_instance", None)
+    monkeypatch.setattr(event_writer, "_writer_configured", True)
+    event_writer.write_event("analytics_events", {"n": 26})
+    assert client.inserts == 1
@@ -0,0 +1,177 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.scraper import geocoding as bridge
+
+geocoding = bridge._runtime_module
+
+LOCATIONS = [
+    "Praha",
+    "Praha 4",
+    "Praha 4 - Nusle",
+    "Praha - Jinonice",
+    "Prague, Czech Republic",
+    "Václavské náměstí 12, Praha 1",
+    "Brno",
+    "Brno-střed",
+    "Brno - Královo Pole",
+    "Kuřim, okres Brno-venkov",
+    "Brno-venkov",
+    "Ostrava-Poruba",
+    "Ostrava-Poruba, Moravskoslezský kraj",
+    "Plzeň, Doubravka",
+    "Plzeň-Severní Předměstí",
+    "Vinohrady, Praha 2",
+    "Karlín",
+    "Bratislava - Petržalka",
+    "Bratislava, Slovakia",
+    "Wien Favoriten",
+    "1100 Wien, Österreich",
+    "Berlin Kreuzberg",
+    "München, Bayern",
+    "Köln / Düsseldorf",
+    "Hamburg Hafen",
+    "København K",
+    "Göteborg",
+    "Malmö, Sweden",
+    "Helsinki - Espoo",
+    "Kraków, Małopolskie",
+    "Warsaw, Poland",
+    "Czech Republic",
+    "Česká republika",
+    "Jihomoravský kraj",
+    "Home office",
+    "Remote",
+    "Remote / Europe",
+    "Unknown Town, CZ",
+    "",
+    "   ",
+]
+
+
+def _linear_static_lookup(location):
+    """The original per-call rebuild and longest-first scan, kept as the parity oracle."""
+    if not location or not location.strip():
+        return None
+    lowered_raw = " ".join(str(location).strip().lower().replace("/", " ").split())
+    if lowered_raw in geocoding._NON_GEOCODABLE_LOCATION_TOKENS:
+        return None
+    simplified = geocoding._simplify_location_for_geocoding(location)
+    normalized_cache = {}
+    for key, coords in geocoding.MAJOR_CITIES_CACHE.items():
+        normalized_cache.setdefault(geocoding.normalize_address(key), coords)
+    normalized = geocoding.normalize_address(simplified or location)
+    primary_segment = geocoding.normalize_address((simplified or location).split(",")[0].strip())
+    if normalized in normalized_cache:
+        return normalized_cache[normalized], "static_cache"
+    if primary_segment in normalized_cache:
+        return normalized_cache[primary_segment], "static_cache"
+    primary_tokens = primary_segment.split()
+    has_admin_context = any(tok in geocoding._ADMIN_AREA_TOKENS for tok in primary_tokens)
+    for key in sorted(normalized_cache.keys(), key=len, reverse=True):
+        key_tokens = key.split()
+        if not key_tokens or (has_admin_context and len(key_tokens) == 1):
+            continue
+        for i in range(0, max(0, len(primary_tokens) - len(key_tokens) + 1)):
+            if primary_tokens[i:i + len(key_tokens)] == key_tokens:
+                return normalized_cache[key], "static_cache_partial"
+    return None
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    calls = []
+
+    def fake_search(address):
+        calls.append(address)
+        return None, True
+
+    monkeypatch.setattr(geocoding, "_nominatim_search", fake_search)
+    monkeypatch.setattr(geocoding, "_SUCCESSFUL_LOOKUPS", {})
+    monkeypatch.setattr(geocoding, "_FAILED_LOOKUPS", {})
+    geocoding.set_geocode_cache(None)
+    yield calls
+    geocoding.set_geocode_cache(None)
+
+
+def _static(result):
+    if result is None:
+        return None
+    return (result["lat"], result["lon"]), result["source"]
+
+
+def test_indexed_gazetteer_matches_the_linear_scan(offline):
+    for location in LOCATIONS:
+        assert _static(geocoding.geocode_location(location)) == _linear_static_lookup(location), location
+
+
+def test_indexed_gazetteer_matches_the_linear_scan_on_random_token_mixes(offline):
+    rng = random.Random(5)
+    vocabulary = sorted({token for key in geocoding._GAZETTEER.coords for token in key.split()})
+    vocabulary += ["okres", "kraj", "venkov", "centrum", "nove", "1", "-", ","]
+    for _ in range(400):
+        location = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 5)))
+        geocoding._SUCCESSFUL_LOOKUPS.clear()
+        assert _static(geocoding.geocode_location(location)) == _linear_static_lookup(location), location
+
+
+def test_persistent_cache_is_shared_and_remembers_definitive_misses(offline, monkeypatch, tmp_path):
+    path = str(tmp_path / "geocode.sqlite3")
+    answers = {"Kuřim, okres Brno-venkov": ({"lat": 49.2988, "lon": 16.5314, "country": "CZ", "source": "nominatim_api"}, True)}
+    offline.clear()
+
+    def fake_search(address):
+        offline.append(address)
+        return answers.get(address, (None, True))
+
+    monkeypatch.setattr(geocoding, "_nominatim_search", fake_search)
+    geocoding.set_geocode_cache(geocoding.GeocodeCache(path))
+    assert geocoding.geocode_location("Kuřim, okres Brno-venkov")["lat"] == 49.2988
+    assert geocoding.geocode_location("Nowhere Village") is None
+    assert offline == ["Kuřim, okres Brno-venkov", "Nowhere Village"]
+
+    # A second process: empty in-memory caches, same SQLite file, no Nominatim calls.
+    geocoding._SUCCESSFUL_LOOKUPS.clear()
+    geocoding._FAILED_LOOKUPS.clear()
+    other = geocoding.GeocodeCache(path)
+    geocoding.set_geocode_cache(other)
+    assert geocoding.geocode_location("Kuřim, okres Brno-venkov")["source"] == "nominatim_api"
+    assert geocoding.geocode_location("Nowhere Village") is None
+    assert len(offline) == 2
+    assert other.stats()["hits"] == 1 and other.stats()["negative_hits"] == 1
+
+
+def test_failed_requests_are_not_remembered_and_entries_expire(offline, monkeypatch, tmp_path):
+    now = [1_000_000.0]
+    cache = geocoding.GeocodeCache(str(tmp_path / "geocode.sqlite3"), ttl_seconds=3600, negative_ttl_seconds=60, clock=lambda: now[0])
+    geocoding.set_geocode_cache(cache)
+    monkeypatch.setattr(geocoding, "_nominatim_search", lambda address: (None, False))
+    assert geocoding.geocode_location("Nowhere Village") is None
+    assert cache.lookup("nowhere village") == (False, None)
+
+    cache.set_missing("gone")
+    cache.set("kept", {"lat": 1.0, "lon": 2.0})
+    now[0] += 120
+    assert cache.lookup("gone") == (False, None)
+    assert cache.lookup("kept") == (True, {"lat": 1.0, "lon": 2.0})
+    cache.prune()
+    assert cache.stats()["entries"] == 1
+
+
+def test_geocode_many_resolves_each_distinct_location_once(offline, monkeypatch):
+    looked_up = []
+    original = geocoding.geocode_location
+    monkeypatch.setattr(geocoding, "geocode_location", lambda location: looked_up.append(location) or original(location))
+
+    results = geocoding.geocode_many(["Brno-střed", "Brno střed", "Remote", "Nowhere", "Brno-střed", "Nowhere"])
+    assert looked_up == ["Brno-střed", "Nowhere"]
+    assert results["Brno střed"] == results["Brno-střed"] and results["Brno-střed"]["source"] == "static_cache"
+    assert results["Remote"] is None and results["Nowhere"] is None
+    assert len(offline) == 1
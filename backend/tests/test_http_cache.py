@@ -0,0 +1,152 @@
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.scraper import scraper_api_sources as api_bridge
+from backend.scraper import scraper_base as base_bridge
+
+api_sources = api_bridge._runtime_module
+scraper_base = base_bridge._runtime_module
+# The one instance scraper_base and scraper_api_sources fetch through.
+http_cache = scraper_base._http_cache
+
+PAGE = ("<html><body>" + "<div class='job'><a href='/job/1'>Skladník</a></div>" * 200 + "</body></html>").encode("utf-8")
+FEED = (
+    "<?xml version='1.0'?><rss><channel>"
+    + "".join(f"<item><title>Dev {index} at Acme</title><link>https://example.com/{index}</link><category>Europe</category></item>" for index in range(30))
+    + "</channel></rss>"
+).encode("utf-8")
+LAST_MODIFIED = "Mon, 02 Mar 2026 08:00:00 GMT"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *_args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers)))
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                return self._send(304, b"", {"ETag": '"v1"'})
+            return self._send(200, PAGE, {"ETag": '"v1"', "Content-Type": "text/html; charset=utf-8"})
+        if self.path == "/last-modified":
+            if self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                return self._send(304, b"", {})
+            return self._send(200, PAGE, {"Last-Modified": LAST_MODIFIED})
+        if self.path == "/no-validators":
+            return self._send(200, PAGE, {})
+        if self.path == "/changing":
+            return self._send(200, PAGE + str(len(server.requests)).encode(), {})
+        if self.path == "/feed.rss":
+            if self.headers.get("If-None-Match") == '"feed-1"':
+                return self._send(304, b"", {})
+            return self._send(200, FEED, {"ETag": '"feed-1"', "Content-Type": "application/rss+xml; charset=utf-8"})
+        return self._send(404, b"missing", {})
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    store = http_cache.HTTPCache(str(tmp_path / "http.sqlite3"))
+    http_cache.set_http_cache(store, replay=False)
+    yield store
+    http_cache.set_http_cache(None, replay=False)
+
+
+@pytest.mark.parametrize("path,header", [("/etag", "If-None-Match"), ("/last-modified", "If-Modified-Since")])
+def test_revalidated_pages_are_served_from_the_store_on_304(server, cache, path, header):
+    url = server.base + path
+    first = http_cache.fetch(requests, url, timeout=5)
+    second = http_cache.fetch(requests, url, timeout=5)
+
+    assert first.content == second.content == PAGE
+    assert first.content_changed and not first.from_cache
+    assert second.from_cache and not second.content_changed and second.body_hash == first.body_hash
+    assert header not in server.requests[0][1] and header in server.requests[1][1]
+    stats = cache.stats()
+    assert stats["not_modified"] == 1 and stats["bytes_saved"] == len(PAGE)
+    assert stats["bytes_downloaded"] == len(PAGE)
+    assert 0 < stats["stored_bytes"] < len(PAGE) / 5
+
+
+def test_identical_and_changed_bodies_without_validators(server, cache):
+    same = [http_cache.fetch(requests, server.base + "/no-validators", timeout=5) for _ in range(2)]
+    assert same[0].content_changed and not same[1].content_changed and not same[1].from_cache
+
+    changing = [http_cache.fetch(requests, server.base + "/changing", timeout=5) for _ in range(2)]
+    assert all(response.content_changed for response in changing)
+    assert changing[0].body_hash != changing[1].body_hash
+    assert cache.lookup(server.base + "/changing")["body"] == changing[1].content
+
+    missing = http_cache.fetch(requests, server.base + "/missing", timeout=5)
+    assert missing.status_code == 404 and cache.lookup(server.base + "/missing") is None
+
+
+def test_scrape_page_revalidates_and_replays_offline(server, cache, monkeypatch):
+    monkeypatch.setattr(scraper_base, "_respect_domain_throttle", lambda domain: None)
+    url = server.base + "/etag"
+    assert len(scraper_base.scrape_page(url).select("div.job")) == 200
+    assert len(scraper_base.scrape_page(url).select("div.job")) == 200
+    assert [headers.get("If-None-Match") for _path, headers in server.requests] == [None, '"v1"']
+
+    server.shutdown()
+    http_cache.set_http_cache(cache, replay=True)
+    assert len(scraper_base.scrape_page(url).select("div.job")) == 200
+    assert scraper_base.scrape_page(server.base + "/never-fetched") is None
+    assert len(server.requests) == 2 and cache.stats()["replayed"] == 1
+    with pytest.raises(http_cache.HTTPReplayMiss):
+        http_cache.fetch(requests, server.base + "/never-fetched")
+
+
+def test_unchanged_feeds_are_not_parsed_again(server, cache, monkeypatch):
+    parses = []
+    original = api_sources._parse_rss_items
+    monkeypatch.setattr(api_sources, "_parse_rss_items", lambda payload: parses.append(1) or original(payload))
+    url = server.base + "/feed.rss"
+
+    first = api_sources._fetch_rss_items(url)
+    second = api_sources._fetch_rss_items(url)
+    assert len(first) == 30 and second == first
+    assert first[3] == {"title": "Dev 3 at Acme", "link": "https://example.com/3", "description": "", "pubDate": "", "categories": ["Europe"]}
+    assert len(parses) == 1
+    assert server.requests[1][1].get("If-None-Match") == '"feed-1"'
+    assert cache.stats()["parse_hits"] == 1
+
+
+def test_stale_entries_are_pruned(tmp_path, server):
+    now = [1_000_000.0]
+    store = http_cache.HTTPCache(str(tmp_path / "http.sqlite3"), ttl_seconds=3600, clock=lambda: now[0])
+    http_cache.fetch(requests, server.base + "/etag", cache=store, timeout=5)
+    store.parsed(server.base + "/etag", "links:v1", "hash", lambda: ["/job/1"])
+    now[0] += 7200
+    store.prune()
+    assert store.lookup(server.base + "/etag") is None
+    assert store.stats()["entries"] == 0 and store.stats()["evictions"] == 1
@@ -0,0 +1,277 @@
+import os
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.matching_engine import change_tracking
+from backend.app.services import jobs_postgres_store as store
+
+NOW = datetime(2026, 3, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def _doc(job_id, title="Skladník", scraped_at=NOW, **extra):
+    return {
+        "id": job_id,
+        "title": title,
+        "company": "Sklady s.r.o.",
+        "location": "Brno",
+        "description": "Noční směny, příplatky.",
+        "benefits": ["Stravenky"],
+        "salary_from": "32000",
+        "lat": "49.19",
+        "url": f"https://example.cz/{job_id}",
+        "created_at": scraped_at.isoformat(),
+        "scraped_at": scraped_at.isoformat(),
+        "updated_at": scraped_at.isoformat(),
+        **extra,
+    }
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(" ".join(sql.split()))
+        if self.conn.fail_with and sql.lstrip().startswith("CREATE TEMP TABLE"):
+            raise self.conn.fail_with
+
+    def executemany(self, sql, rows):
+        self.conn.statements.append(" ".join(sql.split()))
+        self.conn.legacy_rows.extend(rows)
+
+    def fetchall(self):
+        return [{"id": job_id} for job_id in self.conn.existing]
+
+    def fetchone(self):
+        return self.conn.merge_result
+
+    @contextmanager
+    def copy(self, sql):
+        self.conn.statements.append(sql)
+        conn = self.conn
+
+        class _Copy:
+            def set_types(self, types):
+                conn.copy_types = types
+
+            def write_row(self, row):
+                conn.copied.append(row)
+
+        yield _Copy()
+
+
+class _FakeConn:
+    def __init__(self, merge_result=None, existing=(), fail_with=None):
+        self.merge_result = merge_result or {}
+        self.existing = list(existing)
+        self.fail_with = fail_with
+        self.statements, self.copied, self.legacy_rows = [], [], []
+        self.copy_types = None
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    @contextmanager
+    def transaction(self):
+        yield
+
+
+@pytest.fixture
+def fake_store(monkeypatch):
+    arrivals = []
+    monkeypatch.setattr(store.config, "JOBS_POSTGRES_ENABLED", True)
+    monkeypatch.setattr(store.config, "JOBS_POSTGRES_URL", "postgresql://fake")
+    monkeypatch.setattr(store.config, "JOBS_POSTGRES_WRITE_MAIN", True)
+    monkeypatch.setattr(store.config, "JOBS_POSTGRES_BULK_UPSERT_ENABLED", True)
+    monkeypatch.setattr(store, "_ensure_schema", lambda: None)
+    monkeypatch.setattr(store, "_bulk_upsert_unavailable", False)
+    monkeypatch.setattr(change_tracking, "note_job_arrivals", lambda jobs: arrivals.extend(jobs))
+
+    def use(conn):
+        monkeypatch.setattr(store, "_connect", lambda: conn)
+        return conn
+
+    use.arrivals = arrivals
+    return use
+
+
+def test_content_hash_ignores_scrape_timestamps_but_not_content():
+    first = store._job_row(_doc("a"))
+    rescraped = store._job_row(_doc("a", scraped_at=NOW + timedelta(hours=6)))
+    assert rescraped["scraped_at"] > first["scraped_at"]
+    assert rescraped["content_hash"] == first["content_hash"]
+    assert store._job_row(_doc("a", title="Vedoucí skladu"))["content_hash"] != first["content_hash"]
+    assert store._job_row(_doc("a", benefits=["Stravenky", "Sick days"]))["content_hash"] != first["content_hash"]
+    assert store._job_row(_doc("a", recruiter_note="new"))["content_hash"] != first["content_hash"]
+
+
+def test_content_fingerprint_is_stable_under_formatting_noise():
+    base = store.job_content_fingerprint(_doc("a", salary_currency="CZK"))
+    noisy = _doc(
+        "a",
+        title="  SKLADNÍK ",
+        description="Noční  směny,\n příplatky.",
+        company="Sklady\u00a0s.r.o.",
+        salary_from=32000.0,
+        salary_currency="czk",
+        scraped_at=NOW + timedelta(days=1),
+        tags=["new-tag"],
+        url="https://example.cz/a?utm_source=feed",
+    )
+    assert store.job_content_fingerprint(noisy) == base
+    decomposed = _doc("a", title="Skladni\u0301k", salary_currency="CZK")
+    assert store.job_content_fingerprint(decomposed) == base
+
+    for change in [
+        {"title": "Vedoucí skladu"},
+        {"description": "Denní směny."},
+        {"location": "Praha"},
+        {"salary_to": 40000},
+        {"salary_from": 33000},
+        {"salary_currency": "EUR"},
+    ]:
+        assert store.job_content_fingerprint({**_doc("a", salary_currency="CZK"), **change}) != base, change
+
+
+def test_content_watermark_only_advances_with_the_fingerprint():
+    row = store._job_row(_doc("a"))
+    assert row["content_changed_at"] == row["updated_at"]
+    assert len(row["content_fingerprint"]) == 64
+    for sql in [store._jobs_upsert_rows_sql("jobs_nf"), store._jobs_merge_staged_sql("jobs_nf", "jobs_nf_stage")]:
+        flat = " ".join(sql.split())
+        assert "content_changed_at = CASE WHEN t.content_fingerprint IS DISTINCT FROM EXCLUDED.content_fingerprint" in flat
+        assert "content_changed_at = EXCLUDED.content_changed_at," not in flat
+
+
+def test_bulk_path_copies_the_batch_and_reports_merge_counts(fake_store):
+    conn = fake_store(_FakeConn({"staged_count": 3, "inserted_ids": ["b"], "updated_count": 1}))
+    docs = [_doc("a"), _doc("b"), _doc(""), _doc("c"), _doc("a", title="Vedoucí skladu")]
+    result = store.upsert_jobs_documents(docs)
+
+    assert result == {
+        "imported_count": 4,
+        "upserted_count": 2,
+        "matched_count": 2,
+        "inserted_count": 1,
+        "updated_count": 1,
+        "unchanged_count": 1,
+    }
+    assert [row[0] for row in conn.copied] == [0, 1, 2, 3]
+    assert [row[1] for row in conn.copied] == ["a", "b", "c", "a"]
+    assert conn.copy_types[0] == "int4" and "jsonb" not in conn.copy_types
+    assert len(conn.copy_types) == len(conn.copied[0])
+    assert any("FORMAT BINARY" in sql for sql in conn.statements)
+    merge = conn.statements[-1]
+    assert "DISTINCT ON (id)" in merge and "IS DISTINCT FROM EXCLUDED.content_hash" in merge
+    assert conn.legacy_rows == []
+    assert [doc["id"] for doc in fake_store.arrivals] == ["b"]
+
+
+def test_refused_temp_table_falls_back_to_row_upserts_for_the_process(fake_store):
+    conn = fake_store(_FakeConn(existing=["a"], fail_with=RuntimeError("permission denied to create temporary tables")))
+    result = store.upsert_jobs_documents([_doc("a"), _doc("b")])
+
+    assert result["matched_count"] == 1 and result["inserted_count"] == 1
+    assert [row["id"] for row in conn.legacy_rows] == ["a", "b"]
+    assert all(row["content_hash"] for row in conn.legacy_rows)
+    assert store._bulk_upsert_unavailable is True
+    assert [doc["id"] for doc in fake_store.arrivals] == ["b"]
+
+    conn.statements.clear()
+    store.upsert_jobs_documents([_doc("c")])
+    assert not any(sql.startswith("CREATE TEMP TABLE") for sql in conn.statements)
+
+
+def test_non_string_text_columns_survive_the_binary_copy(fake_store):
+    psycopg = pytest.importorskip("psycopg")
+    from psycopg.adapt import Transformer
+    from psycopg.pq import Format
+
+    owner = uuid.uuid4()
+    conn = fake_store(_FakeConn({"staged_count": 1, "inserted_ids": ["a"]}))
+    store.upsert_jobs_documents([
+        _doc("a", company_id=42, posted_by=owner, recruiter_id=owner, role_summary=7, verification_notes=1.5, source=101, url=12345)
+    ])
+
+    row = dict(zip(["ord"] + [name for name, _kind in store._JOBS_COLUMNS], conn.copied[0]))
+    assert (row["company_id"], row["posted_by"], row["url"], row["role_summary"]) == ("42", str(owner), "12345", "7")
+    assert row["contract_type"] is None
+    # The dumpers COPY (FORMAT BINARY) uses for these types reject non-str text values.
+    transformer = Transformer()
+    transformer.set_dumper_types([psycopg.postgres.types.get(name).oid for name in conn.copy_types], Format.BINARY)
+    assert len(transformer.dump_sequence(conn.copied[0], [Format.BINARY] * len(conn.copied[0]))) == len(conn.copied[0])
+
+
+def _content(row):
+    return {key: value for key, value in row.items() if key not in {"created_at", "updated_at", "payload_json"}}
+
+
+@pytest.mark.skipif(not os.getenv("JOBS_POSTGRES_TEST_URL"), reason="no Postgres available")
+def test_bulk_merge_matches_row_upserts_on_postgres(monkeypatch):
+    monkeypatch.setattr(store.config, "JOBS_POSTGRES_ENABLED", True)
+    monkeypatch.setattr(store.config, "JOBS_POSTGRES_URL", os.environ["JOBS_POSTGRES_TEST_URL"])
+    monkeypatch.setattr(store.config, "JOBS_POSTGRES_SSLMODE", os.getenv("JOBS_POSTGRES_TEST_SSLMODE", "disable"))
+    monkeypatch.setattr(store.config, "JOBS_POSTGRES_WRITE_MAIN", True)
+    monkeypatch.setattr(store.config, "JOBS_POSTGRES_UNCHANGED_TOUCH_MINUTES", 60)
+    monkeypatch.setattr(change_tracking, "note_job_arrivals", lambda jobs: None)
+    monkeypatch.setattr(store, "_conn", None)
+    monkeypatch.setattr(store, "_bulk_upsert_unavailable", False)
+
+    first = [_doc(f"job-{index}", salary_to=str(40000 + index), tags=["sklad"]) for index in range(40)]
+    later = NOW + timedelta(hours=3)
+    second = [_doc(f"job-{index}", scraped_at=later, salary_to=str(40000 + index), tags=["sklad"]) for index in range(30)]
+    second[0] = _doc("job-0", title="Vedoucí skladu", scraped_at=later)
+    second += [_doc("job-new", scraped_at=later), _doc("job-new", title="Duplicate, last one wins", scraped_at=later)]
+
+    tables = {}
+    try:
+        for mode, bulk in [("legacy", False), ("bulk", True)]:
+            table = f"jobs_bulk_test_{mode}_{uuid.uuid4().hex[:8]}"
+            tables[mode] = table
+            monkeypatch.setattr(store.config, "JOBS_POSTGRES_JOBS_TABLE", table)
+            monkeypatch.setattr(store.config, "JOBS_POSTGRES_BULK_UPSERT_ENABLED", bulk)
+            monkeypatch.setattr(store, "_schema_ready", False)
+            store.upsert_jobs_documents(first)
+            result = store.upsert_jobs_documents(second)
+            if bulk:
+                assert result["inserted_count"] == 1
+                assert result["updated_count"] == 1
+                assert result["unchanged_count"] == 29
+
+        conn = store._connect()
+        snapshots = {}
+        with conn.cursor() as cur:
+            for mode, table in tables.items():
+                cur.execute(f"SELECT * FROM {table} ORDER BY id")
+                snapshots[mode] = cur.fetchall()
+        assert len(snapshots["bulk"]) == len(snapshots["legacy"]) == 41
+        for legacy_row, bulk_row in zip(snapshots["legacy"], snapshots["bulk"]):
+            assert _content(bulk_row) == _content(legacy_row)
+            assert bulk_row["payload_json"]["title"] == legacy_row["payload_json"]["title"]
+        # Unchanged rows were not rewritten, but re-scraping still moved scraped_at.
+        by_id = {row["id"]: row for row in snapshots["bulk"]}
+        assert by_id["job-5"]["scraped_at"] == later and by_id["job-5"]["updated_at"] == NOW
+        for snapshot in snapshots.values():
+            changed_at = {row["id"]: row["content_changed_at"] for row in snapshot}
+            assert changed_at["job-0"] == later and changed_at["job-5"] == NOW and changed_at["job-35"] == NOW
+        assert by_id["job-new"]["title"] == "Duplicate, last one wins"
+    finally:
+        conn = store._connect()
+        with conn.cursor() as cur:
+            for table in tables.values():
+                cur.execute(f"DROP TABLE IF EXISTS {table}")
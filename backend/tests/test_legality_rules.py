@@ -0,0 +1,66 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.services import legality
+
+# Inputs with the outputs of the previous per-call, regex-by-regex implementation.
+CORPUS = json.loads((Path(__file__).parent / "fixtures" / "legality_corpus.json").read_text(encoding="utf-8"))
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    legality.clear_legality_cache()
+    yield
+    legality.clear_legality_cache()
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=[f"doc{index}" for index in range(len(CORPUS))])
+def test_compiled_rules_match_previous_outputs(case):
+    risk_score, is_legal, reasons, needs_review = legality.check_legality_rules(
+        case["title"], case["company"], case["description"], case["country_code"], case["location"]
+    )
+    expected = case["expected"]
+    assert risk_score == expected["risk_score"]
+    assert is_legal == expected["is_legal"]
+    assert reasons == expected["reasons"]
+    assert needs_review == expected["needs_manual_review"]
+
+
+def test_batch_api_matches_single_calls_and_reuses_cache():
+    results = legality.check_legality_batch(CORPUS + CORPUS[:10])
+
+    assert len(results) == len(CORPUS) + 10
+    for case, result in zip(CORPUS, results):
+        assert result["reasons"] == case["expected"]["reasons"]
+        assert result["risk_score"] == case["expected"]["risk_score"]
+        assert result["ruleset_version"] == legality.LEGALITY_RULESET_VERSION
+    assert results[len(CORPUS):] == results[:10]
+
+    stats = legality.legality_cache_stats()
+    assert stats["hits"] >= 10
+    assert stats["misses"] <= len(CORPUS)
+
+
+def test_cached_reasons_cannot_be_mutated_by_callers():
+    _, _, reasons, _ = legality.check_legality_rules("Asistent", "Quick", "Pasivní příjem, MLM a rychlé peníze!")
+    reasons.append("tampered")
+
+    _, _, again, _ = legality.check_legality_rules("Asistent", "Quick", "Pasivní příjem, MLM a rychlé peníze!")
+    assert "tampered" not in again
+    assert legality.legality_cache_stats()["hits"] == 1
+
+
+def test_country_inference_keeps_priority_order():
+    assert legality._infer_country(None, "Bratislava / Wien", "") == "at"
+    assert legality._infer_country(None, "Praha nebo Berlin", "") == "de"
+    assert legality._infer_country(None, "Kraków", "") == "pl"
+    assert legality._infer_country(None, "Remote", "job in austria") == "at"
+    assert legality._infer_country("SK", "Wien", "") == "sk"
+    assert legality._infer_country(None, "Remote", "") is None
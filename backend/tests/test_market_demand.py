@@ -0,0 +1,255 @@
+import random
+import sys
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.matching_engine import demand
+from backend.app.matching_engine.demand_aggregate import (
+    DemandSnapshot,
+    MemorySkillExtractionStore,
+    SkillDemandAggregate,
+    extract_job_skills,
+    recompute_demand_rows,
+)
+
+VOCABULARY = ["python", "sql", "excel", "sap", "forklift", "react", "docker", "welding", "nursing", "german", "accounting", "logistics"]
+MARKETS = [("cz", "praha"), ("cz", "brno"), ("de", "berlin"), ("", "")]
+
+
+def _job(rng, job_id, day):
+    country, city = rng.choice(MARKETS)
+    words = [rng.choice(VOCABULARY) for _ in range(rng.randint(3, 25))] + ["and", "senior", "x"]
+    return {
+        "id": job_id,
+        "description": "Hledáme: " + ", ".join(words) + ".",
+        "country_code": country.upper(),
+        "location": city.title(),
+        "scraped_at": datetime.combine(day, time(8, rng.randint(0, 59)), tzinfo=timezone.utc).isoformat(),
+    }
+
+
+def _comparable(rows):
+    return {
+        (row["skill"], row["country_code"], row["city"]): (row["demand_score"], row["seasonal_factor"], row["window_start"], row["window_end"])
+        for row in rows
+    }
+
+
+def _assert_rows_match(incremental, full):
+    assert set(incremental) == set(full)
+    for key, (score, seasonal, start, end) in full.items():
+        got = incremental[key]
+        assert got[0] == pytest.approx(score, abs=1e-4)
+        assert got[1] == pytest.approx(seasonal, abs=1e-4)
+        assert got[2:] == (start, end)
+
+
+def test_incremental_totals_equal_full_recompute():
+    rng = random.Random(4)
+    start = date(2026, 1, 1)
+    aggregate = SkillDemandAggregate(MemorySkillExtractionStore(), start)
+    live = {}
+    next_id = 1
+    # Long gaps make jobs leave the demand window and then the seasonal window.
+    days = [start + timedelta(days=offset) for offset in (0, 1, 2, 9, 40, 95, 130, 200, 380, 381, 500)]
+    for today in days:
+        aggregate.advance(today)
+        batch = []
+        for _ in range(rng.randint(20, 60)):
+            job = _job(rng, str(next_id), today - timedelta(days=rng.randint(0, 3)))
+            next_id += 1
+            batch.append(job)
+        for job_id in rng.sample(sorted(live), min(5, len(live))):
+            batch.append({**_job(rng, job_id, today), "id": job_id})  # re-scraped
+        for job in batch:
+            live[str(job["id"])] = job
+        aggregate.ingest(extract_job_skills(job, today) for job in batch)
+        removed = rng.sample(sorted(live), min(3, len(live)))
+        aggregate.forget(removed)
+        for job_id in removed:
+            live.pop(job_id)
+
+        _assert_rows_match(_comparable(aggregate.demand_rows()), _comparable(recompute_demand_rows(live.values(), today)))
+
+    reference = SkillDemandAggregate(MemorySkillExtractionStore(), days[-1])
+    reference.ingest(extract_job_skills(job, days[-1]) for job in live.values())
+    assert aggregate.job_count == reference.job_count < len(live)
+    strip = lambda rows: {(r["month"], r["country_code"], r["city"], r["skill"]): r["correction_factor"] for r in rows}
+    assert strip(aggregate.seasonal_rows()) == strip(reference.seasonal_rows())
+
+
+def test_rebuild_from_stored_extractions_matches_the_live_aggregate():
+    rng = random.Random(8)
+    today = date(2026, 3, 10)
+    store = MemorySkillExtractionStore()
+    live = SkillDemandAggregate(store, today)
+    live.ingest(extract_job_skills(_job(rng, str(i), today - timedelta(days=i % 150)), today) for i in range(1, 400))
+
+    cold = SkillDemandAggregate(store, today)
+    assert cold.rebuild() == live.job_count
+    assert cold.watermark == live.watermark
+    _assert_rows_match(_comparable(cold.demand_rows()), _comparable(live.demand_rows()))
+
+
+def test_extraction_matches_the_original_tokenizer():
+    extraction = extract_job_skills(
+        {"id": 7, "description": "Python/SQL and (Docker), senior python!", "country_code": "CZ", "location": "Praha", "scraped_at": "2026-02-03T10:00:00Z"},
+        date(2026, 3, 1),
+    )
+    assert extraction.skills == {"python": 2, "sql": 1, "docker": 1}
+    assert extraction.market == ("cz", "praha")
+    assert extraction.day == date(2026, 2, 3)
+    assert extract_job_skills({"description": "python"}, date(2026, 3, 1)) is None
+
+
+def test_snapshot_applies_the_seasonal_factor_and_falls_back_to_broader_markets():
+    snapshot = DemandSnapshot(
+        [
+            {"skill": "python", "country_code": "cz", "city": "praha", "demand_score": 0.5, "seasonal_factor": 1.2},
+            {"skill": "python", "country_code": "cz", "city": "brno", "demand_score": 0.3, "seasonal_factor": 1.0},
+            {"skill": "sql", "country_code": None, "city": None, "demand_score": 0.9, "seasonal_factor": 1.5},
+            {"skill": "excel", "country_code": "de", "city": "berlin", "demand_score": 0.4},
+        ]
+    )
+    assert snapshot.lookup("Python", "CZ", "Praha") == pytest.approx(0.6)
+    assert snapshot.lookup("python", "cz", "ostrava") is None
+    assert snapshot.lookup("python", "cz") == pytest.approx(0.6)
+    assert snapshot.lookup("python", "", "brno") == pytest.approx(0.3)
+    assert snapshot.lookup("sql", "", "") == 1.0  # clamped
+    assert snapshot.lookup("excel", "de", "berlin") == pytest.approx(0.4)
+    assert snapshot.lookup("rust") is None
+
+
+def test_demand_weight_reads_the_snapshot_without_queries(monkeypatch):
+    monkeypatch.setattr(demand, "supabase", None)
+    demand.set_demand_snapshot(DemandSnapshot([{"skill": "python", "country_code": "cz", "city": "praha", "demand_score": 0.8}]))
+    try:
+        assert demand.demand_weight_for_skills(["python", "cobol"], "cz", "praha") == pytest.approx(0.8)
+        assert demand.demand_weight_for_skills(["cobol"], "cz", "praha") == 0.0
+    finally:
+        demand.set_demand_snapshot(None)
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table_name = table
+        self.filters = []
+        self.limit_value = None
+        self.action = "select"
+        self.payload = None
+
+    def select(self, _columns):
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: str(row.get(column) or "") >= str(value))
+        return self
+
+    def gt(self, column, value):
+        if column == "id":
+            self.filters.append(lambda row: row["id"] > value)
+        else:
+            self.filters.append(lambda row: str(row.get(column) or "") > str(value))
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in set(values))
+        return self
+
+    def order(self, _column, desc=False):
+        return self
+
+    def limit(self, value):
+        self.limit_value = value
+        return self
+
+    def upsert(self, rows, on_conflict=""):
+        self.action, self.payload = "upsert", rows
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def execute(self):
+        rows = self.db.setdefault(self.table_name, [])
+        if self.action == "upsert":
+            if self.table_name == "job_skill_extractions":
+                by_job = {row["job_id"]: row for row in rows}
+                for row in self.payload:
+                    by_job[row["job_id"]] = {**row, "id": by_job.get(row["job_id"], {}).get("id") or len(rows) + len(by_job) + 1}
+                self.db[self.table_name] = sorted(by_job.values(), key=lambda row: row["id"])
+            else:
+                rows.extend(self.payload)
+            return _Response([])
+        matched = [row for row in rows if all(check(row) for check in self.filters)]
+        if self.action == "delete":
+            self.db[self.table_name] = [row for row in rows if row not in matched]
+            return _Response([])
+        matched.sort(key=lambda row: row.get("id", 0))
+        return _Response(matched[: self.limit_value] if self.limit_value else matched)
+
+
+class _FakeSupabase:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def table(self, name):
+        return _Query(self.tables, name)
+
+
+def test_refresh_applies_only_new_jobs_and_serves_lookups_from_memory(monkeypatch):
+    rng = random.Random(2)
+    today = datetime.now(timezone.utc).date()
+    jobs = [{**_job(rng, index, today - timedelta(days=index % 30 + 1)), "id": index} for index in range(1, 301)]
+    db = {"jobs": jobs}
+    client = _FakeSupabase(db)
+    monkeypatch.setattr(demand, "supabase", client)
+    monkeypatch.setattr(demand, "_aggregate", None)
+    extracted = []
+    real_extract = demand.extract_job_skills
+    monkeypatch.setattr(demand, "extract_job_skills", lambda job, day: extracted.append(job["id"]) or real_extract(job, day))
+
+    try:
+        first = demand.refresh_market_skill_demand()
+        assert first["ingested"] == 300 and first["demand_rows"] > 0
+        assert len(db["job_skill_extractions"]) == 300
+
+        new_job = {**_job(rng, 301, today), "id": 301, "scraped_at": datetime.now(timezone.utc).isoformat()}
+        db["jobs"].append(new_job)
+        extracted.clear()
+        second = demand.refresh_market_skill_demand()
+        assert extracted == [301]
+        assert second["ingested"] == 1
+
+        expected = _comparable(recompute_demand_rows(db["jobs"], today))
+        stored = _comparable([row for row in db["market_skill_demand"] if row["updated_at"] == db["market_skill_demand"][-1]["updated_at"]])
+        _assert_rows_match(stored, expected)
+
+        row = next(iter(expected.items()))
+        (skill, country, city), (score, seasonal, _start, _end) = row
+        assert demand._lookup_skill_demand(skill, country or "", city or "") == pytest.approx(min(1.0, score * seasonal))
+
+        # A cold process rebuilds from the stored extractions instead of re-tokenizing.
+        monkeypatch.setattr(demand, "_aggregate", None)
+        extracted.clear()
+        demand.refresh_market_skill_demand()
+        assert extracted == []
+    finally:
+        demand.set_demand_snapshot(None)
@@ -0,0 +1,379 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.core import runtime_config
+from backend.app.core.config_snapshot import ConfigSnapshotService
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, client, name, rpc=False):
+        self.client = client
+        self.name = name
+        self.rpc = rpc
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def eq(self, *_args, **_kwargs):
+        return self
+
+    def limit(self, *_args, **_kwargs):
+        return self
+
+    def upsert(self, *_args, **_kwargs):
+        return self
+
+    def execute(self):
+        return self.client.execute(self.name, self.rpc)
+
+
+class _CountingSupabase:
+    def __init__(self, payload, *, delay: float = 0.0):
+        self.payload = payload
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def rpc(self, name, _params=None):
+        return _Query(self, name, rpc=True)
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def execute(self, name, rpc):
+        with self._lock:
+            self.calls.append(name)
+        if self.delay:
+            time.sleep(self.delay)
+        if rpc:
+            return _Response(self.payload)
+        if name == "runtime_config_version":
+            return _Response([{"version": self.payload.get("version")}])
+        return _Response([])
+
+
+def _payload(version=1, *, flag_enabled=True):
+    return {
+        "version": version,
+        "release_flags": [
+            {"flag_key": "matching_engine_v2", "is_enabled": flag_enabled, "rollout_percent": 100, "variant": None, "config_json": {}},
+        ],
+        "model_registry": [
+            {
+                "subsystem": "matching",
+                "feature": "recommendations",
+                "version": "m2",
+                "model_name": "ranker-b",
+                "is_primary": True,
+                "is_active": True,
+                "config_json": {"limit": 5},
+                "created_at": "2026-02-01T00:00:00Z",
+            },
+            {
+                "subsystem": "matching",
+                "feature": "recommendations",
+                "version": "m1",
+                "model_name": "ranker-a",
+                "is_fallback": True,
+                "is_active": True,
+                "config_json": {"limit": 3, "k": 1},
+                "created_at": "2026-01-01T00:00:00Z",
+            },
+        ],
+        "scoring_model_versions": [
+            {"version": "scoring-v2", "alpha_skill": 0.5, "beta_demand": 0.1, "gamma_seniority": 0.1, "delta_salary": 0.1, "epsilon_geo": 0.2, "is_active": True, "created_at": "2026-02-01"},
+            {"version": "scoring-v3", "alpha_skill": 0.4, "beta_demand": 0.2, "gamma_seniority": 0.1, "delta_salary": 0.1, "epsilon_geo": 0.2, "is_active": False, "created_at": "2026-03-01"},
+        ],
+        "model_experiments": [
+            {"subsystem": "matching", "feature": "recommendations", "experiment_key": "exp-1", "control_version": "scoring-v2", "candidate_version": "scoring-v3", "traffic_percent": 100, "is_enabled": True, "updated_at": "2026-03-01"},
+        ],
+        "action_prediction_models": [],
+    }
+
+
+def _install(monkeypatch, client, **service_kwargs):
+    monkeypatch.setattr(runtime_config, "supabase", client)
+    monkeypatch.setattr(runtime_config, "_version_probe_disabled", False)
+    monkeypatch.setattr(runtime_config, "_version_probe_backoff", 0.0)
+    monkeypatch.setattr(runtime_config, "_version_probe_retry_at", 0.0)
+    runtime_config._persisted_assignments.clear()
+    service = ConfigSnapshotService(
+        runtime_config._load_runtime_config_snapshot,
+        runtime_config._probe_runtime_config_version,
+        **service_kwargs,
+    )
+    monkeypatch.setattr(runtime_config, "_snapshot_service", service)
+    return service
+
+
+def test_snapshot_lookups_match_previous_semantics(monkeypatch):
+    _install(monkeypatch, _CountingSupabase(_payload()))
+
+    flag = runtime_config.get_release_flag("matching_engine_v2", subject_id="u1", default=False)
+    assert flag["effective_enabled"] is True
+
+    cfg = runtime_config.get_active_model_config("matching", "recommendations")
+    assert cfg["version"] == "m2"
+    assert cfg["primary_model"] == "ranker-b"
+    assert cfg["fallback_model"] == "ranker-a"
+    assert cfg["config_json"] == {"limit": 3, "k": 1}
+
+    assert runtime_config.get_active_scoring_model()["version"] == "scoring-v2"
+    resolved = runtime_config.resolve_scoring_model_for_user("user-1")
+    assert resolved["version"] == "scoring-v3"
+    assert resolved["assignment_source"] == "experiment"
+    assert runtime_config.get_active_action_prediction_model()["version"] == "v1"
+
+
+def test_missing_keys_are_negatively_cached(monkeypatch):
+    client = _CountingSupabase(_payload())
+    _install(monkeypatch, client)
+
+    for index in range(200):
+        flag = runtime_config.get_release_flag(f"missing_flag_{index % 7}", default=True)
+        assert flag["effective_enabled"] is True
+        assert runtime_config.get_active_model_config("ai_orchestration", f"missing_{index % 3}")["primary_model"] is None
+
+    assert client.calls == ["get_runtime_config_snapshot"]
+
+
+def test_thousand_concurrent_lookups_issue_single_query(monkeypatch):
+    client = _CountingSupabase(_payload(), delay=0.05)
+    _install(monkeypatch, client)
+
+    def lookup(index: int):
+        kind = index % 4
+        if kind == 0:
+            return runtime_config.get_release_flag("matching_engine_v2", subject_id=str(index))["effective_enabled"]
+        if kind == 1:
+            return runtime_config.get_active_model_config("matching", "recommendations")["version"]
+        if kind == 2:
+            return runtime_config.get_release_flag(f"unknown_{index}", default=False)["effective_enabled"]
+        return runtime_config.get_active_action_prediction_model("job_apply_probability")["version"]
+
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        results = list(pool.map(lookup, range(1000)))
+
+    assert len(results) == 1000
+    assert client.calls == ["get_runtime_config_snapshot"]
+
+
+def test_experiment_assignment_is_persisted_once_per_user(monkeypatch):
+    client = _CountingSupabase(_payload())
+    _install(monkeypatch, client)
+
+    for _ in range(50):
+        runtime_config.resolve_scoring_model_for_user("user-42")
+
+    assert client.calls.count("model_experiment_assignments") == 1
+
+
+def test_background_refresh_is_single_flight_and_serves_stale(monkeypatch):
+    now = {"t": 0.0}
+    scheduled = []
+    client = _CountingSupabase(_payload(flag_enabled=True))
+    service = _install(
+        monkeypatch,
+        client,
+        ttl_seconds=30,
+        refresh_ahead_seconds=5,
+        jitter_seconds=3,
+        version_poll_seconds=1000,
+        clock=lambda: now["t"],
+        run_in_background=scheduled.append,
+    )
+
+    assert runtime_config.get_release_flag("matching_engine_v2")["effective_enabled"] is True
+    now["t"] = 21.9
+    runtime_config.get_release_flag("matching_engine_v2")
+    assert scheduled == []
+
+    client.payload = _payload(version=2, flag_enabled=False)
+    now["t"] = 26.0
+    for _ in range(100):
+        # Still the old snapshot while the refresh has not run yet.
+        assert runtime_config.get_release_flag("matching_engine_v2")["effective_enabled"] is True
+    assert len(scheduled) == 1
+
+    scheduled.pop()()
+    assert runtime_config.get_release_flag("matching_engine_v2")["effective_enabled"] is False
+    assert client.calls == ["get_runtime_config_snapshot", "get_runtime_config_snapshot"]
+    assert service.stats()["version"] == 2
+
+
+def test_version_change_invalidates_before_ttl(monkeypatch):
+    now = {"t": 0.0}
+    scheduled = []
+    client = _CountingSupabase(_payload(version=7, flag_enabled=True))
+    _install(
+        monkeypatch,
+        client,
+        ttl_seconds=300,
+        version_poll_seconds=2,
+        clock=lambda: now["t"],
+        run_in_background=scheduled.append,
+    )
+
+    assert runtime_config.get_release_flag("matching_engine_v2")["effective_enabled"] is True
+
+    now["t"] = 2.5
+    runtime_config.get_release_flag("matching_engine_v2")
+    scheduled.pop()()
+    assert client.calls == ["get_runtime_config_snapshot", "runtime_config_version"]
+
+    client.payload = _payload(version=8, flag_enabled=False)
+    now["t"] = 5.0
+    runtime_config.get_release_flag("matching_engine_v2")
+    scheduled.pop()()
+    assert runtime_config.get_release_flag("matching_engine_v2")["effective_enabled"] is False
+    assert client.calls[-2:] == ["runtime_config_version", "get_runtime_config_snapshot"]
+
+
+def test_failed_load_is_retried_only_after_backoff(monkeypatch):
+    now = {"t": 0.0}
+    calls = []
+
+    def failing_loader():
+        calls.append(now["t"])
+        raise RuntimeError("db down")
+
+    service = ConfigSnapshotService(failing_loader, failure_retry_seconds=5, clock=lambda: now["t"])
+    for _ in range(20):
+        assert service.get() is None
+    assert len(calls) == 1
+
+    now["t"] = 6.0
+    service.get()
+    assert len(calls) == 2
+
+
+class _NoRpcSupabase(_CountingSupabase):
+    def execute(self, name, rpc):
+        if rpc:
+            with self._lock:
+                self.calls.append(name)
+            raise RuntimeError("function get_runtime_config_snapshot does not exist")
+        return super().execute(name, rpc)
+
+
+def test_table_fallback_keeps_the_version_so_polls_do_not_reload(monkeypatch):
+    now = {"t": 0.0}
+    scheduled = []
+    client = _NoRpcSupabase(_payload(version=7))
+    service = _install(
+        monkeypatch,
+        client,
+        ttl_seconds=300,
+        version_poll_seconds=2,
+        clock=lambda: now["t"],
+        run_in_background=scheduled.append,
+    )
+
+    runtime_config.get_release_flag("matching_engine_v2")
+    assert service.stats()["version"] == 7
+    loads = service.stats()["loads"]
+
+    for step in range(1, 6):
+        now["t"] = step * 2.5
+        runtime_config.get_release_flag("matching_engine_v2")
+        scheduled.pop()()
+    assert service.stats()["loads"] == loads and service.stats()["version_changes"] == 0
+
+
+def test_versionless_snapshot_adopts_the_probed_version():
+    now = {"t": 0.0}
+    scheduled = []
+    version = {"value": 5}
+    loads = []
+
+    def loader():
+        loads.append(now["t"])
+        return {"version": None}
+
+    service = ConfigSnapshotService(
+        loader,
+        lambda: version["value"],
+        ttl_seconds=300,
+        version_poll_seconds=2,
+        clock=lambda: now["t"],
+        run_in_background=scheduled.append,
+    )
+    service.get()
+    for step in range(1, 4):
+        now["t"] = step * 2.5
+        service.get()
+        scheduled.pop()()
+    assert len(loads) == 1 and service.stats()["version"] == 5
+
+    version["value"] = 6
+    now["t"] = 10.0
+    service.get()
+    scheduled.pop()()
+    assert len(loads) == 2
+
+
+class _FlakySupabase(_NoRpcSupabase):
+    """Table fallback with real rows; listed tables (or the version probe) raise."""
+
+    def __init__(self, payload, failing=()):
+        super().__init__(payload)
+        self.failing = set(failing)
+
+    def execute(self, name, rpc):
+        if name in self.failing:
+            with self._lock:
+                self.calls.append(name)
+            raise self.failing_error(name)
+        if not rpc and name in self.payload:
+            with self._lock:
+                self.calls.append(name)
+            return _Response(self.payload[name])
+        return super().execute(name, rpc)
+
+    @staticmethod
+    def failing_error(name):
+        if name == "runtime_config_version":
+            return TimeoutError("read timed out")
+        return RuntimeError(f"relation \"public.{name}\" does not exist")
+
+
+def test_one_unreadable_table_only_defaults_its_own_lookups(monkeypatch):
+    client = _FlakySupabase(_payload(version=3), failing={"action_prediction_models"})
+    service = _install(monkeypatch, client, ttl_seconds=300, version_poll_seconds=300)
+
+    assert runtime_config.get_release_flag("matching_engine_v2")["effective_enabled"] is True
+    assert runtime_config.get_active_model_config("matching", "recommendations")["primary_model"] == "ranker-b"
+    assert runtime_config.get_active_scoring_model()["version"] == "scoring-v2"
+    assert service.stats()["version"] == 3
+
+
+def test_transient_probe_failure_backs_off_instead_of_disabling(monkeypatch):
+    client = _FlakySupabase(_payload(version=3), failing={"runtime_config_version"})
+    _install(monkeypatch, client)
+
+    assert runtime_config._probe_runtime_config_version() is None
+    assert runtime_config._probe_runtime_config_version() is None
+    assert client.calls.count("runtime_config_version") == 1  # second call is inside the backoff
+    assert runtime_config._version_probe_disabled is False
+
+    client.failing.clear()
+    monkeypatch.setattr(runtime_config, "_version_probe_retry_at", 0.0)
+    assert runtime_config._probe_runtime_config_version() == 3
+    assert runtime_config._version_probe_backoff == 0.0
+
+    client.failing.add("runtime_config_version")
+    monkeypatch.setattr(client, "failing_error", lambda _name: RuntimeError("PGRST205: Could not find the table 'public.runtime_config_version'"))
+    assert runtime_config._probe_runtime_config_version() is None
+    assert runtime_config._version_probe_disabled is True
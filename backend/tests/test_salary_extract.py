@@ -0,0 +1,114 @@
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.scraper import scraper_base as base_bridge
+from backend.scraper import scraper_de as de_bridge
+from backend.scraper import scraper_multi as multi_bridge
+from backend.scraper import scraper_sk as sk_bridge
+
+scraper_base = base_bridge._runtime_module
+scraper_multi = multi_bridge._runtime_module
+scraper_sk = sk_bridge._runtime_module
+scraper_de = de_bridge._runtime_module
+# The instance every scraper module extracts salaries through.
+salary_extract = scraper_base._salary_extract
+
+CASES = json.loads((Path(__file__).resolve().parent / "fixtures" / "salary_cases.json").read_text(encoding="utf-8"))
+CURRENCIES = {"cz": "CZK", "sk": "EUR", "pl": "PLN", "de": "EUR", "at": "EUR"}
+
+
+def _legacy_salary(text, thousand_markers=("tis", "tisíc", "thousand", "tys")):
+    """The per-call findall/any() parsing extract_salary ran before the engine."""
+    vals = []
+    for x in re.findall(r"\d[\d\s\.,]*", text):
+        cleaned = x.replace(" ", "").replace("\u00a0", "").replace(".", "")
+        if "," in cleaned:
+            parts = cleaned.split(",")
+            cleaned = parts[0] if len(parts) > 1 and len(parts[-1]) == 2 else cleaned.replace(",", "")
+        if cleaned:
+            try:
+                val = int(cleaned)
+            except ValueError:
+                continue
+            if val > 100:
+                vals.append(val)
+    if any(word in text.lower() for word in thousand_markers):
+        vals = [v * 1000 if v < 1000 else v for v in vals]
+    if len(vals) == 1:
+        return vals[0], None
+    if len(vals) >= 2:
+        return min(vals[0], vals[1]), max(vals[0], vals[1])
+    return None, None
+
+
+def _legacy_period(text, tokens):
+    low = text.lower()
+    for period, period_tokens in tokens.items():
+        if any(tok in low for tok in period_tokens):
+            return period
+    return None
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: f"{case['country']}:{case['text'][:24]}")
+def test_golden_salaries(case):
+    currency = CURRENCIES[case["country"]]
+    info = salary_extract.parse_salary(case["text"], currency, case["country"])
+
+    assert (info.salary_from, info.salary_to) == (case["salary_from"], case["salary_to"])
+    assert (info.currency, info.period, info.gross_net) == (case["currency"], case["period"], case["gross_net"])
+    assert scraper_base.extract_salary(case["text"], currency) == (case["salary_from"], case["salary_to"], currency)
+    assert (case["salary_from"], case["salary_to"]) == _legacy_salary(case["text"])
+
+
+def test_scraper_helpers_match_the_token_scans_they_replaced():
+    texts = [case["text"] for case in CASES] + ["", "Teilzeit, 20 Std. pro Woche", "12 €/h oder 2.000 € im Monat"]
+    tables = salary_extract.COUNTRY_PERIOD_TOKENS
+
+    for text in texts:
+        assert scraper_multi.extract_salary_range(text) == (_legacy_salary(text, ("tis",)) if text else (None, None))
+        assert scraper_multi.detect_salary_timeframe_cz(text) == _legacy_period(text, tables["cz"])
+        assert scraper_sk.SlovakiaScraper()._detect_salary_timeframe(text) == _legacy_period(text, tables["sk"])
+        assert scraper_de.GermanyScraper()._detect_salary_timeframe_de(text) == _legacy_period(text, tables["de"])
+
+
+def test_german_benefit_keywords_match_per_pattern_search():
+    keywords = dict(zip(scraper_de._DE_BENEFITS.labels, (p.pattern for p in scraper_de._DE_BENEFITS._patterns)))
+    texts = [
+        "Wir bieten Homeoffice, Gleitzeit, Dienstwagen und Corporate Benefits.",
+        "Schulung, 30 Tage Urlaub und betriebliche Altersvorsorge; Fitnessstudio im Haus.",
+        "Remote möglich",
+        "Keine Angaben",
+    ]
+    for text in texts:
+        expected = [label for label, pattern in keywords.items() if re.search(pattern, text.lower())]
+        assert scraper_de.GermanyScraper()._extract_benefits_from_text(text) == expected
+
+    matcher = salary_extract.BenefitMatcher({"Home": r"home", "Home Office": r"home\s*office"})
+    assert matcher.find("Home Office") == ["Home", "Home Office"]
+    assert matcher.find_many(["", None, "office"]) == [[], [], []]
+
+
+def test_anchored_parse_ignores_numbers_away_from_the_currency():
+    info = salary_extract.parse_salary("Nástup 1.3.2024, tým 250 lidí, mzda 35 000 - 42 000 Kč hrubého", anchored=True)
+    assert (info.salary_from, info.salary_to, info.currency, info.gross_net) == (35000, 42000, "CZK", "gross")
+
+    info = salary_extract.parse_salary("Gehalt ab EUR 52.000 im Jahr, Team mit 120 Personen", anchored=True)
+    assert (info.salary_from, info.salary_to, info.period) == (52000, None, "year")
+
+    assert salary_extract.parse_salary("Nástup 1.3.2024, 250 lidí", anchored=True).salary_from is None
+
+
+def test_batch_parse_matches_single_parses():
+    texts = [case["text"] for case in CASES] * 2 + ["", None]
+    batch = salary_extract.parse_salaries(texts, "EUR", "de")
+
+    assert batch == [salary_extract.parse_salary(text, "EUR", "de") for text in texts]
+    assert batch[0].to_job_fields()["salary_from"] == CASES[0]["salary_from"]
@@ -0,0 +1,157 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.scraper import scraper_base as base_bridge
+from backend.scraper import scraper_de as de_bridge
+
+scraper_base = base_bridge._runtime_module
+scraper_de = de_bridge._runtime_module
+# scraper_de imports its own scraper_base; its throttle table is the one in play.
+de_base = sys.modules[scraper_de.scrape_page.__module__]
+# The instance GermanyScraper fetches its detail pages through.
+detail_fetch = de_base._detail_fetch
+
+JOB_IDS = [f"{10000 + index}" for index in range(8)]
+LATENCY = 0.1
+TEASER = "Kurzprofil der Stelle als Lagerlogistiker im Schichtbetrieb mit Staplerschein und Teamgeist. " * 5
+AD_TEXT = "Ihre Aufgaben umfassen die Kommissionierung, Verladung und Inventur im Zentrallager Nord. " * 6
+
+
+def _detail(base, job_id):
+    # The ad iframe is joined against the live site, so the fixture links it absolutely.
+    return (
+        f"<html><body><h1>Lagerlogistiker {job_id}</h1>"
+        f"<main><p>{TEASER}</p></main>"
+        f"<iframe data-testid='qa-job-ad-iframe' src='{base}/api/jobs/iframe/{job_id}'></iframe>"
+        "</body></html>"
+    )
+
+
+def _ad(job_id):
+    posting = {
+        "@type": "JobPosting",
+        "title": f"Lagerlogistiker (m/w/d) {job_id}",
+        "hiringOrganization": {"name": "Nordlager GmbH"},
+        "jobLocation": {"address": {"addressLocality": "Hamburg"}},
+        "description": f"<p>{AD_TEXT}</p><p>Referenz {job_id}</p>",
+    }
+    return f"<html><head><script type='application/ld+json'>{json.dumps(posting)}</script></head><body></body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Listing -> detail page -> ad iframe -> jobstatic frame, each after the injected latency."""
+
+    def log_message(self, *_args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        path = self.path
+        server.requests.append(path)
+        time.sleep(server.delays.get(path, LATENCY))
+        job_id = path.rstrip("/").rsplit("-", 1)[-1].rsplit("/", 1)[-1]
+        if path == "/listing":
+            links = "".join(f"<a href='{server.base}/job/lagerlogistiker-{job}/'>Job {job}</a>" for job in JOB_IDS)
+            return self._send(f"<html><body>{links}</body></html>")
+        if path.startswith("/job/"):
+            return self._send(_detail(server.base, job_id))
+        if path.startswith("/api/jobs/iframe/"):
+            return self._send(f"<html><body><iframe src='/jobstatic/{job_id}'></iframe></body></html>")
+        if path.startswith("/jobstatic/"):
+            return self._send(_ad(job_id))
+        self.send_response(404)
+        self.end_headers()
+
+    def _send(self, html):
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.requests = []
+    httpd.delays = {}
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    # Keep the per-host throttle in the loop, without its production spacing.
+    monkeypatch.setitem(de_base._DOMAIN_MIN_DELAY, de_base._get_domain(httpd.base), 0.0)
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _scrape(server, monkeypatch, workers):
+    saved = []
+    monkeypatch.setattr(detail_fetch, "SCRAPER_DETAIL_WORKERS", workers)
+    monkeypatch.setattr(scraper_de, "save_job_to_supabase", lambda _supabase, job, _seen: saved.append(job) or True)
+    listing = scraper_base.scrape_page(server.base + "/listing")
+    started = time.perf_counter()
+    count = scraper_de.GermanyScraper().scrape_page_jobs(listing, "stellenanzeigen.de")
+    return count, saved, time.perf_counter() - started
+
+
+def test_stellenanzeigen_details_and_iframes_load_concurrently(server, monkeypatch):
+    count, saved, elapsed = _scrape(server, monkeypatch, workers=4)
+
+    assert count == len(saved) == len(JOB_IDS)
+    assert sorted(job["title"] for job in saved) == sorted(f"Lagerlogistiker (m/w/d) {job}" for job in JOB_IDS)
+    assert all(f"Referenz {job['title'].rsplit(' ', 1)[-1]}" in job["description"] for job in saved)
+    assert {job["company"] for job in saved} == {"Nordlager GmbH"}
+    # Three chained fetches per job; one at a time that is at least 24 x LATENCY.
+    assert len(server.requests) == 1 + 3 * len(JOB_IDS)
+    assert elapsed < 3 * len(JOB_IDS) * LATENCY * 0.75
+
+
+def test_a_slow_iframe_keeps_the_job_from_its_detail_page(server, monkeypatch):
+    slow = JOB_IDS[2]
+    server.delays[f"/jobstatic/{slow}"] = 2.0
+    monkeypatch.setattr(detail_fetch, "SCRAPER_DETAIL_TIMEOUT_SECONDS", 0.8)
+
+    count, saved, elapsed = _scrape(server, monkeypatch, workers=4)
+
+    assert count == len(JOB_IDS)
+    by_title = {job["title"]: job for job in saved}
+    partial = by_title[f"Lagerlogistiker {slow}"]
+    assert partial["description"].startswith("Kurzprofil der Stelle") and "Referenz" not in partial["description"]
+    assert len(by_title) == len(JOB_IDS) and elapsed < 2.0
+
+
+def test_fetch_details_yields_in_order_with_partial_pages_on_timeout():
+    def fetch(url):
+        time.sleep({"a": 0.2, "b": 0.0, "b/frame": 1.0}.get(url, 0.05))
+        return {"url": url}
+
+    def frames(url, _soup, depth):
+        return [f"{url}/frame"] if depth == 0 and url in ("b", "c") else []
+
+    pages = list(detail_fetch.fetch_details(["a", "b", "a", "c", ""], fetch, frames, workers=3, timeout=0.5))
+
+    assert [page.url for page in pages] == ["a", "b", "c"]
+    assert not pages[0].timed_out and pages[0].soup == {"url": "a"} and pages[0].frames == {}
+    assert pages[1].timed_out and pages[1].soup == {"url": "b"} and pages[1].frame("b/frame") is None
+    assert not pages[2].timed_out and pages[2].frame("c/frame") == {"url": "c/frame"}
+    assert list(detail_fetch.fetch_details([], fetch)) == []
+
+
+def test_pooled_german_hosts_keep_the_old_per_job_spacing():
+    assert de_base._domain_min_delay("www.karriere.at") == de_base._domain_min_delay("www.willhaben.at") == 4.5
+    # Detail page and ad iframe: two requests per job on the same host.
+    assert 2 * de_base._domain_min_delay("www.stellenanzeigen.de") == 4.5
+    assert de_base._domain_min_delay("www.praca.pl") == 6.0
+    assert de_base._domain_min_delay("example.com") == 1.5
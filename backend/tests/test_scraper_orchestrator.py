@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.scraper import orchestrator as bridge
+
+orchestrator = bridge._runtime_module
+ScrapeTask = orchestrator.ScrapeTask
+
+
+def _sleeper(seconds, jobs=1):
+    def run():
+        time.sleep(seconds)
+        return jobs
+
+    return run
+
+
+# (group, sites, pages per site, seconds per page); Czech is by far the longest.
+COUNTRIES = [
+    ("CZ", ["jobs.cz", "prace.cz", "jenprace.cz"], 8, 0.05),
+    ("SK", ["profesia.sk", "kariera.sk"], 4, 0.02),
+    ("PL", ["pracuj.pl", "praca.pl"], 4, 0.02),
+    ("DE", ["stellenanzeigen.de", "karriere.at"], 4, 0.02),
+    ("NORDIC", ["jooble.org"], 4, 0.02),
+]
+
+
+def _run_country(sites, pages, seconds):
+    time.sleep(len(sites) * pages * seconds)
+
+
+def _join_oldest(cap):
+    """The previous run_all_parallel scheduling: one process per country, join the oldest at the cap."""
+    started = time.perf_counter()
+    active = []
+    for _group, sites, pages, seconds in COUNTRIES:
+        while len(active) >= cap:
+            active.pop(0).join()
+        proc = multiprocessing.get_context("fork").Process(target=_run_country, args=(sites, pages, seconds))
+        proc.start()
+        active.append(proc)
+    for proc in active:
+        proc.join()
+    return time.perf_counter() - started
+
+
+def _page_range_tasks(pages_per_task=2):
+    rounds = []
+    for group, sites, pages, seconds in COUNTRIES:
+        for site in sites:
+            rounds.append([
+                ScrapeTask(f"{site}:{first}-{last}", group, site, _sleeper((last - first + 1) * seconds), site=site, first_page=first, last_page=last)
+                for first, last in orchestrator.split_pages(pages, pages_per_task)
+            ])
+    return [ranges[index] for index in range(max(len(ranges) for ranges in rounds)) for ranges in rounds if index < len(ranges)]
+
+
+def test_page_range_tasks_on_a_shared_queue_beat_join_oldest_scheduling():
+    legacy = _join_oldest(cap=2)
+    report = orchestrator.run_tasks(_page_range_tasks(), workers=2, log=False)
+
+    assert report.count(orchestrator.OK) == len(report.results) == 26
+    assert report.jobs_by_group() == {"CZ": 12, "SK": 4, "PL": 4, "DE": 4, "NORDIC": 2}
+    # Czech pages alone are 1.2 s of work; join-oldest idles one slot behind them.
+    assert report.elapsed_seconds < legacy * 0.85, (report.elapsed_seconds, legacy)
+    assert report.utilization > 0.7
+    assert {result.worker for result in report.results} == {0, 1}
+
+
+def test_one_domain_never_runs_twice_at_once_and_starts_are_spaced():
+    tasks = [ScrapeTask(f"a:{index}", "A", "a.example", _sleeper(0.05)) for index in range(3)]
+    tasks += [ScrapeTask(f"b:{index}", "B", "b.example", _sleeper(0.05)) for index in range(3)]
+    report = orchestrator.run_tasks(tasks, workers=4, domain_min_interval=0.1, log=False)
+
+    for domain in ["a.example", "b.example"]:
+        runs = sorted((result.started_at, result.finished_at) for result in report.results if result.domain == domain)
+        for (first_start, first_end), (next_start, _next_end) in zip(runs, runs[1:]):
+            assert next_start >= first_end - 0.01
+            assert next_start - first_start >= 0.1 - 0.01
+
+
+def test_failures_crashes_and_hangs_do_not_stall_the_pool():
+    def boom():
+        raise RuntimeError("layout changed")
+
+    def crash():
+        os._exit(3)
+
+    tasks = [
+        ScrapeTask("boom", "X", "x.example", boom),
+        ScrapeTask("crash", "X", "y.example", crash),
+        ScrapeTask("hang", "X", "z.example", _sleeper(30)),
+    ]
+    tasks += [ScrapeTask(f"ok:{index}", "OK", f"ok{index}.example", _sleeper(0.02, jobs=2)) for index in range(8)]
+
+    started = time.perf_counter()
+    report = orchestrator.run_tasks(tasks, workers=2, task_timeout=0.5, poll_seconds=0.05, log=False)
+    assert time.perf_counter() - started < 5
+
+    statuses = {result.key: result.status for result in report.results}
+    assert statuses["boom"] == orchestrator.ERROR and "layout changed" in report.results[0].error
+    assert statuses["crash"] == orchestrator.CRASHED
+    assert statuses["hang"] == orchestrator.TIMEOUT
+    assert report.jobs_by_group() == {"X": 0, "OK": 16}
+    assert report.count(orchestrator.OK) == 8
+
+
+def test_an_empty_page_range_skips_the_rest_of_its_site():
+    tasks = [
+        ScrapeTask("site:1-3", "S", "s.example", _sleeper(0, jobs=5), site="site", first_page=1, last_page=3),
+        ScrapeTask("site:4-6", "S", "s.example", _sleeper(0, jobs=0), site="site", first_page=4, last_page=6),
+        ScrapeTask("site:7-9", "S", "s.example", _sleeper(0, jobs=9), site="site", first_page=7, last_page=9),
+        ScrapeTask("site:10-10", "S", "s.example", _sleeper(0, jobs=9), site="site", first_page=10, last_page=10),
+    ]
+    report = orchestrator.run_tasks(tasks, workers=2, log=False)
+    assert [result.status for result in report.results] == ["ok", "ok", "skipped", "skipped"]
+    assert report.total_jobs == 5
+    assert report.as_dict()["tasks"][2]["status"] == "skipped"
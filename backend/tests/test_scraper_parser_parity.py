@@ -0,0 +1,100 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.scraper import scraper_base as base_bridge
+from backend.scraper import scraper_de as de_bridge
+from backend.scraper import scraper_multi as multi_bridge
+from backend.scraper import scraper_nordic as nordic_bridge
+from backend.scraper import scraper_pl as pl_bridge
+from backend.scraper import scraper_sk as sk_bridge
+
+scraper_base = base_bridge._runtime_module
+scraper_multi = multi_bridge._runtime_module
+scraper_sk = sk_bridge._runtime_module
+scraper_de = de_bridge._runtime_module
+scraper_pl = pl_bridge._runtime_module
+scraper_nordic = nordic_bridge._runtime_module
+# The one instance every scraper module builds its trees through.
+html_parser = scraper_base._html_parser
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "scraper_html"
+
+
+def _duunitori(soup):
+    scraper = scraper_nordic.NordicScraper("fi")
+    for listing in scraper._extract_duunitori_listing_links(soup, 20):
+        job = scraper._build_duunitori_job(listing, {"name": "Duunitori"})
+        if job:
+            scraper_nordic.save_job_to_supabase(job)
+
+
+# Fixture directory -> (module, site parser run on the listing soup, jobs on the recorded listing).
+SITES = {
+    "jobs_cz": (scraper_multi, lambda soup: scraper_multi.scrape_jobs_cz(soup), 2),
+    "prace_cz": (scraper_multi, lambda soup: scraper_multi.scrape_prace_cz(soup), 2),
+    "jenprace_cz": (scraper_multi, lambda soup: scraper_multi.scrape_jenprace_cz(soup), 2),
+    "profesia_sk": (scraper_sk, lambda soup: scraper_sk.SlovakiaScraper().scrape_page_jobs(soup, "profesia.sk"), 2),
+    "karriere_at": (scraper_de, lambda soup: scraper_de.GermanyScraper().scrape_page_jobs(soup, "karriere.at"), 2),
+    "praca_pl": (scraper_pl, lambda soup: scraper_pl.PolandScraper().scrape_page_jobs(soup, "praca.pl"), 1),
+    "duunitori_fi": (scraper_nordic, _duunitori, 2),
+}
+
+
+def _extract(monkeypatch, site, backend):
+    """Run one site parser over its recorded pages with ``backend`` and return the jobs it saved."""
+    module, run, _expected = SITES[site]
+    listing = (FIXTURES / site / "listing.html").read_bytes()
+    detail = (FIXTURES / site / "detail.html").read_bytes()
+    saved = []
+
+    def capture(*args):
+        saved.append(next(arg for arg in args if isinstance(arg, dict)))
+        return True
+
+    monkeypatch.setattr(html_parser, "SCRAPER_HTML_PARSER", backend)
+    monkeypatch.setattr(module, "scrape_page", lambda url, *args, **kwargs: html_parser.make_soup(detail))
+    monkeypatch.setattr(module, "save_job_to_supabase", capture)
+    if hasattr(module, "time"):
+        monkeypatch.setattr(module.time, "sleep", lambda _seconds: None)
+    monkeypatch.setattr(scraper_base, "jobs_postgres_write_available", lambda: True)
+    if hasattr(module, "geocode_location"):
+        monkeypatch.setattr(module, "geocode_location", lambda _location: None)
+
+    run(html_parser.make_soup(listing))
+    for job in saved:
+        job.pop("scraped_at", None)
+    return sorted(saved, key=lambda job: job["url"])
+
+
+@pytest.mark.parametrize("site", sorted(SITES))
+def test_site_parsers_extract_the_recorded_jobs(monkeypatch, site):
+    jobs = _extract(monkeypatch, site, html_parser.FALLBACK_BACKEND)
+
+    assert len(jobs) == SITES[site][2]
+    assert len({job["url"] for job in jobs}) == len(jobs)
+    for job in jobs:
+        assert job["title"] and job["company"] and job["location"] and job["description"]
+
+
+@pytest.mark.parametrize("site", sorted(SITES))
+@pytest.mark.parametrize("backend", [name for name in html_parser.BACKENDS if name != html_parser.FALLBACK_BACKEND])
+def test_backends_extract_the_same_jobs(monkeypatch, site, backend):
+    if backend not in html_parser.available_backends():
+        pytest.skip(f"{backend} is not installed")
+
+    assert _extract(monkeypatch, site, backend) == _extract(monkeypatch, site, html_parser.FALLBACK_BACKEND)
+
+
+def test_unavailable_backend_falls_back_to_html_parser(monkeypatch):
+    monkeypatch.setattr(html_parser, "SCRAPER_HTML_PARSER", "selectolax")
+    assert html_parser.resolve_backend() == html_parser.FALLBACK_BACKEND
+    assert html_parser.make_soup("<p>Skladník</p>").p.get_text() == "Skladník"
+
+    monkeypatch.setattr(html_parser, "SCRAPER_HTML_PARSER", "auto")
+    assert html_parser.resolve_backend() == html_parser.available_backends()[0]
@@ -0,0 +1,119 @@
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.scraper import scraper_base as base_bridge
+from backend.scraper import scraper_multi as multi_bridge
+
+scraper_base = base_bridge._runtime_module
+scraper_multi = multi_bridge._runtime_module
+# The instance scraper_base cleans descriptions through (memo included).
+text_pipeline = scraper_base._text_pipeline
+
+CASES = json.loads((Path(__file__).resolve().parent / "fixtures" / "text_pipeline_cases.json").read_text(encoding="utf-8"))
+
+
+def _legacy_filter_out_junk(text, junk_tokens):
+    """The per-line any() scan filter_out_junk ran before the tokens were compiled."""
+    filtered_lines = []
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if not stripped:
+            filtered_lines.append("")
+            continue
+        low = stripped.lower()
+        if len(stripped) < 100 and any(tok in low for tok in junk_tokens):
+            continue
+        if any(tok == low for tok in junk_tokens):
+            continue
+        filtered_lines.append(stripped)
+    result = re.sub(r"\n{3,}", "\n\n", "\n".join(filtered_lines).strip())
+    return result if result else "Popis není dostupný"
+
+
+@pytest.mark.parametrize("module", [scraper_base, scraper_multi], ids=["base", "multi"])
+def test_compiled_junk_filter_matches_token_scan(module):
+    texts = CASES["descriptions"] + [case["text"] for case in CASES["languages"]] + ["Kontakt\nImpressum", ""]
+    for text in texts:
+        expected = _legacy_filter_out_junk(text, module.JUNK_TOKENS) if text else ""
+        assert module.filter_out_junk(text) == expected
+
+
+def test_junk_filter_matches_tokens_sharing_prefixes():
+    junk = text_pipeline.JunkFilter(["platy.cz", "platy.sk", "pla", "kontakt"])
+
+    assert junk.is_junk("Planeta")
+    assert junk.is_junk("KONTAKTNÍ ÚDAJE")
+    assert not junk.is_junk("Skladník")
+    assert not junk.is_junk("x" * 120 + " kontakt")
+    assert junk.is_junk("Kontakt")
+    assert not text_pipeline.JunkFilter([]).is_junk("cokoli")
+
+
+def test_repair_check_only_skips_text_ftfy_leaves_alone():
+    ftfy = pytest.importorskip("ftfy")
+    texts = CASES["repair"] + CASES["descriptions"] + [case["text"] for case in CASES["languages"]]
+
+    for text in texts:
+        if not text_pipeline.needs_text_repair(text):
+            assert ftfy.fix_text(text, normalization="NFC") == text
+    assert text_pipeline.needs_text_repair("SchÃ¶ne Stelle")
+    assert text_pipeline.needs_text_repair("Mzda 40 000 Kč &amp; bonusy")
+    assert not text_pipeline.needs_text_repair("Příjem a kontrola zboží.")
+
+
+def test_normalize_matches_unconditional_ftfy(monkeypatch):
+    pytest.importorskip("ftfy")
+    text_pipeline.get_text_memo().clear()
+    monkeypatch.setattr(scraper_base, "_UNSTRUCTURED_AVAILABLE", False)
+    texts = CASES["repair"] + CASES["descriptions"]
+
+    fast = [scraper_base.normalize_description_for_storage(text) for text in texts]
+    text_pipeline.get_text_memo().clear()
+    monkeypatch.setattr(text_pipeline, "needs_text_repair", lambda _text: True)
+    full = [scraper_base.normalize_description_for_storage(text) for text in texts]
+
+    assert fast == full
+    text_pipeline.get_text_memo().clear()
+
+
+def test_language_identifier_labels_samples_deterministically():
+    if text_pipeline.get_language_identifier() is None:
+        pytest.skip("langdetect is not installed")
+
+    for case in CASES["languages"]:
+        labels = {scraper_base.detect_language_code(case["text"]) for _ in range(3)}
+        assert labels == {case["lang"]}, case["text"][:40]
+        assert text_pipeline.identify_language(case["text"]) == case["lang"]
+    assert scraper_base.detect_language_code("Skladník") is None
+
+
+def test_memo_counts_hits_and_evicts_oldest():
+    memo = text_pipeline.ContentMemo(2)
+    calls = []
+
+    def compute(text):
+        calls.append(text)
+        return text.upper()
+
+    assert memo.get_or_compute("stage", "a", compute) == "A"
+    assert memo.get_or_compute("stage", "a", compute) == "A"
+    memo.get_or_compute("stage", "b", compute)
+    memo.get_or_compute("stage", "c", compute)
+    memo.get_or_compute("stage", "a", compute)
+
+    assert calls == ["a", "b", "c", "a"]
+    assert memo.stats() == {"stage": {"hits": 1, "misses": 4}}
+    assert memo.get_or_compute("other", "a", len) == 1
+
+    disabled = text_pipeline.ContentMemo(0)
+    disabled.get_or_compute("stage", "a", compute)
+    disabled.get_or_compute("stage", "a", compute)
+    assert calls[-2:] == ["a", "a"] and disabled.stats() == {}
@@ -0,0 +1,208 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import HTTPException
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.app.core import security
+from backend.app.core import token_verification
+from backend.app.core.token_verification import JWKSKeyStore, VerifiedTokenCache
+
+
+def _es256_keypair(kid: str):
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    public_jwk = jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    public_jwk.update({"kid": kid, "alg": "ES256", "use": "sig"})
+    return private_key, public_jwk
+
+
+class _JWKSServer:
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.status = 200
+        self.hits = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.hits += 1
+                body = json.dumps({"keys": server.keys}).encode("utf-8")
+                self.send_response(server.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/auth/v1/.well-known/jwks.json"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def jwks_server():
+    server = _JWKSServer([])
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def clock():
+    return {"t": 1000.0}
+
+
+@pytest.fixture
+def verifier(monkeypatch, jwks_server, clock):
+    store = JWKSKeyStore(
+        jwks_server.url,
+        refresh_interval_seconds=300,
+        stale_if_error_seconds=600,
+        min_refetch_seconds=0,
+        clock=lambda: clock["t"],
+        run_in_background=lambda fn: fn(),
+    )
+    monkeypatch.setattr(security, "_jwks_store", store)
+    monkeypatch.setattr(security, "_verified_tokens", VerifiedTokenCache(max_entries=100))
+    monkeypatch.setattr(security, "JWT_SECRET", "local-hs256-secret")
+    token_verification.reset_token_verification_metrics()
+    return store
+
+
+def _es256_token(private_key, kid: str, *, sub: str = "user-1", ttl: int = 600) -> str:
+    return jwt.encode(
+        {"sub": sub, "email": f"{sub}@example.com", "role": "authenticated", "exp": int(time.time()) + ttl},
+        private_key,
+        algorithm="ES256",
+        headers={"kid": kid},
+    )
+
+
+def test_es256_tokens_are_verified_with_local_jwks_and_cached(verifier, jwks_server):
+    private_key, public_jwk = _es256_keypair("kid-a")
+    jwks_server.keys = [public_jwk]
+    token = _es256_token(private_key, "kid-a")
+
+    first = security.verify_supabase_token(token)
+    second = security.verify_supabase_token(token)
+
+    assert first["id"] == "user-1"
+    assert second == first
+    assert jwks_server.hits == 1
+    metrics = token_verification.token_verification_metrics()
+    assert metrics["verifications"] == 2
+    assert metrics["cache_hits"] == 1
+    assert metrics["legacy_fallbacks"] == 0
+
+
+def test_unknown_kid_triggers_refresh_for_key_rotation(verifier, jwks_server):
+    old_key, old_jwk = _es256_keypair("kid-old")
+    new_key, new_jwk = _es256_keypair("kid-new")
+    jwks_server.keys = [old_jwk]
+    assert security.verify_supabase_token(_es256_token(old_key, "kid-old"))["sub"] == "user-1"
+
+    jwks_server.keys = [old_jwk, new_jwk]
+    payload = security.verify_supabase_token(_es256_token(new_key, "kid-new", sub="user-2"))
+
+    assert payload["sub"] == "user-2"
+    assert jwks_server.hits == 2
+    assert token_verification.token_verification_metrics()["jwks_kid_miss_refreshes"] == 1
+
+
+def test_stale_jwks_is_served_within_error_window_then_rejected(verifier, jwks_server, clock):
+    private_key, public_jwk = _es256_keypair("kid-a")
+    jwks_server.keys = [public_jwk]
+    security.verify_supabase_token(_es256_token(private_key, "kid-a", sub="warm"))
+
+    jwks_server.status = 503
+    clock["t"] += 400  # past refresh interval, inside stale-if-error window
+    payload = security.verify_supabase_token(_es256_token(private_key, "kid-a", sub="during-outage"))
+    assert payload["sub"] == "during-outage"
+    assert token_verification.token_verification_metrics()["jwks_refresh_failures"] >= 1
+
+    clock["t"] += 1000  # beyond refresh interval + stale window
+    with pytest.raises(HTTPException) as exc_info:
+        security.verify_supabase_token(_es256_token(private_key, "kid-a", sub="after-window"))
+    assert exc_info.value.status_code == 500
+
+
+def test_hs256_tokens_are_verified_and_bad_ones_rejected(verifier):
+    token = jwt.encode({"sub": "hs-user", "exp": int(time.time()) + 60}, "local-hs256-secret", algorithm="HS256")
+    assert security.verify_supabase_token(token)["id"] == "hs-user"
+
+    forged = jwt.encode({"sub": "hs-user", "exp": int(time.time()) + 60}, "wrong-secret", algorithm="HS256")
+    with pytest.raises(HTTPException) as exc_info:
+        security.verify_supabase_token(forged)
+    assert exc_info.value.status_code == 401
+
+    expired = jwt.encode({"sub": "hs-user", "exp": int(time.time()) - 5}, "local-hs256-secret", algorithm="HS256")
+    with pytest.raises(HTTPException) as exc_info:
+        security.verify_supabase_token(expired)
+    assert exc_info.value.detail == "Token has expired"
+
+    metrics = token_verification.token_verification_metrics()
+    assert metrics["failures"] == 2
+    assert len(security._verified_tokens) == 1
+
+
+def test_verified_claims_never_outlive_token_expiry():
+    now = {"t": 1000.0}
+    cache = VerifiedTokenCache(max_entries=2, max_ttl_seconds=300, clock=lambda: now["t"])
+    cache.put("short", {"sub": "a", "exp": 1010})
+    cache.put("long", {"sub": "b", "exp": 999999})
+
+    assert cache.get("short")["sub"] == "a"
+    now["t"] = 1011
+    assert cache.get("short") is None
+    assert cache.get("long")["sub"] == "b"
+
+    now["t"] = 1301  # capped by max_ttl even though exp is far away
+    assert cache.get("long") is None
+
+    cache.put("x", {"exp": 99999})
+    cache.put("y", {"exp": 99999})
+    cache.put("z", {"exp": 99999})
+    assert len(cache) == 2
+    assert cache.get("x") is None
+
+
+def test_legacy_fallback_is_counted_and_cached(monkeypatch, verifier):
+    calls = []
+
+    class _Auth:
+        def get_user(self, token):
+            calls.append(token)
+            return SimpleNamespace(
+                user=SimpleNamespace(id="legacy-user", email="l@example.com", user_metadata={}, app_metadata={"role": "authenticated"})
+            )
+
+    monkeypatch.setattr(security, "JWT_SECRET", None)
+    monkeypatch.setattr(security, "allow_legacy_auth_fallback", lambda: True)
+    monkeypatch.setattr(security, "get_legacy_supabase_client", lambda: SimpleNamespace(auth=_Auth()))
+
+    token = jwt.encode({"sub": "legacy-user", "exp": int(time.time()) + 600}, "supabase-side-secret", algorithm="HS256")
+    for _ in range(5):
+        assert security.verify_supabase_token(token)["id"] == "legacy-user"
+
+    assert len(calls) == 1
+    metrics = token_verification.token_verification_metrics()
+    assert metrics["legacy_fallbacks"] == 1
+    assert metrics["legacy_fallback_rate"] == 0.2
+    assert sum(metrics["latency_buckets"].values()) == 5
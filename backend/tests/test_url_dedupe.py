@@ -0,0 +1,133 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.scraper import orchestrator as orchestrator_bridge
+from backend.scraper import scraper_base as base_bridge
+
+orchestrator = orchestrator_bridge._runtime_module
+scraper_base = base_bridge._runtime_module
+# The one instance scraper_base records and looks up known jobs through.
+url_dedupe = scraper_base._url_dedupe
+
+
+@pytest.fixture
+def dedupe(tmp_path):
+    store = url_dedupe.URLDedupe(str(tmp_path / "dedupe"), capacity=5000, fp_rate=0.01)
+    url_dedupe.set_url_dedupe(store)
+    yield store
+    url_dedupe.set_url_dedupe(None)
+    scraper_base._JOBS_SEEN_BUFFER.clear()
+
+
+def test_url_spellings_of_one_job_share_a_key():
+    spellings = [
+        "https://www.jobs.cz/rpd/2000123456/?utm_source=feed&searchId=7#apply",
+        "http://jobs.cz/rpd/2000123456?searchId=7&gclid=abc",
+        "  https://JOBS.cz:443//rpd/2000123456/?searchId=7&utm_medium=email ",
+    ]
+    assert {url_dedupe.canonical_job_url(url) for url in spellings} == {"https://jobs.cz/rpd/2000123456?searchId=7"}
+    assert len({scraper_base.canonical_job_key(url) for url in spellings}) == 1
+    assert scraper_base.canonical_job_key(spellings[0]) == scraper_base.build_job_id_from_url("https://jobs.cz/rpd/2000123456?searchId=7")
+    assert scraper_base.canonical_job_key("https://jobs.cz/rpd/2000123456?searchId=8") != scraper_base.canonical_job_key(spellings[0])
+
+
+def test_filter_false_positive_rate_and_exact_confirmation(dedupe):
+    rng = random.Random(3)
+    known = [f"known-{rng.getrandbits(64)}" for _ in range(5000)]
+    dedupe.add_many((key, f"id-{key}") for key in known)
+    absent = [f"absent-{index}" for index in range(40000)]
+
+    assert all(dedupe.might_contain(key) for key in known)
+    false_positive_rate = sum(dedupe.might_contain(key) for key in absent) / len(absent)
+    assert 0 < false_positive_rate < 0.02  # sized for 1 % at capacity
+
+    assert all(dedupe.lookup(key) is None for key in absent)
+    assert dedupe.lookup(known[0])["job_id"] == f"id-{known[0]}"
+    stats = dedupe.stats()
+    assert stats["false_positives"] == round(false_positive_rate * len(absent))
+    assert stats["filter_negatives"] == len(absent) - stats["false_positives"]
+
+
+def test_known_jobs_skip_their_detail_page_until_they_are_due(dedupe, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(dedupe, "_clock", lambda: now[0])
+    url = "https://www.stepstone.de/stellenangebote--Lagerist-123.html"
+    scraper_base._record_known_jobs([{"id": "job-123", "url": url}, {"id": "no-url", "url": ""}])
+
+    scraper = scraper_base.BaseScraper("DE")
+    assert scraper.is_duplicate(url + "?utm_source=newsletter")
+    assert scraper_base._JOBS_SEEN_BUFFER == {"job-123"}
+
+    now[0] += url_dedupe.SCRAPER_URL_DEDUPE_REFETCH_HOURS * 3600 + 1
+    monkeypatch.setattr(scraper_base, "jobs_postgres_write_available", lambda: True)
+    assert not scraper_base.BaseScraper("DE").is_duplicate(url)
+    assert not scraper_base.BaseScraper("DE").is_duplicate("https://www.stepstone.de/stellenangebote--Neu-999.html")
+
+
+def test_rebuild_drops_expired_jobs_keeps_local_fetch_times_and_persists(dedupe, tmp_path):
+    dedupe.add_many([("a", "id-a"), ("gone", "id-gone")], fetched_at=500.0)
+    count = dedupe.rebuild([("a", "id-a", 100.0), ("b", "id-b", 200.0)])
+
+    assert count == 2 and dedupe.built_at > 0
+    assert dedupe.lookup("gone") is None
+    assert dedupe.lookup("a")["fetched_at"] == 500.0 and dedupe.lookup("b")["fetched_at"] == 200.0
+    dedupe.close()
+
+    reopened = url_dedupe.URLDedupe(str(tmp_path / "dedupe"), capacity=5000, fp_rate=0.01)
+    assert reopened.built_at == dedupe.built_at
+    assert reopened.lookup("b")["job_id"] == "id-b" and not reopened.might_contain("gone")
+
+
+def _record(keys):
+    def run():
+        url_dedupe.get_url_dedupe().add_many((key, f"id-{key}") for key in keys)
+        return len(keys)
+
+    return run
+
+
+def test_forked_workers_share_the_store_and_flush_after_each_task(dedupe, tmp_path):
+    marker = tmp_path / "after_task.log"
+    tasks = [orchestrator.ScrapeTask(f"t{index}", "G", f"d{index}.example", _record([f"w{index}-{n}" for n in range(50)])) for index in range(4)]
+    report = orchestrator.run_tasks(
+        tasks,
+        workers=2,
+        log=False,
+        after_task=lambda: marker.open("a").write("flushed\n"),
+    )
+
+    assert report.total_jobs == 200
+    assert marker.read_text().count("flushed") == 4
+    for index in range(4):
+        assert all(dedupe.lookup(f"w{index}-{n}") for n in range(50))
+
+
+def test_queued_fingerprints_stay_bounded_and_keep_recent_jobs(monkeypatch):
+    flushed = []
+    monkeypatch.setattr(scraper_base, "backfill_jobs_from_documents", lambda docs: flushed.extend(doc["id"] for doc in docs) or {"imported_count": len(docs)})
+    monkeypatch.setattr(scraper_base, "jobs_postgres_main_write_enabled", lambda: True)
+    monkeypatch.setattr(scraper_base, "job_content_fingerprint", lambda doc: doc["title"])
+    monkeypatch.setattr(scraper_base, "SCRAPER_POSTGRES_BATCH_SIZE", 1)
+    monkeypatch.setattr(scraper_base, "SCRAPER_QUEUED_FINGERPRINT_LIMIT", 3)
+    monkeypatch.setattr(scraper_base, "_JOBS_POSTGRES_QUEUED_FINGERPRINTS", type(scraper_base._JOBS_POSTGRES_QUEUED_FINGERPRINTS)())
+
+    def save(number):
+        job = {"url": f"https://www.stepstone.de/stellenangebote--Lagerist-{number}.html", "title": f"Lagerist {number}", "company": "Nordlager", "description": "Kommissionierung und Verladung im Zentrallager. " * 4}
+        assert scraper_base.save_job_to_supabase(None, job)
+
+    for number in range(5):
+        save(number)
+    ids = list(flushed)
+    assert len(set(ids)) == 5
+    assert list(scraper_base._JOBS_POSTGRES_QUEUED_FINGERPRINTS) == ids[2:]
+    save(4)  # unchanged and still remembered: not queued again
+    save(0)  # evicted: queued again
+    assert flushed == ids + [ids[0]]
+    assert len(scraper_base._JOBS_POSTGRES_QUEUED_FINGERPRINTS) == 3
@@ -0,0 +1,37 @@
+-- Single round trip for the legacy auth context: profile row plus company links
+-- (owned, created, member - in that order) for one Supabase user.
+
+CREATE OR REPLACE FUNCTION public.get_auth_context(p_user_id UUID)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT jsonb_build_object(
+        'profile', (SELECT to_jsonb(p) FROM public.profiles p WHERE p.id = p_user_id),
+        'companies', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('id', links.id, 'name', links.name, 'type', links.kind) ORDER BY links.ord, links.seq)
+            FROM (
+                SELECT c.id, c.name, 'owner' AS kind, 1 AS ord, row_number() OVER () AS seq
+                FROM public.companies c
+                WHERE c.owner_id = p_user_id
+                UNION ALL
+                SELECT c.id, c.name, 'owner', 2, row_number() OVER ()
+                FROM public.companies c
+                WHERE c.created_by = p_user_id
+                UNION ALL
+                SELECT cm.company_id, c.name, 'member', 3, row_number() OVER ()
+                FROM public.company_members cm
+                LEFT JOIN public.companies c ON c.id = cm.company_id
+                WHERE cm.user_id = p_user_id
+            ) AS links
+            WHERE EXISTS (
+                SELECT 1 FROM public.profiles p WHERE p.id = p_user_id AND p.role = 'recruiter'
+            )
+        ), '[]'::jsonb)
+    );
+$$;
+
+REVOKE ALL ON FUNCTION public.get_auth_context(UUID) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.get_auth_context(UUID) TO service_role;
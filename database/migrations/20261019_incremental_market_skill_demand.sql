@@ -0,0 +1,26 @@
+-- Incremental market skill demand: per-job skill extractions (written once per scrape) so
+-- the daily refresh applies deltas instead of re-tokenizing every job description, and the
+-- current month's seasonal factor materialized next to each demand score.
+
+CREATE TABLE IF NOT EXISTS public.job_skill_extractions (
+    id BIGSERIAL PRIMARY KEY,
+    job_id TEXT NOT NULL UNIQUE,
+    country_code TEXT NOT NULL DEFAULT '',
+    city TEXT NOT NULL DEFAULT '',
+    day DATE NOT NULL,
+    skills JSONB NOT NULL DEFAULT '{}'::jsonb,
+    scraped_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS job_skill_extractions_day_idx
+    ON public.job_skill_extractions (day);
+
+ALTER TABLE public.market_skill_demand
+    ADD COLUMN IF NOT EXISTS seasonal_factor NUMERIC NOT NULL DEFAULT 1.0;
+
+CREATE INDEX IF NOT EXISTS market_skill_demand_window_end_id_idx
+    ON public.market_skill_demand (window_end, id);
+
+CREATE INDEX IF NOT EXISTS jobs_scraped_at_id_idx
+    ON public.jobs (scraped_at, id);
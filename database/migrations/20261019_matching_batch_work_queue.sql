@@ -0,0 +1,72 @@
+-- Work queue for matching batch jobs: a run's item ids are split into chunks that worker
+-- threads (or several scheduler processes) lease with an expiry, checkpoint while they
+-- work, and mark done. An expired lease hands the chunk to the next worker, which resumes
+-- at checkpoint_offset.
+
+CREATE TABLE IF NOT EXISTS public.matching_batch_chunks (
+    id BIGSERIAL PRIMARY KEY,
+    run_key TEXT NOT NULL,
+    job_name TEXT NOT NULL DEFAULT '',
+    chunk_index INTEGER NOT NULL,
+    item_ids JSONB NOT NULL DEFAULT '[]'::jsonb,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'leased', 'done', 'failed')),
+    leased_by TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    checkpoint_offset INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE (run_key, chunk_index)
+);
+
+CREATE INDEX IF NOT EXISTS matching_batch_chunks_open_idx
+    ON public.matching_batch_chunks (run_key, chunk_index)
+    WHERE status IN ('pending', 'leased');
+
+CREATE OR REPLACE FUNCTION public.lease_matching_batch_chunk(
+    p_run_key TEXT,
+    p_worker TEXT,
+    p_lease_seconds INTEGER,
+    p_max_attempts INTEGER
+)
+RETURNS SETOF public.matching_batch_chunks
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Chunks whose last allowed attempt expired are given up on.
+    UPDATE public.matching_batch_chunks
+       SET status = 'failed',
+           leased_by = NULL,
+           last_error = COALESCE(last_error, 'lease expired'),
+           updated_at = NOW()
+     WHERE run_key = p_run_key
+       AND status = 'leased'
+       AND lease_expires_at <= NOW()
+       AND attempts >= p_max_attempts;
+
+    RETURN QUERY
+    UPDATE public.matching_batch_chunks c
+       SET status = 'leased',
+           leased_by = p_worker,
+           lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+           attempts = c.attempts + 1,
+           updated_at = NOW()
+     WHERE c.id = (
+        SELECT q.id
+          FROM public.matching_batch_chunks q
+         WHERE q.run_key = p_run_key
+           AND (q.status = 'pending' OR (q.status = 'leased' AND q.lease_expires_at <= NOW()))
+         ORDER BY q.chunk_index
+         LIMIT 1
+         FOR UPDATE SKIP LOCKED
+     )
+    RETURNING c.*;
+END;
+$$;
+
+INSERT INTO public.data_retention_policies (table_name, retain_days, is_enabled)
+VALUES ('matching_batch_chunks', 14, TRUE)
+ON CONFLICT (table_name) DO NOTHING;
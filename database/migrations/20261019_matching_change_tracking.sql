@@ -0,0 +1,25 @@
+-- Change tracking for recommendation refreshes: profile edits, interactions (kind 'user')
+-- and job arrivals per market segment (kind 'segment') are appended as events. Each
+-- refresh consumer keeps a cursor and only recomputes users with events since it.
+
+CREATE TABLE IF NOT EXISTS public.matching_change_events (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL CHECK (kind IN ('user', 'segment')),
+    key TEXT NOT NULL,
+    reason TEXT NOT NULL DEFAULT '',
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS matching_change_events_created_idx
+    ON public.matching_change_events (created_at, id);
+
+CREATE TABLE IF NOT EXISTS public.matching_refresh_cursors (
+    consumer TEXT PRIMARY KEY,
+    last_cycle_at TIMESTAMPTZ NOT NULL,
+    last_full_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO public.data_retention_policies (table_name, retain_days, is_enabled)
+VALUES ('matching_change_events', 7, TRUE)
+ON CONFLICT (table_name) DO NOTHING;
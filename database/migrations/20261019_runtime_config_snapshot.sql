@@ -0,0 +1,130 @@
+-- Runtime config snapshot: one RPC returning all release flags / model configs, plus a
+-- version row that backend workers poll to drop their in-memory snapshot on change.
+
+CREATE TABLE IF NOT EXISTS public.runtime_config_version (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO public.runtime_config_version (id, version)
+VALUES (1, 1)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION public.bump_runtime_config_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    next_version BIGINT;
+BEGIN
+    UPDATE public.runtime_config_version
+       SET version = version + 1,
+           updated_at = NOW()
+     WHERE id = 1
+    RETURNING version INTO next_version;
+    PERFORM pg_notify('runtime_config_changed', COALESCE(next_version, 0)::text);
+    RETURN NULL;
+END;
+$$;
+
+DO $$
+DECLARE
+    tbl TEXT;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY[
+        'release_flags',
+        'model_registry',
+        'scoring_model_versions',
+        'model_experiments',
+        'action_prediction_models'
+    ]
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_config_version ON public.%1$I', tbl);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_config_version
+                 AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.%1$I
+                 FOR EACH STATEMENT EXECUTE FUNCTION public.bump_runtime_config_version()',
+            tbl
+        );
+    END LOOP;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.get_runtime_config_snapshot()
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'version', (SELECT version FROM public.runtime_config_version WHERE id = 1),
+        'release_flags', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'flag_key', flag_key,
+                'is_enabled', is_enabled,
+                'rollout_percent', rollout_percent,
+                'variant', variant,
+                'config_json', config_json
+            ))
+            FROM public.release_flags
+        ), '[]'::jsonb),
+        'model_registry', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'subsystem', subsystem,
+                'feature', feature,
+                'version', version,
+                'model_name', model_name,
+                'temperature', temperature,
+                'top_p', top_p,
+                'top_k', top_k,
+                'is_primary', is_primary,
+                'is_fallback', is_fallback,
+                'is_active', is_active,
+                'config_json', config_json,
+                'created_at', created_at
+            ))
+            FROM public.model_registry
+            WHERE is_active = TRUE
+        ), '[]'::jsonb),
+        'scoring_model_versions', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'version', version,
+                'alpha_skill', alpha_skill,
+                'beta_demand', beta_demand,
+                'gamma_seniority', gamma_seniority,
+                'delta_salary', delta_salary,
+                'epsilon_geo', epsilon_geo,
+                'is_active', is_active,
+                'created_at', created_at
+            ))
+            FROM public.scoring_model_versions
+        ), '[]'::jsonb),
+        'model_experiments', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'subsystem', subsystem,
+                'feature', feature,
+                'experiment_key', experiment_key,
+                'control_version', control_version,
+                'candidate_version', candidate_version,
+                'traffic_percent', traffic_percent,
+                'is_enabled', is_enabled,
+                'updated_at', updated_at
+            ))
+            FROM public.model_experiments
+            WHERE is_enabled = TRUE
+        ), '[]'::jsonb),
+        'action_prediction_models', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'model_key', model_key,
+                'version', version,
+                'objective', objective,
+                'coefficients_json', coefficients_json,
+                'feature_schema_json', feature_schema_json,
+                'is_active', is_active,
+                'created_at', created_at
+            ))
+            FROM public.action_prediction_models
+            WHERE is_active = TRUE
+        ), '[]'::jsonb)
+    );
+$$;
@@ -0,0 +1,139 @@
+"""
+Concurrent detail-page fetching for the site scrapers.
+
+A listing page yields a list of job URLs; the site parser used to fetch each detail
+page, then the iframe embedded in it, strictly one after the other. ``fetch_details``
+runs those fetches on a bounded thread pool instead:
+
+- every detail page goes to the pool as soon as the listing is parsed (a window of
+  ``workers * 2`` pages ahead of the one being processed);
+- the iframe URLs a page embeds (``frames`` callback) are queued the moment that page
+  arrives, so a job's iframe overlaps the next jobs' detail pages;
+- pages come back in listing order, each once its frames are in, or after waiting
+  ``timeout`` seconds for it with whatever did arrive (``DetailPage.timed_out``), so
+  a slow iframe costs its job's extras, not the job.
+
+Politeness stays with ``scrape_page``: its per-host throttle hands out request slots
+under a lock, so concurrent fetches to one host keep the per-domain minimum spacing.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+SCRAPER_DETAIL_WORKERS = max(1, int(os.getenv("SCRAPER_DETAIL_WORKERS", "4") or "4"))
+# How long to wait for one page and its frames; 0 waits without a limit.
+SCRAPER_DETAIL_TIMEOUT_SECONDS = max(0.0, float(os.getenv("SCRAPER_DETAIL_TIMEOUT_SECONDS", "90") or "90"))
+# Iframes inside iframes (stellenanzeigen -> jobstatic) are followed this deep.
+MAX_FRAME_DEPTH = 2
+
+
+@dataclass
+class DetailPage:
+    url: str
+    soup: Optional[object] = None
+    # Frame URL -> parsed frame (None when that fetch failed).
+    frames: Dict[str, Optional[object]] = field(default_factory=dict)
+    # True when the page was handed over before all of its fetches finished.
+    timed_out: bool = False
+
+    def frame(self, url: Optional[str]):
+        return self.frames.get(url) if url else None
+
+
+class _PageState:
+    def __init__(self, url: str):
+        self.page = DetailPage(url)
+        self.pending = 1
+        self.closed = False
+        self.done = threading.Event()
+
+
+def fetch_details(
+    urls: Iterable[str],
+    fetch: Callable[[str], Optional[object]],
+    frames: Optional[Callable[[str, object, int], List[str]]] = None,
+    *,
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Iterator[DetailPage]:
+    """
+    ``DetailPage`` for each of ``urls``, in order.
+
+    ``fetch(url)`` returns a parsed page or None; ``frames(url, soup, depth)`` lists
+    the frame URLs to load for a page (depth 0 is the detail page itself).
+    """
+    urls = list(dict.fromkeys(url for url in urls if url))
+    if not urls:
+        return
+    workers = max(1, workers or SCRAPER_DETAIL_WORKERS)
+    timeout = SCRAPER_DETAIL_TIMEOUT_SECONDS if timeout is None else timeout
+    lock = threading.Lock()
+    executor = ThreadPoolExecutor(max_workers=min(workers, len(urls)), thread_name_prefix="detail-fetch")
+
+    def finish(state: _PageState) -> None:
+        with lock:
+            state.pending -= 1
+            if state.pending:
+                return
+        state.done.set()
+
+    def load(state: _PageState, url: str, depth: int) -> None:
+        try:
+            try:
+                soup = fetch(url)
+            except Exception as exc:
+                print(f"⚠️ [Detail Fetch] {url}: {exc}")
+                soup = None
+            children: List[str] = []
+            if soup is not None and frames and depth < MAX_FRAME_DEPTH:
+                try:
+                    children = [child for child in frames(url, soup, depth) if child]
+                except Exception as exc:
+                    print(f"⚠️ [Detail Fetch] frames of {url}: {exc}")
+            with lock:
+                if state.closed:
+                    return
+                if depth == 0:
+                    state.page.soup = soup
+                else:
+                    state.page.frames[url] = soup
+                children = [child for child in children if child not in state.page.frames and child != state.page.url]
+                for child in children:
+                    state.page.frames[child] = None
+                state.pending += len(children)
+            for child in children:
+                executor.submit(load, state, child, depth + 1)
+        finally:
+            finish(state)
+
+    states: List[_PageState] = []
+
+    def submit_next() -> None:
+        if len(states) < len(urls):
+            state = _PageState(urls[len(states)])
+            states.append(state)
+            executor.submit(load, state, state.page.url, 0)
+
+    try:
+        for _ in range(workers * 2):
+            submit_next()
+        for index in range(len(urls)):
+            state = states[index]
+            finished = state.done.wait(timeout if timeout > 0 else None)
+            with lock:
+                state.closed = True
+                page = DetailPage(state.page.url, state.page.soup, dict(state.page.frames), not finished)
+            if not finished:
+                print(f"⚠️ [Detail Fetch] {page.url}: not complete after {timeout:.0f}s, using what arrived")
+            submit_next()
+            states[index] = None  # type: ignore[assignment]  (release the parsed pages)
+            yield page
+    finally:
+        with lock:
+            for state in states:
+                if state is not None:
+                    state.closed = True
+        executor.shutdown(wait=False, cancel_futures=True)
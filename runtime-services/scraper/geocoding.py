@@ -7,7 +7,10 @@ Uses Nominatim (OpenStreetMap) with rate limiting and fallback caching
 import requests
 import time
 import re
-from typing import Optional, Dict, Tuple
+import json
+import sqlite3
+import threading
+from typing import Callable, Optional, Dict, Iterable, List, Tuple
 from dotenv import load_dotenv
 import os
 
@@ -151,6 +154,14 @@ _FAILED_LOOKUPS: Dict[str, float] = {}
 _SUCCESSFUL_LOOKUPS: Dict[str, Dict] = {}
 _NOMINATIM_COOLDOWN_UNTIL = 0.0
 
+# Persistent cache of Nominatim answers: one SQLite file per host, shared by every scraper
+# process and by scripts/backfill_job_geocoding.py. Misses are kept only when Nominatim
+# actually answered (not on timeouts, 429s or cooldown) and for a shorter TTL.
+GEOCODE_CACHE_ENABLED = os.getenv("GEOCODE_CACHE_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "data/geocode_cache.sqlite3")
+GEOCODE_CACHE_TTL_SECONDS = max(3600, int(os.getenv("GEOCODE_CACHE_TTL_SECONDS", "7776000") or "7776000"))
+GEOCODE_CACHE_NEGATIVE_TTL_SECONDS = max(60, int(os.getenv("GEOCODE_CACHE_NEGATIVE_TTL_SECONDS", "86400") or "86400"))
+
 _ADMIN_AREA_TOKENS = {
     'okres', 'kraj', 'region', 'district', 'venkov', 'county'
 }
@@ -227,6 +238,209 @@ def _simplify_location_for_geocoding(location: str) -> str:
     return raw
 
 
+class Gazetteer:
+    """
+    The static city table, normalized once and indexed by first token.
+
+    ``longest_match`` returns the same key as scanning every key longest-first for a
+    contiguous token match, but only compares keys whose first token occurs in the query.
+    """
+
+    def __init__(self, entries: Dict[str, Tuple[float, float]]):
+        self.coords: Dict[str, Tuple[float, float]] = {}
+        for key, coords in entries.items():
+            self.coords.setdefault(normalize_address(key), coords)
+        # Rank = position in the longest-first scan order; ties keep insertion order.
+        self._ranked = sorted(self.coords, key=len, reverse=True)
+        self._by_first_token: Dict[str, List[Tuple[int, Tuple[str, ...]]]] = {}
+        for rank, key in enumerate(self._ranked):
+            tokens = tuple(key.split())
+            if tokens:
+                self._by_first_token.setdefault(tokens[0], []).append((rank, tokens))
+
+    def get(self, normalized: str) -> Optional[Tuple[float, float]]:
+        return self.coords.get(normalized)
+
+    def longest_match(self, tokens: List[str], skip_single_tokens: bool = False) -> Optional[str]:
+        best: Optional[int] = None
+        for start, token in enumerate(tokens):
+            for rank, key_tokens in self._by_first_token.get(token, ()):
+                if best is not None and rank >= best:
+                    break
+                if skip_single_tokens and len(key_tokens) == 1:
+                    continue
+                if tuple(tokens[start:start + len(key_tokens)]) == key_tokens:
+                    best = rank
+                    break
+        return None if best is None else self._ranked[best]
+
+
+_GAZETTEER = Gazetteer(MAJOR_CITIES_CACHE)
+
+
+class GeocodeCache:
+    """
+    Persistent geocode cache (one SQLite file per host, shared by all scraper processes).
+
+    ``lookup`` returns ``(hit, value)``; a hit with ``None`` is a remembered miss. Entries
+    expire after their TTL and expired rows are pruned every few hundred writes. Storage
+    errors are reported and treated as misses: the cache never fails a geocode.
+    """
+
+    _PRUNE_EVERY = 200
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int = GEOCODE_CACHE_TTL_SECONDS,
+        negative_ttl_seconds: int = GEOCODE_CACHE_NEGATIVE_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+        busy_timeout_ms: int = 2000,
+    ):
+        self.path = path
+        self.ttl_seconds = int(ttl_seconds)
+        self.negative_ttl_seconds = int(negative_ttl_seconds)
+        self._clock = clock
+        self._busy_timeout_ms = int(busy_timeout_ms)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS geocode_cache ("
+            "key TEXT PRIMARY KEY, value TEXT, expires_at REAL NOT NULL, updated_at REAL NOT NULL) WITHOUT ROWID"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self._busy_timeout_ms / 1000.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self._busy_timeout_ms}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def lookup(self, key: str) -> Tuple[bool, Optional[Dict]]:
+        try:
+            row = self._connect().execute("SELECT value, expires_at FROM geocode_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= self._clock():
+                self._count("misses")
+                return False, None
+            if row[0] is None:
+                self._count("negative_hits")
+                return True, None
+            self._count("hits")
+            return True, json.loads(row[0])
+        except Exception as exc:
+            self._count("errors")
+            print(f"⚠️ [Geocode Cache] read failed: {exc}")
+            return False, None
+
+    def set(self, key: str, value: Dict) -> None:
+        self._store(key, json.dumps(value, ensure_ascii=False), self.ttl_seconds)
+
+    def set_missing(self, key: str) -> None:
+        self._store(key, None, self.negative_ttl_seconds)
+
+    def _store(self, key: str, encoded: Optional[str], ttl_seconds: int) -> None:
+        try:
+            now = self._clock()
+            self._connect().execute(
+                "INSERT INTO geocode_cache (key, value, expires_at, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+                "expires_at = excluded.expires_at, updated_at = excluded.updated_at",
+                (key, encoded, now + ttl_seconds, now),
+            )
+            self._count("stores")
+            self._writes += 1
+            if self._writes % self._PRUNE_EVERY == 0:
+                self.prune()
+        except Exception as exc:
+            self._count("errors")
+            print(f"⚠️ [Geocode Cache] write failed: {exc}")
+
+    def prune(self) -> None:
+        """Drop expired entries."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            evicted = conn.execute("DELETE FROM geocode_cache WHERE expires_at <= ?", (self._clock(),)).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if evicted:
+            self._count("evictions", evicted)
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM geocode_cache")
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        try:
+            stats["entries"] = self._connect().execute("SELECT COUNT(*) FROM geocode_cache").fetchone()[0]
+        except Exception:
+            pass
+        return stats
+
+
+_cache_lock = threading.Lock()
+_cache_instance: Optional[GeocodeCache] = None
+_cache_configured = False
+
+
+def get_geocode_cache() -> Optional[GeocodeCache]:
+    """The process-wide persistent cache, or None when disabled or unusable."""
+    global _cache_instance, _cache_configured
+    if _cache_configured:
+        return _cache_instance
+    with _cache_lock:
+        if not _cache_configured:
+            if GEOCODE_CACHE_ENABLED:
+                try:
+                    _cache_instance = GeocodeCache(GEOCODE_CACHE_PATH)
+                except Exception as exc:
+                    print(f"⚠️ [Geocode Cache] disabled, cannot open {GEOCODE_CACHE_PATH}: {exc}")
+            _cache_configured = True
+    return _cache_instance
+
+
+def set_geocode_cache(cache: Optional[GeocodeCache]) -> None:
+    """Replace the process-wide persistent cache (``None`` disables it)."""
+    global _cache_instance, _cache_configured
+    with _cache_lock:
+        _cache_instance = cache
+        _cache_configured = True
+
+
+def _static_result(coords: Tuple[float, float], source: str) -> Dict:
+    lat, lon = coords
+    return {
+        'lat': lat,
+        'lon': lon,
+        'country': 'CZ' if lat > 47 and lat < 51.5 and lon > 12 and lon < 19 else 'EU',
+        'source': source
+    }
+
+
+def _lookup_key(location: str) -> Optional[str]:
+    """Key ``geocode_location`` caches a location under, or None if it is never geocoded."""
+    if not location or not location.strip():
+        return None
+    lowered_raw = " ".join(str(location).strip().lower().replace("/", " ").split())
+    if lowered_raw in _NON_GEOCODABLE_LOCATION_TOKENS:
+        return None
+    return normalize_address(_simplify_location_for_geocoding(location) or location)
+
+
 def geocode_location(location: str) -> Optional[Dict]:
     """
     Geocode a location string to latitude/longitude
@@ -242,12 +456,7 @@ def geocode_location(location: str) -> Optional[Dict]:
         return None
 
     simplified_location = _simplify_location_for_geocoding(location)
-    location_candidates = [candidate for candidate in [location, simplified_location] if candidate]
-
-    # Build normalized cache keys so matching is robust to diacritics/hyphens.
-    normalized_cache: Dict[str, Tuple[float, float]] = {}
-    for key, coords in MAJOR_CITIES_CACHE.items():
-        normalized_cache.setdefault(normalize_address(key), coords)
+    location_candidates = [candidate for candidate in dict.fromkeys([location, simplified_location]) if candidate]
 
     normalized = normalize_address(simplified_location or location)
     primary_segment = normalize_address((simplified_location or location).split(',')[0].strip())
@@ -262,83 +471,92 @@ def geocode_location(location: str) -> Optional[Dict]:
     if failed_at and now_ts - failed_at < _FAILED_LOOKUP_TTL_SECONDS:
         return None
 
-    # 1. Check static cache for exact match (districts/neighborhoods first)
-    if normalized in normalized_cache:
-        lat, lon = normalized_cache[normalized]
-        result = {
-            'lat': lat,
-            'lon': lon,
-            'country': 'CZ' if lat > 47 and lat < 51.5 and lon > 12 and lon < 19 else 'EU',
-            'source': 'static_cache'
-        }
-        _SUCCESSFUL_LOOKUPS[normalized] = dict(result)
-        return result
-
-    # If full string contains additional context, try exact match on primary segment.
-    if primary_segment in normalized_cache:
-        lat, lon = normalized_cache[primary_segment]
-        result = {
-            'lat': lat,
-            'lon': lon,
-            'country': 'CZ' if lat > 47 and lat < 51.5 and lon > 12 and lon < 19 else 'EU',
-            'source': 'static_cache'
-        }
+    # 1. Check static cache for exact match (districts/neighborhoods first); if the full
+    # string contains additional context, try exact match on primary segment.
+    coords = _GAZETTEER.get(normalized) or _GAZETTEER.get(primary_segment)
+    if coords:
+        result = _static_result(coords, 'static_cache')
         _SUCCESSFUL_LOOKUPS[normalized] = dict(result)
         return result
 
     # 2. Conservative partial matching on PRIMARY segment only.
     # This avoids false positives like "Kuřim, okres Brno-venkov" -> Brno centrum.
+    # Generic single-word city names are not matched in admin-area strings ("brno venkov").
     primary_tokens = primary_segment.split()
     has_admin_context = any(tok in _ADMIN_AREA_TOKENS for tok in primary_tokens)
+    key = _GAZETTEER.longest_match(primary_tokens, skip_single_tokens=has_admin_context)
+    if key:
+        result = _static_result(_GAZETTEER.coords[key], 'static_cache_partial')
+        _SUCCESSFUL_LOOKUPS[normalized] = dict(result)
+        return result
 
-    cache_keys = sorted(normalized_cache.keys(), key=len, reverse=True)
-    for key in cache_keys:
-        key_tokens = key.split()
-        if not key_tokens:
-            continue
-
-        # Do not match generic single-word city names in admin-area strings ("brno venkov").
-        if has_admin_context and len(key_tokens) == 1:
-            continue
+    # 3. Answers this or another process already got from Nominatim.
+    cache = get_geocode_cache()
+    if cache is not None:
+        hit, value = cache.lookup(normalized)
+        if hit and value:
+            _SUCCESSFUL_LOOKUPS[normalized] = dict(value)
+            return value
+        if hit:
+            _FAILED_LOOKUPS[normalized] = now_ts
+            return None
 
-        # Require contiguous token sequence match.
-        key_len = len(key_tokens)
-        matched = False
-        for i in range(0, max(0, len(primary_tokens) - key_len + 1)):
-            if primary_tokens[i:i + key_len] == key_tokens:
-                matched = True
-                break
-
-        if matched:
-            lat, lon = normalized_cache[key]
-            result = {
-                'lat': lat,
-                'lon': lon,
-                'country': 'CZ' if lat > 47 and lat < 51.5 and lon > 12 and lon < 19 else 'EU',
-                'source': 'static_cache_partial'
-            }
-            _SUCCESSFUL_LOOKUPS[normalized] = dict(result)
-            return result
-    
-    # 3. Try Nominatim API for unknown locations
+    # 4. Try Nominatim API for unknown locations
+    answered = True
     for candidate in location_candidates:
-        result = _geocode_with_nominatim(candidate)
+        result, definitive = _nominatim_search(candidate)
         if result:
             _SUCCESSFUL_LOOKUPS[normalized] = dict(result)
+            if cache is not None:
+                cache.set(normalized, result)
             return result
+        answered = answered and definitive
 
     _FAILED_LOOKUPS[normalized] = now_ts
+    if cache is not None and answered:
+        cache.set_missing(normalized)
     return None
 
 
+def geocode_many(locations: Iterable[str]) -> Dict[str, Optional[Dict]]:
+    """
+    Geocode a batch of location strings, resolving each distinct location once.
+
+    Locations that normalize to the same key share one lookup (``geocode_location``
+    would return the first one's answer for the rest anyway). Returns a dict keyed by
+    the input strings.
+    """
+    results: Dict[str, Optional[Dict]] = {}
+    by_key: Dict[str, Optional[Dict]] = {}
+    for location in locations:
+        if location in results:
+            continue
+        key = _lookup_key(location)
+        if key is None:
+            results[location] = None
+            continue
+        if key not in by_key:
+            by_key[key] = geocode_location(location)
+        results[location] = dict(by_key[key]) if by_key[key] else None
+    return results
+
+
 def _geocode_with_nominatim(address: str) -> Optional[Dict]:
     """
     Call Nominatim OpenStreetMap API with rate limiting
     """
+    return _nominatim_search(address)[0]
+
+
+def _nominatim_search(address: str) -> Tuple[Optional[Dict], bool]:
+    """
+    Nominatim lookup returning ``(result, definitive)``: ``definitive`` is False when no
+    answer was obtained (cooldown, 429, timeout, error), so a miss must not be remembered.
+    """
     global _last_api_call_time, _call_count_per_minute, _NOMINATIM_COOLDOWN_UNTIL
 
     if _NOMINATIM_COOLDOWN_UNTIL > time.time():
-        return None
+        return None, False
     
     # Rate limiting: 1 request per second for Nominatim
     now = time.time()
@@ -375,11 +593,11 @@ def _geocode_with_nominatim(address: str) -> Optional[Dict]:
         if response.status_code == 429:
             _NOMINATIM_COOLDOWN_UNTIL = time.time() + 30
             print(f"⚠️ Nominatim returned 429 for '{address}'")
-            return None
+            return None, False
 
         if response.status_code != 200:
             print(f"⚠️ Nominatim returned {response.status_code} for '{address}'")
-            return None
+            return None, False
         
         data = response.json()
         
@@ -390,7 +608,8 @@ def _geocode_with_nominatim(address: str) -> Optional[Dict]:
                 'lon': float(result['lon']),
                 'country': result.get('address', {}).get('country_code', 'UNKNOWN').upper(),
                 'source': 'nominatim_api'
-            }
+            }, True
+        return None, True
     
     except requests.exceptions.Timeout:
         print(f"⚠️ Nominatim request timeout for '{address}'")
@@ -399,7 +618,7 @@ def _geocode_with_nominatim(address: str) -> Optional[Dict]:
     except Exception as e:
         print(f"⚠️ Geocoding error for '{address}': {e}")
     
-    return None
+    return None, False
 
 
 def get_coordinates(location: str) -> Optional[Tuple[float, float]]:
@@ -0,0 +1,52 @@
+"""
+One place that decides how the scrapers turn HTML into a BeautifulSoup tree.
+
+Every site parser works on the BeautifulSoup API (``find``/``find_all``/``select``/
+``get_text`` plus tree navigation), so the backend is chosen at the tree-builder
+level: ``lxml`` (C, several times faster) when it is importable, ``html.parser``
+(pure Python, always there) otherwise. ``SCRAPER_HTML_PARSER`` pins one of them;
+``auto`` (the default) takes the fastest available. The parity harness in
+``backend/tests/test_scraper_parser_parity.py`` runs every site parser over recorded
+pages under each backend and diffs the extracted jobs.
+"""
+
+import os
+from typing import List, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401  (only probed; BeautifulSoup loads the tree builder)
+except ImportError:  # optional; html.parser is always there
+    lxml = None
+
+FALLBACK_BACKEND = "html.parser"
+# Fastest first; "auto" takes the first one that is installed.
+BACKENDS = ("lxml", FALLBACK_BACKEND)
+
+SCRAPER_HTML_PARSER = os.getenv("SCRAPER_HTML_PARSER", "auto").strip().lower() or "auto"
+
+_warned: set = set()
+
+
+def available_backends() -> List[str]:
+    return [name for name in BACKENDS if name != "lxml" or lxml is not None]
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """The installed backend for ``name`` (default: SCRAPER_HTML_PARSER), falling back to html.parser."""
+    requested = (name or SCRAPER_HTML_PARSER).strip().lower()
+    available = available_backends()
+    if requested == "auto":
+        return available[0]
+    if requested in available:
+        return requested
+    if requested not in _warned:
+        _warned.add(requested)
+        print(f"⚠️ [HTML Parser] '{requested}' is not available, using {FALLBACK_BACKEND}")
+    return FALLBACK_BACKEND
+
+
+def make_soup(markup, backend: Optional[str] = None) -> BeautifulSoup:
+    """``BeautifulSoup(markup, <backend>)`` with the configured (or given) backend."""
+    return BeautifulSoup(markup, resolve_backend(backend))
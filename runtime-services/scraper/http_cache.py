@@ -0,0 +1,368 @@
+"""
+Conditional HTTP fetches backed by an on-disk response store for the scrapers.
+
+The last 200 response of every URL is kept in one SQLite file (zstd
+compressed when ``zstandard`` is installed, zlib otherwise) with its ETag /
+Last-Modified validators and a hash of the body. The next fetch of that URL is
+conditional: a 304 is answered from the stored body, and a 200 whose body hashes
+the same as before is recognised too. Responses returned by ``fetch`` carry
+``from_cache``, ``content_changed`` and ``body_hash``, and ``HTTPCache.parsed``
+keeps a JSON-able parse result per URL and body hash, so a page that did not change
+is not parsed again.
+
+With ``SCRAPER_HTTP_REPLAY=true`` nothing goes to the network: every fetch is
+answered from the store (``HTTPReplayMiss`` when a URL was never stored), which lets
+parsers be developed and benchmarked offline against real pages.
+
+The store is opt-in (``SCRAPER_HTTP_CACHE_ENABLED``): the scraper job turns it on,
+while other processes that import the scrapers, such as the API's RSS sources, fetch
+without it. It lives next to this module unless ``SCRAPER_HTTP_CACHE_PATH`` says otherwise.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is always there
+    zstandard = None
+
+SCRAPER_HTTP_CACHE_ENABLED = os.getenv("SCRAPER_HTTP_CACHE_ENABLED", "false").strip().lower() in {"1", "true", "yes", "on"}
+SCRAPER_HTTP_CACHE_PATH = os.getenv(
+    "SCRAPER_HTTP_CACHE_PATH", str(Path(__file__).resolve().parent / "data" / "http_cache.sqlite3")
+)
+SCRAPER_HTTP_CACHE_TTL_SECONDS = max(3600, int(os.getenv("SCRAPER_HTTP_CACHE_TTL_SECONDS", "1209600") or "1209600"))
+SCRAPER_HTTP_REPLAY = os.getenv("SCRAPER_HTTP_REPLAY", "false").strip().lower() in {"1", "true", "yes", "on"}
+
+
+class HTTPReplayMiss(LookupError):
+    """Raised in replay mode for a URL that has no stored response."""
+
+
+def _compress(body: bytes):
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=6).compress(body)
+    return "zlib", zlib.compress(body, 6)
+
+
+def _decompress(codec: str, blob: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("stored with zstd but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+class HTTPCache:
+    """
+    Per-URL validators, compressed bodies and parse results in one SQLite file.
+
+    Storage errors are reported and treated as misses: the cache never fails a fetch.
+    Responses not re-validated within ``ttl_seconds`` are pruned every few hundred writes.
+    """
+
+    _PRUNE_EVERY = 200
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int = SCRAPER_HTTP_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+        busy_timeout_ms: int = 2000,
+    ):
+        self.path = path
+        self.ttl_seconds = int(ttl_seconds)
+        self._clock = clock
+        self._busy_timeout_ms = int(busy_timeout_ms)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "not_modified": 0,
+            "unchanged": 0,
+            "changed": 0,
+            "replayed": 0,
+            "bytes_downloaded": 0,
+            "bytes_saved": 0,
+            "parse_hits": 0,
+            "parse_misses": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS http_responses ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_type TEXT, encoding TEXT, "
+            "body_hash TEXT NOT NULL, codec TEXT NOT NULL, body BLOB NOT NULL, size INTEGER NOT NULL, "
+            "fetched_at REAL NOT NULL, checked_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS http_parsed ("
+            "url TEXT NOT NULL, parser TEXT NOT NULL, body_hash TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (url, parser)) WITHOUT ROWID"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self._busy_timeout_ms / 1000.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self._busy_timeout_ms}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = self._connect().execute(
+                "SELECT etag, last_modified, content_type, encoding, body_hash, codec, body, size "
+                "FROM http_responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            etag, last_modified, content_type, encoding, body_hash, codec, blob, size = row
+            return {
+                "etag": etag,
+                "last_modified": last_modified,
+                "content_type": content_type,
+                "encoding": encoding,
+                "body_hash": body_hash,
+                "body": _decompress(codec, blob),
+                "size": size,
+            }
+        except Exception as exc:
+            self._count("errors")
+            print(f"⚠️ [HTTP Cache] read failed: {exc}")
+            return None
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, response: requests.Response, body_hash: str, changed: bool = True) -> None:
+        now = self._clock()
+        try:
+            conn = self._connect()
+            if changed:
+                codec, blob = _compress(response.content)
+                conn.execute(
+                    "INSERT INTO http_responses "
+                    "(url, etag, last_modified, content_type, encoding, body_hash, codec, body, size, fetched_at, checked_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified, "
+                    "content_type = excluded.content_type, encoding = excluded.encoding, body_hash = excluded.body_hash, "
+                    "codec = excluded.codec, body = excluded.body, size = excluded.size, "
+                    "fetched_at = excluded.fetched_at, checked_at = excluded.checked_at",
+                    (
+                        url,
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                        response.headers.get("Content-Type"),
+                        response.encoding,
+                        body_hash,
+                        codec,
+                        blob,
+                        len(response.content),
+                        now,
+                        now,
+                    ),
+                )
+            else:
+                conn.execute(
+                    "UPDATE http_responses SET etag = ?, last_modified = ?, checked_at = ? WHERE url = ?",
+                    (response.headers.get("ETag"), response.headers.get("Last-Modified"), now, url),
+                )
+            self._writes += 1
+            if self._writes % self._PRUNE_EVERY == 0:
+                self.prune()
+        except Exception as exc:
+            self._count("errors")
+            print(f"⚠️ [HTTP Cache] write failed: {exc}")
+
+    def touch(self, url: str) -> None:
+        try:
+            self._connect().execute("UPDATE http_responses SET checked_at = ? WHERE url = ?", (self._clock(), url))
+        except Exception as exc:
+            self._count("errors")
+            print(f"⚠️ [HTTP Cache] write failed: {exc}")
+
+    def parsed(self, url: str, parser: str, body_hash: str, parse: Callable[[], Any]) -> Any:
+        """
+        ``parse()``'s result for this body of ``url``, computed once per body hash.
+
+        ``parser`` names the parser and its version; bump it when its output changes.
+        """
+        try:
+            row = self._connect().execute(
+                "SELECT body_hash, value FROM http_parsed WHERE url = ? AND parser = ?", (url, parser)
+            ).fetchone()
+            if row is not None and row[0] == body_hash:
+                self._count("parse_hits")
+                return json.loads(row[1])
+        except Exception as exc:
+            self._count("errors")
+            print(f"⚠️ [HTTP Cache] read failed: {exc}")
+        self._count("parse_misses")
+        value = parse()
+        try:
+            self._connect().execute(
+                "INSERT INTO http_parsed (url, parser, body_hash, value) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(url, parser) DO UPDATE SET body_hash = excluded.body_hash, value = excluded.value",
+                (url, parser, body_hash, json.dumps(value, ensure_ascii=False)),
+            )
+        except Exception as exc:
+            self._count("errors")
+            print(f"⚠️ [HTTP Cache] write failed: {exc}")
+        return value
+
+    def prune(self) -> None:
+        """Drop responses not re-validated within the TTL, and parse results of dropped URLs."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            evicted = conn.execute(
+                "DELETE FROM http_responses WHERE checked_at <= ?", (self._clock() - self.ttl_seconds,)
+            ).rowcount
+            conn.execute("DELETE FROM http_parsed WHERE url NOT IN (SELECT url FROM http_responses)")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if evicted:
+            self._count("evictions", evicted)
+
+    def clear(self) -> None:
+        conn = self._connect()
+        conn.execute("DELETE FROM http_responses")
+        conn.execute("DELETE FROM http_parsed")
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        try:
+            entries, stored = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM http_responses"
+            ).fetchone()
+            stats["entries"], stats["stored_bytes"] = entries, stored
+        except Exception:
+            pass
+        return stats
+
+
+_cache_lock = threading.Lock()
+_cache_instance: Optional[HTTPCache] = None
+_cache_configured = False
+_replay = SCRAPER_HTTP_REPLAY
+
+
+def get_http_cache() -> Optional[HTTPCache]:
+    """The process-wide response store, or None when disabled or unusable."""
+    global _cache_instance, _cache_configured
+    if _cache_configured:
+        return _cache_instance
+    with _cache_lock:
+        if not _cache_configured:
+            if SCRAPER_HTTP_CACHE_ENABLED or SCRAPER_HTTP_REPLAY:
+                try:
+                    _cache_instance = HTTPCache(SCRAPER_HTTP_CACHE_PATH)
+                except Exception as exc:
+                    print(f"⚠️ [HTTP Cache] disabled, cannot open {SCRAPER_HTTP_CACHE_PATH}: {exc}")
+            _cache_configured = True
+    return _cache_instance
+
+
+def set_http_cache(cache: Optional[HTTPCache], replay: Optional[bool] = None) -> None:
+    """Replace the process-wide response store (``None`` disables it) and optionally the replay switch."""
+    global _cache_instance, _cache_configured, _replay
+    with _cache_lock:
+        _cache_instance = cache
+        _cache_configured = True
+        if replay is not None:
+            _replay = bool(replay)
+
+
+def replay_enabled() -> bool:
+    return _replay
+
+
+def _stored_response(url: str, entry: Dict[str, Any], changed: bool) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = entry["body"]
+    response.encoding = entry.get("encoding")
+    for header, key in (("Content-Type", "content_type"), ("ETag", "etag"), ("Last-Modified", "last_modified")):
+        if entry.get(key):
+            response.headers[header] = entry[key]
+    response.from_cache = True
+    response.content_changed = changed
+    response.body_hash = entry["body_hash"]
+    return response
+
+
+def fetch(session, url: str, cache: Optional[HTTPCache] = None, **kwargs) -> requests.Response:
+    """
+    ``session.get(url, **kwargs)`` made conditional on what the cache holds for ``url``.
+
+    ``session`` is a ``requests.Session`` or the ``requests`` module. A 304 comes back
+    as the stored 200 with ``from_cache = True``; ``content_changed`` is False for a
+    304 and for a 200 whose body is byte-identical to the stored one. Other statuses
+    are returned as they are and never stored.
+    """
+    cache = cache if cache is not None else get_http_cache()
+    entry = cache.lookup(url) if cache is not None else None
+    if _replay:
+        if entry is None:
+            raise HTTPReplayMiss(url)
+        cache._count("replayed")
+        return _stored_response(url, entry, changed=True)
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry is not None:
+        headers.update(HTTPCache.conditional_headers(entry))
+    response = session.get(url, headers=headers, **kwargs)
+    response.from_cache = False
+    response.content_changed = True
+    response.body_hash = None
+    if cache is None:
+        return response
+
+    cache._count("requests")
+    cache._count("bytes_downloaded", len(response.content or b""))
+    if response.status_code == 304 and entry is not None:
+        cache.touch(url)
+        cache._count("not_modified")
+        cache._count("bytes_saved", int(entry["size"]))
+        return _stored_response(url, entry, changed=False)
+    if response.status_code != 200:
+        return response
+
+    body_hash = hashlib.sha256(response.content).hexdigest()
+    changed = entry is None or entry["body_hash"] != body_hash
+    cache._count("changed" if changed else "unchanged")
+    cache.store(url, response, body_hash, changed=changed)
+    response.content_changed = changed
+    response.body_hash = body_hash
+    return response
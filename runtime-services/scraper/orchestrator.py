@@ -0,0 +1,316 @@
+"""
+Work-stealing task orchestrator for the scrapers.
+
+Scraping is split into small tasks (one site x one listing page range, or one
+monolithic source). A fixed pool of worker processes takes task indexes from one
+shared queue, so a free worker always picks up the next task instead of waiting
+for the slowest country. The parent only puts a task on the queue when a worker is
+idle and the task's domain is free: at most ``domain_concurrency`` tasks per domain
+run at once and their starts are ``domain_min_interval`` seconds apart, whichever
+worker they land on. Every task's timing and outcome ends up in a ``RunReport``.
+
+Workers are forked, so tasks (and their ``run`` callables) never cross a pipe; only
+indexes and plain result tuples do.
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+OK = "ok"
+ERROR = "error"
+TIMEOUT = "timeout"
+CRASHED = "crashed"
+SKIPPED = "skipped"
+
+# A page range at least this long that saved nothing ends its site, like three
+# consecutive empty pages end BaseScraper.scrape_website.
+EMPTY_PAGES_STOP = 3
+
+
+@dataclass
+class ScrapeTask:
+    key: str
+    group: str
+    domain: str
+    run: Callable[[], int]
+    site: str = ""
+    first_page: int = 0
+    last_page: int = 0
+
+    @property
+    def pages(self) -> int:
+        return self.last_page - self.first_page + 1 if self.last_page else 0
+
+
+@dataclass
+class TaskResult:
+    key: str
+    group: str
+    domain: str
+    status: str
+    jobs: int = 0
+    worker: Optional[int] = None
+    queued_at: float = 0.0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    error: str = ""
+
+    @property
+    def seconds(self) -> float:
+        return max(0.0, self.finished_at - self.started_at) if self.started_at else 0.0
+
+    @property
+    def wait_seconds(self) -> float:
+        return max(0.0, self.started_at - self.queued_at) if self.started_at and self.queued_at else 0.0
+
+
+@dataclass
+class RunReport:
+    workers: int
+    started_at: float
+    finished_at: float = 0.0
+    results: List[TaskResult] = field(default_factory=list)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return max(0.0, self.finished_at - self.started_at)
+
+    @property
+    def total_jobs(self) -> int:
+        return sum(result.jobs for result in self.results)
+
+    def jobs_by_group(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for result in self.results:
+            totals[result.group] = totals.get(result.group, 0) + result.jobs
+        return totals
+
+    def count(self, status: str) -> int:
+        return sum(1 for result in self.results if result.status == status)
+
+    @property
+    def utilization(self) -> float:
+        capacity = self.elapsed_seconds * self.workers
+        return sum(result.seconds for result in self.results) / capacity if capacity else 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "total_jobs": self.total_jobs,
+            "utilization": round(self.utilization, 3),
+            "jobs_by_group": self.jobs_by_group(),
+            "tasks": [
+                {
+                    "key": result.key,
+                    "group": result.group,
+                    "domain": result.domain,
+                    "status": result.status,
+                    "jobs": result.jobs,
+                    "worker": result.worker,
+                    "wait_seconds": round(result.wait_seconds, 3),
+                    "seconds": round(result.seconds, 3),
+                    "error": result.error,
+                }
+                for result in self.results
+            ],
+        }
+
+    def write(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.as_dict(), handle, ensure_ascii=False, indent=2)
+
+
+def site_domain(url: str) -> str:
+    try:
+        domain = urlparse(url).netloc.lower()
+    except Exception:
+        return ""
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def split_pages(last_page: int, pages_per_task: int) -> List[tuple]:
+    """``[(first, last), ...]`` covering pages 1..last_page in chunks of ``pages_per_task``."""
+    size = max(1, int(pages_per_task))
+    return [(first, min(first + size - 1, last_page)) for first in range(1, last_page + 1, size)]
+
+
+def _worker_loop(worker_id: int, tasks: List[ScrapeTask], task_queue, result_queue, current, since, after_task=None) -> None:
+    # ``current``/``since`` are shared memory, written before the task runs, so the parent
+    # knows what a worker was doing even if it dies before anything it queued is flushed.
+    while True:
+        index = task_queue.get()
+        if index is None:
+            return
+        started_at = time.time()
+        since.value = started_at
+        current.value = index
+        try:
+            jobs, status, error = int(tasks[index].run() or 0), OK, ""
+        except Exception as exc:
+            jobs, status, error = 0, ERROR, f"{type(exc).__name__}: {exc}"
+            print(f"❌ [Orchestrator] {tasks[index].key}: {error}")
+            traceback.print_exc()
+        if after_task is not None:
+            # Forked workers exit without running atexit hooks, so whatever a task
+            # buffered is written out here, before its result is reported.
+            try:
+                after_task()
+            except Exception as exc:
+                print(f"⚠️ [Orchestrator] after-task hook failed for {tasks[index].key}: {exc}")
+        result_queue.put((index, worker_id, started_at, time.time(), status, jobs, error))
+        current.value = -1
+
+
+def run_tasks(
+    tasks: List[ScrapeTask],
+    workers: int = 2,
+    domain_concurrency: int = 1,
+    domain_min_interval: float = 0.0,
+    task_timeout: Optional[float] = None,
+    poll_seconds: float = 0.5,
+    log: bool = True,
+    after_task: Optional[Callable[[], None]] = None,
+) -> RunReport:
+    """
+    Run ``tasks`` on a pool of ``workers`` processes and return the run report.
+
+    Tasks are dispatched in list order, skipping ones whose domain is busy or was
+    started less than ``domain_min_interval`` seconds ago. A task that raises is
+    recorded as ``error``; one that outlives ``task_timeout`` or takes its worker down
+    is recorded as ``timeout``/``crashed`` and the worker is replaced. Either way the
+    rest of the run continues. Later page ranges of a site are ``skipped`` once a long
+    enough range saved nothing. ``after_task`` runs in the worker after every task.
+    """
+    ctx = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+    workers = max(1, int(workers))
+    report = RunReport(workers=workers, started_at=time.time())
+    task_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    results: Dict[int, TaskResult] = {}
+    pending = list(range(len(tasks)))
+    dispatched: Dict[int, float] = {}  # queued or running task index -> queued at
+    domain_running: Dict[str, int] = {}
+    domain_started: Dict[str, float] = {}
+    procs: Dict[int, tuple] = {}  # worker id -> (process, current task index, task started at)
+    next_worker_id = 0
+
+    def spawn() -> None:
+        nonlocal next_worker_id
+        current, since = ctx.Value("l", -1, lock=False), ctx.Value("d", 0.0, lock=False)
+        proc = ctx.Process(
+            target=_worker_loop,
+            args=(next_worker_id, tasks, task_queue, result_queue, current, since, after_task),
+            daemon=True,
+        )
+        proc.start()
+        procs[next_worker_id] = (proc, current, since)
+        next_worker_id += 1
+
+    def finish(index: int, status: str, worker: int, started_at: float, finished_at: float, jobs: int = 0, error: str = "") -> None:
+        task = tasks[index]
+        result = results[index] = TaskResult(task.key, task.group, task.domain, status, jobs, worker, dispatched.pop(index), started_at, finished_at, error)
+        domain_running[task.domain] = max(0, domain_running.get(task.domain, 0) - 1)
+        if log:
+            icon = "✅" if status == OK else "❌"
+            print(f"{icon} [Orchestrator] {task.key}: {status} jobs={jobs} ({result.seconds:.1f}s){' ' + error if error else ''}")
+        if status == OK and jobs == 0 and task.site and task.pages >= EMPTY_PAGES_STOP:
+            for later in [i for i in pending if tasks[i].site == task.site and tasks[i].first_page > task.last_page]:
+                pending.remove(later)
+                results[later] = TaskResult(tasks[later].key, tasks[later].group, tasks[later].domain, SKIPPED, finished_at=time.time())
+                if log:
+                    print(f"⏭️ [Orchestrator] {tasks[later].key}: skipped, {task.key} found nothing new")
+
+    def dispatch() -> Optional[float]:
+        """Queue eligible tasks for idle workers; return seconds until the next domain frees up."""
+        now = time.time()
+        wait: Optional[float] = None
+        for index in list(pending):
+            if len(dispatched) >= workers:
+                break
+            domain = tasks[index].domain
+            if domain_running.get(domain, 0) >= domain_concurrency:
+                continue
+            ready_in = domain_started.get(domain, float("-inf")) + domain_min_interval - now
+            if ready_in > 0:
+                wait = ready_in if wait is None else min(wait, ready_in)
+                continue
+            pending.remove(index)
+            dispatched[index] = now
+            domain_running[domain] = domain_running.get(domain, 0) + 1
+            domain_started[domain] = now
+            task_queue.put(index)
+        return wait
+
+    if log:
+        print(f"🧭 [Orchestrator] {len(tasks)} tasks on {workers} workers")
+    for _ in range(min(workers, len(tasks))):
+        spawn()
+
+    try:
+        while pending or dispatched:
+            wait = dispatch()
+            timeout = poll_seconds if wait is None else max(0.01, min(poll_seconds, wait))
+            try:
+                index, worker_id, started_at, finished_at, status, jobs, error = result_queue.get(timeout=timeout)
+                # A result that arrives after its task was given up on is ignored.
+                if index in dispatched:
+                    finish(index, status, worker_id, started_at, finished_at, jobs, error)
+            except queue.Empty:
+                pass
+
+            now = time.time()
+            for worker_id, (proc, current, since) in list(procs.items()):
+                index = current.value
+                alive = proc.is_alive()
+                timed_out = alive and index in dispatched and task_timeout is not None and now - since.value > task_timeout
+                if alive and not timed_out:
+                    continue
+                if timed_out:
+                    proc.terminate()
+                    proc.join(5)
+                if index in dispatched:
+                    status = TIMEOUT if timed_out else CRASHED
+                    finish(index, status, worker_id, since.value, now, error=f"worker {worker_id} {'timed out' if timed_out else 'exited'}")
+                procs.pop(worker_id)
+                spawn()
+    finally:
+        for _ in procs:
+            task_queue.put(None)
+        for proc, _current, _since in procs.values():
+            proc.join(5)
+            if proc.is_alive():
+                proc.terminate()
+
+    report.results = [results[index] for index in range(len(tasks)) if index in results]
+    report.finished_at = time.time()
+    return report
+
+
+def print_report(report: RunReport, slowest: int = 5) -> None:
+    print(f"\n{'='*70}")
+    print("  📊 PARALLEL SCRAPING SUMMARY")
+    print(f"{'='*70}")
+    for group, count in report.jobs_by_group().items():
+        status = "✅" if count > 0 else "⚠️"
+        print(f"  {status} {group:30}: {count:>5} jobs")
+    print(
+        f"\n  🧩 Tasks: {len(report.results)} ok={report.count(OK)} error={report.count(ERROR)} "
+        f"timeout={report.count(TIMEOUT)} crashed={report.count(CRASHED)} skipped={report.count(SKIPPED)}"
+    )
+    print(f"  ⚙️  Worker utilization: {report.utilization:.0%} of {report.workers} workers")
+    for result in sorted(report.results, key=lambda item: item.seconds, reverse=True)[:slowest]:
+        print(f"     {result.seconds:>7.1f}s  {result.key} [{result.status}]")
+    print(f"\n  🎯 TOTAL JOBS COLLECTED: {report.total_jobs}")
+    elapsed = report.elapsed_seconds
+    print(f"  ⏱️  TOTAL ELAPSED TIME:  {int(elapsed/60)}m {int(elapsed%60)}s")
+    print(f"{'='*70}\n")
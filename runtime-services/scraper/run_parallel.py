@@ -1,109 +1,141 @@
 """
 JobShaman Parallel Orchestrator
 Runs all country scrapers concurrently to save time.
+
+Each listing site is split into page-range tasks and the monolithic sources (Nordic
+countries, external APIs) are one task each; a fixed worker pool takes them from a
+shared queue as workers free up (see orchestrator.py).
 """
 
 import multiprocessing
-import time
 from datetime import datetime
 import sys
 import os
 
 # Import country scrapers (supports running as module or script)
 try:
-    from .scraper_multi import run_czech_scrapers as run_cz, run_all_api_sources as run_api  # type: ignore
-    from .scraper_sk import run_slovakia_scraper as run_sk  # type: ignore
-    from .scraper_pl import run_poland_scraper as run_pl  # type: ignore
-    from .scraper_de import run_germany_scraper as run_de  # type: ignore
+    from .orchestrator import ScrapeTask, print_report, run_tasks, site_domain, split_pages  # type: ignore
+    from .scraper_base import _get_page_cap, flush_jobs_postgres_buffer, prepare_url_dedupe  # type: ignore
+    from .scraper_multi import CZECH_WEBSITES, scrape_website as scrape_cz_website, run_all_api_sources as run_api  # type: ignore
+    from .scraper_sk import SLOVAKIA_WEBSITES, SlovakiaScraper  # type: ignore
+    from .scraper_pl import POLAND_WEBSITES, PolandScraper  # type: ignore
+    from .scraper_de import GERMANY_WEBSITES, GermanyScraper  # type: ignore
     from .scraper_nordic import run_nordic_scraper as run_nordic  # type: ignore
 except Exception:
     # Handle if run as script from parent or elsewhere
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-    from scraper_multi import run_czech_scrapers as run_cz, run_all_api_sources as run_api
-    from scraper_sk import run_slovakia_scraper as run_sk
-    from scraper_pl import run_poland_scraper as run_pl
-    from scraper_de import run_germany_scraper as run_de
+    from orchestrator import ScrapeTask, print_report, run_tasks, site_domain, split_pages
+    from scraper_base import _get_page_cap, flush_jobs_postgres_buffer, prepare_url_dedupe
+    from scraper_multi import CZECH_WEBSITES, scrape_website as scrape_cz_website, run_all_api_sources as run_api
+    from scraper_sk import SLOVAKIA_WEBSITES, SlovakiaScraper
+    from scraper_pl import POLAND_WEBSITES, PolandScraper
+    from scraper_de import GERMANY_WEBSITES, GermanyScraper
     from scraper_nordic import run_nordic_scraper as run_nordic
 
-def run_scraper_process(name, func, results_dict):
-    """Wrapper to run a scraper in a separate process"""
-    start_time = time.time()
-    print(f"\n🚀 [STARTED] {name}")
+# group label, websites, scraper class (None = module-level scrape_website of scraper_multi)
+SITE_GROUPS = [
+    ('Czech Republic (Jobs.cz/Prace)', CZECH_WEBSITES, None),
+    ('Slovakia (SK)', SLOVAKIA_WEBSITES, SlovakiaScraper),
+    ('Poland (PL)', POLAND_WEBSITES, PolandScraper),
+    ('Germany + Austria (DE/AT)', GERMANY_WEBSITES, GermanyScraper),
+]
+NORDIC_GROUP = 'Nordic Countries (DK/SE/NO/FI)'
+API_GROUP = 'External API Sources (Jooble/WWR)'
+# Nordic and API sources both lean on Jooble, so they share one politeness slot.
+JOOBLE_DOMAIN = 'jooble.org'
+
+
+def _env_int(name, default):
     try:
-        count = func()
-        results_dict[name] = count
-        elapsed = time.time() - start_time
-        print(f"✅ [FINISHED] {name}: {count} jobs (took {int(elapsed/60)}m {int(elapsed%60)}s)")
-    except Exception as e:
-        print(f"❌ [ERROR] {name}: {e}")
-        import traceback
-        traceback.print_exc()
-        results_dict[name] = 0
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
 
-def run_all_parallel():
-    """Run all scrapers in parallel using multiprocessing"""
-    start_time = time.time()
+
+def _env_float(name, default):
     try:
-        max_parallel = max(1, int(os.getenv("SCRAPER_MAX_PARALLEL_PROCESSES", "2")))
+        return float(os.getenv(name, str(default)))
     except ValueError:
-        max_parallel = 2
-    
-    # Manager for shared dictionary between processes
-    manager = multiprocessing.Manager()
-    results = manager.dict()
-    
-    scrapers = [
-        ('Czech Republic (Jobs.cz/Prace)', run_cz),
-        ('Slovakia (SK)', run_sk),
-        ('Poland (PL)', run_pl),
-        ('Germany + Austria (DE/AT)', run_de),
-        ('Nordic Countries (DK/SE/NO/FI)', run_nordic),
-        ('External API Sources (Jooble/WWR)', run_api),
+        return default
+
+
+def run_site_pages(scraper_cls, site, first_page, last_page):
+    """Scrape pages first_page..last_page of one listing site (one orchestrator task)"""
+    if scraper_cls is None:
+        return scrape_cz_website(site['name'], site['base_url'], last_page, start_page=first_page)
+    return scraper_cls().run([{**site, 'start_page': first_page, 'max_pages': last_page}])
+
+
+def build_scrape_tasks(pages_per_task=None):
+    """
+    Monolithic sources first (they tend to be the longest), then the page ranges of
+    all listing sites interleaved round by round so no site waits for another one.
+    """
+    pages_per_task = pages_per_task or max(1, _env_int("SCRAPER_TASK_PAGES", 3))
+    cap = _get_page_cap()
+    tasks = [
+        ScrapeTask("api", API_GROUP, JOOBLE_DOMAIN, run_api),
+        *[
+            ScrapeTask(f"nordic:{code}", NORDIC_GROUP, JOOBLE_DOMAIN, lambda code=code: run_nordic(code))
+            for code in ['dk', 'se', 'no', 'fi']
+        ],
     ]
-    
-    processes = []
-    
+    site_ranges = []
+    for group, websites, scraper_cls in SITE_GROUPS:
+        for site in websites:
+            last_page = min(site.get('max_pages', 10), cap) if cap else site.get('max_pages', 10)
+            site_ranges.append([
+                ScrapeTask(
+                    f"{site['name']}:{first}-{last}",
+                    group,
+                    site_domain(site['base_url']),
+                    lambda cls=scraper_cls, site=site, first=first, last=last: run_site_pages(cls, site, first, last),
+                    site=site['name'],
+                    first_page=first,
+                    last_page=last,
+                )
+                for first, last in split_pages(last_page, pages_per_task)
+            ])
+    for round_index in range(max((len(ranges) for ranges in site_ranges), default=0)):
+        tasks.extend(ranges[round_index] for ranges in site_ranges if round_index < len(ranges))
+    return tasks
+
+
+def run_all_parallel():
+    """Run all scrapers in parallel on the work-stealing orchestrator"""
+    max_parallel = max(1, _env_int("SCRAPER_MAX_PARALLEL_PROCESSES", 2))
+    tasks = build_scrape_tasks()
+    timeout = _env_float("SCRAPER_TASK_TIMEOUT_SECONDS", 1800.0)
+
     print(f"\n{'='*70}")
     print(f"  JOBSHAMAN PARALLEL ORCHESTRATOR")
     print(f"  Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*70}")
-    print(f"  Spawning {len(scrapers)} scraper processes...")
+    print(f"  Scheduling {len(tasks)} scraper tasks...")
     print(f"  Max concurrent processes: {max_parallel}")
-    
-    active_processes = []
-    for name, func in scrapers:
-        while len(active_processes) >= max_parallel:
-            oldest = active_processes.pop(0)
-            oldest.join()
-        p = multiprocessing.Process(target=run_scraper_process, args=(name, func, results))
-        processes.append(p)
-        active_processes.append(p)
-        p.start()
-        # Slight staggered start to avoid connection bursts
-        time.sleep(1.5)
-        
-    # Wait for all processes to finish
-    for p in active_processes:
-        p.join()
-        
-    # Final Summary Report
-    elapsed_total = time.time() - start_time
-    print(f"\n{'='*70}")
-    print(f"  📊 PARALLEL SCRAPING SUMMARY")
-    print(f"{'='*70}")
-    
-    total_jobs = 0
-    # Use original order for report
-    for name, _ in scrapers:
-        count = results.get(name, 0)
-        status = "✅" if count > 0 else "⚠️"
-        print(f"  {status} {name:30}: {count:>5} jobs")
-        total_jobs += count
-        
-    print(f"\n  🎯 TOTAL JOBS COLLECTED: {total_jobs}")
-    print(f"  ⏱️  TOTAL ELAPSED TIME:  {int(elapsed_total/60)}m {int(elapsed_total%60)}s")
+    # Built once here, before the workers fork, so they all share the same files.
+    prepare_url_dedupe()
+
+    report = run_tasks(
+        tasks,
+        workers=max_parallel,
+        domain_concurrency=max(1, _env_int("SCRAPER_DOMAIN_CONCURRENCY", 1)),
+        domain_min_interval=max(0.0, _env_float("SCRAPER_DOMAIN_TASK_INTERVAL_SECONDS", 3.0)),
+        task_timeout=timeout if timeout > 0 else None,
+        after_task=lambda: flush_jobs_postgres_buffer(force=True),
+    )
+    print_report(report)
     print(f"  🏁 Finished at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"{'='*70}\n")
+
+    report_path = os.getenv("SCRAPER_RUN_REPORT_PATH", "").strip()
+    if report_path:
+        try:
+            report.write(report_path)
+            print(f"  🧾 Run report written to {report_path}")
+        except Exception as e:
+            print(f"⚠️ Could not write run report to {report_path}: {e}")
+    return report
+
 
 if __name__ == '__main__':
     # On Windows, multiprocessing needs this guard. On Linux it's good practice.
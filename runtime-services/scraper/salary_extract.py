@@ -0,0 +1,356 @@
+"""
+Salary and benefit extraction, compiled once per process.
+
+``extract_salary`` (scraper_base), ``extract_salary_range`` and the per-country salary
+timeframe detectors (scraper_multi, scraper_sk, scraper_de) and the German benefit
+keywords all go through the objects here:
+
+- ``SalaryExtractor``: one tokenizing pass finds the number spans of a text; the
+  currency, period and gross/net patterns only run on the text around them, the
+  thousand markers only when a value under 1000 could need them, and nothing else
+  runs on a text without numbers. ``salary_range`` is the (min, max) the scrapers
+  store; ``parse`` returns a ``SalaryInfo`` (min, max, currency, period, gross/net)
+  and ``parse_many`` does a batch (identical texts parsed once).
+- ``BenefitMatcher``: a label -> pattern table compiled once.
+
+``salary_from``/``salary_to`` follow the scrapers' original rules exactly (numbers
+over 100, "35 tis." -> 35000, the first two values ordered); the parity test in
+``backend/tests/test_salary_extract.py`` runs the recorded CZ/SK/PL/DE/AT salary
+texts against those rules.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Most specific period first: a text mentioning both "/hod" and "měsíc" is hourly.
+PERIODS = ("hour", "day", "week", "month", "year")
+
+COUNTRY_PERIOD_TOKENS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "cz": {
+        "hour": ("kč/h", "kc/h", "/hod", "hodin", "hod."),
+        "day": ("/den", "denně", "denne"),
+        "week": ("/týd", "/tyd", "týden", "tyden"),
+        "month": ("/měs", "/mes", "měsíc", "mesiac", "měsíčně", "mesicne"),
+        "year": ("/rok", "roč", "roc", "p.a."),
+    },
+    "sk": {
+        "hour": ("/hod", "hodin", "hour"),
+        "day": ("/den", "denne", "day"),
+        "week": ("/týž", "/tyz", "week", "týždeň", "tyzden"),
+        "month": ("/mesiac", "/mes", "month"),
+        "year": ("/rok", "roč", "year"),
+    },
+    "de": {
+        "hour": ("stunde", "std", "hour", "/h"),
+        "day": ("tag", "täglich", "daily", "/tag"),
+        "week": ("woche", "weekly", "/woche"),
+        "month": ("monat", "monatlich", "month", "/monat"),
+        "year": ("jahr", "jähr", "year", "/jahr"),
+    },
+    "pl": {
+        "hour": ("/godz", "godzin", "/h"),
+        "day": ("/dzień", "dziennie"),
+        "week": ("/tydz", "tygodniowo"),
+        "month": ("/mies", "miesięcznie", "mies."),
+        "year": ("/rok", "rocznie"),
+    },
+}
+COUNTRY_PERIOD_TOKENS["at"] = COUNTRY_PERIOD_TOKENS["de"]
+
+# "35 tis." / "35 tys." / "35 thousand" -> 35000
+THOUSAND_MARKERS = ("tis", "tisíc", "thousand", "tys")
+COUNTRY_THOUSAND_MARKERS = {"cz": ("tis",)}
+
+CURRENCY_TOKENS: Dict[str, Tuple[str, ...]] = {
+    "CZK": ("kč", "kc", "czk"),
+    "EUR": ("€", "eur", "euro"),
+    "PLN": ("zł", "zl", "pln"),
+    "CHF": ("chf",),
+    "GBP": ("£", "gbp"),
+    "USD": ("$", "usd"),
+    "SEK": ("sek",),
+    "NOK": ("nok",),
+    "DKK": ("dkk",),
+    "HUF": ("huf",),
+}
+
+GROSS_NET_TOKENS: Dict[str, Tuple[str, ...]] = {
+    "gross": ("brutto", "hrubá", "hrubého", "hrubej", "hrubý", "hruby", "gross", "brut"),
+    "net": ("netto", "čistá", "čistého", "čistý", "cisty", "na rękę", "net"),
+}
+
+# Numbers keep the scrapers' original shape (digits with space/dot/comma runs).
+_NUMBER_RE = re.compile(r"\d[\d\s\.,]*")
+# Currency, period and gross/net markers count when they are this close to a number.
+CONTEXT_CHARS = 40
+# What may sit between an anchored number and its currency, or between the two ends of
+# a range ("od 35 000 do 45 000 Kč", "3.000 bis 4.000 €").
+_ADJACENT_GAP_RE = re.compile(r"[\s:]*")
+_RANGE_GAP_RE = re.compile(r"\s*(?:[-–—]|do|až|az|bis|to)?\s*", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class SalaryInfo:
+    salary_from: Optional[int] = None
+    salary_to: Optional[int] = None
+    # Currency written near the numbers (ISO code); None when there is none.
+    currency: Optional[str] = None
+    period: Optional[str] = None
+    gross_net: Optional[str] = None
+
+    def to_job_fields(self, default_currency: Optional[str] = None) -> Dict[str, object]:
+        """The jobs-table columns this salary fills."""
+        return {
+            "salary_from": self.salary_from,
+            "salary_to": self.salary_to,
+            "salary_currency": self.currency or default_currency,
+            "salary_timeframe": self.period,
+        }
+
+
+class _TokenScanner:
+    """
+    Finds the tokens of a key -> tokens table; letter tokens must not touch other
+    letters ("eur" not in "europe", "net" not in "internet"), digits are fine
+    ("35000Kč"). The pattern is a plain alternation searched in lowercased text and
+    the boundary is checked here: lookbehinds or IGNORECASE with non-ASCII tokens
+    would stop the regex engine from skipping ahead to the tokens' first characters.
+    """
+
+    def __init__(self, table: Dict[str, Sequence[str]]):
+        self.keys = list(table)
+        tokens = sorted(
+            ((token.lower(), index) for index, key in enumerate(self.keys) for token in table[key]),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self._key_of = {token: index for token, index in tokens}
+        self._worded = {token for token, _ in tokens if token[-1].isalnum()}
+        pattern = "|".join(re.escape(token) for token, _ in tokens)
+        self._search = re.compile(pattern).search
+        self._search_ignorecase = re.compile(pattern, re.IGNORECASE).search
+
+    def finditer(self, text: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, key) of each token in ``text[pos:endpos]``, positions in ``text``."""
+        endpos = len(text) if endpos is None else min(endpos, len(text))
+        haystack = text[pos:endpos].lower()
+        search, offset, cursor, stop = self._search, pos, 0, len(haystack)
+        if len(haystack) != endpos - pos:
+            # Lowercasing changed the length ("İ"): search the original text instead.
+            search, haystack, offset, cursor, stop = self._search_ignorecase, text, 0, pos, endpos
+        while True:
+            match = search(haystack, cursor, stop)
+            if match is None:
+                return
+            start, end = match.start() + offset, match.end() + offset
+            token = match.group().lower()
+            if token not in self._worded or not (
+                (start and text[start - 1].isalpha()) or (end < len(text) and text[end].isalpha())
+            ):
+                yield start, end, self.keys[self._key_of[token]]
+                cursor = match.end()
+            else:
+                cursor = match.start() + 1
+
+
+class SalaryExtractor:
+    """Salary parsing for one set of period and thousand-marker tokens."""
+
+    def __init__(
+        self,
+        period_tokens: Optional[Dict[str, Sequence[str]]] = None,
+        thousand_markers: Sequence[str] = THOUSAND_MARKERS,
+        context_chars: int = CONTEXT_CHARS,
+    ):
+        if period_tokens is None:
+            period_tokens = {
+                period: tuple(dict.fromkeys(tok for tokens in COUNTRY_PERIOD_TOKENS.values() for tok in tokens[period]))
+                for period in PERIODS
+            }
+        # Substring tests: CPython's ``in`` beats a regex alternation for a few short tokens.
+        self._period_tokens = [(period, tuple(tokens)) for period, tokens in period_tokens.items()]
+        self._thousand_markers = tuple(thousand_markers)
+        self.context_chars = context_chars
+        self._currency = _TokenScanner(CURRENCY_TOKENS)
+        self._gross_net = _TokenScanner(GROSS_NET_TOKENS)
+
+    def period(self, text: str) -> Optional[str]:
+        """Salary timeframe named anywhere in ``text`` (hour < day < week < month < year)."""
+        if not text:
+            return None
+        low = text.lower()
+        for period, tokens in self._period_tokens:
+            for token in tokens:
+                if token in low:
+                    return period
+        return None
+
+    def parse(self, text: str, currency: Optional[str] = None, *, anchored: bool = False) -> SalaryInfo:
+        """
+        Salary in ``text``; ``currency`` fills in when no currency is written next to
+        the numbers.
+
+        ``anchored`` only counts numbers written against a currency ("35 000 Kč",
+        "€ 3.500", "8 000 - 12 000 zł"), for free-form descriptions where dates and
+        counts sit next to the salary.
+        """
+        if not text:
+            return SalaryInfo(currency=currency)
+        # The tokenizing pass: number spans; everything else only looks around them.
+        numbers = [(match.start(), match.end(), None) for match in _NUMBER_RE.finditer(text)]
+        if not numbers:
+            return SalaryInfo(currency=currency)
+        windows = self._windows(numbers)
+        currencies = [span for start, end in windows for span in self._currency.finditer(text, start, end)]
+        if anchored:
+            numbers = self._anchored(text, sorted(numbers + currencies))
+            if not numbers:
+                return SalaryInfo(currency=currencies[0][2] if currencies else currency)
+            currencies = [span for span in currencies if span[2] == numbers[0][2]]
+            windows = self._windows(numbers + currencies)
+
+        raws = [text[start:end] for start, end, _ in numbers]
+        salary_from, salary_to = self._range(raws, text if not anchored else self._join(text, windows))
+        context = self._join(text, windows)
+        gross_net = next(self._gross_net.finditer(context), None)
+        return SalaryInfo(
+            salary_from=salary_from,
+            salary_to=salary_to,
+            currency=currencies[0][2] if currencies else currency,
+            period=self.period(context),
+            gross_net=gross_net[2] if gross_net else None,
+        )
+
+    def salary_range(self, text: str) -> Tuple[Optional[int], Optional[int]]:
+        """(salary_from, salary_to) alone: the tokenizing pass without the other fields."""
+        if not text:
+            return None, None
+        return self._range(_NUMBER_RE.findall(text), text)
+
+    def _range(self, raws: List[str], scope: str) -> Tuple[Optional[int], Optional[int]]:
+        values = []
+        for raw in raws:
+            value = _number_value(raw)
+            # Drop nonsensical values ('2024' from a date is kept, '1' from '1st floor' is not).
+            if value is not None and value > 100:
+                values.append(value)
+        # Multiplying only changes values under 1000, so the marker scan is skipped otherwise.
+        if self._thousand_markers and any(value < 1000 for value in values):
+            low = scope.lower()
+            if any(marker in low for marker in self._thousand_markers):
+                values = [value * 1000 if value < 1000 else value for value in values]
+        if len(values) >= 2:
+            return min(values[0], values[1]), max(values[0], values[1])
+        return (values[0], None) if values else (None, None)
+
+    def parse_many(
+        self, texts: Iterable[str], currency: Optional[str] = None, *, anchored: bool = False
+    ) -> List[SalaryInfo]:
+        """``parse`` over a batch; repeated texts are parsed once."""
+        seen: Dict[str, SalaryInfo] = {}
+        results = []
+        for text in texts:
+            info = seen.get(text or "")
+            if info is None:
+                info = seen[text or ""] = self.parse(text, currency, anchored=anchored)
+            results.append(info)
+        return results
+
+    @staticmethod
+    def _anchored(text: str, spans: List[Tuple[int, int, Optional[str]]]) -> List[Tuple[int, int, Optional[str]]]:
+        """Number spans chained to a currency; the third item is that currency."""
+        anchors: List[Optional[str]] = [None] * len(spans)
+
+        def link(index: int, neighbour: int, gap: str) -> None:
+            if spans[index][2] is not None or anchors[index] or not 0 <= neighbour < len(spans):
+                return
+            currency = spans[neighbour][2]
+            if currency is not None and _ADJACENT_GAP_RE.fullmatch(gap):
+                anchors[index] = currency
+            elif currency is None and anchors[neighbour] and _RANGE_GAP_RE.fullmatch(gap):
+                anchors[index] = anchors[neighbour]
+
+        # Right to left catches "35 000 - 45 000 Kč", left to right "€ 3.000 - 4.000".
+        for index in range(len(spans) - 1, -1, -1):
+            link(index, index + 1, text[spans[index][1]:spans[index + 1][0]] if index + 1 < len(spans) else "")
+        for index in range(len(spans)):
+            link(index, index - 1, text[spans[index - 1][1]:spans[index][0]] if index else "")
+        return [(start, end, anchor) for (start, end, _), anchor in zip(spans, anchors) if anchor]
+
+    def _windows(self, spans: List[Tuple[int, int, Optional[str]]]) -> List[Tuple[int, int]]:
+        """``context_chars`` around each span, overlapping windows merged."""
+        windows: List[List[int]] = []
+        for start, end, _ in sorted(spans):
+            start, end = max(0, start - self.context_chars), end + self.context_chars
+            if windows and start <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], end)
+            else:
+                windows.append([start, end])
+        return [(start, end) for start, end in windows]
+
+    @staticmethod
+    def _join(text: str, windows: List[Tuple[int, int]]) -> str:
+        return " ".join(text[start:end] for start, end in windows)
+
+
+def _number_value(raw: str) -> Optional[int]:
+    # Spaces and dots are thousand separators; ",NN" at the end is cents.
+    cleaned = raw.replace(" ", "").replace("\u00a0", "").replace(".", "")
+    if "," in cleaned:
+        parts = cleaned.split(",")
+        cleaned = parts[0] if len(parts[-1]) == 2 else cleaned.replace(",", "")
+    try:
+        return int(cleaned) if cleaned else None
+    except ValueError:
+        return None
+
+
+class BenefitMatcher:
+    """
+    Benefit labels whose pattern occurs in a text, from a label -> regex table.
+
+    Each pattern is compiled once and searched on one lowercased copy of the text.
+    Joining them into a single alternation measured slower: the regex engine can only
+    skip ahead when a pattern's possible first characters are few.
+    """
+
+    def __init__(self, keywords: Dict[str, str]):
+        self.labels = list(keywords)
+        self._patterns = [re.compile(pattern) for pattern in keywords.values()]
+
+    def find(self, text: str) -> List[str]:
+        """Labels found in ``text`` (lowercased first), in table order."""
+        if not text:
+            return []
+        low = text.lower()
+        return [label for label, pattern in zip(self.labels, self._patterns) if pattern.search(low)]
+
+    def find_many(self, texts: Iterable[str]) -> List[List[str]]:
+        return [self.find(text) for text in texts]
+
+
+_default = SalaryExtractor()
+_extractors: Dict[str, SalaryExtractor] = {}
+
+
+def get_salary_extractor(country: Optional[str] = None) -> SalaryExtractor:
+    """Extractor with ``country``'s period and thousand tokens (all countries' when None)."""
+    code = (country or "").lower()
+    if code not in COUNTRY_PERIOD_TOKENS:
+        return _default
+    if code not in _extractors:
+        _extractors[code] = SalaryExtractor(
+            COUNTRY_PERIOD_TOKENS[code], COUNTRY_THOUSAND_MARKERS.get(code, THOUSAND_MARKERS)
+        )
+    return _extractors[code]
+
+
+def parse_salary(text: str, currency: Optional[str] = None, country: Optional[str] = None, *, anchored: bool = False) -> SalaryInfo:
+    return get_salary_extractor(country).parse(text, currency, anchored=anchored)
+
+
+def parse_salaries(
+    texts: Iterable[str], currency: Optional[str] = None, country: Optional[str] = None, *, anchored: bool = False
+) -> List[SalaryInfo]:
+    return get_salary_extractor(country).parse_many(texts, currency, anchored=anchored)
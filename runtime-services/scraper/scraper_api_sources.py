@@ -16,7 +16,6 @@ from typing import Any, Dict, Iterable, List, Optional, Tuple
 import xml.etree.ElementTree as ET
 
 import requests
-from bs4 import BeautifulSoup
 
 def _import_first(module_names: list[str]) -> Any:
     last_error: Exception | None = None
@@ -41,11 +40,14 @@ now_iso = _scraper_base.now_iso
 save_job_to_supabase = _scraper_base.save_job_to_supabase
 get_country_centroid = _scraper_base.get_country_centroid
 jobs_postgres_write_available = getattr(_scraper_base, "jobs_postgres_write_available", None)
+make_soup = _scraper_base.make_soup
 
 _geocoding = _import_first(["geocoding", "backend.geocoding"])
 geocode_location = _geocoding.geocode_location
 normalize_address = _geocoding.normalize_address
 
+_http_cache = _import_first(["http_cache", "scraper.http_cache", "backend.scraper.http_cache"])
+
 
 DEFAULT_ARBEITNOW_API_URL = "https://www.arbeitnow.com/api/job-board-api"
 DEFAULT_JOOBLE_API_HOST = "cz.jooble.org"
@@ -83,6 +85,9 @@ DEFAULT_WWR_RSS_URLS = [
 ]
 DEFAULT_GERMAN_TECH_JOBS_RSS_URL = "https://germantechjobs.de/rss"
 HTTP_TIMEOUT_SECONDS = 30
+RSS_REQUEST_HEADERS = {"Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8"}
+# Name and version of _parse_rss_items' output in the HTTP cache; bump when it changes.
+RSS_PARSER_KEY = "rss_items:v1"
 LIVE_SEARCH_CACHE_TTL_SECONDS = max(30, int(os.getenv("LIVE_SEARCH_CACHE_TTL_SECONDS") or "900"))
 LIVE_SEARCH_GEOCODE_TTL_SECONDS = max(300, int(os.getenv("LIVE_SEARCH_GEOCODE_TTL_SECONDS") or "86400"))
 LIVE_SEARCH_CACHE_TABLE = "external_live_search_cache"
@@ -214,7 +219,7 @@ def _html_to_text(value: Any) -> str:
         return ""
     if "<" not in raw and ">" not in raw:
         return norm_text(raw)
-    soup = BeautifulSoup(raw, "html.parser")
+    soup = make_soup(raw)
     return soup.get_text("\n", strip=True)
 
 def _xml_local_name(tag: str) -> str:
@@ -515,10 +520,14 @@ def _request_json(url: str, *, params: Optional[Dict[str, Any]] = None, headers:
     return response.json()
 
 
-def _request_text(url: str, *, headers: Optional[Dict[str, str]] = None) -> str:
-    response = requests.get(url, headers=headers, timeout=HTTP_TIMEOUT_SECONDS)
+def _fetch_rss_items(url: str) -> List[Dict[str, Any]]:
+    """Fetch a feed conditionally; a feed whose body did not change is not parsed again."""
+    response = _http_cache.fetch(requests, url, headers=RSS_REQUEST_HEADERS, timeout=HTTP_TIMEOUT_SECONDS)
     response.raise_for_status()
-    return response.text
+    cache = _http_cache.get_http_cache()
+    if cache is None or not response.body_hash:
+        return _parse_rss_items(response.text)
+    return cache.parsed(url, RSS_PARSER_KEY, response.body_hash, lambda: _parse_rss_items(response.text))
 
 
 def _build_live_cache_key(prefix: str, **parts: Any) -> str:
@@ -1115,10 +1124,7 @@ def search_weworkremotely_jobs_live(
 
     for rss_url in rss_urls:
         try:
-            payload = _request_text(
-                rss_url,
-                headers={"Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8"},
-            )
+            items = _fetch_rss_items(rss_url)
         except Exception as exc:
             if _is_dns_resolution_error(exc):
                 _mark_live_source_unavailable(provider_key)
@@ -1129,7 +1135,6 @@ def search_weworkremotely_jobs_live(
             print(f"❌ WWR live RSS fetch failed for {rss_url}: {exc}")
             continue
 
-        items = _parse_rss_items(payload)
         if not items:
             continue
 
@@ -1613,12 +1618,11 @@ def scrape_weworkremotely_jobs(supabase_client: Any = None) -> int:
 
     for rss_url in rss_urls:
         try:
-            payload = _request_text(rss_url, headers={"Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8"})
+            items = _fetch_rss_items(rss_url)
         except Exception as exc:
             print(f"❌ WWR RSS fetch failed for {rss_url}: {exc}")
             continue
 
-        items = _parse_rss_items(payload)
         if len(items) == 0:
             print(f"ℹ️ WWR RSS {rss_url}: no items.")
             continue
@@ -1681,12 +1685,11 @@ def scrape_german_tech_jobs(supabase_client: Any = None) -> int:
     total_saved = 0
 
     try:
-        payload = _request_text(rss_url, headers={"Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8"})
+        items = _fetch_rss_items(rss_url)
     except Exception as exc:
         print(f"❌ GermanTechJobs RSS fetch failed for {rss_url}: {exc}")
         return 0
 
-    items = _parse_rss_items(payload)
     if len(items) == 0:
         print(f"ℹ️ GermanTechJobs RSS {rss_url}: no items.")
         return 0
@@ -20,16 +20,9 @@ from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
 import re
 from datetime import datetime
 import sys
+from collections import OrderedDict
 from threading import Lock
 from typing import Optional, Dict, List, Tuple, Callable, Any
-try:
-    from langdetect import detect, detect_langs, LangDetectException
-    _LANGDETECT_AVAILABLE = True
-except Exception:
-    detect = None  # type: ignore
-    detect_langs = None  # type: ignore
-    LangDetectException = Exception  # type: ignore
-    _LANGDETECT_AVAILABLE = False
 try:
     from ftfy import fix_text as ftfy_fix_text
     _FTFY_AVAILABLE = True
@@ -66,20 +59,68 @@ except ImportError:
     except ImportError:
         import geocoding
         geocode_location = geocoding.geocode_location
+try:
+    import http_cache as _http_cache
+except ImportError:
+    try:
+        from scraper import http_cache as _http_cache
+    except ImportError:
+        from backend.scraper import http_cache as _http_cache
+try:
+    import html_parser as _html_parser
+except ImportError:
+    try:
+        from scraper import html_parser as _html_parser
+    except ImportError:
+        from backend.scraper import html_parser as _html_parser
+try:
+    import url_dedupe as _url_dedupe
+except ImportError:
+    try:
+        from scraper import url_dedupe as _url_dedupe
+    except ImportError:
+        from backend.scraper import url_dedupe as _url_dedupe
+try:
+    import text_pipeline as _text_pipeline
+except ImportError:
+    try:
+        from scraper import text_pipeline as _text_pipeline
+    except ImportError:
+        from backend.scraper import text_pipeline as _text_pipeline
+try:
+    import salary_extract as _salary_extract
+except ImportError:
+    try:
+        from scraper import salary_extract as _salary_extract
+    except ImportError:
+        from backend.scraper import salary_extract as _salary_extract
+try:
+    import detail_fetch as _detail_fetch
+except ImportError:
+    try:
+        from scraper import detail_fetch as _detail_fetch
+    except ImportError:
+        from backend.scraper import detail_fetch as _detail_fetch
 try:
     from app.services.jobs_postgres_store import (
         backfill_jobs_from_documents,
         get_job_by_id,
         get_job_by_url,
+        job_content_fingerprint,
         jobs_postgres_enabled,
         jobs_postgres_main_write_enabled,
+        list_job_urls,
+        mark_jobs_seen,
     )
 except Exception:
     backfill_jobs_from_documents = None  # type: ignore
     get_job_by_id = None  # type: ignore
     get_job_by_url = None  # type: ignore
+    job_content_fingerprint = None  # type: ignore
     jobs_postgres_enabled = None  # type: ignore
     jobs_postgres_main_write_enabled = None  # type: ignore
+    list_job_urls = None  # type: ignore
+    mark_jobs_seen = None  # type: ignore
 
 # --- Environment Setup ---
 
@@ -164,6 +205,13 @@ SCRAPER_SUPABASE_FALLBACK_ENABLED = os.getenv("SCRAPER_SUPABASE_FALLBACK_ENABLED
 SCRAPER_POSTGRES_BATCH_SIZE = max(1, int(os.getenv("SCRAPER_POSTGRES_BATCH_SIZE", "25") or "25"))
 _JOBS_POSTGRES_BUFFER: List[Dict[str, Any]] = []
 _JOBS_POSTGRES_BUFFER_LOCK = Lock()
+SCRAPER_QUEUED_FINGERPRINT_LIMIT = max(1, int(os.getenv("SCRAPER_QUEUED_FINGERPRINT_LIMIT", "50000") or "50000"))
+# Job id -> content fingerprint of what this process recently queued for Postgres,
+# least recently queued first; capped at SCRAPER_QUEUED_FINGERPRINT_LIMIT ids.
+_JOBS_POSTGRES_QUEUED_FINGERPRINTS: "OrderedDict[str, str]" = OrderedDict()
+# Ids of known jobs still listed whose detail page was skipped; their scraped_at is
+# moved forward on the next flush so retention keeps them.
+_JOBS_SEEN_BUFFER: set = set()
 
 # Debug output
 if SUPABASE_URL:
@@ -266,6 +314,7 @@ def flush_jobs_postgres_buffer(force: bool = False) -> bool:
     if not enabled:
         return False
 
+    _flush_seen_jobs(force)
     with _JOBS_POSTGRES_BUFFER_LOCK:
         if not _JOBS_POSTGRES_BUFFER:
             return True
@@ -281,9 +330,16 @@ def flush_jobs_postgres_buffer(force: bool = False) -> bool:
         if imported_count > 0 or matched_count > 0 or upserted_count > 0:
             with _JOBS_POSTGRES_BUFFER_LOCK:
                 del _JOBS_POSTGRES_BUFFER[:len(payload)]
+            _record_known_jobs(payload)
             print(
                 f"    --> Batch Azure Postgres flush ok: imported={imported_count} "
                 f"upserted={upserted_count} matched={matched_count}"
+                + (
+                    f" (inserted={result.get('inserted_count')} updated={result.get('updated_count')} "
+                    f"unchanged={result.get('unchanged_count')})"
+                    if "unchanged_count" in result
+                    else ""
+                )
             )
             return True
     except Exception as exc:
@@ -292,6 +348,74 @@ def flush_jobs_postgres_buffer(force: bool = False) -> bool:
     return False
 
 
+def _flush_seen_jobs(force: bool = False) -> None:
+    with _JOBS_POSTGRES_BUFFER_LOCK:
+        if not _JOBS_SEEN_BUFFER or not callable(mark_jobs_seen):
+            return
+        if not force and len(_JOBS_SEEN_BUFFER) < SCRAPER_POSTGRES_BATCH_SIZE:
+            return
+        job_ids = sorted(_JOBS_SEEN_BUFFER)
+        _JOBS_SEEN_BUFFER.clear()
+    try:
+        touched = mark_jobs_seen(job_ids)
+        print(f"    --> Známé nabídky stále vystavené: {len(job_ids)} (scraped_at posunuto u {touched})")
+    except Exception as exc:
+        print(f"    ⚠️ Jobs Postgres seen-touch failed: {exc}")
+
+
+def _record_known_jobs(docs: List[Dict[str, Any]]) -> None:
+    """Remember flushed jobs in the shared known-URL store so later runs skip their detail pages."""
+    dedupe = _url_dedupe.get_url_dedupe()
+    if dedupe is None:
+        return
+    dedupe.add_many(
+        (canonical_job_key(doc["url"]), doc["id"])
+        for doc in docs
+        if str(doc.get("url") or "").strip() and doc.get("id")
+    )
+
+
+def canonical_job_key(url: str) -> str:
+    """``build_job_id_from_url`` of the canonical spelling of ``url`` (the known-URL store key)."""
+    return build_job_id_from_url(_url_dedupe.canonical_job_url(url))
+
+
+def known_job_id(url: str) -> Optional[str]:
+    """
+    Id of an already stored job at ``url`` whose detail page was fetched within
+    SCRAPER_URL_DEDUPE_REFETCH_HOURS, or None when it should be fetched.
+    """
+    dedupe = _url_dedupe.get_url_dedupe()
+    if dedupe is None or not str(url or "").strip():
+        return None
+    return dedupe.fresh_job_id(canonical_job_key(url), _url_dedupe.SCRAPER_URL_DEDUPE_REFETCH_HOURS * 3600)
+
+
+def prepare_url_dedupe(force: bool = False) -> Optional[int]:
+    """
+    Rebuild the known-URL store from the jobs table when it is older than
+    SCRAPER_URL_DEDUPE_REBUILD_HOURS (or ``force``). Called once by the parallel
+    orchestrator before it forks its workers, which then share the files.
+    Returns the number of known jobs after a rebuild, None when nothing was done.
+    """
+    dedupe = _url_dedupe.get_url_dedupe()
+    if dedupe is None or not callable(list_job_urls) or not jobs_postgres_write_available():
+        return None
+    if not force and time.time() - dedupe.built_at < _url_dedupe.SCRAPER_URL_DEDUPE_REBUILD_HOURS * 3600:
+        return None
+    started = time.perf_counter()
+    try:
+        count = dedupe.rebuild(
+            (canonical_job_key(url), job_id, updated_at.timestamp() if isinstance(updated_at, datetime) else 0.0)
+            for job_id, url, updated_at in list_job_urls()
+        )
+    except Exception as exc:
+        print(f"⚠️ [URL Dedupe] rebuild failed: {exc}")
+        return None
+    print(f"✅ [URL Dedupe] {count} známých nabídek načteno z databáze za {time.perf_counter() - started:.1f}s")
+    return count
+
+
 atexit.register(lambda: flush_jobs_postgres_buffer(force=True))
 
 
@@ -410,9 +534,15 @@ _DOMAIN_MIN_DELAY = {
     "pracuj.pl": 6.0,
     "nofluffjobs.com": 3.0,
     "justjoin.it": 3.0,
+    # GermanyScraper fetches these on a pool (detail_fetch.py); the spacing keeps the
+    # old one-job-per-4.5 s pace (Stellenanzeigen costs two requests per job).
+    "stellenanzeigen.de": 2.25,
+    "karriere.at": 4.5,
+    "willhaben.at": 4.5,
 }
 _DOMAIN_LAST_REQUEST: Dict[str, float] = {}
 _DOMAIN_COOLDOWN_UNTIL: Dict[str, float] = {}
+_DOMAIN_THROTTLE_LOCK = Lock()
 
 
 def _is_transient_db_error(exc: Exception) -> bool:
@@ -454,22 +584,48 @@ def _get_headers(url: str) -> Dict[str, str]:
     }
 
 
+def _domain_min_delay(domain: str, default: float = 1.5) -> float:
+    # Keys may name the registered domain ("praca.pl") for any of its hosts ("www.praca.pl").
+    parts = domain.split(".")
+    for index in range(len(parts) - 1):
+        delay = _DOMAIN_MIN_DELAY.get(".".join(parts[index:]))
+        if delay is not None:
+            return delay
+    return default
+
+
 def _respect_domain_throttle(domain: str) -> None:
     if not domain:
         return
-    now_ts = time.time()
-    cooldown_until = _DOMAIN_COOLDOWN_UNTIL.get(domain, 0.0)
-    if cooldown_until > now_ts:
-        time.sleep(max(0.0, cooldown_until - now_ts))
-    min_delay = _DOMAIN_MIN_DELAY.get(domain, 1.5)
-    last_at = _DOMAIN_LAST_REQUEST.get(domain, 0.0)
-    wait_for = min_delay - (now_ts - last_at)
-    if wait_for > 0:
-        time.sleep(wait_for + random.uniform(0.2, 0.8))
-    _DOMAIN_LAST_REQUEST[domain] = time.time()
+    # Reserve the next request slot for this domain under the lock and sleep outside
+    # it, so concurrent detail fetches (detail_fetch.py) keep the per-domain spacing.
+    # The jitter is capped at the spacing itself, or short delays would be mostly jitter.
+    with _DOMAIN_THROTTLE_LOCK:
+        now_ts = time.time()
+        start_at = max(now_ts, _DOMAIN_COOLDOWN_UNTIL.get(domain, 0.0))
+        min_delay = _domain_min_delay(domain)
+        last_at = _DOMAIN_LAST_REQUEST.get(domain, 0.0)
+        if last_at + min_delay > start_at:
+            start_at = last_at + min_delay + random.uniform(0.2, 0.8) * min(1.0, min_delay)
+        _DOMAIN_LAST_REQUEST[domain] = start_at
+    if start_at > now_ts:
+        time.sleep(start_at - now_ts)
 
 # --- Utility Functions ---
 
+# Every site parser builds its trees through this (backend: SCRAPER_HTML_PARSER).
+make_soup = _html_parser.make_soup
+# Compiled line filter for navigation/footer junk (see filter_out_junk).
+JunkFilter = _text_pipeline.JunkFilter
+# Compiled salary/benefit extraction shared by every scraper (see extract_salary).
+SalaryInfo = _salary_extract.SalaryInfo
+BenefitMatcher = _salary_extract.BenefitMatcher
+get_salary_extractor = _salary_extract.get_salary_extractor
+parse_salaries = _salary_extract.parse_salaries
+# Detail pages (and their iframes) fetched on a bounded pool, in listing order.
+fetch_details = _detail_fetch.fetch_details
+
+
 def now_iso() -> str:
     """Return current UTC time in ISO format"""
     return datetime.utcnow().isoformat()
@@ -486,25 +642,14 @@ def detect_language_code(text: str) -> Optional[str]:
     """
     Detect language code (ISO 639-1) from text.
     Returns None if text is too short or detection fails.
+    Deterministic n-gram identification (text_pipeline), memoized per text.
     """
-    if not _LANGDETECT_AVAILABLE:
-        return None
     if not text:
         return None
     cleaned = norm_text(text)
     if len(cleaned) < 40:
         return None
-    try:
-        # Prefer probabilistic detection when available
-        if detect_langs:
-            langs = detect_langs(cleaned)
-            if langs:
-                return str(langs[0]).split(":")[0]
-        return detect(cleaned)  # fallback
-    except LangDetectException:
-        return None
-    except Exception:
-        return None
+    return _text_pipeline.memoize("language", cleaned, _text_pipeline.identify_language)
 
 
 def extract_salary(
@@ -523,116 +668,53 @@ def extract_salary(
     """
     if not salary_text:
         return None, None, currency
-    
-    # Extract numeric segments including separators (dot, comma, space)
-    nums = re.findall(r"\d[\d\s\.,]*", salary_text)
-    vals = []
-    
-    for x in nums:
-        # Remove spaces and dots (often thousand separators in EU)
-        cleaned = x.replace(" ", "").replace("\u00a0", "").replace(".", "")
-        
-        # Handle comma - if exactly 2 digits after comma at end, it's cents
-        if "," in cleaned:
-            parts = cleaned.split(",")
-            if len(parts) > 1 and len(parts[-1]) == 2:
-                cleaned = parts[0]  # Drop cents
-            else:
-                cleaned = cleaned.replace(",", "")  # Comma as thousand separator
-        
-        if cleaned:
-            try:
-                val = int(cleaned)
-                # Filter nonsensical values (e.g. '2024' from date or '1' from '1st floor')
-                if val > 100:
-                    vals.append(val)
-            except ValueError:
-                continue
-    
-    # Check for "thousand" multiplier
-    low_txt = salary_text.lower()
-    if any(word in low_txt for word in ["tis", "tisíc", "thousand", "tys"]):
-        # If values are suspiciously small (e.g. 35 instead of 35000), multiply
-        vals = [v * 1000 if v < 1000 else v for v in vals]
-    
-    # Determine from/to
-    salary_from = None
-    salary_to = None
-    
-    if len(vals) == 1:
-        salary_from = vals[0]
-    elif len(vals) >= 2:
-        # Sort to ensure from < to
-        salary_from = min(vals[0], vals[1])
-        salary_to = max(vals[0], vals[1])
-    
+
+    salary_from, salary_to = get_salary_extractor().salary_range(salary_text)
     return salary_from, salary_to, currency
 
 
+# Navigation, footer and generic junk commonly found around job descriptions
+JUNK_TOKENS = [
+    "nabídky práce", "vytvořit si životopis", "jobs.cz", "prace.cz", "atmoskop",
+    "profesia.sk", "profesia.cz", "práca za rohom", "práce za rohem", "nelisa.com",
+    "arnold", "teamio", "seduo.cz", "seduo.sk", "platy.cz", "platy.sk", "paylab.com",
+    "mojposao", "historie odpovědí", "uložené nabídky", "upozornění na nabídky",
+    "hledám zaměstnance", "vložit brigádu", "ceník inzerce", "napište nám",
+    "pro média", "zásady ochrany soukromí", "podmínky používání", "nastavení cookies",
+    "reklama na portálech", "transparentnost", "nahlásit nezákonný obsah",
+    "vzdělávací kurzy", "středoškolské nebo odborné", "typ pracovního poměru",
+    "kontaktní údaje", "zadavatel", "časté pracovní cesty", "foto v medailonku",
+    "the pulse of beauty", "nadnárodní struktury", "vlastní organizace",
+    "vyhrazený čas na inovace", "kafetérie", "příspěvek na vzdělání",
+    "stravenky/příspěvek na stravování", "zdravotní volno/sickdays",
+    "možnost občasné práce z domova", "občerstvení na pracovišti",
+    "příspěvek na sport/kulturu", "firemní akce", "bonusy/prémie",
+    "flexibilní začátek/konec pracovní doby", "notebook", "sleva na firemní výrobky",
+    "nabídky práce", "brigády", "inspirace", "zaměstnavatelé", "skvělý životopis",
+    "můžete si ho uložit", "vytisknout nebo poslat do světa",
+    # German
+    "stellenangebote", "lebenslauf erstellen", "datenschutz", "impressum",
+    "cookie-einstellungen", "agb", "kontakt", "über uns",
+    # Polish
+    "oferty pracy", "stwórz cv", "polityka prywatności", "regulamin",
+    "ustawienia cookies", "kontakt", "o nas",
+    # Slovak
+    "ponuky práce", "vytvoriť životopis", "ochrana súkromia", "podmienky používania",
+]
+
+_JUNK_FILTER = JunkFilter(JUNK_TOKENS)
+
+
 def filter_out_junk(text: str) -> str:
     """
     Remove navigation, footers, and generic junk from job descriptions
     """
     if not text:
         return ""
-    
-    # Extensive list of junk tokens commonly found in navigation/footers
-    junk_tokens = [
-        "nabídky práce", "vytvořit si životopis", "jobs.cz", "prace.cz", "atmoskop",
-        "profesia.sk", "profesia.cz", "práca za rohom", "práce za rohem", "nelisa.com",
-        "arnold", "teamio", "seduo.cz", "seduo.sk", "platy.cz", "platy.sk", "paylab.com",
-        "mojposao", "historie odpovědí", "uložené nabídky", "upozornění na nabídky",
-        "hledám zaměstnance", "vložit brigádu", "ceník inzerce", "napište nám",
-        "pro média", "zásady ochrany soukromí", "podmínky používání", "nastavení cookies",
-        "reklama na portálech", "transparentnost", "nahlásit nezákonný obsah",
-        "vzdělávací kurzy", "středoškolské nebo odborné", "typ pracovního poměru",
-        "kontaktní údaje", "zadavatel", "časté pracovní cesty", "foto v medailonku",
-        "the pulse of beauty", "nadnárodní struktury", "vlastní organizace",
-        "vyhrazený čas na inovace", "kafetérie", "příspěvek na vzdělání",
-        "stravenky/příspěvek na stravování", "zdravotní volno/sickdays",
-        "možnost občasné práce z domova", "občerstvení na pracovišti",
-        "příspěvek na sport/kulturu", "firemní akce", "bonusy/prémie",
-        "flexibilní začátek/konec pracovní doby", "notebook", "sleva na firemní výrobky",
-        "nabídky práce", "brigády", "inspirace", "zaměstnavatelé", "skvělý životopis",
-        "můžete si ho uložit", "vytisknout nebo poslat do světa",
-        # German
-        "stellenangebote", "lebenslauf erstellen", "datenschutz", "impressum",
-        "cookie-einstellungen", "agb", "kontakt", "über uns",
-        # Polish
-        "oferty pracy", "stwórz cv", "polityka prywatności", "regulamin",
-        "ustawienia cookies", "kontakt", "o nas",
-        # Slovak
-        "ponuky práce", "vytvoriť životopis", "ochrana súkromia", "podmienky používania",
-    ]
-    
-    lines = text.split("\n")
-    filtered_lines = []
-    
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            filtered_lines.append("")
-            continue
-        
-        low = stripped.lower()
-        
-        # If line is too short (navigation link) and contains junk token
-        if len(stripped) < 100:
-            if any(tok in low for tok in junk_tokens):
-                continue
-        
-        # Specific for exact matches
-        if any(tok == low for tok in junk_tokens):
-            continue
-        
-        filtered_lines.append(stripped)
-    
-    # Rejoin and clean empty lines at start/end
-    result = "\n".join(filtered_lines).strip()
-    
-    # Remove multiple consecutive empty lines
-    result = re.sub(r'\n{3,}', '\n\n', result)
-    
+
+    # Short lines (navigation links) containing a junk token and exact matches go;
+    # blank runs collapse to one empty line.
+    result = _JUNK_FILTER.clean(text)
     return result if result else "Popis není dostupný"
 
 
@@ -644,14 +726,21 @@ def normalize_description_for_storage(text: str) -> str:
     1) `ftfy` repair for mojibake/encoding issues.
     2) `unstructured` partitioning when available (better block/list recovery).
     3) Conservative inline-list recovery for one-line " - " bullet payloads.
+
+    Results are memoized by content, so a description repeated across searches or
+    portals is normalized once per process.
     """
     if not text:
         return ""
+    return _text_pipeline.memoize("normalize", str(text), _normalize_description_for_storage)
 
-    normalized = str(text).replace("\r\n", "\n").replace("\r", "\n")
+
+def _normalize_description_for_storage(text: str) -> str:
+    normalized = text.replace("\r\n", "\n").replace("\r", "\n")
     normalized = normalized.replace("\u00a0", " ").replace("\u200b", "")
 
-    if _FTFY_AVAILABLE and ftfy_fix_text:
+    # ftfy is the identity on clean text; skip the pass when nothing needs repair.
+    if _FTFY_AVAILABLE and ftfy_fix_text and _text_pipeline.needs_text_repair(normalized):
         try:
             normalized = ftfy_fix_text(normalized, normalization="NFC")
         except Exception as e:
@@ -708,7 +797,8 @@ def scrape_page(url: str, max_retries: int = 2) -> Optional[BeautifulSoup]:
     domain = _get_domain(url)
     for attempt in range(max_retries + 1):
         try:
-            _respect_domain_throttle(domain)
+            if not _http_cache.replay_enabled():
+                _respect_domain_throttle(domain)
             headers = _get_headers(url)
             
             # Disable verification for domains with known SSL issues (like prace.sk)
@@ -722,7 +812,7 @@ def scrape_page(url: str, max_retries: int = 2) -> Optional[BeautifulSoup]:
                     pass
             
             try:
-                resp = _SESSION.get(url, timeout=20, headers=headers, verify=verify)
+                resp = _http_cache.fetch(_SESSION, url, timeout=20, headers=headers, verify=verify)
             except (requests.exceptions.SSLError, requests.exceptions.ConnectionError) as ssl_err:
                 err_str = str(ssl_err).lower()
                 if verify and ("ssl" in err_str or "cert" in err_str or "verify failed" in err_str):
@@ -732,7 +822,7 @@ def scrape_page(url: str, max_retries: int = 2) -> Optional[BeautifulSoup]:
                         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
                     except ImportError:
                         pass
-                    resp = _SESSION.get(url, timeout=20, headers=headers, verify=False)
+                    resp = _http_cache.fetch(_SESSION, url, timeout=20, headers=headers, verify=False)
                 else:
                     raise ssl_err
 
@@ -747,14 +837,17 @@ def scrape_page(url: str, max_retries: int = 2) -> Optional[BeautifulSoup]:
                             wait = backoff
                     # Increase domain delay after 429s
                     if domain:
-                        _DOMAIN_MIN_DELAY[domain] = min(_DOMAIN_MIN_DELAY.get(domain, 2.0) * 1.5, 30.0)
+                        _DOMAIN_MIN_DELAY[domain] = min(_domain_min_delay(domain, 2.0) * 1.5, 30.0)
                         _DOMAIN_COOLDOWN_UNTIL[domain] = time.time() + wait
                 print(f"⚠️  Blokace/limit ({resp.status_code}) pro {url}, pokus {attempt + 1}/{max_retries + 1} (čekám {wait}s)")
                 time.sleep(wait)
                 backoff *= 1.8
                 continue
             resp.raise_for_status()
-            return BeautifulSoup(resp.content, "html.parser")
+            return make_soup(resp.content)
+        except _http_cache.HTTPReplayMiss:
+            print(f"❌ Replay: žádná uložená odpověď pro {url}")
+            return None
         except Exception as e:
             if attempt < max_retries:
                 time.sleep(backoff)
@@ -1081,7 +1174,18 @@ def save_job_to_supabase(supabase: Optional[Client], job_data: Dict, seen_urls:
             str(doc.get("location") or ""),
             doc.get("work_model") or doc.get("work_type"),
         )
+        fingerprint = job_content_fingerprint(doc) if callable(job_content_fingerprint) else ""
         with _JOBS_POSTGRES_BUFFER_LOCK:
+            # The same listing reached again in this run (another page, another site)
+            # with unchanged content is already on its way; don't write it twice.
+            if fingerprint and _JOBS_POSTGRES_QUEUED_FINGERPRINTS.get(str(doc["id"])) == fingerprint:
+                _JOBS_POSTGRES_QUEUED_FINGERPRINTS.move_to_end(str(doc["id"]))
+                return True
+            if fingerprint:
+                _JOBS_POSTGRES_QUEUED_FINGERPRINTS[str(doc["id"])] = fingerprint
+                _JOBS_POSTGRES_QUEUED_FINGERPRINTS.move_to_end(str(doc["id"]))
+                while len(_JOBS_POSTGRES_QUEUED_FINGERPRINTS) > SCRAPER_QUEUED_FINGERPRINT_LIMIT:
+                    _JOBS_POSTGRES_QUEUED_FINGERPRINTS.popitem(last=False)
             _JOBS_POSTGRES_BUFFER.append(doc)
             buffer_size = len(_JOBS_POSTGRES_BUFFER)
         if buffer_size >= SCRAPER_POSTGRES_BATCH_SIZE:
@@ -1342,13 +1446,25 @@ class BaseScraper:
     def is_duplicate(self, url: str) -> bool:
         """
         Check if job URL already exists in database.
-        Results are cached in memory so each URL hits the DB at most once per run.
+        Results are cached in memory so each URL hits the DB at most once per run,
+        and jobs stored by earlier runs are answered from the shared known-URL store
+        (see url_dedupe.py) until SCRAPER_URL_DEDUPE_REFETCH_HOURS have passed.
         """
         # Fast path: already seen in this run
         if url in self._seen_urls:
             print(f"    --> (Cache) Nabídka již existuje: {url}")
             return True
 
+        # Stored by an earlier run (or another worker) and fetched recently enough:
+        # skip the detail page, just keep the job alive.
+        job_id = known_job_id(url)
+        if job_id:
+            self._seen_urls.add(url)
+            with _JOBS_POSTGRES_BUFFER_LOCK:
+                _JOBS_SEEN_BUFFER.add(job_id)
+            print(f"    --> (Známá URL) Nabídka již uložena: {url}")
+            return True
+
         # For Azure Postgres main writes we use deterministic IDs + upsert, so a DB
         # pre-check is unnecessary and only creates extra connection pressure.
         if jobs_postgres_write_available():
@@ -1385,14 +1501,15 @@ class BaseScraper:
         """
         raise NotImplementedError("Subclasses must implement scrape_page_jobs()")
     
-    def scrape_website(self, site_name: str, base_url: str, max_pages: int = 10) -> int:
+    def scrape_website(self, site_name: str, base_url: str, max_pages: int = 10, start_page: int = 1) -> int:
         """
         Scrape multiple pages from a website
         
         Args:
             site_name: Name of the website
             base_url: Base URL for scraping
-            max_pages: Maximum number of pages to scrape
+            max_pages: Last page to scrape
+            start_page: First page to scrape (the orchestrator splits sites into page ranges)
         
         Returns:
             Total number of jobs saved
@@ -1404,7 +1521,7 @@ class BaseScraper:
         if effective_max_pages != max_pages:
             print(f"   ℹ️ Omezení stránek: {max_pages} → {effective_max_pages} (SCRAPER_MAX_PAGES={cap})")
         
-        for page_num in range(1, effective_max_pages + 1):
+        for page_num in range(max(1, start_page), effective_max_pages + 1):
             # Build page URL (different sites use different pagination formats)
             url = build_page_url(base_url, page_num)
             
@@ -1441,7 +1558,7 @@ class BaseScraper:
         Run scraper on multiple websites
         
         Args:
-            websites: List of dicts with 'name', 'base_url', 'max_pages' keys
+            websites: List of dicts with 'name', 'base_url', 'max_pages' and optional 'start_page' keys
         
         Returns:
             Total number of jobs saved across all websites
@@ -1464,7 +1581,8 @@ class BaseScraper:
                 total = self.scrape_website(
                     site['name'],
                     site['base_url'],
-                    site.get('max_pages', 10)
+                    site.get('max_pages', 10),
+                    site.get('start_page', 1)
                 )
                 grand_total += total
                 
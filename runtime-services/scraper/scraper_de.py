@@ -9,24 +9,40 @@ try:
     from .scraper_base import (
         BaseScraper, scrape_page, norm_text, extract_salary,
         detect_work_type, save_job_to_supabase, build_description,
-        extract_benefits, filter_out_junk, is_low_quality
+        extract_benefits, filter_out_junk, is_low_quality, make_soup,
+        get_salary_extractor, BenefitMatcher, fetch_details
     )
 except ImportError:
     # Fallback to direct import (when run as script)
     from scraper_base import (
         BaseScraper, scrape_page, norm_text, extract_salary,
         detect_work_type, save_job_to_supabase, build_description,
-        extract_benefits, filter_out_junk, is_low_quality
+        extract_benefits, filter_out_junk, is_low_quality, make_soup,
+        get_salary_extractor, BenefitMatcher, fetch_details
     )
 
 
 from urllib.parse import urljoin
-import time
 import re
 import json
 from bs4 import BeautifulSoup
 
 
+# DE salary timeframe tokens ("stunde", "monat", ...) compiled once.
+_DE_SALARY = get_salary_extractor("de")
+# German benefit keywords, scanned as one pattern per description.
+_DE_BENEFITS = BenefitMatcher({
+    'Home Office': r'home\s*office|remote|fernarbeit',
+    'Flexible Arbeitszeiten': r'flexible?\s*arbeitszeiten|gleitzeit',
+    'Weiterbildung': r'weiterbildung|schulung|training',
+    '30 Tage Urlaub': r'30\s*tage\s*urlaub|6\s*wochen',
+    'Betriebliche Altersvorsorge': r'betriebliche\s*altersvorsorge|pension',
+    'Firmenfahrzeug': r'firmenfahrzeug|dienstwagen|firmenwagen',
+    'Gym-Mitgliedschaft': r'fitnessstudio|gym|sportangebot',
+    'Mitarbeiterrabatte': r'mitarbeiterrabatt|corporate\s*benefits',
+})
+
+
 class GermanyScraper(BaseScraper):
     """Scraper for German and Austrian job portals"""
     
@@ -82,32 +98,27 @@ class GermanyScraper(BaseScraper):
                 if job_url:
                     links.add(job_url)
 
-        for url in list(links):
-            if self.is_duplicate(url):
-                continue
-                
+        targets = [url for url in links if not self.is_duplicate(url)]
+        # Detail pages and their ad iframes load on a bounded pool; pages come back in order.
+        for page in fetch_details(targets, scrape_page, self._stellenanzeigen_frame_urls):
+            url = page.url
             try:
                 print(f"    📄 Stahuji detail: {url}")
-                detail_soup = scrape_page(url)
+                detail_soup = page.soup
                 if not detail_soup:
                     continue
 
-                # If the detail is rendered in an iframe, load it too
+                # If the detail is rendered in an iframe, use it too
                 detail_iframe_soup = None
-                iframe = detail_soup.select_one('iframe[data-testid="qa-job-ad-iframe"], iframe[src*="/api/jobs/iframe/"]')
-                if iframe and iframe.get('src'):
-                    iframe_url = urljoin(base_url, iframe.get('src'))
-                    detail_iframe_soup = scrape_page(iframe_url)
+                iframe_urls = self._stellenanzeigen_frame_urls(url, detail_soup, 0)
+                if iframe_urls:
+                    detail_iframe_soup = page.frame(iframe_urls[0])
                     # Sometimes iframe content embeds another iframe (jobstatic)
                     if detail_iframe_soup:
-                        inner_iframe = detail_iframe_soup.select_one('iframe[src]')
-                        if inner_iframe and inner_iframe.get('src'):
-                            inner_src = inner_iframe.get('src')
-                            if any(h in inner_src for h in ['jobstatic', 'gohiring', 'anzeigen.jobstatic.de']):
-                                inner_url = urljoin(iframe_url, inner_src)
-                                inner_soup = scrape_page(inner_url)
-                                if inner_soup:
-                                    detail_iframe_soup = inner_soup
+                        inner_urls = self._stellenanzeigen_frame_urls(iframe_urls[0], detail_iframe_soup, 1)
+                        inner_soup = page.frame(inner_urls[0]) if inner_urls else None
+                        if inner_soup:
+                            detail_iframe_soup = inner_soup
                 
                 # Defaults
                 title = "Neznámá pozice"
@@ -186,7 +197,7 @@ class GermanyScraper(BaseScraper):
                     if 'description' in json_ld and json_ld['description']:
                         desc_html = json_ld['description']
                         # Clean HTML to text
-                        desc_soup = BeautifulSoup(desc_html, 'html.parser')
+                        desc_soup = make_soup(desc_html)
                         # Extract structured text
                         parts = []
                         for elem in desc_soup.find_all(['p', 'li', 'h2', 'h3', 'div']):
@@ -334,14 +345,26 @@ class GermanyScraper(BaseScraper):
 
                 if save_job_to_supabase(self.supabase, job_data, self._seen_urls):
                     jobs_saved += 1
-                
-                time.sleep(3)
 
             except Exception as e:
                 print(f"       ❌ Chyba detailu {url}: {e}")
                 continue
         
         return jobs_saved
+
+    def _stellenanzeigen_frame_urls(self, url, soup, depth):
+        """Iframe URLs a Stellenanzeigen page embeds: the ad iframe, then its jobstatic frame."""
+        if depth == 0:
+            iframe = soup.select_one('iframe[data-testid="qa-job-ad-iframe"], iframe[src*="/api/jobs/iframe/"]')
+            if iframe and iframe.get('src'):
+                return [urljoin('https://www.stellenanzeigen.de', iframe.get('src'))]
+        elif depth == 1:
+            inner_iframe = soup.select_one('iframe[src]')
+            if inner_iframe and inner_iframe.get('src'):
+                inner_src = inner_iframe.get('src')
+                if any(h in inner_src for h in ['jobstatic', 'gohiring', 'anzeigen.jobstatic.de']):
+                    return [urljoin(url, inner_src)]
+        return []
     
     def scrape_karriere_at(self, soup):
         """Scrape Karriere.at (Austrian job portal)"""
@@ -421,24 +444,26 @@ class GermanyScraper(BaseScraper):
                         continue
                     job_links.append(a)
         
+        # Skip duplicates early, then prefetch the remaining details on a bounded pool.
+        targets = {}
         for link_el in job_links:
-            try:
-                url = urljoin('https://www.karriere.at', link_el.get('href', ''))
-                
-                if not url or 'karriere.at' not in url:
-                    continue
-
-                # Skip duplicates early
-                if self.is_duplicate(url):
-                    continue
+            url = urljoin('https://www.karriere.at', link_el.get('href', ''))
+            if not url or 'karriere.at' not in url or url in targets:
+                continue
+            if self.is_duplicate(url):
+                continue
+            targets[url] = link_el
 
+        for page in fetch_details(targets, scrape_page):
+            try:
+                url = page.url
+                link_el = targets[url]
                 fallback = listing_fallbacks.get(url, {})
                 title = fallback.get('title') or norm_text(link_el.get_text())
                 
                 print(f"    📄 Stahuji detail: {title}")
                 
-                # Fetch detail
-                detail_soup = scrape_page(url)
+                detail_soup = page.soup
                 if not detail_soup:
                     continue
                 
@@ -506,7 +531,7 @@ class GermanyScraper(BaseScraper):
                 if json_ld and 'description' in json_ld and json_ld['description']:
                     try:
                         desc_html = json_ld['description']
-                        desc_soup = BeautifulSoup(desc_html, 'html.parser')
+                        desc_soup = make_soup(desc_html)
                         parts = []
                         for elem in desc_soup.find_all(['p', 'li', 'h2', 'h3']):
                             txt = norm_text(elem.get_text())
@@ -532,7 +557,7 @@ class GermanyScraper(BaseScraper):
                     if iframe and iframe.has_attr('srcdoc'):
                         try:
                             srcdoc = iframe['srcdoc']
-                            src_soup = BeautifulSoup(srcdoc, 'html.parser')
+                            src_soup = make_soup(srcdoc)
                             description = build_description(src_soup, {
                                 'paragraphs': ['.main-content p', '.job p', 'p'],
                                 'lists': ['.main-content ul', '.job ul', 'ul']
@@ -699,8 +724,6 @@ class GermanyScraper(BaseScraper):
                 if save_job_to_supabase(self.supabase, job_data, self._seen_urls):
                     jobs_saved += 1
                 
-                time.sleep(3)
-                
             except Exception as e:
                 print(f"       ❌ Chyba: {e}")
                 continue
@@ -708,20 +731,7 @@ class GermanyScraper(BaseScraper):
         return jobs_saved
 
     def _detect_salary_timeframe_de(self, text: str):
-        if not text:
-            return None
-        low = text.lower()
-        if any(tok in low for tok in ["stunde", "std", "hour", "/h"]):
-            return "hour"
-        if any(tok in low for tok in ["tag", "täglich", "daily", "/tag"]):
-            return "day"
-        if any(tok in low for tok in ["woche", "weekly", "/woche"]):
-            return "week"
-        if any(tok in low for tok in ["monat", "monatlich", "month", "/monat"]):
-            return "month"
-        if any(tok in low for tok in ["jahr", "jähr", "year", "/jahr"]):
-            return "year"
-        return None
+        return _DE_SALARY.period(text)
 
     def _detect_working_time_de(self, contract_type: str):
         if not contract_type:
@@ -839,13 +849,12 @@ class GermanyScraper(BaseScraper):
 
         links = {_clean_url(u) for u in links if u}
 
-        for url in links:
-            if self.is_duplicate(url):
-                continue
-
+        targets = [url for url in links if not self.is_duplicate(url)]
+        for page in fetch_details(targets, scrape_page):
+            url = page.url
             try:
                 print(f"    📄 Stahuji detail: {url}")
-                detail_soup = scrape_page(url)
+                detail_soup = page.soup
                 if not detail_soup:
                     continue
 
@@ -941,7 +950,7 @@ class GermanyScraper(BaseScraper):
 
                     if json_ld.get("description"):
                         desc_html = json_ld["description"]
-                        desc_soup = BeautifulSoup(desc_html, "html.parser")
+                        desc_soup = make_soup(desc_html)
                         parts = []
                         for elem in desc_soup.find_all(["p", "li", "h2", "h3", "div"]):
                             txt = norm_text(elem.get_text())
@@ -1087,8 +1096,6 @@ class GermanyScraper(BaseScraper):
                 if save_job_to_supabase(self.supabase, job_data, self._seen_urls):
                     jobs_saved += 1
 
-                time.sleep(3)
-
             except Exception as e:
                 print(f"       ❌ Chyba detailu {url}: {e}")
                 continue
@@ -1097,52 +1104,36 @@ class GermanyScraper(BaseScraper):
     
     def _extract_benefits_from_text(self, text):
         """Extract benefits from description text (German keywords)"""
-        benefits = []
-        keywords = {
-            'Home Office': r'home\s*office|remote|fernarbeit',
-            'Flexible Arbeitszeiten': r'flexible?\s*arbeitszeiten|gleitzeit',
-            'Weiterbildung': r'weiterbildung|schulung|training',
-            '30 Tage Urlaub': r'30\s*tage\s*urlaub|6\s*wochen',
-            'Betriebliche Altersvorsorge': r'betriebliche\s*altersvorsorge|pension',
-            'Firmenfahrzeug': r'firmenfahrzeug|dienstwagen|firmenwagen',
-            'Gym-Mitgliedschaft': r'fitnessstudio|gym|sportangebot',
-            'Mitarbeiterrabatte': r'mitarbeiterrabatt|corporate\s*benefits',
-        }
-        
-        text_lower = text.lower()
-        for benefit, pattern in keywords.items():
-            if re.search(pattern, text_lower):
-                benefits.append(benefit)
-        
-        return benefits
+        return _DE_BENEFITS.find(text)
+
+
+GERMANY_WEBSITES = [
+    {
+        'name': 'Stellenanzeigen.de',
+        # Full market (no keyword filter)
+        'base_url': 'https://www.stellenanzeigen.de/jobs/',
+        'max_pages': 10
+    },
+    {
+        'name': 'Karriere.at',
+        # Full market listing
+        'base_url': 'https://www.karriere.at/jobs?focusResults=true&page={page}',
+        'max_pages': 10
+    },
+    {
+        'name': 'Willhaben.at',
+        # Full market listing
+        'base_url': 'https://www.willhaben.at/jobs/',
+        'max_pages': 10
+    }
+]
 
 
 def run_germany_scraper():
     """Main function to run Germany/Austria scraper"""
     scraper = GermanyScraper()
     
-    websites = [
-        {
-            'name': 'Stellenanzeigen.de',
-            # Full market (no keyword filter)
-            'base_url': 'https://www.stellenanzeigen.de/jobs/',
-            'max_pages': 10
-        },
-        {
-            'name': 'Karriere.at',
-            # Full market listing
-            'base_url': 'https://www.karriere.at/jobs?focusResults=true&page={page}',
-            'max_pages': 10
-        },
-        {
-            'name': 'Willhaben.at',
-            # Full market listing
-            'base_url': 'https://www.willhaben.at/jobs/',
-            'max_pages': 10
-        }
-    ]
-    
-    return scraper.run(websites)
+    return scraper.run(GERMANY_WEBSITES)
 
 
 if __name__ == '__main__':
@@ -1,5 +1,4 @@
 import requests
-from bs4 import BeautifulSoup
 import json
 import time
 import base64
@@ -45,11 +44,17 @@ try:
     from .scraper_base import (
         save_job_to_supabase as shared_save_job_to_supabase,
         jobs_postgres_write_available,
+        make_soup,
+        JunkFilter,
+        get_salary_extractor,
     )
 except ImportError:
     from scraper_base import (  # type: ignore
         save_job_to_supabase as shared_save_job_to_supabase,
         jobs_postgres_write_available,
+        make_soup,
+        JunkFilter,
+        get_salary_extractor,
     )
 try:
     from scripts.backfill_remote_import_metadata import backfill as backfill_remote_import_metadata
@@ -310,21 +315,12 @@ def detect_language_code(text: str):
         return None
 
 
+# CZ salary tokens ("kč/h", "měsíčně", "35 tis.") compiled once for the functions below.
+_CZ_SALARY = get_salary_extractor("cz")
+
+
 def detect_salary_timeframe_cz(text):
-    if not text:
-        return None
-    low = text.lower()
-    if any(tok in low for tok in ["kč/h", "kc/h", "/hod", "hodin", "hod."]):
-        return "hour"
-    if any(tok in low for tok in ["/den", "denně", "denne"]):
-        return "day"
-    if any(tok in low for tok in ["/týd", "/tyd", "týden", "tyden"]):
-        return "week"
-    if any(tok in low for tok in ["/měs", "/mes", "měsíc", "mesiac", "měsíčně", "mesicne"]):
-        return "month"
-    if any(tok in low for tok in ["/rok", "roč", "roc", "p.a."]):
-        return "year"
-    return None
+    return _CZ_SALARY.period(text)
 
 
 def detect_working_time_cz(text):
@@ -682,50 +678,8 @@ def extract_salary_range(stxt):
     """
     if not stxt:
         return None, None
-    
-    # Krok 1: Extrakce číselných segmentů včetně oddělovačů (tečka, čárka, mezera)
-    nums = re.findall(r"\d[\d\s\.,]*", stxt)
-    vals = []
-    
-    for x in nums:
-        # Odstranění mezer a teček (často tisícové oddělovače v ČR)
-        cleaned = x.replace(" ", "").replace("\u00a0", "").replace(".", "")
-        
-        # Ošetření čárky - pokud je za ní přesně 2 cifry na konci segmentu, jde o haléře
-        if "," in cleaned:
-            parts = cleaned.split(",")
-            if len(parts) > 1 and len(parts[-1]) == 2:
-                cleaned = parts[0] # Zahodíme haléře
-            else:
-                cleaned = cleaned.replace(",", "") # Jinak čárka jako oddělovač tisíců
-        
-        if cleaned:
-            try:
-                val = int(cleaned)
-                # Filtrujeme nesmyslné hodnoty (např. '2024' z data nebo '1' z '1. patro')
-                if val > 100:
-                    vals.append(val)
-            except ValueError:
-                continue
 
-    # Krok 2: Multiplikátor "tisíc"
-    low_txt = stxt.lower()
-    if "tis" in low_txt or "tisíc" in low_txt:
-        # Pokud jsou hodnoty podezřele malé (např. 35 místo 35000), vynásobíme je
-        vals = [v * 1000 if v < 1000 else v for v in vals]
-
-    # Krok 3: Určení From/To
-    salary_from = None
-    salary_to = None
-    
-    if len(vals) == 1:
-        salary_from = vals[0]
-    elif len(vals) >= 2:
-        # Seřadíme, aby from < to (pokud by byly v opačném pořadí v textu)
-        salary_from = min(vals[0], vals[1])
-        salary_to = max(vals[0], vals[1])
-        
-    return salary_from, salary_to
+    return _CZ_SALARY.salary_range(stxt)
 
 
 # --- Uložení do Supabase ---
@@ -764,67 +718,45 @@ def scrape_page(url):
                 raise ssl_err
 
         resp.raise_for_status()
-        return BeautifulSoup(resp.content, "html.parser")
+        return make_soup(resp.content)
     except Exception as e:
         print(f"❌ Chyba při stahování {url}: {e}")
         return None
 
 
 # --- Filtrování footeru ---
+# Rozsáhlý seznam "junk" tokenů, které se často objevují v navigaci nebo patičkách
+JUNK_TOKENS = [
+    "nabídky práce", "vytvořit si životopis", "jobs.cz", "prace.cz", "atmoskop",
+    "profesia.sk", "profesia.cz", "práca za rohom", "práce za rohem", "nelisa.com",
+    "arnold", "teamio", "seduo.cz", "seduo.sk", "platy.cz", "platy.sk", "paylab.com",
+    "mojposao", "historie odpovědí", "uložené nabídky", "upozornění na nabídky",
+    "hledám zaměstnance", "vložit brigádu", "ceník inzerce", "napište nám",
+    "pro média", "zásady ochrany soukromí", "podmínky používání", "nastavení cookies",
+    "reklama na portálech", "transparentnost", "nahlásit nezákonný obsah",
+    "vzdělávací kurzy", "středoškolské nebo odborné", "typ pracovního poměru",
+    "kontaktní údaje", "zadavatel", "časté pracovní cesty", "foto v medailonku",
+    "the pulse of beauty", "nadnárodní struktury", "vlastní organizace",
+    "vyhrazený čas na inovace", "kafetérie", "příspěvek na vzdělání",
+    "stravenky/příspěvek na stravování", "zdravotní volno/sickdays",
+    "možnost občasné práce z domova", "občerstvení na pracovišti",
+    "příspěvek na sport/kulturu", "firemní akce", "bonusy/prémie",
+    "flexibilní začátek/konec pracovní doby", "notebook", "sleva na firemní výrobky",
+    "nabídky práce", "brigády", "inspirace", "zaměstnavatelé", "skvělý životopis",
+    "můžete si ho uložit", "vytisknout nebo poslat do světa"
+]
+
+_JUNK_FILTER = JunkFilter(JUNK_TOKENS)
+
+
 def filter_out_junk(text):
     """Odstraní navigaci, patičky a obecný balast z popisů pozic."""
     if not text:
         return ""
-    
-    # Rozsáhlý seznam "junk" tokenů, které se často objevují v navigaci nebo patičkách
-    junk_tokens = [
-        "nabídky práce", "vytvořit si životopis", "jobs.cz", "prace.cz", "atmoskop",
-        "profesia.sk", "profesia.cz", "práca za rohom", "práce za rohem", "nelisa.com",
-        "arnold", "teamio", "seduo.cz", "seduo.sk", "platy.cz", "platy.sk", "paylab.com",
-        "mojposao", "historie odpovědí", "uložené nabídky", "upozornění na nabídky",
-        "hledám zaměstnance", "vložit brigádu", "ceník inzerce", "napište nám",
-        "pro média", "zásady ochrany soukromí", "podmínky používání", "nastavení cookies",
-        "reklama na portálech", "transparentnost", "nahlásit nezákonný obsah",
-        "vzdělávací kurzy", "středoškolské nebo odborné", "typ pracovního poměru",
-        "kontaktní údaje", "zadavatel", "časté pracovní cesty", "foto v medailonku",
-        "the pulse of beauty", "nadnárodní struktury", "vlastní organizace",
-        "vyhrazený čas na inovace", "kafetérie", "příspěvek na vzdělání",
-        "stravenky/příspěvek na stravování", "zdravotní volno/sickdays",
-        "možnost občasné práce z domova", "občerstvení na pracovišti",
-        "příspěvek na sport/kulturu", "firemní akce", "bonusy/prémie",
-        "flexibilní začátek/konec pracovní doby", "notebook", "sleva na firemní výrobky",
-        "nabídky práce", "brigády", "inspirace", "zaměstnavatelé", "skvělý životopis",
-        "můžete si ho uložit", "vytisknout nebo poslat do světa"
-    ]
-    
-    lines = text.split("\n")
-    filtered_lines = []
-    
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            filtered_lines.append("")
-            continue
-            
-        low = stripped.lower()
-        
-        # Pokud je řádek příliš krátký (navigační odkaz) a obsahuje junk token
-        if len(stripped) < 100:
-            if any(tok in low for tok in junk_tokens):
-                continue
-        
-        # Specifické pro Jobs.cz navigaci (často dlouhé seznamy s krátkými řádky)
-        if any(tok == low for tok in junk_tokens):
-            continue
-            
-        filtered_lines.append(stripped)
-    
-    # Zpětné spojení a vyčištění prázdných řádků na začátku/konci
-    result = "\n".join(filtered_lines).strip()
-    
-    # Odstranění vícenásobných prázdných řádků
-    result = re.sub(r'\n{3,}', '\n\n', result)
-    
+
+    # Krátké řádky (navigační odkazy) s junk tokenem a přesné shody se zahodí,
+    # vícenásobné prázdné řádky se sloučí.
+    result = _JUNK_FILTER.clean(text)
     return result if result else "Popis není dostupný"
 
 
@@ -1299,7 +1231,7 @@ def scrape_jenprace_cz(soup):
 
 
 # --- Hlavní funkce ---
-def scrape_website(site_name, base_url, max_pages=10):
+def scrape_website(site_name, base_url, max_pages=10, start_page=1):
     total_saved = 0
     scrapers = {
         "jobs.cz": scrape_jobs_cz,
@@ -1314,7 +1246,7 @@ def scrape_website(site_name, base_url, max_pages=10):
     effective_max_pages = min(max_pages, cap) if cap else max_pages
     if effective_max_pages != max_pages:
         print(f"   ℹ️ Omezení stránek: {max_pages} → {effective_max_pages} (SCRAPER_MAX_PAGES={cap})")
-    for page_num in range(1, effective_max_pages + 1):
+    for page_num in range(max(1, start_page), effective_max_pages + 1):
         url = (
             f"{base_url}&page={page_num}"
             if site_name == "jobs.cz"
@@ -1352,27 +1284,29 @@ def run_all_scrapers():
     if not supabase and jobs_postgres_write_available():
         print("ℹ️ Supabase není dostupné, pokračuji v postgres-only režimu.")
 
+CZECH_WEBSITES = [
+    {
+        "name": "jobs.cz",
+        "base_url": "https://www.jobs.cz/prace/?language-skill=cs",
+        "max_pages": 10,
+    },
+    {
+        "name": "prace.cz",
+        "base_url": "https://www.prace.cz/nabidky",
+        "max_pages": 10,
+    },
+    {
+        "name": "jenprace.cz",
+        "base_url": "https://www.jenprace.cz/nabidky",
+        "max_pages": 10,
+    },
+]
+
+
 def run_czech_scrapers():
     """Runs only Czech-specific website scrapers (jobs.cz, prace.cz, jenprace.cz)"""
-    websites = [
-        {
-            "name": "jobs.cz",
-            "base_url": "https://www.jobs.cz/prace/?language-skill=cs",
-            "max_pages": 10,
-        },
-        {
-            "name": "prace.cz",
-            "base_url": "https://www.prace.cz/nabidky",
-            "max_pages": 10,
-        },
-        {
-            "name": "jenprace.cz",
-            "base_url": "https://www.jenprace.cz/nabidky",
-            "max_pages": 10,
-        },
-    ]
     total = 0
-    for site in websites:
+    for site in CZECH_WEBSITES:
         try:
             total += scrape_website(
                 site["name"], site["base_url"], site["max_pages"]
@@ -28,6 +28,7 @@ try:
         extract_benefits,
         extract_salary,
         filter_out_junk,
+        make_soup,
     )
     from scraper_api_sources import (
         LiveSourceUnavailableError,
@@ -51,6 +52,7 @@ except ImportError:
         extract_benefits,
         extract_salary,
         filter_out_junk,
+        make_soup,
     )
     from .scraper_api_sources import (
         LiveSourceUnavailableError,
@@ -343,7 +345,7 @@ class NordicScraper:
                 
             # Clean HTML if present
             if "<" in description:
-                description = BeautifulSoup(description, "html.parser").get_text(separator="\n")
+                description = make_soup(description).get_text(separator="\n")
 
             # Extract salary if available
             salary_data = job_data.get("salary", {})
@@ -748,7 +750,7 @@ class NordicScraper:
                     })
                     response.raise_for_status()
                     
-                    soup = BeautifulSoup(response.content, 'html.parser')
+                    soup = make_soup(response.content)
                     
                     # Generic selectors (works for most job sites)
                     # Try multiple common selectors
@@ -810,7 +812,7 @@ class NordicScraper:
                 search_url = self._build_portal_search_url(portal, search_term)
                 response = requests.get(search_url, timeout=20, headers=self._get_portal_headers(portal))
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = make_soup(response.content)
                 listing_links = self._extract_duunitori_listing_links(soup, max_jobs_per_term)
                 if not listing_links:
                     print(f"      ℹ️ Duunitori: no listings parsed for '{search_term}'")
@@ -858,7 +860,7 @@ class NordicScraper:
                 search_url = self._build_portal_search_url(portal, search_term)
                 response = requests.get(search_url, timeout=20, headers=self._get_portal_headers(portal))
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = make_soup(response.content)
                 listing_links = self._extract_jobly_listing_links(soup, max_jobs_per_term)
                 if not listing_links:
                     print(f"      ℹ️ Jobly: no listings parsed for '{search_term}'")
@@ -916,7 +918,7 @@ class NordicScraper:
             try:
                 response = requests.get(page_url, timeout=20, headers=self._get_portal_headers(portal))
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = make_soup(response.content)
                 listing_links = extractor(soup, max_jobs_per_page)
                 if not listing_links:
                     continue
@@ -8,20 +8,19 @@ try:
     from .scraper_base import (
         BaseScraper, scrape_page, norm_text, extract_salary,
         detect_work_type, save_job_to_supabase, build_description,
-        extract_benefits, filter_out_junk, is_low_quality
+        extract_benefits, filter_out_junk, is_low_quality, make_soup
     )
 except ImportError:
     # Fallback to direct import (when run as script)
     from scraper_base import (
         BaseScraper, scrape_page, norm_text, extract_salary,
         detect_work_type, save_job_to_supabase, build_description,
-        extract_benefits, filter_out_junk, is_low_quality
+        extract_benefits, filter_out_junk, is_low_quality, make_soup
     )
 import json
 from urllib.parse import urljoin
 import time
 import re
-from bs4 import BeautifulSoup
 
 
 class PolandScraper(BaseScraper):
@@ -248,7 +247,7 @@ class PolandScraper(BaseScraper):
                     if json_ld:
                         if 'description' in json_ld and json_ld['description']:
                             desc_html = json_ld['description']
-                            desc_soup = BeautifulSoup(desc_html, 'html.parser')
+                            desc_soup = make_soup(desc_html)
                             parts = []
                             for elem in desc_soup.find_all(['p', 'li', 'h2', 'h3']):
                                 txt = norm_text(elem.get_text())
@@ -459,7 +458,7 @@ class PolandScraper(BaseScraper):
 
                         if json_ld and json_ld.get("description"):
                             desc_html = json_ld["description"]
-                            desc_soup = BeautifulSoup(desc_html, "html.parser")
+                            desc_soup = make_soup(desc_html)
                             parts = []
                             for elem in desc_soup.find_all(["p", "li", "h2", "h3"]):
                                 txt = norm_text(elem.get_text())
@@ -706,7 +705,7 @@ class PolandScraper(BaseScraper):
 
                         if json_ld and 'description' in json_ld and json_ld['description']:
                             desc_html = json_ld['description']
-                            desc_soup = BeautifulSoup(desc_html, 'html.parser')
+                            desc_soup = make_soup(desc_html)
                             parts = []
                             for elem in desc_soup.find_all(['p', 'li', 'h2', 'h3']):
                                 txt = norm_text(elem.get_text())
@@ -930,37 +929,38 @@ class PolandScraper(BaseScraper):
         return jobs_saved
 
 
+POLAND_WEBSITES = [
+    {
+        'name': 'Pracuj.pl',
+        # Full market (no keyword filter)
+        'base_url': 'https://www.pracuj.pl/praca?pn={page}',
+        'max_pages': 10
+    },
+    {
+        'name': 'Praca.pl',
+        # Full market listing
+        'base_url': 'https://www.praca.pl/oferty-pracy.html',
+        'max_pages': 10
+    },
+    {
+        'name': 'NoFluffJobs',
+        # Full market listing
+        'base_url': 'https://nofluffjobs.com/pl/jobs?page={page}',
+        'max_pages': 10
+    },
+    # {
+    #     'name': 'JustJoin.it',
+    #     'base_url': 'https://justjoin.it/offers',
+    #     'max_pages': 10
+    # }
+]
+
+
 def run_poland_scraper():
     """Main function to run Poland scraper"""
     scraper = PolandScraper()
     
-    websites = [
-        {
-            'name': 'Pracuj.pl',
-            # Full market (no keyword filter)
-            'base_url': 'https://www.pracuj.pl/praca?pn={page}',
-            'max_pages': 10
-        },
-        {
-            'name': 'Praca.pl',
-            # Full market listing
-            'base_url': 'https://www.praca.pl/oferty-pracy.html',
-            'max_pages': 10
-        },
-        {
-            'name': 'NoFluffJobs',
-            # Full market listing
-            'base_url': 'https://nofluffjobs.com/pl/jobs?page={page}',
-            'max_pages': 10
-        },
-        # {
-        #     'name': 'JustJoin.it',
-        #     'base_url': 'https://justjoin.it/offers',
-        #     'max_pages': 10
-        # }
-    ]
-    
-    return scraper.run(websites)
+    return scraper.run(POLAND_WEBSITES)
 
 
 if __name__ == '__main__':
@@ -8,20 +8,25 @@ try:
     from .scraper_base import (
         BaseScraper, scrape_page, norm_text, extract_salary,
         detect_work_type, save_job_to_supabase, build_description,
-        extract_benefits, filter_out_junk, is_low_quality
+        extract_benefits, filter_out_junk, is_low_quality,
+        get_salary_extractor
     )
 except ImportError:
     # Fallback to direct import (when run as script)
     from scraper_base import (
         BaseScraper, scrape_page, norm_text, extract_salary,
         detect_work_type, save_job_to_supabase, build_description,
-        extract_benefits, filter_out_junk, is_low_quality
+        extract_benefits, filter_out_junk, is_low_quality,
+        get_salary_extractor
     )
 from urllib.parse import urljoin
 import time
 import re
 from datetime import datetime
 
+# SK salary timeframe tokens ("/hod", "/mesiac", ...) compiled once.
+_SK_SALARY = get_salary_extractor("sk")
+
 
 class SlovakiaScraper(BaseScraper):
     """Scraper for Slovak job portals"""
@@ -410,20 +415,7 @@ class SlovakiaScraper(BaseScraper):
         return lines
 
     def _detect_salary_timeframe(self, text: str):
-        if not text:
-            return None
-        low = text.lower()
-        if any(tok in low for tok in ["/hod", "hodin", "hour"]):
-            return "hour"
-        if any(tok in low for tok in ["/den", "denne", "day"]):
-            return "day"
-        if any(tok in low for tok in ["/týž", "/tyz", "week", "týždeň", "tyzden"]):
-            return "week"
-        if any(tok in low for tok in ["/mesiac", "/mes", "month"]):
-            return "month"
-        if any(tok in low for tok in ["/rok", "roč", "year"]):
-            return "year"
-        return None
+        return _SK_SALARY.period(text)
 
     def _detect_working_time(self, contract_type: str):
         if not contract_type:
@@ -726,26 +718,27 @@ class SlovakiaScraper(BaseScraper):
         return jobs_saved
 
 
+SLOVAKIA_WEBSITES = [
+    {
+        'name': 'Profesia.sk',
+        'base_url': 'https://www.profesia.sk/praca/',
+        'max_pages': 10
+    },
+    {
+        'name': 'Kariera.sk',
+        'base_url': 'https://kariera.zoznam.sk/pracovne-ponuky/za-1-den',
+        'max_pages': 10
+    }
+]
+
+
 def run_slovakia_scraper():
     """Main function to run Slovakia scraper"""
     curr_time = datetime.now().isoformat()
     print(f"🚀 Spouštím SK scraper: {curr_time}", flush=True)
     scraper = SlovakiaScraper()
     
-    websites = [
-        {
-            'name': 'Profesia.sk',
-            'base_url': 'https://www.profesia.sk/praca/',
-            'max_pages': 10
-        },
-        {
-            'name': 'Kariera.sk',
-            'base_url': 'https://kariera.zoznam.sk/pracovne-ponuky/za-1-den',
-            'max_pages': 10
-        }
-    ]
-    
-    return scraper.run(websites)
+    return scraper.run(SLOVAKIA_WEBSITES)
 
 
 if __name__ == '__main__':
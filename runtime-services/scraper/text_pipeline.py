@@ -0,0 +1,286 @@
+"""
+Text cleaning for scraped descriptions, compiled once per process.
+
+Every saved job runs through filter_out_junk, normalize_description_for_storage and
+detect_language_code (scraper_base). The expensive parts live here:
+
+- ``JunkFilter``: the navigation/footer token list as one trie-shaped regular
+  expression, searched once per short line instead of ~90 substring tests.
+- ``needs_text_repair``: the cheap check that lets the ftfy pass be skipped for text
+  ftfy would hand back unchanged (ASCII or NFC text with no mojibake, control
+  characters, curly quotes, ligatures, wide forms or HTML entities).
+- ``LanguageIdentifier``: deterministic character 1-3-gram naive Bayes over
+  langdetect's own language profiles. langdetect itself (seeded) only decides short
+  texts the profiles cannot separate.
+- ``memoize``: results keyed by a content hash in a bounded per-process LRU, so the
+  same description seen from several searches or portals is cleaned once.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter, OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from ftfy.badness import is_bad as _ftfy_is_bad
+except Exception:  # optional; without ftfy there is nothing to skip
+    _ftfy_is_bad = None
+
+try:
+    import langdetect
+    from langdetect import DetectorFactory, LangDetectException, detect_langs
+    # langdetect samples n-grams at random; a fixed seed makes the fallback repeatable.
+    DetectorFactory.seed = 0
+except Exception:
+    langdetect = None  # type: ignore
+    detect_langs = None  # type: ignore
+    LangDetectException = Exception  # type: ignore
+
+SCRAPER_TEXT_CACHE_SIZE = max(0, int(os.getenv("SCRAPER_TEXT_CACHE_SIZE", "4096") or "4096"))
+SCRAPER_LANGUAGE_CANDIDATES = [
+    code.strip()
+    for code in os.getenv("SCRAPER_LANGUAGE_CANDIDATES", "cs,sk,pl,de,en,fi,sv,da,no,nl,fr,es,it,hu,uk,ru").split(",")
+    if code.strip()
+]
+
+
+# --- Junk lines ---
+
+def _trie_pattern(tokens: Iterable[str]) -> str:
+    """One regex alternation shaped like a trie of ``tokens`` (shared prefixes are matched once)."""
+    trie: Dict[str, dict] = {}
+    for token in tokens:
+        node = trie
+        for char in token:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        # A token ending here already matches; longer tokens through it add nothing.
+        if "" in node:
+            return ""
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return build(trie) if trie else r"(?!)"
+
+
+class JunkFilter:
+    """Drops navigation/footer lines: short lines containing a token, or lines equal to one."""
+
+    def __init__(self, tokens: Sequence[str], short_line: int = 100):
+        self.tokens = tuple(dict.fromkeys(token.lower() for token in tokens if token))
+        self.short_line = short_line
+        self._exact = frozenset(self.tokens)
+        self._search = re.compile(_trie_pattern(self.tokens)).search
+
+    def is_junk(self, line: str) -> bool:
+        low = line.lower()
+        if len(line) < self.short_line and self._search(low) is not None:
+            return True
+        return low in self._exact
+
+    def clean(self, text: str) -> str:
+        """Stripped non-junk lines (blank lines kept), at most one empty line in a row; may be ""."""
+        kept = []
+        for line in text.split("\n"):
+            stripped = line.strip()
+            if stripped and self.is_junk(stripped):
+                continue
+            kept.append(stripped)
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(kept).strip())
+
+
+# --- ftfy fast path ---
+
+# Characters some ftfy fixer rewrites even in otherwise clean text: C0/C1 controls (\t, \n
+# and form feed are kept), CR, entities ("&"), curly quotes, line/paragraph separators,
+# invisible formatting characters, the BOM, wide forms, Latin ligatures and surrogates.
+_REPAIR_CHARS_RE = re.compile(
+    "[\x00-\x08\x0b\x0d-\x1f\x7f-\x9f&\u0132\u0133\u0149\u01c4-\u01cc\u01f1-\u01f3\u02bc\u2018-\u201f"
+    "\u2028\u2029\u206a-\u206f\u3000\ufb00-\ufb06\ufeff\ufff9-\ufffc\uff01-\uffef\ud800-\udfff]"
+)
+
+
+def needs_text_repair(text: str) -> bool:
+    """False only when ``ftfy.fix_text(text, normalization="NFC")`` would return ``text`` as is."""
+    if _REPAIR_CHARS_RE.search(text):
+        return True
+    if text.isascii():
+        return False
+    if _ftfy_is_bad is None:
+        return True
+    return not unicodedata.is_normalized("NFC", text) or _ftfy_is_bad(text)
+
+
+# --- Language identification ---
+
+_URL_RE = re.compile(r"https?://\S+|[-_.0-9A-Za-z]{1,64}@[-_0-9A-Za-z]{1,255}[-_.0-9A-Za-z]{1,255}")
+_NON_LETTERS_RE = re.compile(r"[\W\d_]+")
+
+
+def _ngrams(text: str, max_chars: int) -> Counter:
+    grams: Counter = Counter()
+    words = _NON_LETTERS_RE.sub(" ", _URL_RE.sub(" ", text[: max_chars * 2]).lower()[:max_chars]).split()
+    for word in words:
+        padded = f" {word} "
+        grams.update(word)
+        grams.update(padded[index:index + 2] for index in range(len(padded) - 1))
+        grams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return grams
+
+
+class LanguageIdentifier:
+    """
+    Naive Bayes over langdetect's 1-3-gram profiles for ``languages``.
+
+    ``identify`` returns the best language unless the text is short (< ``short_text``
+    characters) and the two best languages are closer than ``min_margin`` nats per
+    n-gram; those go to ``fallback`` when one is given.
+    """
+
+    def __init__(
+        self,
+        languages: Sequence[str],
+        profiles_dir: Optional[str] = None,
+        *,
+        max_chars: int = 1000,
+        short_text: int = 200,
+        min_margin: float = 0.1,
+        fallback: Optional[Callable[[str], Optional[str]]] = None,
+    ):
+        directory = Path(profiles_dir or Path(langdetect.__file__).resolve().parent / "profiles")
+        self.languages: List[str] = []
+        profiles = []
+        for code in languages:
+            path = directory / code
+            if path.exists():
+                self.languages.append(code)
+                profiles.append(json.loads(path.read_text(encoding="utf-8")))
+        self.max_chars = max_chars
+        self.short_text = short_text
+        self.min_margin = min_margin
+        self.fallback = fallback
+        self._table: Dict[str, Tuple[float, ...]] = {}
+        grams = set()
+        for profile in profiles:
+            grams.update(gram.lower() for gram in profile["freq"])
+        lowered = [Counter() for _ in profiles]
+        for counts, profile in zip(lowered, profiles):
+            for gram, freq in profile["freq"].items():
+                counts[gram.lower()] += freq
+        for gram in grams:
+            self._table[gram] = tuple(
+                math.log((counts.get(gram, 0) + 0.5) / profile["n_words"][min(len(gram), 3) - 1])
+                for counts, profile in zip(lowered, profiles)
+            )
+
+    def scores(self, text: str) -> List[Tuple[str, float]]:
+        """Languages by mean log-likelihood per known n-gram, best first ([] if none are known)."""
+        rows = []
+        total = 0
+        for gram, count in _ngrams(text, self.max_chars).items():
+            row = self._table.get(gram)
+            if row is not None:
+                rows.extend([row] * count)
+                total += count
+        if not total:
+            return []
+        sums = [math.fsum(column) / total for column in zip(*rows)]
+        return sorted(zip(self.languages, sums), key=lambda item: item[1], reverse=True)
+
+    def identify(self, text: str) -> Optional[str]:
+        ranked = self.scores(text)
+        if not ranked:
+            return self.fallback(text) if self.fallback else None
+        if len(ranked) > 1 and len(text) < self.short_text and ranked[0][1] - ranked[1][1] < self.min_margin:
+            if self.fallback:
+                return self.fallback(text) or ranked[0][0]
+        return ranked[0][0]
+
+
+def _langdetect_code(text: str) -> Optional[str]:
+    if detect_langs is None:
+        return None
+    try:
+        langs = detect_langs(text)
+    except LangDetectException:
+        return None
+    except Exception:
+        return None
+    return str(langs[0]).split(":")[0] if langs else None
+
+
+_identifier: Optional[LanguageIdentifier] = None
+_identifier_lock = Lock()
+
+
+def get_language_identifier() -> Optional[LanguageIdentifier]:
+    """The process-wide identifier (built on first use; None without langdetect)."""
+    global _identifier
+    if _identifier is None and langdetect is not None:
+        with _identifier_lock:
+            if _identifier is None:
+                _identifier = LanguageIdentifier(SCRAPER_LANGUAGE_CANDIDATES, fallback=_langdetect_code)
+    return _identifier
+
+
+def identify_language(text: str) -> Optional[str]:
+    identifier = get_language_identifier()
+    return identifier.identify(text) if identifier else None
+
+
+# --- Memo ---
+
+class ContentMemo:
+    """Bounded LRU of stage results keyed by (stage, blake2b of the text)."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._entries: "OrderedDict[Tuple[str, bytes], object]" = OrderedDict()
+        self._lock = Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def get_or_compute(self, stage: str, text: str, compute: Callable[[str], object]):
+        if self.capacity <= 0:
+            return compute(text)
+        key = (stage, hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest())
+        with self._lock:
+            stats = self._stats.setdefault(stage, {"hits": 0, "misses": 0})
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                stats["hits"] += 1
+                return self._entries[key]
+            stats["misses"] += 1
+        value = compute(text)
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {stage: dict(counts) for stage, counts in self._stats.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+
+_memo = ContentMemo(SCRAPER_TEXT_CACHE_SIZE)
+
+
+def memoize(stage: str, text: str, compute: Callable[[str], object]):
+    return _memo.get_or_compute(stage, text, compute)
+
+
+def get_text_memo() -> ContentMemo:
+    return _memo
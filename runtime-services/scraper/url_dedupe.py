@@ -0,0 +1,315 @@
+"""
+Known job URLs shared by every scraper process and kept across runs.
+
+A job listing reached again on a later run should not cost another detail-page
+fetch. Known jobs are kept as keys (job ids of canonical URLs, see
+``scraper_base.canonical_job_key``) in two files under one directory:
+
+* ``known_urls.bloom`` - a Bloom filter, memory-mapped shared, so forked workers see
+  each other's additions and a lookup of an unknown URL touches neither SQLite nor
+  Postgres;
+* ``known_urls.sqlite3`` - the exact key -> (job id, fetched_at) table that every
+  Bloom positive is confirmed against, so a false positive never skips a new job.
+
+The filter is rebuilt from the jobs table on demand (``URLDedupe.rebuild``). Between
+rebuilds, concurrent writers can lose a bit of a shared byte; that only costs one
+extra fetch, because the exact table stays authoritative for positives.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+SCRAPER_URL_DEDUPE_ENABLED = os.getenv("SCRAPER_URL_DEDUPE_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+SCRAPER_URL_DEDUPE_DIR = os.getenv("SCRAPER_URL_DEDUPE_DIR", "data/url_dedupe")
+SCRAPER_URL_DEDUPE_CAPACITY = max(1000, int(os.getenv("SCRAPER_URL_DEDUPE_CAPACITY", "2000000") or "2000000"))
+SCRAPER_URL_DEDUPE_FP_RATE = min(0.1, max(1e-6, float(os.getenv("SCRAPER_URL_DEDUPE_FP_RATE", "0.001") or "0.001")))
+# Known jobs are fetched again after this long so edits to the posting are picked up.
+SCRAPER_URL_DEDUPE_REFETCH_HOURS = max(1, int(os.getenv("SCRAPER_URL_DEDUPE_REFETCH_HOURS", "72") or "72"))
+SCRAPER_URL_DEDUPE_REBUILD_HOURS = max(1, int(os.getenv("SCRAPER_URL_DEDUPE_REBUILD_HOURS", "24") or "24"))
+
+_TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl",
+    "trk", "trackingid", "refid", "ref", "referrer",
+}
+_HEADER = struct.Struct("<8sQIxxxxd")
+_MAGIC = b"JSURLBF1"
+
+
+def canonical_job_url(url: str) -> str:
+    """
+    One spelling per job URL: https, lower-case host without ``www.`` and default
+    port, no fragment, no trailing slash, tracking parameters dropped and the rest
+    of the query sorted.
+    """
+    text = str(url or "").strip()
+    parts = urlsplit(text)
+    if not parts.scheme or not parts.netloc:
+        return text
+    scheme = "https" if parts.scheme.lower() in {"http", "https"} else parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in {80, 443}:
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def bloom_parameters(capacity: int, fp_rate: float) -> Tuple[int, int]:
+    """(bits, hash count) of a Bloom filter holding ``capacity`` keys at ``fp_rate``."""
+    capacity = max(1, int(capacity))
+    bits = max(64, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+    return bits, max(1, int(round(bits / capacity * math.log(2))))
+
+
+class _BloomFile:
+    """A Bloom filter whose bit array lives in a shared memory-mapped file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.bits, self.hashes, self.built_at = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a known-URL filter")
+
+    @staticmethod
+    def create(path: str, bits: int, hashes: int, built_at: float) -> None:
+        with open(path, "wb") as handle:
+            handle.write(_HEADER.pack(_MAGIC, bits, hashes, built_at))
+            handle.truncate(_HEADER.size + (bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [(first + index * step) % self.bits for index in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        data = self._map
+        for position in self._positions(key):
+            offset = _HEADER.size + (position >> 3)
+            data[offset] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        data = self._map
+        return all(data[_HEADER.size + (position >> 3)] & (1 << (position & 7)) for position in self._positions(key))
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+class URLDedupe:
+    """
+    Bloom filter in front of an exact SQLite table of known job keys.
+
+    ``lookup`` answers from the filter when it says no and confirms every yes in
+    SQLite. Storage errors are reported and treated as "unknown": the worst outcome
+    is a detail page fetched once more.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        capacity: int = SCRAPER_URL_DEDUPE_CAPACITY,
+        fp_rate: float = SCRAPER_URL_DEDUPE_FP_RATE,
+        clock: Callable[[], float] = time.time,
+        busy_timeout_ms: int = 2000,
+    ):
+        self.directory = directory
+        self.bloom_path = os.path.join(directory, "known_urls.bloom")
+        self.db_path = os.path.join(directory, "known_urls.sqlite3")
+        self.capacity = int(capacity)
+        self.fp_rate = float(fp_rate)
+        self._clock = clock
+        self._busy_timeout_ms = int(busy_timeout_ms)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "filter_negatives": 0, "filter_positives": 0, "false_positives": 0, "known": 0, "added": 0, "errors": 0}
+        os.makedirs(directory, exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS known_jobs ("
+            "key TEXT PRIMARY KEY, job_id TEXT NOT NULL, fetched_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        if not os.path.exists(self.bloom_path):
+            _BloomFile.create(self.bloom_path, *bloom_parameters(self.capacity, self.fp_rate), 0.0)
+        self._bloom = _BloomFile(self.bloom_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=self._busy_timeout_ms / 1000.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self._busy_timeout_ms}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    @property
+    def built_at(self) -> float:
+        """When the filter was last rebuilt from the database (0 if never)."""
+        return self._bloom.built_at
+
+    def might_contain(self, key: str) -> bool:
+        return key in self._bloom
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """``{"job_id", "fetched_at"}`` of a known key, None for an unknown one."""
+        self._count("lookups")
+        if key not in self._bloom:
+            self._count("filter_negatives")
+            return None
+        self._count("filter_positives")
+        try:
+            row = self._connect().execute("SELECT job_id, fetched_at FROM known_jobs WHERE key = ?", (key,)).fetchone()
+        except Exception as exc:
+            self._count("errors")
+            print(f"⚠️ [URL Dedupe] lookup failed: {exc}")
+            return None
+        if row is None:
+            self._count("false_positives")
+            return None
+        self._count("known")
+        return {"job_id": row[0], "fetched_at": row[1]}
+
+    def fresh_job_id(self, key: str, max_age_seconds: float) -> Optional[str]:
+        """Job id of a known key fetched within ``max_age_seconds``, else None."""
+        entry = self.lookup(key)
+        if entry is None or self._clock() - float(entry["fetched_at"]) > max_age_seconds:
+            return None
+        return entry["job_id"]
+
+    def add_many(self, items: Iterable[Tuple[str, str]], fetched_at: Optional[float] = None) -> int:
+        """Record ``(key, job_id)`` pairs as fetched now (or at ``fetched_at``)."""
+        stamp = self._clock() if fetched_at is None else float(fetched_at)
+        rows = [(key, str(job_id), stamp) for key, job_id in items if key]
+        if not rows:
+            return 0
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT INTO known_jobs (key, job_id, fetched_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET job_id = excluded.job_id, fetched_at = excluded.fetched_at",
+                    rows,
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as exc:
+            self._count("errors")
+            print(f"⚠️ [URL Dedupe] could not record {len(rows)} jobs: {exc}")
+            return 0
+        for key, _job_id, _stamp in rows:
+            self._bloom.add(key)
+        self._count("added", len(rows))
+        return len(rows)
+
+    def rebuild(self, items: Iterable[Tuple[str, str, float]]) -> int:
+        """
+        Replace the known set with ``(key, job_id, fetched_at)`` rows from the database.
+
+        Keys no longer in the database are dropped. For keys this machine fetched
+        itself the later of the two fetch times is kept. The filter is sized for at
+        least twice the rebuilt count and swapped in atomically.
+        """
+        conn = self._connect()
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS rebuild_jobs (key TEXT PRIMARY KEY, job_id TEXT NOT NULL, fetched_at REAL NOT NULL)")
+        conn.execute("DELETE FROM rebuild_jobs")
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT INTO rebuild_jobs (key, job_id, fetched_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET fetched_at = MAX(fetched_at, excluded.fetched_at)",
+                ((key, str(job_id), float(fetched_at or 0.0)) for key, job_id, fetched_at in items if key),
+            )
+            conn.execute("DELETE FROM known_jobs WHERE key NOT IN (SELECT key FROM rebuild_jobs)")
+            conn.execute(
+                "INSERT INTO known_jobs (key, job_id, fetched_at) SELECT key, job_id, fetched_at FROM rebuild_jobs WHERE true "
+                "ON CONFLICT(key) DO UPDATE SET job_id = excluded.job_id, fetched_at = MAX(known_jobs.fetched_at, excluded.fetched_at)"
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("DELETE FROM rebuild_jobs")
+
+        count = conn.execute("SELECT COUNT(*) FROM known_jobs").fetchone()[0]
+        staging = self.bloom_path + ".new"
+        _BloomFile.create(staging, *bloom_parameters(max(self.capacity, 2 * count), self.fp_rate), self._clock())
+        bloom = _BloomFile(staging)
+        for (key,) in conn.execute("SELECT key FROM known_jobs"):
+            bloom.add(key)
+        bloom.close()
+        os.replace(staging, self.bloom_path)
+        with self._lock:
+            self._bloom.close()
+            self._bloom = _BloomFile(self.bloom_path)
+        return count
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["filter_bits"], stats["filter_hashes"] = self._bloom.bits, self._bloom.hashes
+        try:
+            stats["entries"] = self._connect().execute("SELECT COUNT(*) FROM known_jobs").fetchone()[0]
+        except Exception:
+            pass
+        return stats
+
+    def close(self) -> None:
+        self._bloom.close()
+
+
+_dedupe_lock = threading.Lock()
+_dedupe_instance: Optional[URLDedupe] = None
+_dedupe_configured = False
+
+
+def get_url_dedupe() -> Optional[URLDedupe]:
+    """The known-URL store shared by this machine's scraper processes, or None when disabled."""
+    global _dedupe_instance, _dedupe_configured
+    if _dedupe_configured:
+        return _dedupe_instance
+    with _dedupe_lock:
+        if not _dedupe_configured:
+            if SCRAPER_URL_DEDUPE_ENABLED:
+                try:
+                    _dedupe_instance = URLDedupe(SCRAPER_URL_DEDUPE_DIR)
+                except Exception as exc:
+                    print(f"⚠️ [URL Dedupe] disabled, cannot open {SCRAPER_URL_DEDUPE_DIR}: {exc}")
+            _dedupe_configured = True
+    return _dedupe_instance
+
+
+def set_url_dedupe(dedupe: Optional[URLDedupe]) -> None:
+    """Replace the process-wide known-URL store (``None`` disables it)."""
+    global _dedupe_instance, _dedupe_configured
+    with _dedupe_lock:
+        _dedupe_instance = dedupe
+        _dedupe_configured = True
@@ -1,4 +1,581 @@
+"""
+Rate limiting shared by every worker and replica of the API.
+
+Decisions use GCRA (generic cell rate algorithm): each key stores a single
+"theoretical arrival time", and the read-check-write step runs atomically inside
+the storage backend. Every process pointed at the same storage therefore enforces
+one global budget:
+
+- ``SQLiteRateLimitStorage``: one host, any number of uvicorn/gunicorn workers,
+- ``RedisRateLimitStorage``: clusters, anything speaking the Redis protocol,
+- ``MemoryRateLimitStorage``: a single process (tests, local dev).
+
+Requests are keyed by authenticated identity (user id / integration API key, as
+reported by the authenticators through ``remember_authenticated_credential``) and
+fall back to the client IP. The middleware runs before authentication, so the
+credential -> identity table is kept in the same storage as the budgets: a token
+verified on one worker is charged to its user on every other worker too. Expensive routes consume more of the budget than cheap
+reads (``RATE_LIMIT_ROUTE_COSTS``).
+
+The global middleware is opt-in (``RATE_LIMIT_ENABLED``). Behind a proxy or ingress
+every anonymous request arrives from the proxy's address, so enable it together with
+``RATE_LIMIT_TRUST_FORWARDED`` there, or all anonymous users share one bucket.
+
+``limiter`` (slowapi) stays available for per-route decorators.
+
+The backend API loads this same module (backend/app/core/limiter.py).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Protocol
+
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.requests import Request
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+DEFAULT_BUDGET = "600/minute"
+# Path suffix -> cost in budget units; everything else costs 1.
+DEFAULT_ROUTE_COSTS: dict[str, int] = {
+    "/jobs/hybrid-search-v2": 10,
+    "/jobs/hybrid-search": 8,
+    "/mentor/chat": 20,
+    "/mentor/recruiter-chat": 20,
+    "/mentor/role-insight": 10,
+    "/jobs/search/parse": 5,
+}
+EXEMPT_PATHS = frozenset({"/health", "/ready", "/", "/docs", "/openapi.json"})
+
+_metrics_lock = threading.Lock()
+_METRICS: dict[str, int] = {"checks": 0, "rejected": 0, "storage_errors": 0, "cost_consumed": 0}
+
+
+def _bump(**amounts: int) -> None:
+    with _metrics_lock:
+        for name, amount in amounts.items():
+            _METRICS[name] = _METRICS.get(name, 0) + amount
+
+
+def rate_limit_metrics() -> dict[str, Any]:
+    with _metrics_lock:
+        out: dict[str, Any] = dict(_METRICS)
+    out["reject_rate"] = round(out["rejected"] / out["checks"], 4) if out["checks"] else 0.0
+    return out
+
+
+def reset_rate_limit_metrics() -> None:
+    with _metrics_lock:
+        for key in _METRICS:
+            _METRICS[key] = 0
+
+
+def parse_rate(value: str) -> tuple[int, float]:
+    """``"600/minute"`` / ``"10/second"`` / ``"100/5minute"`` -> (units, period seconds)."""
+    amount, _, per = str(value).strip().lower().partition("/")
+    per = per.strip() or "minute"
+    digits = "".join(ch for ch in per if ch.isdigit())
+    unit = per[len(digits):].strip().rstrip("s") or "minute"
+    if unit not in _PERIODS:
+        raise ValueError(f"Unknown rate period: {value!r}")
+    return max(1, int(amount)), _PERIODS[unit] * (int(digits) if digits else 1)
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+
+def gcra(tat: Optional[float], now: float, cost: int, limit: int, period: float) -> tuple[RateLimitDecision, Optional[float]]:
+    """
+    One GCRA step. Returns the decision and the new arrival time to store (``None`` when
+    the request is rejected and nothing must change). A full budget may be spent as a
+    burst; it then refills continuously at ``limit / period`` units per second.
+    """
+    interval = period / limit
+    base = max(tat or now, now)
+    new_tat = base + interval * cost
+    allow_at = new_tat - period
+    if cost > limit or now < allow_at:
+        remaining = max(0, int((now + period - base) / interval))
+        retry_after = (period if cost > limit else allow_at - now)
+        return RateLimitDecision(False, limit, remaining, retry_after, base - now), None
+    remaining = max(0, int((now + period - new_tat) / interval))
+    return RateLimitDecision(True, limit, remaining, 0.0, new_tat - now), new_tat
+
+
+class RateLimitStorage(Protocol):
+    # True when acquire() can wait (network, file locks) and must not run on the event loop.
+    blocking: bool
+
+    def acquire(self, key: str, cost: int, limit: int, period: float) -> RateLimitDecision: ...
+
+    def remember_identity(self, key: str, identity: str, ttl_seconds: float) -> None: ...
+
+    def identity_for(self, key: str) -> Optional[str]: ...
+
+
+class MemoryRateLimitStorage:
+    blocking = False
+
+    def __init__(self, clock: Callable[[], float] = time.time, max_keys: int = 100000):
+        self._clock = clock
+        self._max_keys = max(1, int(max_keys))
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._identities: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, cost: int, limit: int, period: float) -> RateLimitDecision:
+        now = self._clock()
+        with self._lock:
+            decision, new_tat = gcra(self._tats.get(key), now, cost, limit, period)
+            if new_tat is not None:
+                self._tats[key] = new_tat
+                self._tats.move_to_end(key)
+                while len(self._tats) > self._max_keys:
+                    self._tats.popitem(last=False)
+        return decision
+
+    def remember_identity(self, key: str, identity: str, ttl_seconds: float) -> None:
+        with self._lock:
+            self._identities[key] = (self._clock() + ttl_seconds, identity)
+            self._identities.move_to_end(key)
+            while len(self._identities) > self._max_keys:
+                self._identities.popitem(last=False)
+
+    def identity_for(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._identities.get(key)
+            if entry is None or entry[0] <= self._clock():
+                return None
+            return entry[1]
+
+
+class SQLiteRateLimitStorage:
+    """
+    Shared state for all processes on one host. Each decision is one ``BEGIN IMMEDIATE``
+    transaction, so concurrent workers serialize on the row instead of double-spending.
+    Waiting for that lock can take up to the busy timeout, hence ``blocking``.
+    """
+
+    blocking = True
+    _PURGE_EVERY = 5000
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time, busy_timeout_ms: int = 2000):
+        self.path = path
+        self._clock = clock
+        self._busy_timeout_ms = int(busy_timeout_ms)
+        self._local = threading.local()
+        self._ops = 0
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limit_tat (key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_identity "
+                "(key TEXT PRIMARY KEY, identity TEXT NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self._busy_timeout_ms / 1000.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Limiter state is disposable; losing the last writes on power loss is acceptable.
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(f"PRAGMA busy_timeout={self._busy_timeout_ms}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def acquire(self, key: str, cost: int, limit: int, period: float) -> RateLimitDecision:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = self._clock()
+            row = conn.execute("SELECT tat FROM rate_limit_tat WHERE key = ?", (key,)).fetchone()
+            decision, new_tat = gcra(row[0] if row else None, now, cost, limit, period)
+            if new_tat is not None:
+                conn.execute(
+                    "INSERT INTO rate_limit_tat (key, tat) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    (key, new_tat),
+                )
+            self._ops += 1
+            if self._ops % self._PURGE_EVERY == 0:
+                conn.execute("DELETE FROM rate_limit_tat WHERE tat < ?", (now,))
+                conn.execute("DELETE FROM rate_limit_identity WHERE expires_at < ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return decision
+
+    def remember_identity(self, key: str, identity: str, ttl_seconds: float) -> None:
+        self._connect().execute(
+            "INSERT INTO rate_limit_identity (key, identity, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET identity = excluded.identity, expires_at = excluded.expires_at",
+            (key, identity, self._clock() + ttl_seconds),
+        )
+
+    def identity_for(self, key: str) -> Optional[str]:
+        row = self._connect().execute(
+            "SELECT identity FROM rate_limit_identity WHERE key = ? AND expires_at > ?", (key, self._clock())
+        ).fetchone()
+        return row[0] if row else None
+
+
+_REDIS_GCRA_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local period = tonumber(ARGV[3])
+local interval = period / limit
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+local base = math.max(tat, now)
+local new_tat = base + interval * cost
+local allow_at = new_tat - period
+if cost > limit or now < allow_at then
+  local retry = cost > limit and period or (allow_at - now)
+  return {0, math.max(0, math.floor((now + period - base) / interval)), tostring(retry), tostring(base - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000) + 1)
+return {1, math.max(0, math.floor((now + period - new_tat) / interval)), '0', tostring(new_tat - now)}
+"""
+
+
+class RedisRateLimitStorage:
+    """Cluster-wide state; the GCRA step runs as a Lua script using the server clock."""
+
+    blocking = True
+
+    def __init__(self, url: Optional[str] = None, client: Any = None, prefix: str = "rl:"):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("redis package is required for RedisRateLimitStorage")
+            client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.5)
+        self._client = client
+        self._prefix = prefix
+        self._script = client.register_script(_REDIS_GCRA_SCRIPT)
+
+    def acquire(self, key: str, cost: int, limit: int, period: float) -> RateLimitDecision:
+        allowed, remaining, retry_after, reset_after = self._script(keys=[self._prefix + key], args=[cost, limit, period])
+        return RateLimitDecision(bool(int(allowed)), limit, int(remaining), float(retry_after), float(reset_after))
+
+    def remember_identity(self, key: str, identity: str, ttl_seconds: float) -> None:
+        self._client.set(f"{self._prefix}id:{key}", identity, px=max(1, int(ttl_seconds * 1000)))
+
+    def identity_for(self, key: str) -> Optional[str]:
+        value = self._client.get(f"{self._prefix}id:{key}")
+        if value is None:
+            return None
+        return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def default_sqlite_path() -> str:
+    return os.path.join(tempfile.gettempdir(), "jobshaman-rate-limit.sqlite3")
+
+
+def storage_from_url(url: Optional[str]) -> RateLimitStorage:
+    """``memory://``, ``sqlite:///path/to/file`` or ``redis://host:6379/0`` (``rediss://`` too)."""
+    url = (url or "").strip()
+    if not url:
+        return SQLiteRateLimitStorage(default_sqlite_path())
+    if url.startswith("memory://"):
+        return MemoryRateLimitStorage()
+    if url.startswith("sqlite:///"):
+        # SQLAlchemy style: sqlite:///relative.db, sqlite:////absolute/path.db
+        return SQLiteRateLimitStorage(url[len("sqlite:///"):] or default_sqlite_path())
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        if redis is None:
+            raise ValueError(f"RATE_LIMIT_STORAGE_URL={url.split('://', 1)[0]}://... needs the redis package (pip install redis)")
+        return RedisRateLimitStorage(url)
+    raise ValueError(f"Unsupported RATE_LIMIT_STORAGE_URL: {url!r}")
+
+
+# ---------------------------------------------------------------- request identity
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+# Only behind a proxy that overwrites X-Forwarded-For; otherwise clients could pick their key.
+_TRUST_FORWARDED = _env_bool("RATE_LIMIT_TRUST_FORWARDED", False)
+
+_IDENTITY_TTL_SECONDS = 300.0
+# How long a worker trusts an identity it read from the shared storage before asking again.
+_SHARED_IDENTITY_LOCAL_TTL_SECONDS = 30.0
+_IDENTITY_MAX_ENTRIES = 20000
+_identity_lock = threading.Lock()
+# credential hash -> (expires_at, identity, rewrite shared entry at)
+_identities: "OrderedDict[str, tuple[float, str, float]]" = OrderedDict()
+_shared_identities: Optional[RateLimitStorage] = None
+
+
+def share_credential_identities(storage: Optional[RateLimitStorage]) -> None:
+    """Publish verified credentials to ``storage`` so every worker sharing it keys them alike."""
+    global _shared_identities
+    _shared_identities = storage if hasattr(storage, "identity_for") else None
+
+
+def _credential_hash(credential: str) -> str:
+    return hashlib.sha256(credential.encode("utf-8")).hexdigest()
+
+
+def remember_authenticated_credential(credential: str, identity: str, ttl_seconds: float = _IDENTITY_TTL_SECONDS) -> None:
+    """
+    Called by authenticators after a credential verified: later requests carrying it are
+    limited as ``identity`` (e.g. ``user:<id>``). Unverified credentials never get their own
+    bucket, so rotating garbage tokens does not escape the per-IP limit.
+    """
+    if not credential or not identity:
+        return
+    key = _credential_hash(credential)
+    now = time.monotonic()
+    with _identity_lock:
+        entry = _identities.get(key)
+        # The shared entry is rewritten once per half TTL, not on every authenticated request.
+        publish = entry is None or entry[1] != identity or entry[2] <= now
+        _identities[key] = (now + ttl_seconds, identity, now + ttl_seconds / 2 if publish else entry[2])
+        _identities.move_to_end(key)
+        while len(_identities) > _IDENTITY_MAX_ENTRIES:
+            _identities.popitem(last=False)
+    shared = _shared_identities
+    if publish and shared is not None:
+        try:
+            shared.remember_identity(key, identity, ttl_seconds)
+        except Exception as exc:
+            print(f"⚠️ [RateLimit] could not share verified identity: {exc}")
+
+
+def _identity_for_credential(credential: str) -> Optional[str]:
+    key = _credential_hash(credential)
+    now = time.monotonic()
+    with _identity_lock:
+        entry = _identities.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                return entry[1]
+            _identities.pop(key, None)
+    shared = _shared_identities
+    if shared is None:
+        return None
+    try:
+        identity = shared.identity_for(key)
+    except Exception as exc:
+        print(f"⚠️ [RateLimit] could not read shared identity: {exc}")
+        return None
+    if identity:
+        expires_at = now + _SHARED_IDENTITY_LOCAL_TTL_SECONDS
+        with _identity_lock:
+            _identities[key] = (expires_at, identity, expires_at)
+            _identities.move_to_end(key)
+            while len(_identities) > _IDENTITY_MAX_ENTRIES:
+                _identities.popitem(last=False)
+    return identity
+
+
+def _bearer_token(headers: Any) -> Optional[str]:
+    auth = headers.get("authorization") or ""
+    if auth[:7].lower() != "bearer ":
+        return None
+    return auth[7:].strip() or None
+
+
+def client_ip(request: Any, trust_forwarded: bool = False) -> str:
+    if trust_forwarded:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",", 1)[0].strip()
+    return get_remote_address(request)
+
+
+def rate_limit_key(request: Any) -> str:
+    """User / API-key identity when the credential has been verified before, else the client IP."""
+    state_key = getattr(getattr(request, "state", None), "rate_limit_key", None)
+    if state_key:
+        return str(state_key)
+    token = _bearer_token(request.headers)
+    if token:
+        identity = _identity_for_credential(token)
+        if identity:
+            return identity
+    return f"ip:{client_ip(request, _TRUST_FORWARDED)}"
+
+
+# ---------------------------------------------------------------- limiter + middleware
+
+
+def _parse_route_costs(raw: Optional[str]) -> dict[str, int]:
+    """``RATE_LIMIT_ROUTE_COSTS`` as JSON object or ``"/path=cost,/other=cost"``."""
+    costs = dict(DEFAULT_ROUTE_COSTS)
+    if not raw or not raw.strip():
+        return costs
+    try:
+        parsed = json.loads(raw)
+        items = parsed.items() if isinstance(parsed, dict) else []
+    except ValueError:
+        items = [part.split("=", 1) for part in raw.split(",") if "=" in part]
+    for path, cost in items:
+        try:
+            costs[str(path).strip().rstrip("/")] = max(0, int(cost))
+        except (TypeError, ValueError):
+            print(f"⚠️ [RateLimit] ignoring invalid route cost {path}={cost}")
+    return costs
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        storage: RateLimitStorage,
+        *,
+        budget: str = DEFAULT_BUDGET,
+        route_costs: Optional[dict[str, int]] = None,
+        key_func: Callable[[Any], str] = rate_limit_key,
+        fail_open: bool = True,
+    ):
+        self.storage = storage
+        self.limit, self.period = parse_rate(budget)
+        self.key_func = key_func
+        self.fail_open = fail_open
+        costs = DEFAULT_ROUTE_COSTS if route_costs is None else route_costs
+        # Longest suffix first so "/jobs/hybrid-search-v2" wins over "/jobs/hybrid-search".
+        self._route_costs = sorted(((path.rstrip("/"), int(cost)) for path, cost in costs.items()), key=lambda item: -len(item[0]))
+
+    def cost_for(self, method: str, path: str) -> int:
+        if method == "OPTIONS" or path in EXEMPT_PATHS:
+            return 0
+        path = path.rstrip("/")
+        for suffix, cost in self._route_costs:
+            if path.endswith(suffix):
+                return cost
+        return 1
+
+    def check(self, key: str, cost: int = 1) -> RateLimitDecision:
+        try:
+            decision = self.storage.acquire(key, cost, self.limit, self.period)
+        except Exception as exc:
+            _bump(checks=1, storage_errors=1)
+            print(f"⚠️ [RateLimit] storage error, {'allowing' if self.fail_open else 'rejecting'} request: {exc}")
+            return RateLimitDecision(self.fail_open, self.limit, 0, 0.0 if self.fail_open else 1.0, 0.0)
+        _bump(checks=1, rejected=0 if decision.allowed else 1, cost_consumed=cost if decision.allowed else 0)
+        return decision
+
+    async def check_async(self, key: str, cost: int = 1) -> RateLimitDecision:
+        if getattr(self.storage, "blocking", True):
+            return await asyncio.to_thread(self.check, key, cost)
+        return self.check(key, cost)
+
+    def check_request(self, request: Any, cost: int = 1) -> RateLimitDecision:
+        return self.check(self.key_func(request), cost)
+
+    async def check_request_async(self, request: Any, cost: int = 1) -> RateLimitDecision:
+        # The key may come from the shared identity table, which is the same blocking storage.
+        if getattr(self.storage, "blocking", True):
+            return await asyncio.to_thread(self.check_request, request, cost)
+        return self.check_request(request, cost)
+
+
+def _headers(decision: RateLimitDecision) -> list[tuple[bytes, bytes]]:
+    headers = [
+        (b"x-ratelimit-limit", str(decision.limit).encode()),
+        (b"x-ratelimit-remaining", str(decision.remaining).encode()),
+        (b"x-ratelimit-reset", str(math.ceil(decision.reset_after)).encode()),
+    ]
+    if not decision.allowed:
+        headers.append((b"retry-after", str(max(1, math.ceil(decision.retry_after))).encode()))
+    return headers
+
+
+class RateLimitMiddleware:
+    """ASGI middleware charging every HTTP request against its key's global budget."""
+
+    def __init__(self, app: Any, rate_limiter: RateLimiter):
+        self.app = app
+        self.rate_limiter = rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        cost = self.rate_limiter.cost_for(scope.get("method", "GET"), scope.get("path", ""))
+        if cost <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        decision = await self.rate_limiter.check_request_async(Request(scope), cost)
+        if not decision.allowed:
+            body = json.dumps({"status": "error", "detail": "Rate limit exceeded"}).encode("utf-8")
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 429,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())] + _headers(decision),
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        extra_headers = _headers(decision)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers") or []) + extra_headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def rate_limiter_from_env() -> RateLimiter:
+    return RateLimiter(
+        storage_from_url(os.getenv("RATE_LIMIT_STORAGE_URL")),
+        budget=os.getenv("RATE_LIMIT_BUDGET") or DEFAULT_BUDGET,
+        route_costs=_parse_route_costs(os.getenv("RATE_LIMIT_ROUTE_COSTS")),
+        fail_open=_env_bool("RATE_LIMIT_FAIL_OPEN", True),
+    )
+
+
+def install_rate_limiting(app: Any) -> Optional[RateLimiter]:
+    """Attach the global limiter middleware when ``RATE_LIMIT_ENABLED`` is on."""
+    if not _env_bool("RATE_LIMIT_ENABLED", False):
+        return None
+    try:
+        rate_limiter = rate_limiter_from_env()
+    except Exception as exc:
+        print(f"⚠️ [RateLimit] disabled, storage could not be initialised: {exc}")
+        return None
+    share_credential_identities(rate_limiter.storage)
+    app.add_middleware(RateLimitMiddleware, rate_limiter=rate_limiter)
+    app.state.rate_limiter = rate_limiter
+    return rate_limiter
+
+
+def _slowapi_storage_uri() -> str:
+    url = (os.getenv("RATE_LIMIT_STORAGE_URL") or "").strip()
+    return url if url.startswith(("redis://", "rediss://")) else "memory://"
+
 
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(key_func=rate_limit_key, storage_uri=_slowapi_storage_uri(), strategy="moving-window")
@@ -9,6 +9,7 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from .config import CSRF_TOKEN_EXPIRY
 from .database import supabase
+from .limiter import remember_authenticated_credential
 
 security = HTTPBearer()
 csrf_tokens: dict[str, dict[str, Any]] = {}
@@ -118,6 +119,7 @@ def verify_supabase_token(token: str) -> dict:
             "email": getattr(auth_user, "email", "") or "",
         }
         _AUTH_CONTEXT_CACHE[cache_key] = (now + timedelta(seconds=_AUTH_CONTEXT_CACHE_TTL_SECONDS), deepcopy(payload))
+        remember_authenticated_credential(token, f"user:{user_id}")
         return payload
     except HTTPException:
         raise
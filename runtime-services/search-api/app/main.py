@@ -12,7 +12,7 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from starlette.responses import JSONResponse
 
-from .core.limiter import limiter
+from .core.limiter import install_rate_limiting, limiter
 from .core.security import add_security_headers
 from .routers import search_runtime, seo, analytics
 
@@ -81,6 +81,9 @@ def _is_allowed_origin(origin: str | None) -> bool:
     return normalized_origin in ALLOWED_ORIGINS or bool(_origin_regex.match(normalized_origin))
 
 
+# Opt-in (RATE_LIMIT_ENABLED) global, cost-weighted budget per user / IP shared by all workers (before CORS so 429s carry CORS headers).
+install_rate_limiting(app)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,